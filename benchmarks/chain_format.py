@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Compare sync throughput and disk footprint of the binary and the legacy hex chain schema.
+
+Blocks are read from a file created with `np-export` and persisted into a fresh database
+for each schema.
+
+Usage:
+    python benchmarks/chain_format.py -i testnet.acc -t 50000
+"""
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Block import Block
+from neo.IO.MemoryStream import MemoryStream
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.SchemaMigration import get_dir_size
+from neocore.IO.BinaryReader import BinaryReader
+import argparse
+import shutil
+import tempfile
+import time
+
+
+class HexLevelDBBlockchain(LevelDBBlockchain):
+    _sysversion = LevelDBBlockchain._sysversion_hex
+
+
+def run(klass, file_path, total_blocks):
+    path = tempfile.mkdtemp()
+    try:
+        chain = klass(path)
+        Blockchain.RegisterBlockchain(chain)
+
+        stream = MemoryStream()
+        reader = BinaryReader(stream)
+        block = Block()
+
+        with open(file_path, 'rb') as file_input:
+            total_blocks = min(total_blocks, int.from_bytes(file_input.read(4), 'little'))
+
+            start = time.time()
+            for index in range(total_blocks):
+                block_len = int.from_bytes(file_input.read(4), 'little')
+                reader.stream.write(file_input.read(block_len))
+                reader.stream.seek(0)
+                block.Deserialize(reader)
+                if block.Index > 0:
+                    chain.AddBlockDirectly(block)
+                reader.stream.Cleanup()
+            elapsed = time.time() - start
+
+        chain.Dispose()
+        Blockchain.DeregisterBlockchain()
+
+        return total_blocks, elapsed, get_dir_size(path)
+    finally:
+        shutil.rmtree(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-i", "--input", required=True, help="Block file created with np-export")
+    parser.add_argument("-t", "--totalblocks", help="Total blocks to import", type=int, default=10000)
+    args = parser.parse_args()
+
+    for name, klass in [('hex', HexLevelDBBlockchain), ('binary', LevelDBBlockchain)]:
+        blocks, elapsed, size = run(klass, args.input, args.totalblocks)
+        print("%-8s %8s blocks  %8.1f blocks/s  %10.1f MB" % (name, blocks, blocks / elapsed, size / 1024 / 1024))
+
+
+if __name__ == "__main__":
+    main()
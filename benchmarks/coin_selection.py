@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Compare the coin selection strategies of `Wallet.MakeTransaction` on a synthetic wallet.
+
+The wallet holds one asset on one address, in coins of random value: mostly dust, some mid-sized coins
+and a few large ones, like the deposit address of an exchange. For every strategy the same payments are
+selected, and the time per selection, the number of inputs and the size of the resulting transaction
+(with one payment output, the change output and the witness) are reported. The `scan` line is the
+selection walking and sorting every coin of the wallet, as done before coins were indexed.
+
+Usage:
+    python benchmarks/coin_selection.py -c 200000 -p 200 --max-inputs 100
+"""
+from neo.Core.CoinReference import CoinReference
+from neo.Core.State.CoinState import CoinState
+from neo.Core.TX.Transaction import TransactionOutput, ContractTransaction
+from neo.Wallets.Coin import Coin
+from neo.Wallets.CoinIndex import CoinIndex
+from neo.Wallets.CoinSelection import CoinSelector, LargestFirstSelector, BranchAndBoundSelector, ConsolidationSelector
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+import argparse
+import random
+import statistics
+import time
+
+ASSET = UInt256(data=b'\x01' * 32)
+ADDRESS = UInt160(data=b'\x01' * 20)
+
+# invocation script with one signature and a standard verification script
+WITNESS_SIZE = 1 + 65 + 1 + 35
+
+
+def make_coins(count, rnd):
+    coins = {}
+    for index in range(count):
+        kind = rnd.random()
+        if kind < 0.8:
+            value = rnd.randint(1, 10 ** 7)
+        elif kind < 0.98:
+            value = rnd.randint(10 ** 7, 10 ** 10)
+        else:
+            value = rnd.randint(10 ** 10, 10 ** 12)
+
+        reference = CoinReference(prev_hash=UInt256(data=index.to_bytes(32, 'little')), prev_index=0)
+        output = TransactionOutput(AssetId=ASSET, Value=Fixed8(value), script_hash=ADDRESS)
+        coins[reference] = Coin.CoinFromRef(reference, output, state=CoinState.Confirmed)
+    return coins
+
+
+def scan(coins, amount):
+    unspent = [coin for coin in coins.values()
+               if coin.Output.AssetId == ASSET and coin.State & CoinState.Confirmed > 0 and coin.State & CoinState.Spent == 0]
+    for coin in unspent:
+        if coin.Output.Value == amount:
+            return [coin]
+
+    total = Fixed8(0)
+    selected = []
+    for coin in sorted(unspent, key=lambda coin: coin.Output.Value.value):
+        total = total + coin.Output.Value
+        selected.append(coin)
+        if total >= amount:
+            return selected
+    return None
+
+
+def tx_size(coins, amount):
+    paid = sum(coin.Output.Value.value for coin in coins)
+    outputs = [TransactionOutput(AssetId=ASSET, Value=amount, script_hash=ADDRESS)]
+    if paid > amount.value:
+        outputs.append(TransactionOutput(AssetId=ASSET, Value=Fixed8(paid - amount.value), script_hash=ADDRESS))
+
+    tx = ContractTransaction(inputs=[coin.Reference for coin in coins], outputs=outputs)
+    return tx.Size() + WITNESS_SIZE
+
+
+def run(name, select, amounts):
+    times = []
+    inputs = []
+    sizes = []
+    failed = 0
+    for amount in amounts:
+        start = time.perf_counter()
+        coins = select(amount)
+        times.append(time.perf_counter() - start)
+
+        if coins is None:
+            failed += 1
+            continue
+        inputs.append(len(coins))
+        sizes.append(tx_size(coins, amount))
+
+    inputs = inputs or [0]
+    sizes = sizes or [0]
+    print("%-12s %9.2f %9.2f %8.1f %8s %9.0f %8s %7s" % (
+        name, statistics.mean(times) * 1000, max(times) * 1000, statistics.mean(inputs), max(inputs),
+        statistics.mean(sizes), max(sizes), failed))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--coins", help="Number of coins in the wallet", type=int, default=200000)
+    parser.add_argument("-p", "--payments", help="Number of payments to select coins for", type=int, default=200)
+    parser.add_argument("--max-inputs", help="Input cap of the capped strategies", type=int, default=100)
+    parser.add_argument("--seed", help="Random seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+
+    start = time.time()
+    coins = make_coins(args.coins, rnd)
+    index = CoinIndex(coins)
+    buckets = [bucket for address, bucket in index.GetBuckets(asset_id=ASSET)]
+    print("%s coins, indexed in %.1f s" % (len(index), time.time() - start))
+
+    # payments of any size, and some that are exactly the value of a few coins
+    values = [coin.Output.Value.value for coin in coins.values()]
+    amounts = []
+    for payment in range(args.payments):
+        if payment % 4 == 0:
+            amounts.append(Fixed8(sum(rnd.sample(values, 3))))
+        else:
+            amounts.append(Fixed8(rnd.randint(10 ** 8, 10 ** 11)))
+
+    selectors = [
+        ('default', CoinSelector()),
+        ('largest', LargestFirstSelector()),
+        ('exact', BranchAndBoundSelector()),
+        ('consolidate', ConsolidationSelector(max_inputs=args.max_inputs)),
+        ('capped', CoinSelector(max_inputs=args.max_inputs)),
+    ]
+
+    print("%-12s %9s %9s %8s %8s %9s %8s %7s" % ('strategy', 'ms/sel', 'max ms', 'inputs', 'max', 'tx bytes', 'max', 'failed'))
+    run('scan', lambda amount: scan(coins, amount), amounts[:max(1, args.payments // 10)])
+    for name, selector in selectors:
+        run(name, lambda amount: selector.Select(buckets, amount), amounts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Persist synthetic blocks touching an increasing number of accounts through `DBCollection` and report
+the time per block.
+
+The first block of each size creates the accounts, the second one updates them. Both touch every account
+twice, like the outputs and inputs of a block do, and remove a tenth of them.
+
+Usage:
+    python benchmarks/db_collection.py -c 1000 5000 10000
+"""
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Core.State.AccountState import AccountState
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+from neocore.Fixed8 import Fixed8
+import argparse
+import os
+import plyvel
+import shutil
+import tempfile
+import time
+
+ASSET_ID = UInt256(data=bytearray(32))
+
+
+def persist_block(db, keys):
+    start = time.time()
+
+    accounts = DBCollection(db, None, DBPrefix.ST_Account, AccountState, True)
+    for key in keys:
+        account = accounts.GetAndChange(key, AccountState(UInt160(data=key)))
+        account.AddToBalance(ASSET_ID, Fixed8.One())
+
+    for key in keys:
+        accounts.GetAndChange(key).SubtractFromBalance(ASSET_ID, Fixed8.Satoshi())
+
+    for key in keys[:len(keys) // 10]:
+        accounts.Remove(key)
+
+    with db.write_batch(transaction=True) as wb:
+        accounts.Commit(wb)
+
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--counts", help="Numbers of accounts per block", type=int, nargs='+', default=[1000, 5000, 10000])
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp()
+    try:
+        db = plyvel.DB(path, create_if_missing=True)
+
+        for count in args.counts:
+            keys = [os.urandom(20) for i in range(0, count)]
+
+            created = persist_block(db, keys)
+            updated = persist_block(db, keys)
+
+            print("%6s accounts  create %.3fs  update %.3fs" % (count, created, updated))
+
+        db.close()
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
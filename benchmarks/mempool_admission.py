@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Measure how fast transactions are admitted to a memory pool that holds many pending transactions.
+
+The pool is filled with `--pending` transactions, then `--count` more are admitted the way
+`NodeLeader.AddTransaction` does it, without the script verification: the conflict and fee checks, then `Add`,
+which evicts the lowest fee transactions once the pool is full. For comparison, the same conflict check is done
+by scanning the inputs of all pending transactions, as a plain dict of transactions requires.
+
+Usage:
+    python benchmarks/mempool_admission.py -p 50000 -c 10000
+"""
+from neo.Core.CoinReference import CoinReference
+from neo.Network.MemPool import MemPool
+from neocore.Fixed8 import Fixed8
+from neocore.UInt256 import UInt256
+import argparse
+import os
+import random
+import time
+
+
+class Transaction:
+
+    def __init__(self):
+        self.Hash = UInt256(data=os.urandom(32))
+        self.inputs = [CoinReference(UInt256(data=os.urandom(32)), random.randint(0, 3)) for i in range(2)]
+        self.fee = random.randint(0, 10000000)
+
+    def NetworkFee(self):
+        return Fixed8(self.fee)
+
+    def Size(self):
+        return 250
+
+
+def admit(pool, transactions):
+    admitted = 0
+    for tx in transactions:
+        if tx.Hash.ToBytes() in pool or pool.HasConflicts(tx):
+            continue
+        fee_per_byte = pool.FeePerByte(tx)
+        if pool.CanAdmit(fee_per_byte):
+            pool.Add(tx, fee_per_byte)
+            admitted += 1
+    return admitted
+
+
+def admit_scan(pool, transactions):
+    admitted = 0
+    for tx in transactions:
+        if tx.Hash.ToBytes() in pool:
+            continue
+        spent = set((c.PrevHash.ToBytes(), c.PrevIndex) for c in tx.inputs)
+        if any((c.PrevHash.ToBytes(), c.PrevIndex) in spent for other in pool.values() for c in other.inputs):
+            continue
+        pool[tx.Hash.ToBytes()] = tx
+        admitted += 1
+    return admitted
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--pending", help="Transactions in the pool before measuring", type=int, default=50000)
+    parser.add_argument("-c", "--count", help="Transactions to admit", type=int, default=10000)
+    parser.add_argument("-s", "--scan-count", help="Transactions to admit with the scanning check", type=int, default=20)
+    args = parser.parse_args()
+
+    pending = [Transaction() for i in range(args.pending)]
+    new = [Transaction() for i in range(args.count)]
+
+    pool = MemPool(args.pending)
+    admit(pool, pending)
+
+    start = time.time()
+    admitted = admit(pool, new)
+    elapsed = time.time() - start
+    print("indexed pool  %8s pending  %8.0f tx/s  (%s admitted, %s evicted)" % (
+        args.pending, args.count / elapsed, admitted, pool.Evictions))
+
+    pool = dict((tx.Hash.ToBytes(), tx) for tx in pending)
+    start = time.time()
+    admit_scan(pool, new[:args.scan_count])
+    elapsed = time.time() - start
+    print("scanned dict  %8s pending  %8.0f tx/s" % (args.pending, args.scan_count / elapsed))
+
+
+if __name__ == "__main__":
+    main()
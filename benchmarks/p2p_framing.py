@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Measure how fast `NeoNode` splits incoming P2P traffic into messages.
+
+The traffic is a catch-up sync burst: `block` messages carrying the blocks of a file created with
+`np-export`, or copies of the genesis block if no file is given. It is fed to the node in socket sized
+reads, message handling is skipped.
+
+Usage:
+    python benchmarks/p2p_framing.py -i testnet.acc -t 2000
+"""
+from neo.Core.Blockchain import Blockchain
+from neo.IO.MemoryStream import StreamManager
+from neo.Network.Message import Message
+from neo.Network.NeoNode import NeoNode
+from neocore.IO.BinaryWriter import BinaryWriter
+from mock import patch
+import argparse
+import time
+
+
+def record_traffic(file_path, total_blocks):
+    stream = StreamManager.GetStream()
+    writer = BinaryWriter(stream)
+
+    if file_path:
+        with open(file_path, 'rb') as file_input:
+            total_blocks = min(total_blocks, int.from_bytes(file_input.read(4), 'little'))
+            for index in range(total_blocks):
+                block_len = int.from_bytes(file_input.read(4), 'little')
+                message = Message('block')
+                message.Payload = file_input.read(block_len)
+                message.Checksum = Message.GetChecksum(message.Payload)
+                message.Serialize(writer)
+    else:
+        message = Message('block', payload=Blockchain.GenesisBlock())
+        for index in range(total_blocks):
+            message.Serialize(writer)
+
+    out = stream.getvalue()
+    StreamManager.ReleaseStream(stream)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-i", "--input", help="Block file created with np-export")
+    parser.add_argument("-t", "--totalblocks", help="Number of block messages", type=int, default=2000)
+    parser.add_argument("-r", "--readsize", help="Bytes per socket read", type=int, default=65536)
+    args = parser.parse_args()
+
+    traffic = record_traffic(args.input, args.totalblocks)
+
+    with patch.object(NeoNode, 'MessageReceived') as received:
+        node = NeoNode()
+
+        start = time.time()
+        for offset in range(0, len(traffic), args.readsize):
+            node.dataReceived(traffic[offset:offset + args.readsize])
+        elapsed = time.time() - start
+
+    print("%s messages, %.1f MB in %.3fs, %.1f MB/s" % (
+        received.call_count, len(traffic) / 1000000, elapsed, len(traffic) / 1000000 / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Relay random inventories through the node leader for a number of simulated days and report its memory use.
+
+A mock peer relays a new inventory every `--interval` seconds of simulated time. The memory held by the
+known hashes and relay caches should stay flat once they are full or their items start to expire.
+
+Usage:
+    python benchmarks/relay_soak.py -d 3 -i 1
+"""
+from neo.Network.BoundedCache import BoundedCache, ExpiringHashSet
+from neo.Network.InventoryType import InventoryType
+from neo.Network.NodeLeader import NodeLeader
+from neocore.UInt256 import UInt256
+import argparse
+import os
+import time
+import tracemalloc
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Inventory:
+    InventoryType = InventoryType.Consensus
+
+    def __init__(self):
+        self.Hash = UInt256(data=os.urandom(32))
+
+
+class Peer:
+
+    def Relay(self, inventory):
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--days", help="Simulated days", type=int, default=3)
+    parser.add_argument("-i", "--interval", help="Simulated seconds between two inventories", type=float, default=1)
+    args = parser.parse_args()
+
+    clock = Clock()
+    leader = NodeLeader()
+    leader.KnownHashes = ExpiringHashSet(leader.KNOWN_HASHES_SIZE, leader.KNOWN_HASHES_AGE, clock=clock)
+    leader.RelayCache = BoundedCache(leader.RELAY_CACHE_SIZE, leader.RELAY_CACHE_AGE, clock=clock)
+    leader.Peers = [Peer()]
+
+    tracemalloc.start()
+    start = time.time()
+
+    per_hour = int(3600 / args.interval)
+    for hour in range(args.days * 24):
+        for i in range(per_hour):
+            clock.now += args.interval
+            leader.Relay(Inventory())
+
+        current, peak = tracemalloc.get_traced_memory()
+        stats = leader.CacheStats()
+        print("hour %4s  %8.1f KB  known hashes %7s  relay cache %5s  relays/s %8.0f" % (
+            hour + 1, current / 1024, stats['known_hashes']['size'], stats['relay_cache']['size'],
+            (hour + 1) * per_hour / (time.time() - start)))
+
+
+if __name__ == "__main__":
+    main()
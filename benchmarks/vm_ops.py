@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Measure the instruction throughput of the VM interpreter.
+
+Every contract is a loop written in raw bytecode and executed by a bare `ExecutionEngine`,
+so the numbers reflect the interpreter only and not the storage or interop layers.
+Run it on two revisions to compare them.
+
+    nep5       the balance checks and updates of a NEP5 transfer, with the balances kept in a map
+    loop       a counting loop doing integer arithmetic
+    crypto     hashing and signature verification
+    recursion  a function calling itself, leaving one item per call on the stack
+
+With --memory the peak memory of each contract and the size of a single stack item are reported as well.
+
+Usage:
+    python benchmarks/vm_ops.py -n 5000 --memory
+"""
+from neo.VM.ExecutionEngine import ExecutionEngine
+from neo.VM.OpCode import *
+from neo.VM import VMState
+from neo.VM.InteropService import StackItem
+from neocore.Cryptography.Crypto import Crypto
+import argparse
+import binascii
+import time
+import tracemalloc
+
+FROM = b'\x01' * 20
+TO = b'\x02' * 20
+
+# signature of b'abcdef' by PUBKEY, see neo/VM/tests/test_execution_engine.py
+SIG = binascii.unhexlify(b'cd0ca967d11cea78e25ad16f15dbe77672258bfec59ff3617c95e317acff063a48d35f71aa5ce7d735977412186e1572507d0f4d204c5bcb6c90e03b8b857fbd')
+PUBKEY = binascii.unhexlify(b'036fbcb5e138c1ce5360e861674c03228af735a9114a5b7fb4121b8350129f3ffe')
+
+
+def push(data):
+    if isinstance(data, int):
+        data = data.to_bytes(4, 'little')
+    return bytes([len(data)]) + data
+
+
+def loop(iterations, setup, body):
+    """
+    Wrap `body` in a loop that runs `iterations` times.
+    The loop counter is kept at the bottom of the evaluation stack.
+    """
+    script = setup + push(iterations)
+    start = len(script)
+    script += body + DEC + DUP + PUSH0 + GT
+    # jump offsets are relative to the jump instruction
+    script += JMPIF + (start - len(script)).to_bytes(2, 'little', signed=True)
+    return script + DROP + RET
+
+
+def nep5_script(iterations):
+    setup = NEWMAP + DUP + push(FROM) + push(iterations * 10) + SETITEM + \
+        DUP + push(TO) + PUSH0 + SETITEM + TOALTSTACK
+
+    # assert balances[from] >= amount
+    body = DUPFROMALTSTACK + push(FROM) + PICKITEM + PUSH1 + GTE + THROWIFNOT
+    # balances[from] -= amount
+    body += DUPFROMALTSTACK + push(FROM) + DUPFROMALTSTACK + push(FROM) + PICKITEM + PUSH1 + SUB + SETITEM
+    # balances[to] += amount
+    body += DUPFROMALTSTACK + push(TO) + DUPFROMALTSTACK + push(TO) + PICKITEM + PUSH1 + ADD + SETITEM
+
+    return loop(iterations, setup, body)
+
+
+def loop_script(iterations):
+    body = PUSH5 + PUSH3 + ADD + PUSH2 + MUL + PUSH7 + SWAP + SUB + ABS + DROP
+    return loop(iterations, b'', body)
+
+
+def crypto_script(iterations):
+    body = push(b'\x07' * 32) + SHA256 + HASH160 + HASH256 + SHA1 + DROP
+    body += push(b'abcdef') + push(SIG) + push(PUBKEY) + VERIFY + DROP
+    return loop(iterations, b'', body)
+
+
+def recursion_script(depth):
+    # the counter is pushed as 4 bytes
+    script = push(depth)
+    # call f, which starts after the RET below
+    script += CALL + (4).to_bytes(2, 'little', signed=True) + RET
+
+    # f: return if the counter is 0, else call f with counter - 1
+    f = len(script)
+    script += DUP + PUSH0 + GT + JMPIFNOT + (8).to_bytes(2, 'little', signed=True)
+    script += DUP + DEC + CALL + (f - len(script) - 2).to_bytes(2, 'little', signed=True)
+    return script + RET
+
+
+def stack_item_size(count=100000):
+    """
+    Get the average memory taken by an integer and a byte array stack item.
+    """
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    items = [StackItem.New(i + 1000) for i in range(count)] + [StackItem.New(b'\x01\x02') for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    return size / len(items)
+
+
+def run(script, memory=False):
+    engine = ExecutionEngine(crypto=Crypto.Default())
+    engine.LoadScript(script)
+
+    if memory:
+        tracemalloc.start()
+
+    start = time.time()
+    engine.Execute()
+    elapsed = time.time() - start
+
+    peak = 0
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    if engine.State & VMState.FAULT:
+        raise Exception("script faulted after %s ops" % engine.ops_processed)
+
+    return engine.ops_processed, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--iterations", help="Loop iterations per contract", type=int, default=5000)
+    parser.add_argument("-m", "--memory", help="Report memory usage, slows down execution", action="store_true")
+    args = parser.parse_args()
+
+    contracts = [('nep5', nep5_script), ('loop', loop_script), ('crypto', crypto_script), ('recursion', recursion_script)]
+
+    for name, build in contracts:
+        ops, elapsed, peak = run(build(args.iterations), args.memory)
+        line = "%-10s %10s ops  %8.3fs  %10.0f ops/s" % (name, ops, elapsed, ops / elapsed)
+        if args.memory:
+            line += "  %10.1f KB peak" % (peak / 1024)
+        print(line)
+
+    if args.memory:
+        print("%.1f bytes per stack item" % stack_item_size())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Measure how long a wallet with many addresses takes to check transactions and outputs against its addresses.
+
+A wallet is filled with signature contracts of random scripts, like the deposit addresses of an exchange, and
+some watch only addresses. Random transactions, a few of which pay to the wallet, are checked with
+`Wallet.IsWalletTransaction` and their outputs with `Wallet.CheckAddressState`, as done for every transaction
+while processing a block. The `scan` lines loop over every contract and watch only address, as done before
+the addresses were kept in an `AddressSet`.
+
+Usage:
+    python benchmarks/wallet_address_check.py -a 50000 -t 2000
+"""
+from neo.Core.TX.Transaction import TransactionOutput, ContractTransaction
+from neo.Core.Witness import Witness
+from neo.SmartContract.Contract import Contract
+from neo.Wallets.AddressState import AddressState
+from neo.Wallets.Wallet import Wallet
+from neo.Wallets.utils import to_aes_key
+from neocore.Cryptography.Crypto import Crypto
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+import argparse
+import random
+import time
+
+ASSET = UInt256(data=b'\x01' * 32)
+
+
+def random_script(rnd):
+    return b'\x21\x02' + rnd.getrandbits(256).to_bytes(32, 'little') + b'\xac'
+
+
+def make_transactions(wallet_scripts, count, outputs, rnd):
+    txs = []
+    for index in range(count):
+        # one transaction in 20 pays to the wallet, one in 20 is signed by it
+        kind = index % 20
+        script_hashes = [UInt160(data=rnd.getrandbits(160).to_bytes(20, 'little')) for output in range(outputs)]
+        if kind == 0:
+            script_hashes[-1] = Crypto.ToScriptHash(rnd.choice(wallet_scripts), unhex=False)
+        verification_script = rnd.choice(wallet_scripts) if kind == 1 else random_script(rnd)
+
+        tx = ContractTransaction(outputs=[TransactionOutput(AssetId=ASSET, Value=Fixed8.One(), script_hash=script_hash)
+                                          for script_hash in script_hashes])
+        tx.scripts = [Witness(b'\x00', verification_script)]
+        txs.append(tx)
+    return txs
+
+
+def scan_is_wallet_transaction(wallet, tx):
+    for key, contract in wallet._contracts.items():
+
+        for output in tx.outputs:
+            if output.ScriptHash.ToBytes() == contract.ScriptHash.ToBytes():
+                return True
+
+        for script in tx.scripts:
+
+            if script.VerificationScript:
+                if bytes(contract.Script) == script.VerificationScript:
+                    return True
+
+    for watch_script_hash in wallet._watch_only:
+        for output in tx.outputs:
+            if output.ScriptHash == watch_script_hash:
+                return True
+        for script in tx.scripts:
+            if Crypto.ToScriptHash(script.VerificationScript, unhex=False) == watch_script_hash:
+                return True
+
+    return False
+
+
+def scan_check_address_state(wallet, script_hash):
+    for key, contract in wallet._contracts.items():
+        if contract.ScriptHash.ToBytes() == script_hash.ToBytes():
+            return AddressState.InWallet
+    for watch in wallet._watch_only:
+        if watch == script_hash:
+            return AddressState.InWallet | AddressState.WatchOnly
+    return AddressState.NoState
+
+
+def run(name, check, items):
+    start = time.perf_counter()
+    found = sum(1 for item in items if check(item))
+    elapsed = time.perf_counter() - start
+    print("%-26s %8s %12.2f %8s" % (name, len(items), elapsed / len(items) * 10 ** 6, found))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-a", "--addresses", help="Number of addresses in the wallet", type=int, default=50000)
+    parser.add_argument("-w", "--watch-only", help="Number of watch only addresses in the wallet", type=int, default=100)
+    parser.add_argument("-t", "--transactions", help="Number of transactions to check", type=int, default=2000)
+    parser.add_argument("-o", "--outputs", help="Outputs per transaction", type=int, default=2)
+    parser.add_argument("--seed", help="Random seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+
+    start = time.time()
+    wallet = Wallet('', to_aes_key('benchmark password'), True)
+    key = wallet.CreateKey()
+    scripts = [random_script(rnd) for address in range(args.addresses)]
+    for script in scripts:
+        wallet.AddContract(Contract(script, b'\x00', key.PublicKeyHash))
+    for address in range(args.watch_only):
+        wallet.AddWatchOnly(UInt160(data=rnd.getrandbits(160).to_bytes(20, 'little')))
+    print("wallet with %s addresses and %s watch only addresses, created in %.1f s" % (
+        args.addresses, args.watch_only, time.time() - start))
+
+    txs = make_transactions(scripts, args.transactions, args.outputs, rnd)
+    outputs = [output.ScriptHash for tx in txs for output in tx.outputs]
+
+    start = time.time()
+    wallet.GetAddressSet()
+    print("address set built in %.3f s" % (time.time() - start))
+
+    # the scans are too slow to check every transaction
+    scanned = max(1, args.transactions // 100)
+
+    print("%-26s %8s %12s %8s" % ('check', 'items', 'us/item', 'found'))
+    run('IsWalletTransaction scan', lambda tx: scan_is_wallet_transaction(wallet, tx), txs[:scanned])
+    run('IsWalletTransaction', wallet.IsWalletTransaction, txs)
+    run('CheckAddressState scan', lambda script_hash: scan_check_address_state(wallet, script_hash) > 0, outputs[:scanned])
+    run('CheckAddressState', lambda script_hash: wallet.CheckAddressState(script_hash) > 0, outputs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Compare rebuilding a wallet by reading every block with rebuilding it through the address index of the chain.
+
+Synthetic blocks are persisted to a new chain in a temporary directory, twice: without and with the address
+index, to show what maintaining the index costs. Every transaction pays GAS to random addresses, and every
+`--every` blocks one of them pays to an address of the wallet instead. The wallet is then rebuilt from the
+chain reading every block, and through the index.
+
+Usage:
+    python benchmarks/wallet_index_rebuild.py -b 5000 -t 10 -e 100
+"""
+from neo.Core.Block import Block
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Witness import Witness
+from neo.Core.TX.Transaction import TransactionOutput, ContractTransaction
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Wallets.peewee.UserWallet import UserWallet
+from neo.Settings import settings
+from neo.Wallets.utils import to_aes_key
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+
+
+def make_blocks(wallet, args, rnd):
+    addresses = [contract.ScriptHash for contract in wallet.GetContracts()]
+    gas = Blockchain.SystemCoin().Hash
+
+    blocks = []
+    for index in range(1, args.blocks + 1):
+        txs = []
+        for tx_index in range(args.transactions):
+            if tx_index == 0 and index % args.every == 0:
+                script_hash = rnd.choice(addresses)
+            else:
+                script_hash = UInt160(data=rnd.getrandbits(160).to_bytes(20, 'little'))
+
+            tx = ContractTransaction(outputs=[TransactionOutput(AssetId=gas, Value=Fixed8(rnd.randint(1, 10 ** 10)),
+                                                                script_hash=script_hash)])
+            tx.Attributes = []
+            tx.scripts = []
+            txs.append(tx)
+
+        blocks.append(Block(prevHash=UInt256(data=bytes(32)), timestamp=1500000000 + index, index=index,
+                            consensusData=0, nextConsensus=UInt160(data=bytes(20)),
+                            script=Witness(bytearray(0), bytearray([0x51])), transactions=txs, build_root=True))
+    return blocks
+
+
+def persist(path, blocks, address_index):
+    settings.set_address_index(address_index)
+    chain = LevelDBBlockchain(path)
+    Blockchain.RegisterBlockchain(chain)
+
+    start = time.time()
+    for block in blocks:
+        chain.AddBlockDirectly(block)
+    return chain, time.time() - start
+
+
+def rebuild(wallet):
+    start = time.time()
+    wallet.Rebuild()
+    wallet.ProcessBlocks(0)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-b", "--blocks", help="Number of blocks", type=int, default=5000)
+    parser.add_argument("-t", "--transactions", help="Transactions per block", type=int, default=10)
+    parser.add_argument("-e", "--every", help="Blocks per wallet transaction", type=int, default=100)
+    parser.add_argument("-a", "--addresses", help="Number of addresses in the wallet", type=int, default=5)
+    parser.add_argument("--seed", help="Random seed", type=int, default=1)
+    args = parser.parse_args()
+
+    settings.set_loglevel(logging.WARNING)
+
+    rnd = random.Random(args.seed)
+    directory = tempfile.mkdtemp()
+    try:
+        wallet = UserWallet.Create(os.path.join(directory, 'wallet.db3'), to_aes_key('benchmark password'))
+        for address in range(args.addresses - 1):
+            wallet.CreateKey()
+
+        blocks = make_blocks(wallet, args, rnd)
+        print("%s blocks, %s transactions, %s for the wallet" % (
+            args.blocks, args.blocks * args.transactions, args.blocks // args.every))
+
+        chain, elapsed = persist(os.path.join(directory, 'plain'), blocks, False)
+        print("persisted           %7.2f s  %8.1f blocks/s" % (elapsed, args.blocks / elapsed))
+        Blockchain.DeregisterBlockchain()
+        chain.Dispose()
+
+        chain, elapsed = persist(os.path.join(directory, 'indexed'), blocks, True)
+        print("persisted, indexed  %7.2f s  %8.1f blocks/s" % (elapsed, args.blocks / elapsed))
+
+        wallet.ADDRESS_INDEX_MIN_BLOCKS = args.blocks + 1
+        elapsed = rebuild(wallet)
+        print("rebuilt, all blocks %7.2f s  %8.1f blocks/s  %s coins" % (elapsed, args.blocks / elapsed, len(wallet.GetCoins())))
+
+        wallet.ADDRESS_INDEX_MIN_BLOCKS = 0
+        elapsed = rebuild(wallet)
+        print("rebuilt, indexed    %7.2f s  %8.1f blocks/s  %s coins" % (elapsed, args.blocks / elapsed, len(wallet.GetCoins())))
+
+        wallet.Close()
+        chain.Dispose()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Measure how long a `UserWallet` takes to process blocks, as when it is rebuilt.
+
+A new wallet is created in a temporary directory, next to an empty chain, and synthetic blocks are
+processed with `Wallet.ProcessNewBlock`: every transaction pays NEO and GAS to addresses of the wallet
+and spends coins received in earlier blocks, so coins are added, changed and deleted in every block.
+The blocks are processed once, then the wallet is rebuilt and they are processed again.
+
+Usage:
+    python benchmarks/wallet_rebuild.py -b 1000 -t 5 -o 10 -a 20
+"""
+from neo.Core.Block import Block
+from neo.Core.Blockchain import Blockchain
+from neo.Core.CoinReference import CoinReference
+from neo.Core.Witness import Witness
+from neo.Core.TX.Transaction import TransactionOutput, ContractTransaction
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Wallets.peewee.Models import Coin, Transaction
+from neo.Implementations.Wallets.peewee.UserWallet import UserWallet
+from neo.Settings import settings
+from neo.Wallets.utils import to_aes_key
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+
+
+def make_blocks(wallet, args, rnd):
+    addresses = [contract.ScriptHash for contract in wallet.GetContracts()]
+    assets = [Blockchain.SystemShare().Hash, Blockchain.SystemCoin().Hash]
+    unspent = []
+
+    blocks = []
+    for index in range(args.blocks):
+        txs = []
+        for tx_index in range(args.transactions):
+            inputs = []
+            for spend in range(min(len(unspent), args.outputs // 2)):
+                inputs.append(unspent.pop(rnd.randrange(len(unspent))))
+
+            outputs = [TransactionOutput(AssetId=assets[output % 2], Value=Fixed8(rnd.randint(1, 10 ** 10)),
+                                         script_hash=rnd.choice(addresses)) for output in range(args.outputs)]
+            tx = ContractTransaction(inputs=inputs, outputs=outputs)
+            tx.scripts = []
+            txs.append(tx)
+            unspent.extend(CoinReference(prev_hash=tx.Hash, prev_index=i) for i in range(len(outputs)))
+
+        blocks.append(Block(prevHash=UInt256(data=bytes(32)), timestamp=1500000000 + index, index=index,
+                            consensusData=0, nextConsensus=UInt160(data=bytes(20)),
+                            script=Witness(bytearray(0), bytearray([0x51])), transactions=txs))
+    return blocks
+
+
+def process(wallet, blocks):
+    start = time.time()
+    for block in blocks:
+        wallet.ProcessNewBlock(block)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-b", "--blocks", help="Number of blocks", type=int, default=1000)
+    parser.add_argument("-t", "--transactions", help="Wallet transactions per block", type=int, default=5)
+    parser.add_argument("-o", "--outputs", help="Outputs per transaction, half as many inputs are spent", type=int, default=10)
+    parser.add_argument("-a", "--addresses", help="Number of addresses in the wallet", type=int, default=20)
+    parser.add_argument("--seed", help="Random seed", type=int, default=1)
+    args = parser.parse_args()
+
+    settings.set_loglevel(logging.WARNING)
+
+    rnd = random.Random(args.seed)
+    directory = tempfile.mkdtemp()
+    try:
+        Blockchain.RegisterBlockchain(LevelDBBlockchain(os.path.join(directory, 'chain')))
+
+        wallet = UserWallet.Create(os.path.join(directory, 'wallet.db3'), to_aes_key('benchmark password'))
+        for address in range(args.addresses - 1):
+            wallet.CreateKey()
+
+        blocks = make_blocks(wallet, args, rnd)
+        coins = args.blocks * args.transactions * args.outputs
+        print("%s blocks, %s wallet transactions, %s coins" % (args.blocks, args.blocks * args.transactions, coins))
+
+        elapsed = process(wallet, blocks)
+        print("processed  %7.2f s  %8.1f blocks/s  %8.0f coins/s" % (elapsed, args.blocks / elapsed, coins / elapsed))
+        print("wallet has %s coins and %s transactions" % (Coin.select().count(), Transaction.select().count()))
+
+        start = time.time()
+        wallet.Rebuild()
+        process(wallet, blocks)
+        elapsed = time.time() - start
+        print("rebuilt    %7.2f s  %8.1f blocks/s  %8.0f coins/s" % (elapsed, args.blocks / elapsed, coins / elapsed))
+
+        wallet.Close()
+        Blockchain.Default().Dispose()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -259,10 +259,13 @@ class Block(BlockBase, InventoryMixin):
         # json['sys_fee'] = GetBlockchain().GetSysFeeAmount(self.Hash)
         return json
 
-    def Trim(self):
+    def Trim(self, raw=False):
         """
         Returns a byte array that contains only the block header and transaction hash.
 
+        Args:
+            raw (bool): (Optional) return the raw serialized bytes instead of their hex representation.
+
         Returns:
             bytes:
         """
@@ -273,7 +276,7 @@ class Block(BlockBase, InventoryMixin):
         self.Script.Serialize(writer)
 
         writer.WriteHashes([tx.Hash.ToBytes() for tx in self.Transactions])
-        retVal = ms.ToArray()
+        retVal = ms.getvalue() if raw else ms.ToArray()
         StreamManager.ReleaseStream(ms)
         return retVal
 
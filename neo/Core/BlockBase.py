@@ -61,14 +61,17 @@ class BlockBase(VerifiableMixin):
 
         return self.__hash
 
-    def ToArray(self):
+    def ToArray(self, raw=False):
         """
         Get the byte data of self.
 
+        Args:
+            raw (bool): (Optional) return the raw serialized bytes instead of their hex representation.
+
         Returns:
             bytes:
         """
-        return Helper.ToArray(self)
+        return Helper.ToArray(self, raw)
 
     def RawData(self):
         """
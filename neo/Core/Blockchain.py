@@ -161,6 +161,15 @@ class Blockchain:
     def CurrentBlock(self):
         pass
 
+    @property
+    def StateCache(self):
+        pass
+
+    @property
+    def AddressIndexStart(self):
+        # abstract
+        return None
+
     def AddBlock(self, block):
         pass
 
@@ -425,6 +434,10 @@ class Blockchain:
     def GetTransaction(self, hash):
         return None, 0
 
+    def GetAddressTransactions(self, script_hashes, start_height=0, end_height=None):
+        # abstract
+        return None
+
     def GetUnclaimed(self, hash):
         # abstract
         pass
@@ -451,6 +464,18 @@ class Blockchain:
     def BlockCacheCount(self):
         pass
 
+    def IsBlockCached(self, hash):
+        """
+        Check if a block was received and waits in the block cache to be persisted.
+
+        Args:
+            hash (bytes): hash of the block.
+
+        Returns:
+            bool: True if the block is cached. False otherwise.
+        """
+        return False
+
     def Pause(self):
         self._paused = True
 
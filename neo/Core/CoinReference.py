@@ -68,12 +68,12 @@ class CoinReference(SerializableMixin):
     def __eq__(self, other):
         if other is None:
             return False
-        if other.PrevHash.ToBytes() == self.PrevHash.ToBytes() and other.PrevIndex == self.PrevIndex:
+        if other.PrevIndex == self.PrevIndex and other.PrevHash.Data == self.PrevHash.Data:
             return True
         return False
 
     def __hash__(self):
-        return int.from_bytes(self.PrevHash.Data + bytearray(self.PrevIndex), 'little')
+        return int.from_bytes(self.PrevHash.Data + self.PrevIndex.to_bytes(2, 'little'), 'little')
 
     def ToJson(self):
         """
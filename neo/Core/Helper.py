@@ -8,6 +8,8 @@ from neocore.UInt160 import UInt160
 from neo.IO.MemoryStream import StreamManager
 from neo.VM.ScriptBuilder import ScriptBuilder
 from neo.SmartContract.ApplicationEngine import ApplicationEngine
+from neo.SmartContract.VerificationCache import VerificationCache
+from neo.SmartContract.SignatureVerifier import KeyCacheCrypto
 from neocore.Fixed8 import Fixed8
 from neo.SmartContract import TriggerType
 from neo.Settings import settings
@@ -61,12 +63,13 @@ class Helper:
         return res
 
     @staticmethod
-    def ToArray(value):
+    def ToArray(value, raw=False):
         """
         Serialize the given `value` to a an array of bytes.
 
         Args:
             value (neo.IO.Mixins.SerializableMixin): object extending SerializableMixin.
+            raw (bool): (Optional) return the raw serialized bytes instead of their hex representation.
 
         Returns:
             bytes:
@@ -76,7 +79,7 @@ class Helper:
 
         value.Serialize(writer)
 
-        retVal = ms.ToArray()
+        retVal = ms.getvalue() if raw else ms.ToArray()
         StreamManager.ReleaseStream(ms)
 
         return retVal
@@ -156,9 +159,12 @@ class Helper:
             return False
 
         blockchain = GetBlockchain()
+        cache = VerificationCache.Default()
+        verifiable_hash = verifiable.Hash.ToBytes()
 
         for i in range(0, len(hashes)):
             verification = verifiable.Scripts[i].VerificationScript
+            invocation = verifiable.Scripts[i].InvocationScript
 
             if len(verification) == 0:
                 sb = ScriptBuilder()
@@ -170,11 +176,25 @@ class Helper:
                 if hashes[i] != verification_hash:
                     return False
 
+            key = VerificationCache.Key(verifiable_hash, i, hashes[i], invocation)
+            if cache.Contains(key):
+                continue
+
+            # only standard witnesses are cached, their result depends on nothing but the verifiable.
+            # Other scripts can read chain state, so they run again on every verification
+            result = Helper.VerifyStandardWitness(verifiable, invocation, verification)
+            if result is not None:
+                cache.NativeVerifications += 1
+                if not result:
+                    return False
+                cache.Add(key)
+                continue
+
+            cache.VMRuns += 1
             state_reader = GetStateReader()
             engine = ApplicationEngine(TriggerType.Verification, verifiable, blockchain, state_reader, Fixed8.Zero())
             engine.LoadScript(verification, False)
-            invoction = verifiable.Scripts[i].InvocationScript
-            engine.LoadScript(invoction, True)
+            engine.LoadScript(invocation, True)
 
             try:
                 success = engine.Execute()
@@ -190,6 +210,112 @@ class Helper:
 
         return True
 
+    @staticmethod
+    def VerifyStandardWitness(verifiable, invocation, verification, crypto=None):
+        """
+        Check the signatures of a witness with a standard signature or multi-signature verification script
+        without running the VM, with the same outcome as CHECKSIG and CHECKMULTISIG.
+
+        Args:
+            verifiable (neo.IO.Mixins.VerifiableMixin): the signed object.
+            invocation (bytes): the invocation script.
+            verification (bytes): the verification script.
+            crypto (neocore.Cryptography.Crypto.CryptoInstance): (Optional) verifies the signatures, defaults to `KeyCacheCrypto.Default()`.
+
+        Returns:
+            bool: True if the signatures are valid, False if they are not, None if the witness has to be run in the VM.
+        """
+        witness = Helper.ParseStandardWitness(invocation, verification)
+        if witness is None:
+            return None
+
+        sigs, pubkeys, multisig = witness
+        return Helper.VerifyStandardSignatures(crypto or KeyCacheCrypto.Default(), verifiable.GetMessage(), sigs, pubkeys, multisig)
+
+    @staticmethod
+    def ParseStandardWitness(invocation, verification):
+        """
+        Get the signatures and public keys of a standard witness.
+
+        Only scripts in the form created by `Contract` are handled: 33 byte public keys, at most 16 of them,
+        and an invocation script that pushes exactly the required 64 byte signatures.
+
+        Args:
+            invocation (bytes): the invocation script.
+            verification (bytes): the verification script.
+
+        Returns:
+            tuple: the signatures and public keys in the order they are pushed, and True for a multi-signature
+                   script. None if the witness is not in standard form.
+        """
+        if len(verification) == 35 and verification[0] == 0x21 and verification[34] == 0xac:
+            m = 1
+            pubkeys = [verification[1:34]]
+            multisig = False
+
+        elif len(verification) >= 37 and verification[-1] == 0xae and 0x51 <= verification[0] <= 0x60 \
+                and 0x51 <= verification[-2] <= 0x60:
+            m = verification[0] - 0x50
+            n = verification[-2] - 0x50
+            if m > n or len(verification) != 3 + n * 34:
+                return None
+
+            pubkeys = [verification[1 + j * 34 + 1:1 + (j + 1) * 34] for j in range(n)]
+            if any(verification[1 + j * 34] != 0x21 for j in range(n)):
+                return None
+            multisig = True
+
+        else:
+            return None
+
+        if len(invocation) != m * 65 or any(invocation[i * 65] != 0x40 for i in range(m)):
+            return None
+
+        sigs = [invocation[i * 65 + 1:(i + 1) * 65] for i in range(m)]
+        return sigs, pubkeys, multisig
+
+    @staticmethod
+    def VerifyStandardSignatures(crypto, message, sigs, pubkeys, multisig):
+        """
+        Verify the signatures of a standard witness the way CHECKSIG and CHECKMULTISIG do.
+
+        Args:
+            crypto (neocore.Cryptography.Crypto.CryptoInstance): verifies the signatures.
+            message (bytes): the signed message, hex encoded.
+            sigs (list): the signatures in the order they are pushed.
+            pubkeys (list): the public keys in the order they are pushed.
+            multisig (bool): True for a multi-signature script.
+
+        Returns:
+            bool: True if the signatures are valid. False otherwise.
+        """
+        if not multisig:
+            try:
+                return crypto.VerifySignature(message, sigs[0], pubkeys[0])
+            except Exception as e:
+                return False
+
+        # CHECKMULTISIG pops the last pushed signature and public key first
+        sigs = sigs[::-1]
+        pubkeys = pubkeys[::-1]
+        m = len(sigs)
+        n = len(pubkeys)
+
+        try:
+            i = 0
+            j = 0
+            while i < m and j < n:
+                if crypto.VerifySignature(message, sigs[i], pubkeys[j]):
+                    i += 1
+                j += 1
+
+                if m - i > n - j:
+                    return False
+        except Exception as e:
+            return False
+
+        return True
+
     @staticmethod
     def IToBA(value):
         return [1 if digit == '1' else 0 for digit in bin(value)[2:]]
@@ -241,10 +241,13 @@ class AccountState(StateBase):
                 return False
         return True
 
-    def ToByteArray(self):
+    def ToByteArray(self, raw=False):
         """
         Serialize self and get the byte stream.
 
+        Args:
+            raw (bool): (Optional) return the raw serialized bytes instead of their hex representation.
+
         Returns:
             bytes: serialized object.
         """
@@ -252,7 +255,7 @@ class AccountState(StateBase):
         writer = BinaryWriter(ms)
         self.Serialize(writer)
 
-        retval = ms.ToArray()
+        retval = ms.getvalue() if raw else ms.ToArray()
         StreamManager.ReleaseStream(ms)
 
         return retval
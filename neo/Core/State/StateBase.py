@@ -49,10 +49,13 @@ class StateBase(SerializableMixin):
         """
         writer.WriteByte(self.StateVersion)
 
-    def ToByteArray(self):
+    def ToByteArray(self, raw=False):
         """
         Serialize self and get the byte stream.
 
+        Args:
+            raw (bool): (Optional) return the raw serialized bytes instead of their hex representation.
+
         Returns:
             bytes: serialized object.
         """
@@ -60,7 +63,7 @@ class StateBase(SerializableMixin):
         writer = BinaryWriter(ms)
         self.Serialize(writer)
 
-        retval = ms.ToArray()
+        retval = ms.getvalue() if raw else ms.ToArray()
         StreamManager.ReleaseStream(ms)
 
         return retval
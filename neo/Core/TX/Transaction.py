@@ -539,14 +539,17 @@ class Transaction(InventoryMixin):
             return False
         return self.Hash == other.Hash
 
-    def ToArray(self):
+    def ToArray(self, raw=False):
         """
         Get the byte data of self.
 
+        Args:
+            raw (bool): (Optional) return the raw serialized bytes instead of their hex representation.
+
         Returns:
             bytes:
         """
-        return Helper.ToArray(self)
+        return Helper.ToArray(self, raw)
 
     def Serialize(self, writer):
         """
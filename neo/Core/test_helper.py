@@ -0,0 +1,125 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Helper import Helper
+from neo.Core.Witness import Witness
+from neo.IO.Helper import Helper as IOHelper
+from neo.SmartContract.VerificationCache import VerificationCache
+from neo.VM.ExecutionEngine import ExecutionEngine
+from neo.VM import VMState
+from neo.VM.ScriptBuilder import ScriptBuilder
+from neo.VM.OpCode import PUSH0, NUMEQUAL
+from neo.Core import test_block
+from neocore.Cryptography.Crypto import Crypto
+from mock import patch, MagicMock
+import binascii
+
+
+class SignedMessage:
+    """A verifiable with a single witness, signing b'abcdef'."""
+
+    # signature of b'abcdef' by PUBKEY, see neo/VM/tests/test_execution_engine.py
+    SIG = binascii.unhexlify(b'cd0ca967d11cea78e25ad16f15dbe77672258bfec59ff3617c95e317acff063a48d35f71aa5ce7d735977412186e1572507d0f4d204c5bcb6c90e03b8b857fbd')
+    PUBKEY = b'036fbcb5e138c1ce5360e861674c03228af735a9114a5b7fb4121b8350129f3ffe'
+
+    def __init__(self, invocation, verification):
+        self.Hash = Crypto.ToScriptHash(invocation + verification, unhex=False)
+        self.Scripts = [Witness(invocation, verification)]
+
+    def GetMessage(self):
+        return binascii.hexlify(b'abcdef')
+
+    def GetScriptHashesForVerifying(self):
+        return [Crypto.ToScriptHash(self.Scripts[0].VerificationScript, unhex=False)]
+
+
+def run_witness(verifiable, witness, crypto=None):
+    """Run a witness of `verifiable` in a bare engine, as a reference for the native checks."""
+    engine = ExecutionEngine(container=verifiable, crypto=crypto or Crypto.Default(), exit_on_error=True)
+    engine.LoadScript(witness.VerificationScript)
+    engine.LoadScript(witness.InvocationScript, push_only=True)
+
+    try:
+        engine.Execute()
+    except Exception as e:
+        return False
+
+    if engine.State & VMState.FAULT:
+        return False
+
+    return engine.EvaluationStack.Count == 1 and engine.EvaluationStack.Pop().GetBoolean()
+
+
+class HelperTestCase(NeoTestCase):
+
+    def signature_script(self):
+        return binascii.unhexlify(b'21' + SignedMessage.PUBKEY + b'ac')
+
+    def test_standard_witness_signature(self):
+        invocation = b'\x40' + SignedMessage.SIG
+        message = SignedMessage(invocation, self.signature_script())
+        self.assertTrue(Helper.VerifyStandardWitness(message, invocation, self.signature_script()))
+
+        bad_sig = b'\x40' + bytes(64)
+        self.assertFalse(Helper.VerifyStandardWitness(message, bad_sig, self.signature_script()))
+
+        # anything but a single 64 byte push is left to the VM
+        self.assertIsNone(Helper.VerifyStandardWitness(message, invocation + invocation, self.signature_script()))
+        self.assertIsNone(Helper.VerifyStandardWitness(message, b'\x51', b'\x51'))
+
+    def test_standard_witness_multisig(self):
+        # a 5 out of 7 consensus witness
+        block = IOHelper.AsSerializableWithType(test_block.BlocksTestCase.rawblock_hex, 'neo.Core.Block.Block')
+        witness = block.Script
+
+        self.assertTrue(Helper.VerifyStandardWitness(block, witness.InvocationScript, witness.VerificationScript))
+        self.assertTrue(run_witness(block, witness))
+
+        # the signatures have to be in the order of the public keys
+        invocation = witness.InvocationScript
+        swapped = invocation[65:130] + invocation[:65] + invocation[130:]
+        self.assertFalse(Helper.VerifyStandardWitness(block, swapped, witness.VerificationScript))
+        self.assertFalse(run_witness(block, Witness(swapped, witness.VerificationScript)))
+
+        # too few signatures fault in the VM
+        self.assertIsNone(Helper.VerifyStandardWitness(block, invocation[65:], witness.VerificationScript))
+
+    def test_verify_scripts_cache(self):
+        cache = VerificationCache.Default()
+        native = cache.NativeVerifications
+        hits = cache.Hits
+        vm_runs = cache.VMRuns
+
+        invocation = b'\x40' + SignedMessage.SIG
+        message = SignedMessage(invocation, self.signature_script())
+        self.assertTrue(Helper.VerifyScripts(message))
+        self.assertTrue(Helper.VerifyScripts(message))
+
+        self.assertEqual(cache.NativeVerifications, native + 1)
+        self.assertEqual(cache.Hits, hits + 1)
+
+        # a different witness for the same hash is verified on its own
+        message.Scripts[0] = Witness(b'\x40' + bytes(64), self.signature_script())
+        self.assertFalse(Helper.VerifyScripts(message))
+
+        # other scripts run in the VM, every time
+        message = SignedMessage(b'', b'\x51')
+        with patch.object(Blockchain, 'Default', return_value=MagicMock(Height=0)):
+            self.assertTrue(Helper.VerifyScripts(message))
+            self.assertTrue(Helper.VerifyScripts(message))
+        self.assertEqual(cache.VMRuns, vm_runs + 2)
+        self.assertEqual(cache.VMRunsAvoided, cache.Hits + cache.NativeVerifications)
+
+    def test_verify_scripts_reads_state_again(self):
+        # a witness that only passes at height 0
+        sb = ScriptBuilder()
+        sb.EmitSysCall("Neo.Blockchain.GetHeight")
+        sb.Emit(PUSH0)
+        sb.Emit(NUMEQUAL)
+        message = SignedMessage(b'', sb.ToArray())
+
+        with patch.object(Blockchain, 'Default', return_value=MagicMock(Height=0)):
+            self.assertTrue(Helper.VerifyScripts(message))
+
+        # after a block is persisted the same witness fails
+        with patch.object(Blockchain, 'Default', return_value=MagicMock(Height=1)):
+            self.assertFalse(Helper.VerifyScripts(message))
@@ -0,0 +1,128 @@
+class BufferedDB:
+    """
+    Wraps a `plyvel.DB` and keeps all writes in memory until `Flush` writes them in a single batch.
+
+    Reads see the buffered writes, so a blockchain can persist many blocks on top of it and write them
+    to disk at once. Only the parts of the plyvel API used by the blockchain are supported.
+    """
+
+    def __init__(self, db):
+        """
+        Create an instance.
+
+        Args:
+            db (plyvel.DB): the database to buffer writes for.
+        """
+        self.DB = db
+
+        # buffered values by key, None marks a deletion
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def get(self, key, default=None):
+        if key in self._pending:
+            value = self._pending[key]
+            return default if value is None else value
+        return self.DB.get(key, default)
+
+    def put(self, key, value):
+        self._pending[key] = value
+
+    def delete(self, key):
+        self._pending[key] = None
+
+    def iterator(self, prefix=b'', start=None, stop=None, include_key=True, include_value=True):
+        # the database is read lazily and merged with the sorted buffered keys of the range.
+        # Like plyvel, `start` is inclusive and `stop` exclusive, and they can not be combined with `prefix`
+        if prefix and (start is not None or stop is not None):
+            raise TypeError("'prefix' cannot be used together with 'start' or 'stop'")
+
+        if prefix:
+            bounds = {'prefix': prefix}
+        else:
+            bounds = {key: value for key, value in [('start', start), ('stop', stop)] if value is not None}
+
+        pending = sorted((key, value) for key, value in self._pending.items()
+                         if key.startswith(prefix) and (start is None or key >= start) and (stop is None or key < stop))
+        index = 0
+
+        for item in self.DB.iterator(include_value=include_value, **bounds):
+            key, value = item if include_value else (item, None)
+
+            while index < len(pending) and pending[index][0] < key:
+                if pending[index][1] is not None:
+                    yield self._Item(pending[index][0], pending[index][1], include_key, include_value)
+                index += 1
+
+            if index < len(pending) and pending[index][0] == key:
+                key, value = pending[index]
+                index += 1
+                if value is None:
+                    continue
+
+            yield self._Item(key, value, include_key, include_value)
+
+        for key, value in pending[index:]:
+            if value is not None:
+                yield self._Item(key, value, include_key, include_value)
+
+    @staticmethod
+    def _Item(key, value, include_key, include_value):
+        if include_key and include_value:
+            return key, value
+        if include_key:
+            return key
+        return value
+
+    def write_batch(self, transaction=False, **kwargs):
+        return _BufferedWriteBatch(self._pending, transaction)
+
+    def snapshot(self):
+        # reads go through the buffer, the writes of a block are applied when its batch completes
+        return _BufferedSnapshot()
+
+    def Flush(self):
+        """
+        Write all buffered changes to the database in one batch.
+        """
+        with self.DB.write_batch() as wb:
+            for key, value in self._pending.items():
+                if value is None:
+                    wb.delete(key)
+                else:
+                    wb.put(key, value)
+
+        self._pending.clear()
+
+
+class _BufferedWriteBatch:
+
+    def __init__(self, pending, transaction):
+        self._pending = pending
+        self._transaction = transaction
+        self._changes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None or not self._transaction:
+            self.write()
+
+    def put(self, key, value):
+        self._changes[key] = value
+
+    def delete(self, key):
+        self._changes[key] = None
+
+    def write(self):
+        self._pending.update(self._changes)
+        self._changes = {}
+
+
+class _BufferedSnapshot:
+
+    def close(self):
+        pass
@@ -1,4 +1,5 @@
 import binascii
+from collections import OrderedDict
 from logzero import logger
 from neo.SmartContract.Iterable import EnumeratorBase
 
@@ -12,14 +13,24 @@ class DBCollection:
 
     Collection = {}
 
-    Changed = []
-    Deleted = []
+    # ordered sets of keys, implemented as OrderedDict with None values for O(1) membership tests
+    Changed = None
+    Deleted = None
+
+    # values committed to a write batch that has not been written to the DB yet, None marks a deletion
+    Batched = {}
 
     _built_keys = False
 
     DebugStorage = False
 
-    def __init__(self, db, sn, prefix, class_ref):
+    # whether values are stored as raw bytes (binary schema) or hexlified (legacy schema)
+    Binary = False
+
+    # optional `StateCache` shared between the collections of a blockchain
+    Cache = None
+
+    def __init__(self, db, sn, prefix, class_ref, binary=False, cache=None):
 
         self.DB = db
 
@@ -27,9 +38,15 @@ class DBCollection:
 
         self.ClassRef = class_ref
 
+        self.Binary = binary
+
+        if cache is not None and prefix in cache.Prefixes:
+            self.Cache = cache
+
         self.Collection = {}
-        self.Changed = []
-        self.Deleted = []
+        self.Changed = OrderedDict()
+        self.Deleted = OrderedDict()
+        self.Batched = {}
 
     @property
     def Keys(self):
@@ -54,29 +71,65 @@ class DBCollection:
     def _BuildCollectionKeys(self):
         for key in self.DB.iterator(prefix=self.Prefix, include_value=False):
             key = key[1:]
-            if key not in self.Collection.keys():
+            if key not in self.Collection.keys() and self.Batched.get(key, True) is not None:
+                self.Collection[key] = None
+        for key, value in self.Batched.items():
+            if value is not None and key not in self.Collection.keys():
                 self.Collection[key] = None
 
+    def _GetDBValue(self, keyval):
+        if keyval in self.Batched:
+            return self.Batched[keyval]
+        if self.Cache is not None:
+            return self.Cache.Get(self.DB, self.Prefix + keyval)
+        return self.DB.get(self.Prefix + keyval)
+
     def Commit(self, wb, destroy=True):
+        """
+        Write all changed and deleted items.
+
+        Args:
+            wb (plyvel.WriteBatch): the write batch to add the changes to, so they are written atomically
+                                    together with the rest of the batch. If None, the changes are written
+                                    to the DB directly.
+            destroy (bool): release the collection after committing.
+        """
+        target = wb if wb is not None else self.DB
 
         for keyval in self.Changed:
             item = self.Collection[keyval]
             if item:
-                self.DB.put(self.Prefix + keyval, self.Collection[keyval].ToByteArray())
+                data = item.ToByteArray(self.Binary)
+                target.put(self.Prefix + keyval, data)
+                if wb is not None:
+                    self.Batched[keyval] = data
+                self._CacheCommitted(wb, keyval, data)
         for keyval in self.Deleted:
-            self.DB.delete(self.Prefix + keyval)
+            target.delete(self.Prefix + keyval)
             self.Collection[keyval] = None
+            if wb is not None:
+                self.Batched[keyval] = None
+            self._CacheCommitted(wb, keyval, None)
         if destroy:
             self.Destroy()
         else:
-            self.Changed = []
-            self.Deleted = []
+            self.Changed.clear()
+            self.Deleted.clear()
+
+    def _CacheCommitted(self, wb, keyval, data):
+        if self.Cache is None:
+            return
+        if wb is None:
+            self.Cache.Put(self.Prefix + keyval, data)
+        else:
+            # the batch owner applies the staged values after writing the batch
+            self.Cache.Stage(self.Prefix + keyval, data)
 
     def Reset(self):
         for keyval in self.Changed:
             self.Collection[keyval] = None
-        self.Changed = []
-        self.Deleted = []
+        self.Changed.clear()
+        self.Deleted.clear()
 
     def GetAndChange(self, keyval, new_instance=None, debug_item=False):
 
@@ -98,8 +151,7 @@ class DBCollection:
 
         item = new_instance
 
-        if keyval in self.Deleted:
-            self.Deleted.remove(keyval)
+        self.Deleted.pop(keyval, None)
 
         self.Add(keyval, item)
 
@@ -114,8 +166,7 @@ class DBCollection:
 
         item = new_instance
 
-        if keyval in self.Deleted:
-            self.Deleted.remove(keyval)
+        self.Deleted.pop(keyval, None)
 
         self.Add(keyval, item)
 
@@ -137,7 +188,7 @@ class DBCollection:
             return item
 
         # otherwise, chekc in the database
-        key = self.DB.get(self.Prefix + keyval)
+        key = self._GetDBValue(keyval)
 
         # if the key is there, get the item
         if key is not None:
@@ -154,9 +205,9 @@ class DBCollection:
             return None
 
         try:
-            buffer = self.DB.get(self.Prefix + keyval)
+            buffer = self._GetDBValue(keyval)
             if buffer:
-                item = self.ClassRef.DeserializeFromDB(binascii.unhexlify(buffer))
+                item = self.ClassRef.DeserializeFromDB(self._Decode(buffer))
                 self.Collection[keyval] = item
                 return item
             return None
@@ -165,17 +216,20 @@ class DBCollection:
 
         return None
 
+    def _Decode(self, buffer):
+        if self.Binary:
+            return buffer
+        return binascii.unhexlify(buffer)
+
     def Add(self, keyval, item):
         self.Collection[keyval] = item
         self.MarkChanged(keyval)
 
     def Remove(self, keyval):
-        if keyval not in self.Deleted:
-            self.Deleted.append(keyval)
+        self.Deleted[keyval] = None
 
     def MarkChanged(self, keyval):
-        if keyval not in self.Changed:
-            self.Changed.append(keyval)
+        self.Changed[keyval] = None
 
     def TryFind(self, key_prefix):
         candidates = {}
@@ -194,14 +248,21 @@ class DBCollection:
         return EnumeratorBase(iter(final_collection))
 
     def Find(self, key_prefix):
-        key_prefix = self.Prefix + key_prefix
         res = {}
-        for key, val in self.DB.iterator(prefix=key_prefix):
+        for key, val in self.DB.iterator(prefix=self.Prefix + key_prefix):
             # we want the storage item, not the raw bytes
-            item = self.ClassRef.DeserializeFromDB(binascii.unhexlify(val)).Value
+            item = self.ClassRef.DeserializeFromDB(self._Decode(val)).Value
             # also here we need to skip the 1 byte storage prefix
             res_key = key[21:]
             res[res_key] = item
+
+        # apply the changes that are committed to a write batch, but not written yet
+        for keyval, val in self.Batched.items():
+            if keyval.startswith(key_prefix):
+                if val is None:
+                    res.pop(keyval[20:], None)
+                else:
+                    res[keyval[20:]] = self.ClassRef.DeserializeFromDB(self._Decode(val)).Value
         return res
 
     def Destroy(self):
@@ -212,4 +273,6 @@ class DBCollection:
         self.Prefix = None
         self.Deleted = None
         self.Changed = None
+        self.Batched = None
+        self.Cache = None
         logger = None
@@ -12,7 +12,9 @@ class DBPrefix:
     ST_Storage = b'\x70'
 
     IX_HeaderHashList = b'\x80'
+    IX_AddressTransaction = b'\x81'
 
     SYS_CurrentBlock = b'\xc0'
     SYS_CurrentHeader = b'\xc1'
+    SYS_AddressIndex = b'\xc2'
     SYS_Version = b'\xf0'
@@ -1,5 +1,7 @@
 from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
 from neo.Blockchain import GetBlockchain
+import binascii
 import plyvel
 from logzero import logger
 from neo.Settings import settings
@@ -9,17 +11,35 @@ class DebugStorage:
 
     __instance = None
 
+    _binary = False
+
     @property
     def db(self):
         return self._db
 
+    @property
+    def BinaryFormat(self):
+        """
+        Get whether the storage items of the debug storage are stored as raw bytes or hex encoded.
+        The debug storage keeps its own format, which can differ from the one of the chain.
+
+        Returns:
+            bool: True for raw bytes.
+        """
+        return self._binary
+
     def reset(self):
         for key in self._db.iterator(prefix=DBPrefix.ST_Storage, include_value=False):
             self._db.delete(key)
 
     def clone_from_live(self):
-        clone_db = GetBlockchain()._db.snapshot()
+        blockchain = GetBlockchain()
+        clone_db = blockchain._db.snapshot()
         for key, value in clone_db.iterator(prefix=DBPrefix.ST_Storage, include_value=True):
+            if blockchain.BinaryFormat and not self._binary:
+                value = binascii.hexlify(value)
+            elif not blockchain.BinaryFormat and self._binary:
+                value = binascii.unhexlify(value)
             self._db.put(key, value)
 
     def __init__(self):
@@ -30,6 +50,15 @@ class DebugStorage:
             logger.info("DEBUG leveldb unavailable, you may already be running this process: %s " % e)
             raise Exception('DEBUG Leveldb Unavailable %s ' % e)
 
+        version = self._db.get(DBPrefix.SYS_Version)
+        if version is None:
+            # storage written before the format was recorded is hex encoded, a new one uses the format of the chain
+            has_storage = next(self._db.iterator(prefix=DBPrefix.ST_Storage, include_value=False), None) is not None
+            self._binary = not has_storage and GetBlockchain().BinaryFormat
+            self._db.put(DBPrefix.SYS_Version, LevelDBBlockchain._sysversion if self._binary else LevelDBBlockchain._sysversion_hex)
+        else:
+            self._binary = version != LevelDBBlockchain._sysversion_hex
+
     @staticmethod
     def instance():
         if not DebugStorage.__instance:
@@ -1,6 +1,7 @@
 import time
 import plyvel
 import binascii
+from collections import OrderedDict
 
 from logzero import logger
 
@@ -13,6 +14,8 @@ from neocore.IO.BinaryReader import BinaryReader
 from neo.IO.MemoryStream import StreamManager
 from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
 from neo.Implementations.Blockchains.LevelDB.CachedScriptTable import CachedScriptTable
+from neo.Implementations.Blockchains.LevelDB.StateCache import StateCache
+from neo.Implementations.Blockchains.LevelDB.BufferedDB import BufferedDB
 from neocore.Fixed8 import Fixed8
 from neocore.UInt160 import UInt160
 from neocore.UInt256 import UInt256
@@ -33,6 +36,7 @@ from neo.SmartContract import TriggerType
 from neocore.Cryptography.Crypto import Crypto
 from neocore.BigInteger import BigInteger
 from neo.EventHub import events
+from neo.Settings import settings
 
 
 from prompt_toolkit import prompt
@@ -54,10 +58,28 @@ class LevelDBBlockchain(Blockchain):
 
     # this is the version of the database
     # should not be updated for network version changes
-    _sysversion = b'schema v.0.6.9'
+    _sysversion = b'schema v.0.7.5'
+
+    # databases created with this schema store hexlified blocks, transactions and states.
+    # they can still be opened, and converted to the current schema with `np-migrate-chain`
+    _sysversion_hex = b'schema v.0.6.9'
+
+    # version of a database that `np-migrate-chain` is converting in place, followed by the last converted key
+    _sysversion_migrating = b'schema migration in progress'
+
+    # whether blocks, transactions and states are stored as raw bytes
+    _binary = True
 
     _persisting_block = None
 
+    _state_cache = None
+
+    # whether blocks are added to the address index when they are persisted
+    _index_addresses = False
+
+    # height of the first block in the address index, None without an index
+    _address_index_start = None
+
     TXProcessed = 0
 
     @property
@@ -100,6 +122,36 @@ class LevelDBBlockchain(Blockchain):
     def Path(self):
         return self._path
 
+    @property
+    def BinaryFormat(self):
+        """
+        Flag indicating if the database stores raw bytes instead of hexlified data.
+
+        Returns:
+            bool: True if the binary schema is in use. False for the legacy hex schema.
+        """
+        return self._binary
+
+    @property
+    def StateCache(self):
+        """
+        Get the cache of account, asset, contract and storage records.
+
+        Returns:
+            StateCache:
+        """
+        return self._state_cache
+
+    @property
+    def AddressIndexStart(self):
+        """
+        Get the height from which the address index holds every block, up to the current height.
+
+        Returns:
+            int: the height or None if the chain has no address index.
+        """
+        return self._address_index_start
+
     def __init__(self, path, skip_version_check=False):
         super(LevelDBBlockchain, self).__init__()
         self._path = path
@@ -109,6 +161,8 @@ class LevelDBBlockchain(Blockchain):
 
         self.TXProcessed = 0
 
+        self._state_cache = StateCache(settings.STATE_CACHE_SIZE)
+
         try:
             self._db = plyvel.DB(self._path, create_if_missing=True)
         #            self._db = plyvel.DB(self._path, create_if_missing=True, bloom_filter_bits=16, compression=None)
@@ -117,13 +171,28 @@ class LevelDBBlockchain(Blockchain):
             logger.info("leveldb unavailable, you may already be running this process: %s " % e)
             raise Exception('Leveldb Unavailable')
 
+        self._index_addresses = settings.ADDRESS_INDEX
+        start = self._db.get(DBPrefix.SYS_AddressIndex)
+        self._address_index_start = int.from_bytes(start, 'little') if start is not None else None
+
         version = self._db.get(DBPrefix.SYS_Version)
 
-        if skip_version_check:
+        if version is not None and version.startswith(self._sysversion_migrating):
+            self._db.close()
+            raise Exception("The schema migration of %s was interrupted, run np-migrate-chain again to finish it" % self._path)
+
+        if skip_version_check and version != self._sysversion_hex:
             self._db.put(DBPrefix.SYS_Version, self._sysversion)
             version = self._sysversion
 
-        if version == self._sysversion:  # or in the future, if version doesn't equal the current version...
+        # a new database is created with the schema of `_sysversion`
+        self._binary = (version or self._sysversion) != self._sysversion_hex
+
+        if version in [self._sysversion, self._sysversion_hex]:
+
+            if not self._binary:
+                logger.warning("Blockchain DB at %s uses the legacy hex schema %s. Run np-migrate-chain to convert it to %s" % (
+                    self._path, version, self._sysversion))
 
             ba = bytearray(self._db.get(DBPrefix.SYS_CurrentBlock, 0))
             self._current_block_height = int.from_bytes(ba[-4:], 'little')
@@ -138,12 +207,15 @@ class LevelDBBlockchain(Blockchain):
             hashes = []
             try:
                 for key, value in self._db.iterator(prefix=DBPrefix.IX_HeaderHashList):
-                    ms = StreamManager.GetStream(value)
-                    reader = BinaryReader(ms)
-                    hlist = reader.Read2000256List()
+                    if self._binary:
+                        hlist = self._ReadHeaderHashList(value)
+                    else:
+                        ms = StreamManager.GetStream(value)
+                        reader = BinaryReader(ms)
+                        hlist = reader.Read2000256List()
+                        StreamManager.ReleaseStream(ms)
                     key = int.from_bytes(key[-4:], 'little')
                     hashes.append({'k': key, 'v': hlist})
-                    StreamManager.ReleaseStream(ms)
             #                hashes.append({'index':int.from_bytes(key, 'little'), 'hash':value})
 
             except Exception as e:
@@ -163,7 +235,7 @@ class LevelDBBlockchain(Blockchain):
                 headers = []
                 for key, value in self._db.iterator(prefix=DBPrefix.DATA_Block):
                     dbhash = bytearray(value)[8:]
-                    headers.append(Header.FromTrimmedData(binascii.unhexlify(dbhash), 0))
+                    headers.append(Header.FromTrimmedData(self._DecodeValue(dbhash), 0))
 
                 headers.sort(key=lambda h: h.Index)
                 for h in headers:
@@ -202,14 +274,56 @@ class LevelDBBlockchain(Blockchain):
                     for key, value in self._db.iterator():
                         wb.delete(key)
 
+                self._address_index_start = None
                 self.Persist(Blockchain.GenesisBlock())
                 self._db.put(DBPrefix.SYS_Version, self._sysversion)
 
             else:
                 raise Exception("Database schema changed")
 
+    def _DataKey(self, prefix, hash):
+        """
+        Build the key of a block or transaction record.
+
+        Args:
+            prefix (bytes): `DBPrefix.DATA_Block` or `DBPrefix.DATA_Transaction`.
+            hash (bytes): hex string of the block or transaction hash.
+
+        Returns:
+            bytes: the key, with the hash stored as raw bytes for the binary schema.
+        """
+        if self._binary:
+            try:
+                return prefix + binascii.unhexlify(hash)
+            except (binascii.Error, TypeError):
+                pass
+        return prefix + hash
+
+    def _DecodeValue(self, data):
+        if self._binary:
+            return bytes(data)
+        return binascii.unhexlify(data)
+
+    @staticmethod
+    def _ReadHeaderHashList(data):
+        """
+        Read a list of header hashes as written by `BinaryWriter.Write2000256List`.
+
+        Args:
+            data (bytes): raw hash list data.
+
+        Returns:
+            list: of header hashes as hex strings.
+        """
+        hashes = []
+        for i in range(0, len(data) - 31, 32):
+            ba = bytearray(data[i:i + 32])
+            ba.reverse()
+            hashes.append(ba.hex().encode('utf-8'))
+        return hashes
+
     def GetStates(self, prefix, classref):
-        return DBCollection(self._db, None, prefix, classref)
+        return DBCollection(self._db, None, prefix, classref, self._binary, self._state_cache)
 
     def GetAccountState(self, script_hash, print_all_accounts=False):
 
@@ -221,7 +335,7 @@ class LevelDBBlockchain(Blockchain):
                 return None
 
         sn = self._db.snapshot()
-        accounts = DBCollection(self._db, sn, DBPrefix.ST_Account, AccountState)
+        accounts = DBCollection(self._db, sn, DBPrefix.ST_Account, AccountState, self._binary, self._state_cache)
         acct = accounts.TryGet(keyval=script_hash)
 
         sn.close()
@@ -230,7 +344,7 @@ class LevelDBBlockchain(Blockchain):
 
     def GetStorageItem(self, storage_key):
         sn = self._db.snapshot()
-        storages = DBCollection(self._db, sn, DBPrefix.ST_Storage, StorageItem)
+        storages = DBCollection(self._db, sn, DBPrefix.ST_Storage, StorageItem, self._binary, self._state_cache)
         item = storages.TryGet(storage_key.ToArray())
         sn.close()
         return item
@@ -238,7 +352,7 @@ class LevelDBBlockchain(Blockchain):
     def SearchContracts(self, query):
         res = []
         sn = self._db.snapshot()
-        contracts = DBCollection(self._db, sn, DBPrefix.ST_Contract, ContractState)
+        contracts = DBCollection(self._db, sn, DBPrefix.ST_Contract, ContractState, self._binary, self._state_cache)
         keys = contracts.Keys
 
         query = query.casefold()
@@ -265,7 +379,7 @@ class LevelDBBlockchain(Blockchain):
     def ShowAllContracts(self):
 
         sn = self._db.snapshot()
-        contracts = DBCollection(self._db, sn, DBPrefix.ST_Contract, ContractState)
+        contracts = DBCollection(self._db, sn, DBPrefix.ST_Contract, ContractState, self._binary, self._state_cache)
         keys = contracts.Keys
         sn.close()
         return keys
@@ -280,21 +394,21 @@ class LevelDBBlockchain(Blockchain):
                 return None
 
         sn = self._db.snapshot()
-        contracts = DBCollection(self._db, sn, DBPrefix.ST_Contract, ContractState)
+        contracts = DBCollection(self._db, sn, DBPrefix.ST_Contract, ContractState, self._binary, self._state_cache)
         contract = contracts.TryGet(keyval=hash)
         sn.close()
         return contract
 
     def GetAllSpentCoins(self):
         sn = self._db.snapshot()
-        coins = DBCollection(self._db, sn, DBPrefix.ST_SpentCoin, SpentCoinState)
+        coins = DBCollection(self._db, sn, DBPrefix.ST_SpentCoin, SpentCoinState, self._binary, self._state_cache)
 
         return coins.Keys
 
     def GetUnspent(self, hash, index):
 
         sn = self._db.snapshot()
-        coins = DBCollection(self._db, sn, DBPrefix.ST_Coin, UnspentCoinState)
+        coins = DBCollection(self._db, sn, DBPrefix.ST_Coin, UnspentCoinState, self._binary, self._state_cache)
 
         state = coins.TryGet(hash)
 
@@ -314,7 +428,7 @@ class LevelDBBlockchain(Blockchain):
             tx_hash = bytes(tx_hash.encode('utf-8'))
 
         sn = self._db.snapshot()
-        coins = DBCollection(self._db, sn, DBPrefix.ST_SpentCoin, SpentCoinState)
+        coins = DBCollection(self._db, sn, DBPrefix.ST_SpentCoin, SpentCoinState, self._binary, self._state_cache)
 
         result = coins.TryGet(keyval=tx_hash)
 
@@ -327,7 +441,7 @@ class LevelDBBlockchain(Blockchain):
         unspents = []
 
         sn = self._db.snapshot()
-        unspentcoins = DBCollection(self._db, sn, DBPrefix.ST_Coin, UnspentCoinState)
+        unspentcoins = DBCollection(self._db, sn, DBPrefix.ST_Coin, UnspentCoinState, self._binary, self._state_cache)
 
         state = unspentcoins.TryGet(keyval=hash.ToBytes())
 
@@ -348,7 +462,7 @@ class LevelDBBlockchain(Blockchain):
 
         out = {}
         sn = self._db.snapshot()
-        coins = DBCollection(self._db, sn, DBPrefix.ST_SpentCoin, SpentCoinState)
+        coins = DBCollection(self._db, sn, DBPrefix.ST_SpentCoin, SpentCoinState, self._binary, self._state_cache)
 
         state = coins.TryGet(keyval=hash.ToBytes())
 
@@ -363,7 +477,7 @@ class LevelDBBlockchain(Blockchain):
     def SearchAssetState(self, query):
         res = []
         sn = self._db.snapshot()
-        assets = DBCollection(self._db, sn, DBPrefix.ST_Asset, AssetState)
+        assets = DBCollection(self._db, sn, DBPrefix.ST_Asset, AssetState, self._binary, self._state_cache)
         keys = assets.Keys
 
         for item in keys:
@@ -388,7 +502,7 @@ class LevelDBBlockchain(Blockchain):
                 return None
 
         sn = self._db.snapshot()
-        assets = DBCollection(self._db, sn, DBPrefix.ST_Asset, AssetState)
+        assets = DBCollection(self._db, sn, DBPrefix.ST_Asset, AssetState, self._binary, self._state_cache)
         asset = assets.TryGet(assetId)
 
         return asset
@@ -400,12 +514,12 @@ class LevelDBBlockchain(Blockchain):
         elif type(hash) is UInt256:
             hash = hash.ToBytes()
 
-        out = self._db.get(DBPrefix.DATA_Transaction + hash)
+        out = self._db.get(self._DataKey(DBPrefix.DATA_Transaction, hash))
         if out is not None:
             out = bytearray(out)
             height = int.from_bytes(out[:4], 'little')
             out = out[4:]
-            outhex = binascii.unhexlify(out)
+            outhex = self._DecodeValue(out)
             return Transaction.DeserializeFromBufer(outhex, 0), height
 
         logger.info("Could not find transaction for hash %s " % hash)
@@ -419,6 +533,29 @@ class LevelDBBlockchain(Blockchain):
         self.Persist(block)
         self.OnPersistCompleted(block)
 
+    def StartBulkWrite(self):
+        """
+        Keep the writes of `AddBlockDirectly` in memory until `CommitBulkWrite` is called, so many blocks
+        and their headers are written in one batch. Used to import blocks from a file.
+        """
+        if not isinstance(self._db, BufferedDB):
+            self._db = BufferedDB(self._db)
+
+    def CommitBulkWrite(self):
+        """
+        Write the blocks added since `StartBulkWrite` or the previous commit to disk.
+        """
+        if isinstance(self._db, BufferedDB):
+            self._db.Flush()
+
+    def StopBulkWrite(self):
+        """
+        Write the remaining blocks to disk and write every block right away again.
+        """
+        if isinstance(self._db, BufferedDB):
+            self._db.Flush()
+            self._db = self._db.DB
+
     def AddBlock(self, block):
 
         if not block.Hash.ToBytes() in self._block_cache:
@@ -445,15 +582,15 @@ class LevelDBBlockchain(Blockchain):
         return False
 
     def ContainsTransaction(self, hash):
-        tx = self._db.get(DBPrefix.DATA_Transaction + hash.ToBytes())
+        tx = self._db.get(self._DataKey(DBPrefix.DATA_Transaction, hash.ToBytes()))
         return True if tx is not None else False
 
     def GetHeader(self, hash):
 
         try:
-            out = bytearray(self._db.get(DBPrefix.DATA_Block + hash))
+            out = bytearray(self._db.get(self._DataKey(DBPrefix.DATA_Block, hash)))
             out = out[8:]
-            outhex = binascii.unhexlify(out)
+            outhex = self._DecodeValue(out)
             return Header.FromTrimmedData(outhex, 0)
         except TypeError as e2:
             pass
@@ -519,7 +656,7 @@ class LevelDBBlockchain(Blockchain):
         if type(hash) is UInt256:
             hash = hash.ToBytes()
         try:
-            value = self._db.get(DBPrefix.DATA_Block + hash)[0:8]
+            value = self._db.get(self._DataKey(DBPrefix.DATA_Block, hash))[0:8]
             amount = int.from_bytes(value, 'little', signed=False)
             return amount
         except Exception as e:
@@ -568,9 +705,9 @@ class LevelDBBlockchain(Blockchain):
 
     def GetBlockByHash(self, hash):
         try:
-            out = bytearray(self._db.get(DBPrefix.DATA_Block + hash))
+            out = bytearray(self._db.get(self._DataKey(DBPrefix.DATA_Block, hash)))
             out = out[8:]
-            outhex = binascii.unhexlify(out)
+            outhex = self._DecodeValue(out)
             return Block.FromTrimmedData(outhex)
         except Exception as e:
             logger.info("Could not get block %s " % e)
@@ -638,7 +775,7 @@ class LevelDBBlockchain(Blockchain):
             w = BinaryWriter(ms)
             headers_to_write = self._header_index[self._stored_header_count:self._stored_header_count + 2000]
             w.Write2000256List(headers_to_write)
-            out = ms.ToArray()
+            out = ms.getvalue() if self._binary else ms.ToArray()
             StreamManager.ReleaseStream(ms)
             with self._db.write_batch() as wb:
                 wb.put(DBPrefix.IX_HeaderHashList + self._stored_header_count.to_bytes(4, 'little'), out)
@@ -648,38 +785,49 @@ class LevelDBBlockchain(Blockchain):
             logger.debug("Trimming stored header index %s" % self._stored_header_count)
 
         with self._db.write_batch() as wb:
-            wb.put(DBPrefix.DATA_Block + hHash, bytes(8) + header.ToArray())
+            wb.put(self._DataKey(DBPrefix.DATA_Block, hHash), bytes(8) + header.ToArray(self._binary))
             wb.put(DBPrefix.SYS_CurrentHeader, hHash + header.Index.to_bytes(4, 'little'))
 
     @property
     def BlockCacheCount(self):
         return len(self._block_cache)
 
+    def IsBlockCached(self, hash):
+        return hash in self._block_cache
+
     def Persist(self, block):
 
         self._persisting_block = block
 
+        # values staged by a block that failed to persist were never written
+        self._state_cache.DiscardStaged()
+
         sn = self._db.snapshot()
-        accounts = DBCollection(self._db, sn, DBPrefix.ST_Account, AccountState)
-        unspentcoins = DBCollection(self._db, sn, DBPrefix.ST_Coin, UnspentCoinState)
-        spentcoins = DBCollection(self._db, sn, DBPrefix.ST_SpentCoin, SpentCoinState)
-        assets = DBCollection(self._db, sn, DBPrefix.ST_Asset, AssetState)
-        validators = DBCollection(self._db, sn, DBPrefix.ST_Validator, ValidatorState)
-        contracts = DBCollection(self._db, sn, DBPrefix.ST_Contract, ContractState)
-        storages = DBCollection(self._db, sn, DBPrefix.ST_Storage, StorageItem)
+        accounts = DBCollection(self._db, sn, DBPrefix.ST_Account, AccountState, self._binary, self._state_cache)
+        unspentcoins = DBCollection(self._db, sn, DBPrefix.ST_Coin, UnspentCoinState, self._binary, self._state_cache)
+        spentcoins = DBCollection(self._db, sn, DBPrefix.ST_SpentCoin, SpentCoinState, self._binary, self._state_cache)
+        assets = DBCollection(self._db, sn, DBPrefix.ST_Asset, AssetState, self._binary, self._state_cache)
+        validators = DBCollection(self._db, sn, DBPrefix.ST_Validator, ValidatorState, self._binary, self._state_cache)
+        contracts = DBCollection(self._db, sn, DBPrefix.ST_Contract, ContractState, self._binary, self._state_cache)
+        storages = DBCollection(self._db, sn, DBPrefix.ST_Storage, StorageItem, self._binary, self._state_cache)
 
         amount_sysfee = self.GetSysFeeAmount(block.PrevHash) + block.TotalFees().value
         amount_sysfee_bytes = amount_sysfee.to_bytes(8, 'little')
 
         to_dispatch = []
 
-        with self._db.write_batch() as wb:
+        # transactions spent from, by hash, to add the addresses of the spent outputs to the address index
+        prev_txs = {}
 
-            wb.put(DBPrefix.DATA_Block + block.Hash.ToBytes(), amount_sysfee_bytes + block.Trim())
+        # all changes of a block go through this single batch, with `transaction=True`
+        # nothing is written if persisting the block fails half way
+        with self._db.write_batch(transaction=True) as wb:
 
-            for tx in block.Transactions:
+            wb.put(self._DataKey(DBPrefix.DATA_Block, block.Hash.ToBytes()), amount_sysfee_bytes + block.Trim(self._binary))
 
-                wb.put(DBPrefix.DATA_Transaction + tx.Hash.ToBytes(), block.IndexBytes() + tx.ToArray())
+            for position, tx in enumerate(block.Transactions):
+
+                wb.put(self._DataKey(DBPrefix.DATA_Transaction, tx.Hash.ToBytes()), block.IndexBytes() + tx.ToArray(self._binary))
 
                 # go through all outputs and add unspent coins to them
 
@@ -695,16 +843,14 @@ class LevelDBBlockchain(Blockchain):
                     else:
                         account.SetBalanceFor(output.AssetId, output.Value)
 
-                # go through all tx inputs
-                unique_tx_input_hashes = []
+                # go through all tx inputs, grouped by the transaction they spend from
+                inputs_by_hash = OrderedDict()
                 for input in tx.inputs:
-                    if input.PrevHash not in unique_tx_input_hashes:
-                        unique_tx_input_hashes.append(input.PrevHash)
+                    inputs_by_hash.setdefault(input.PrevHash.ToBytes(), []).append(input)
 
-                for txhash in unique_tx_input_hashes:
-                    prevTx, height = self.GetTransaction(txhash.ToBytes())
-                    coin_refs_by_hash = [coinref for coinref in tx.inputs if
-                                         coinref.PrevHash.ToBytes() == txhash.ToBytes()]
+                for txhash, coin_refs_by_hash in inputs_by_hash.items():
+                    prevTx, height = self.GetTransaction(txhash)
+                    prev_txs[txhash] = prevTx
                     for input in coin_refs_by_hash:
 
                         uns = unspentcoins.GetAndChange(input.PrevHash.ToBytes())
@@ -721,6 +867,10 @@ class LevelDBBlockchain(Blockchain):
                         assetid = prevTx.outputs[input.PrevIndex].AssetId
                         acct.SubtractFromBalance(assetid, prevTx.outputs[input.PrevIndex].Value)
 
+                if self._index_addresses:
+                    for key in self._AddressIndexKeys(block.Index, position, tx, prev_txs):
+                        wb.put(key, b'')
+
                 # do a whole lotta stuff with tx here...
                 if tx.Type == TransactionType.RegisterTransaction:
                     asset = AssetState(tx.Hash, tx.AssetType, tx.Name, tx.Amount,
@@ -819,14 +969,125 @@ class LevelDBBlockchain(Blockchain):
             sn.close()
 
             wb.put(DBPrefix.SYS_CurrentBlock, block.Hash.ToBytes() + block.IndexBytes())
-            self._current_block_height = block.Index
-            self._persisting_block = None
 
-            self.TXProcessed += len(block.Transactions)
+            # the index starts with the first block persisted while it is enabled, and is
+            # dropped when a block is persisted without it, as it would miss that block
+            address_index_start = self._address_index_start
+            if self._index_addresses and address_index_start is None:
+                address_index_start = block.Index
+                wb.put(DBPrefix.SYS_AddressIndex, block.IndexBytes())
+            elif not self._index_addresses and address_index_start is not None:
+                address_index_start = None
+                wb.delete(DBPrefix.SYS_AddressIndex)
+
+        self._state_cache.ApplyStaged()
+
+        self._current_block_height = block.Index
+        self._address_index_start = address_index_start
+        self._persisting_block = None
+
+        self.TXProcessed += len(block.Transactions)
 
         for event in to_dispatch:
             events.emit(event.event_type, event)
 
+    def _AddressIndexKeys(self, block_index, position, tx, prev_txs):
+        """
+        Build the address index keys of a transaction, one for every address it pays to, spends or claims from,
+        or that signed it.
+
+        Args:
+            block_index (int): height of the block holding the transaction.
+            position (int): position of the transaction in the block.
+            tx (neo.Core.TX.Transaction): the transaction.
+            prev_txs (dict): transactions spent from by their hash, missing ones are read from the chain and added.
+
+        Returns:
+            set: of keys, `DBPrefix.IX_AddressTransaction` followed by the script hash, the height and the position,
+                 big endian so the keys of an address are sorted by height.
+        """
+        script_hashes = set(bytes(output.ScriptHash.Data) for output in tx.outputs)
+
+        references = list(tx.inputs)
+        if tx.Type == TransactionType.ClaimTransaction:
+            references.extend(tx.Claims)
+
+        for reference in references:
+            txhash = reference.PrevHash.ToBytes()
+            prevTx = prev_txs.get(txhash)
+            if prevTx is None:
+                prevTx, height = self.GetTransaction(txhash)
+                prev_txs[txhash] = prevTx
+            if prevTx is not None:
+                script_hashes.add(bytes(prevTx.outputs[reference.PrevIndex].ScriptHash.Data))
+
+        for script in tx.scripts:
+            if script.VerificationScript:
+                script_hashes.add(bytes(Crypto.ToScriptHash(script.VerificationScript, unhex=False).Data))
+
+        suffix = block_index.to_bytes(4, 'big') + position.to_bytes(4, 'big')
+        return set(DBPrefix.IX_AddressTransaction + script_hash + suffix for script_hash in script_hashes)
+
+    def GetAddressTransactions(self, script_hashes, start_height=0, end_height=None):
+        """
+        Look up the transactions affecting any of the given addresses in the address index.
+
+        Args:
+            script_hashes (list): of UInt160 script hashes of the addresses.
+            start_height (int): (Optional) the height to start at.
+            end_height (int): (Optional) the last height to include, the current height by default.
+
+        Returns:
+            list: of (height, position) tuples sorted by height and position in the block, None if the
+                  address index does not hold every block from `start_height` on.
+        """
+        if self._address_index_start is None or start_height < self._address_index_start:
+            return None
+
+        if end_height is None:
+            end_height = self._current_block_height
+
+        found = set()
+        for script_hash in script_hashes:
+            prefix = DBPrefix.IX_AddressTransaction + bytes(script_hash.Data)
+            for key in self._db.iterator(start=prefix + start_height.to_bytes(4, 'big'),
+                                         stop=prefix + (end_height + 1).to_bytes(4, 'big'), include_value=False):
+                found.add((int.from_bytes(key[21:25], 'big'), int.from_bytes(key[25:29], 'big')))
+
+        return sorted(found)
+
+    def IndexAddresses(self, progress=None, batch_size=1000):
+        """
+        Add the blocks persisted before the address index was enabled to it, so it holds the whole chain.
+
+        Args:
+            progress (callable): (Optional) called with the height of the last indexed block after every batch.
+            batch_size (int): (Optional) the number of blocks to write at once.
+
+        Returns:
+            int: the number of blocks indexed.
+        """
+        end = self._address_index_start
+        if end is None:
+            end = self._current_block_height + 1
+
+        prev_txs = {}
+        for start in range(0, end, batch_size):
+            with self._db.write_batch() as wb:
+                for height in range(start, min(start + batch_size, end)):
+                    block = self.GetBlockByHeight(height)
+                    for position, tx in enumerate(block.FullTransactions):
+                        for key in self._AddressIndexKeys(height, position, tx, prev_txs):
+                            wb.put(key, b'')
+                prev_txs.clear()
+
+            if progress:
+                progress(min(start + batch_size, end) - 1)
+
+        self._db.put(DBPrefix.SYS_AddressIndex, (0).to_bytes(4, 'little'))
+        self._address_index_start = 0
+        return end
+
     def PersistBlocks(self):
 
         if not self._paused:
@@ -860,5 +1121,6 @@ class LevelDBBlockchain(Blockchain):
         self.PersistBlocks()
 
     def Dispose(self):
+        self.StopBulkWrite()
         self._db.close()
         self._disposed = True
@@ -0,0 +1,175 @@
+"""
+Description:
+    Conversion of a chain database from the legacy hex schema to the binary schema
+Usage:
+    from neo.Implementations.Blockchains.LevelDB.SchemaMigration import migrate_to_binary
+"""
+import binascii
+import os
+
+import plyvel
+from logzero import logger
+
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+
+# prefixes of which the complete value is hexlified in the legacy schema
+HEX_VALUE_PREFIXES = [
+    DBPrefix.ST_Account,
+    DBPrefix.ST_Coin,
+    DBPrefix.ST_SpentCoin,
+    DBPrefix.ST_Validator,
+    DBPrefix.ST_Asset,
+    DBPrefix.ST_Contract,
+    DBPrefix.ST_Storage,
+    DBPrefix.IX_HeaderHashList,
+]
+
+# written to `SYS_Version` while an in place migration runs, followed by the last converted key, so an
+# interrupted migration is never mistaken for a usable database and can be resumed
+MIGRATION_IN_PROGRESS = LevelDBBlockchain._sysversion_migrating
+
+BATCH_SIZE = 10000
+
+
+def convert_record(key, value):
+    """
+    Convert a single record from the legacy hex schema to the binary schema.
+
+    Args:
+        key (bytes): record key.
+        value (bytes): record value.
+
+    Returns:
+        tuple: (key, value) of the converted record.
+    """
+    prefix = key[:1]
+
+    if prefix == DBPrefix.DATA_Block:
+        # 8 bytes system fee followed by the trimmed block
+        return prefix + binascii.unhexlify(key[1:]), value[:8] + binascii.unhexlify(value[8:])
+
+    if prefix == DBPrefix.DATA_Transaction:
+        # 4 bytes block height followed by the transaction
+        return prefix + binascii.unhexlify(key[1:]), value[:4] + binascii.unhexlify(value[4:])
+
+    if prefix in HEX_VALUE_PREFIXES:
+        return key, binascii.unhexlify(value)
+
+    return key, value
+
+
+def is_converted_key(key):
+    """
+    Check if a block or transaction key already uses the binary schema, as the keys of these records
+    change when they are converted.
+
+    Args:
+        key (bytes): record key.
+
+    Returns:
+        bool: True for a block or transaction key holding a raw 32 byte hash.
+    """
+    return key[:1] in [DBPrefix.DATA_Block, DBPrefix.DATA_Transaction] and len(key) == 33
+
+
+def get_dir_size(path):
+    """
+    Get the total size of all files in a directory.
+
+    Args:
+        path (str): directory.
+
+    Returns:
+        int: size in bytes.
+    """
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for f in files:
+            total += os.path.getsize(os.path.join(root, f))
+    return total
+
+
+def migrate_to_binary(source_path, target_path=None, progress=None):
+    """
+    Convert a chain database from the legacy hex schema to the binary schema.
+
+    Args:
+        source_path (str): path of the legacy chain database.
+        target_path (str): (Optional) path to write the converted database to. If omitted, the source
+                           database is rewritten in place, continuing an interrupted in place migration.
+        progress (callable): (Optional) called with the number of converted records after every batch.
+
+    Raises:
+        Exception: if the source database does not use the legacy hex schema.
+
+    Returns:
+        int: the number of converted records.
+    """
+    in_place = target_path is None or os.path.abspath(target_path) == os.path.abspath(source_path)
+
+    source = plyvel.DB(source_path)
+    target = source if in_place else plyvel.DB(target_path, create_if_missing=True, error_if_exists=True)
+
+    try:
+        version = source.get(DBPrefix.SYS_Version)
+
+        # records up to this key were converted by an interrupted in place migration
+        last_key = None
+
+        if in_place and version is not None and version.startswith(MIGRATION_IN_PROGRESS):
+            last_key = version[len(MIGRATION_IN_PROGRESS):] or None
+            logger.info("Resuming the schema migration of %s" % source_path)
+        elif version != LevelDBBlockchain._sysversion_hex:
+            raise Exception("Database at %s has schema %s, expected %s" % (source_path, version, LevelDBBlockchain._sysversion_hex))
+        elif in_place:
+            source.put(DBPrefix.SYS_Version, MIGRATION_IN_PROGRESS)
+
+        count = 0
+        sn = source.snapshot()
+        wb = target.write_batch()
+
+        if last_key is None:
+            iterator = sn.iterator()
+        else:
+            iterator = sn.iterator(start=last_key, include_start=False)
+
+        for key, value in iterator:
+            # converted block and transaction keys sort among the ones still to convert
+            if key == DBPrefix.SYS_Version or (last_key is not None and is_converted_key(key)):
+                continue
+
+            new_key, new_value = convert_record(key, value)
+
+            if in_place and new_key != key:
+                wb.delete(key)
+            wb.put(new_key, new_value)
+
+            count += 1
+            if count % BATCH_SIZE == 0:
+                if in_place:
+                    wb.put(DBPrefix.SYS_Version, MIGRATION_IN_PROGRESS + key)
+                wb.write()
+                wb = target.write_batch()
+                if progress:
+                    progress(count)
+
+        wb.put(DBPrefix.SYS_Version, LevelDBBlockchain._sysversion)
+        wb.write()
+        sn.close()
+
+        if progress:
+            progress(count)
+
+        # reclaim the space of the deleted hex records
+        if in_place:
+            target.compact_range()
+
+        logger.info("Migrated %s records from %s to schema %s" % (count, source_path, LevelDBBlockchain._sysversion))
+
+        return count
+
+    finally:
+        if not in_place:
+            target.close()
+        source.close()
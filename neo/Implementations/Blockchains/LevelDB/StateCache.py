@@ -0,0 +1,157 @@
+from collections import OrderedDict
+
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+
+
+class StateCache:
+    """
+    Bounded LRU cache of raw state values read from the chain database.
+
+    The cache lives as long as the blockchain instance and is shared by all `DBCollection` objects
+    created by it, so hot accounts, contracts and storage items are read from disk only once.
+    It saves the LevelDB read, not the deserialization: collections hand out state objects that are
+    changed in place, and copying a cached object takes longer than deserializing the raw value.
+
+    Values committed by a collection are written through once they are in the database. Values committed
+    to a write batch are staged, and stored by `ApplyStaged` after the batch is written, so a read between
+    the commit and the write can not put the old value back into the cache.
+    """
+
+    # prefixes of the state records that are cached
+    Prefixes = [DBPrefix.ST_Account, DBPrefix.ST_Asset, DBPrefix.ST_Contract, DBPrefix.ST_Storage]
+
+    # marks a key that does not exist in the DB
+    _MISSING = object()
+
+    def __init__(self, max_items):
+        """
+        Create an instance.
+
+        Args:
+            max_items (int): maximum number of cached values.
+        """
+        self.MaxItems = max_items
+        self._items = OrderedDict()
+
+        # values committed to the write batch that is not written yet, None marks a deletion
+        self._staged = OrderedDict()
+
+        self.Hits = 0
+        self.Misses = 0
+        self.Evictions = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def Get(self, db, key):
+        """
+        Get a value, reading it from `db` if it is not cached.
+
+        Args:
+            db (plyvel.DB): database to read missing values from.
+            key (bytes): full key, including the prefix.
+
+        Returns:
+            bytes: the value or None if the key does not exist.
+        """
+        value = self._items.get(key)
+
+        if value is not None:
+            self.Hits += 1
+            self._items.move_to_end(key)
+            return None if value is self._MISSING else value
+
+        self.Misses += 1
+        value = db.get(key)
+
+        self._Store(key, value)
+
+        return value
+
+    def _Store(self, key, value):
+        if self.MaxItems > 0:
+            self._items[key] = self._MISSING if value is None else value
+            self._items.move_to_end(key)
+            if len(self._items) > self.MaxItems:
+                self._items.popitem(last=False)
+                self.Evictions += 1
+
+    def Put(self, key, value):
+        """
+        Store a value that was written to the database.
+
+        Args:
+            key (bytes): full key, including the prefix.
+            value (bytes): the value or None if the key was deleted.
+        """
+        self._staged.pop(key, None)
+        self._Store(key, value)
+
+    def Stage(self, key, value):
+        """
+        Remember a value that was added to a write batch, to store it when the batch is written.
+
+        Args:
+            key (bytes): full key, including the prefix.
+            value (bytes): the value or None if the key is deleted.
+        """
+        self._staged[key] = value
+
+    def ApplyStaged(self):
+        """
+        Store the staged values, after the write batch holding them was written.
+        """
+        for key, value in self._staged.items():
+            self._Store(key, value)
+        self._staged.clear()
+
+    def DiscardStaged(self):
+        """
+        Forget the staged values, as the write batch holding them was not written.
+        """
+        self._staged.clear()
+
+    def Invalidate(self, key):
+        """
+        Remove a key from the cache.
+
+        Args:
+            key (bytes): full key, including the prefix.
+        """
+        self._items.pop(key, None)
+
+    def Clear(self):
+        """
+        Remove all cached values.
+        """
+        self._items.clear()
+        self._staged.clear()
+
+    @property
+    def HitRate(self):
+        """
+        Get the share of lookups answered from the cache.
+
+        Returns:
+            float: between 0 and 1.
+        """
+        total = self.Hits + self.Misses
+        if total == 0:
+            return 0.0
+        return self.Hits / total
+
+    def ToJson(self):
+        """
+        Convert object members to a dictionary that can be parsed as JSON.
+
+        Returns:
+             dict:
+        """
+        return {
+            'size': len(self._items),
+            'max_size': self.MaxItems,
+            'hits': self.Hits,
+            'misses': self.Misses,
+            'evictions': self.Evictions,
+            'hit_rate': round(self.HitRate, 4)
+        }
@@ -27,13 +27,13 @@ class TestLevelDBBlockchain(LevelDBBlockchain):
 
         sn = self._db.snapshot()
 
-        accounts = DBCollection(self._db, sn, DBPrefix.ST_Account, AccountState)
-        unspentcoins = DBCollection(self._db, sn, DBPrefix.ST_Coin, UnspentCoinState)
-        spentcoins = DBCollection(self._db, sn, DBPrefix.ST_SpentCoin, SpentCoinState)
-        assets = DBCollection(self._db, sn, DBPrefix.ST_Asset, AssetState)
-        validators = DBCollection(self._db, sn, DBPrefix.ST_Validator, ValidatorState)
-        contracts = DBCollection(self._db, sn, DBPrefix.ST_Contract, ContractState)
-        storages = DBCollection(self._db, sn, DBPrefix.ST_Storage, StorageItem)
+        accounts = DBCollection(self._db, sn, DBPrefix.ST_Account, AccountState, self._binary, self._state_cache)
+        unspentcoins = DBCollection(self._db, sn, DBPrefix.ST_Coin, UnspentCoinState, self._binary, self._state_cache)
+        spentcoins = DBCollection(self._db, sn, DBPrefix.ST_SpentCoin, SpentCoinState, self._binary, self._state_cache)
+        assets = DBCollection(self._db, sn, DBPrefix.ST_Asset, AssetState, self._binary, self._state_cache)
+        validators = DBCollection(self._db, sn, DBPrefix.ST_Validator, ValidatorState, self._binary, self._state_cache)
+        contracts = DBCollection(self._db, sn, DBPrefix.ST_Contract, ContractState, self._binary, self._state_cache)
+        storages = DBCollection(self._db, sn, DBPrefix.ST_Storage, StorageItem, self._binary, self._state_cache)
 
         amount_sysfee = self.GetSysFeeAmount(block.PrevHash) + block.TotalFees().value
         amount_sysfee_bytes = amount_sysfee.to_bytes(8, 'little')
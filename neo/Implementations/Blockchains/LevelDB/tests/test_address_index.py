@@ -0,0 +1,164 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Wallets.peewee.UserWallet import UserWallet
+from neo.Core.Block import Block
+from neo.Core.Blockchain import Blockchain
+from neo.Core.CoinReference import CoinReference
+from neo.Core.Witness import Witness
+from neo.Core.TX.Transaction import TransactionOutput, ContractTransaction
+from neo.Core.TX.ClaimTransaction import ClaimTransaction
+from neo.Wallets.utils import to_aes_key
+from neo.Settings import settings
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+from mock import patch
+import shutil
+import os
+
+
+class AddressIndexTest(NeoTestCase):
+
+    LEVELDB_TESTPATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestAddressIndex')
+    WALLET_TESTPATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestAddressIndex.db3')
+
+    ADDR_A = UInt160(data=b'\x0a' * 20)
+    ADDR_B = UInt160(data=b'\x0b' * 20)
+
+    _blockchain = None
+
+    def tearDown(self):
+        Blockchain.DeregisterBlockchain()
+        if self._blockchain:
+            self._blockchain.Dispose()
+            self._blockchain = None
+        if os.path.exists(self.LEVELDB_TESTPATH):
+            shutil.rmtree(self.LEVELDB_TESTPATH)
+        if os.path.exists(self.WALLET_TESTPATH):
+            os.remove(self.WALLET_TESTPATH)
+
+    def open(self, address_index):
+        if self._blockchain:
+            Blockchain.DeregisterBlockchain()
+            self._blockchain.Dispose()
+
+        with patch.object(settings, 'ADDRESS_INDEX', address_index):
+            self._blockchain = LevelDBBlockchain(self.LEVELDB_TESTPATH)
+        Blockchain.RegisterBlockchain(self._blockchain)
+        return self._blockchain
+
+    def persist(self, *txs):
+        for tx in txs:
+            tx.scripts = []
+
+        index = self._blockchain.Height + 1
+        block = Block(prevHash=UInt256(data=bytes(32)), timestamp=1500000000 + index, index=index,
+                      consensusData=0, nextConsensus=UInt160(data=bytes(20)),
+                      script=Witness(bytearray(0), bytearray([0x51])), transactions=list(txs), build_root=True)
+        self._blockchain.AddBlockDirectly(block)
+        return block
+
+    def persist_spends(self):
+        # the genesis block issues all NEO to the consensus address, block 1 sends it to A, block 2 sends
+        # part of it from A to B and block 3 claims the GAS of the NEO spent by the consensus address
+        neo = Blockchain.SystemShare().Hash
+        issue = Blockchain.GenesisBlock().Transactions[3]
+        amount = issue.outputs[0].Value
+
+        tx1 = ContractTransaction(inputs=[CoinReference(issue.Hash, 0)],
+                                  outputs=[TransactionOutput(AssetId=neo, Value=amount, script_hash=self.ADDR_A)])
+        self.persist(tx1)
+
+        tx2 = ContractTransaction(inputs=[CoinReference(tx1.Hash, 0)],
+                                  outputs=[TransactionOutput(AssetId=neo, Value=Fixed8.FromDecimal(1), script_hash=self.ADDR_B),
+                                           TransactionOutput(AssetId=neo, Value=amount - Fixed8.FromDecimal(1), script_hash=self.ADDR_A)])
+        self.persist(ContractTransaction(), tx2)
+
+        claim = ClaimTransaction(outputs=[TransactionOutput(AssetId=Blockchain.SystemCoin().Hash, Value=Fixed8.FromDecimal(1),
+                                                            script_hash=self.ADDR_B)])
+        claim.Claims = [CoinReference(issue.Hash, 0)]
+        self.persist(claim)
+
+        return issue.outputs[0].ScriptHash
+
+    def test_index_transactions(self):
+        chain = self.open(address_index=True)
+        self.assertEqual(chain.AddressIndexStart, 0)
+
+        consensus = self.persist_spends()
+
+        self.assertEqual(chain.GetAddressTransactions([consensus]), [(0, 3), (1, 0), (3, 0)])
+        self.assertEqual(chain.GetAddressTransactions([self.ADDR_A]), [(1, 0), (2, 1)])
+        self.assertEqual(chain.GetAddressTransactions([self.ADDR_B]), [(2, 1), (3, 0)])
+
+        self.assertEqual(chain.GetAddressTransactions([self.ADDR_A, self.ADDR_B], start_height=2), [(2, 1), (3, 0)])
+        self.assertEqual(chain.GetAddressTransactions([self.ADDR_A, self.ADDR_B], start_height=2, end_height=2), [(2, 1)])
+        self.assertEqual(chain.GetAddressTransactions([UInt160(data=b'\x0c' * 20)]), [])
+
+        # the index is kept when the chain is opened again
+        chain = self.open(address_index=True)
+        self.assertEqual(chain.AddressIndexStart, 0)
+        self.assertEqual(chain.GetAddressTransactions([self.ADDR_B]), [(2, 1), (3, 0)])
+
+    def test_index_enabled_later(self):
+        chain = self.open(address_index=False)
+        self.persist(ContractTransaction(outputs=[TransactionOutput(AssetId=Blockchain.SystemCoin().Hash, Value=Fixed8.FromDecimal(1),
+                                                                    script_hash=self.ADDR_A)]))
+        self.assertIsNone(chain.AddressIndexStart)
+        self.assertIsNone(chain.GetAddressTransactions([self.ADDR_A]))
+
+        # the index only holds the blocks from the one persisted after it was enabled on
+        chain = self.open(address_index=True)
+        self.assertIsNone(chain.AddressIndexStart)
+        self.persist(ContractTransaction(outputs=[TransactionOutput(AssetId=Blockchain.SystemCoin().Hash, Value=Fixed8.FromDecimal(1),
+                                                                    script_hash=self.ADDR_A)]))
+        self.assertEqual(chain.AddressIndexStart, 2)
+        self.assertIsNone(chain.GetAddressTransactions([self.ADDR_A]))
+        self.assertEqual(chain.GetAddressTransactions([self.ADDR_A], start_height=2), [(2, 0)])
+
+        # until the older blocks are indexed
+        self.assertEqual(chain.IndexAddresses(), 2)
+        self.assertEqual(chain.AddressIndexStart, 0)
+        self.assertEqual(chain.GetAddressTransactions([self.ADDR_A]), [(1, 0), (2, 0)])
+
+        # persisting a block without the index drops it
+        chain = self.open(address_index=False)
+        self.persist(ContractTransaction())
+        self.assertIsNone(chain.AddressIndexStart)
+        self.assertIsNone(chain._db.get(DBPrefix.SYS_AddressIndex))
+
+    def test_wallet_sync(self):
+        chain = self.open(address_index=True)
+
+        wallet = UserWallet.Create(self.WALLET_TESTPATH, to_aes_key('unittest password'))
+        self.ADDR_A = wallet.GetDefaultContract().ScriptHash
+        self.persist_spends()
+        for i in range(5):
+            self.persist(ContractTransaction())
+
+        # only the blocks paying to or spending from the wallet are read
+        with patch.object(wallet, 'ADDRESS_INDEX_MIN_BLOCKS', 1):
+            with patch.object(chain, 'GetBlockByHeight', wraps=chain.GetBlockByHeight) as read:
+                wallet.ProcessBlocks()
+        self.assertEqual([call[0][0] for call in read.call_args_list], [1, 2])
+        indexed = sorted((coin.Reference.PrevHash.ToBytes(), coin.Reference.PrevIndex, coin.State) for coin in wallet.GetCoins())
+        self.assertEqual(wallet._current_height, chain.Height + 1)
+        self.assertEqual(len(indexed), 2)
+
+        # reading every block gives the same coins
+        wallet.Rebuild()
+        with patch.object(wallet, 'ADDRESS_INDEX_MIN_BLOCKS', 1):
+            with patch.object(chain, 'GetAddressTransactions', return_value=None):
+                wallet.ProcessBlocks()
+        self.assertEqual(sorted((coin.Reference.PrevHash.ToBytes(), coin.Reference.PrevIndex, coin.State) for coin in wallet.GetCoins()), indexed)
+        self.assertEqual(wallet._current_height, chain.Height + 1)
+
+        # the index is only used far behind the chain
+        wallet.Rebuild()
+        with patch.object(wallet, 'ADDRESS_INDEX_MIN_BLOCKS', 1000):
+            with patch.object(chain, 'GetAddressTransactions') as lookup:
+                wallet.ProcessBlocks()
+        lookup.assert_not_called()
+
+        wallet.Close()
@@ -0,0 +1,130 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.SchemaMigration import migrate_to_binary
+from neo.Core.Blockchain import Blockchain
+from neo.Core.State.AssetState import AssetState
+from neo.Settings import settings
+from mock import patch
+import binascii
+import shutil
+import os
+
+
+class HexLevelDBBlockchain(LevelDBBlockchain):
+    _sysversion = LevelDBBlockchain._sysversion_hex
+
+
+class BinarySchemaTest(NeoTestCase):
+
+    LEVELDB_TESTPATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestBinarySchema')
+    LEVELDB_MIGRATEDPATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestBinarySchemaMigrated')
+
+    def tearDown(self):
+        Blockchain.DeregisterBlockchain()
+        for path in [self.LEVELDB_TESTPATH, self.LEVELDB_MIGRATEDPATH]:
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
+    def assertGenesisReadable(self, chain):
+        genesis = Blockchain.GenesisBlock()
+
+        block = chain.GetBlockByHeight(0)
+        self.assertEqual(block.Hash, genesis.Hash)
+
+        header = chain.GetHeader(genesis.Hash.ToBytes())
+        self.assertEqual(header.Hash, genesis.Hash)
+
+        for tx in genesis.Transactions:
+            stored, height = chain.GetTransaction(tx.Hash.ToBytes())
+            self.assertEqual(stored.Hash, tx.Hash)
+            self.assertEqual(height, 0)
+
+        asset = chain.GetAssetState(Blockchain.SystemShare().Hash.ToBytes())
+        self.assertIsInstance(asset, AssetState)
+        self.assertEqual(asset.Amount, Blockchain.SystemShare().Amount)
+
+    def test_new_database_is_binary(self):
+        chain = LevelDBBlockchain(self.LEVELDB_TESTPATH)
+        Blockchain.RegisterBlockchain(chain)
+
+        self.assertTrue(chain.BinaryFormat)
+        self.assertEqual(chain._db.get(DBPrefix.SYS_Version), LevelDBBlockchain._sysversion)
+
+        genesis = Blockchain.GenesisBlock()
+        raw = chain._db.get(DBPrefix.DATA_Block + binascii.unhexlify(genesis.Hash.ToBytes()))
+        self.assertEqual(raw[8:], genesis.Trim(raw=True))
+        self.assertIsNone(chain._db.get(DBPrefix.DATA_Block + genesis.Hash.ToBytes()))
+
+        self.assertGenesisReadable(chain)
+        chain.Dispose()
+
+    def test_legacy_database_is_readable(self):
+        chain = HexLevelDBBlockchain(self.LEVELDB_TESTPATH)
+        chain.Dispose()
+
+        # reopening with the current implementation keeps using the legacy schema
+        chain = LevelDBBlockchain(self.LEVELDB_TESTPATH, skip_version_check=True)
+        Blockchain.RegisterBlockchain(chain)
+
+        self.assertFalse(chain.BinaryFormat)
+        self.assertEqual(chain._db.get(DBPrefix.SYS_Version), LevelDBBlockchain._sysversion_hex)
+        self.assertGenesisReadable(chain)
+        chain.Dispose()
+
+    def test_migrate_to_new_path(self):
+        chain = HexLevelDBBlockchain(self.LEVELDB_TESTPATH)
+        chain.Dispose()
+
+        count = migrate_to_binary(self.LEVELDB_TESTPATH, self.LEVELDB_MIGRATEDPATH)
+        self.assertGreater(count, 0)
+
+        chain = LevelDBBlockchain(self.LEVELDB_MIGRATEDPATH)
+        Blockchain.RegisterBlockchain(chain)
+        self.assertTrue(chain.BinaryFormat)
+        self.assertGenesisReadable(chain)
+        chain.Dispose()
+
+    def test_migrate_in_place(self):
+        chain = HexLevelDBBlockchain(self.LEVELDB_TESTPATH)
+        chain.Dispose()
+
+        migrate_to_binary(self.LEVELDB_TESTPATH)
+
+        chain = LevelDBBlockchain(self.LEVELDB_TESTPATH)
+        Blockchain.RegisterBlockchain(chain)
+        self.assertTrue(chain.BinaryFormat)
+        self.assertGenesisReadable(chain)
+
+        genesis = Blockchain.GenesisBlock()
+        self.assertIsNone(chain._db.get(DBPrefix.DATA_Block + genesis.Hash.ToBytes()))
+        chain.Dispose()
+
+        with self.assertRaises(Exception):
+            migrate_to_binary(self.LEVELDB_TESTPATH)
+
+    def test_resume_interrupted_migration(self):
+        chain = HexLevelDBBlockchain(self.LEVELDB_TESTPATH)
+        chain.Dispose()
+
+        def interrupt(count):
+            raise KeyboardInterrupt()
+
+        # stop after the first batch has been written
+        with patch('neo.Implementations.Blockchains.LevelDB.SchemaMigration.BATCH_SIZE', 2):
+            with self.assertRaises(KeyboardInterrupt):
+                migrate_to_binary(self.LEVELDB_TESTPATH, progress=interrupt)
+
+        # the half converted database is not opened
+        with self.assertRaises(Exception):
+            LevelDBBlockchain(self.LEVELDB_TESTPATH, skip_version_check=True)
+
+        with patch('neo.Implementations.Blockchains.LevelDB.SchemaMigration.BATCH_SIZE', 2):
+            self.assertGreater(migrate_to_binary(self.LEVELDB_TESTPATH), 0)
+
+        chain = LevelDBBlockchain(self.LEVELDB_TESTPATH)
+        Blockchain.RegisterBlockchain(chain)
+        self.assertTrue(chain.BinaryFormat)
+        self.assertEqual(chain._db.get(DBPrefix.SYS_Version), LevelDBBlockchain._sysversion)
+        self.assertGenesisReadable(chain)
+        chain.Dispose()
@@ -0,0 +1,105 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.BufferedDB import BufferedDB
+from neo.Settings import settings
+import plyvel
+import shutil
+import os
+
+
+class BufferedDBTest(NeoTestCase):
+
+    LEVELDB_TESTPATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestBufferedDB')
+
+    def setUp(self):
+        self._db = plyvel.DB(self.LEVELDB_TESTPATH, create_if_missing=True)
+        self._db.put(b'a1', b'1')
+        self._db.put(b'a2', b'2')
+        self._db.put(b'b1', b'3')
+
+    def tearDown(self):
+        self._db.close()
+        shutil.rmtree(self.LEVELDB_TESTPATH)
+
+    def test_reads_see_buffered_writes(self):
+        db = BufferedDB(self._db)
+
+        with db.write_batch(transaction=True) as wb:
+            wb.put(b'a3', b'4')
+            wb.delete(b'a1')
+
+        self.assertEqual(db.get(b'a3'), b'4')
+        self.assertIsNone(db.get(b'a1'))
+        self.assertEqual(db.get(b'a1', 0), 0)
+        self.assertEqual(db.get(b'b1'), b'3')
+
+        self.assertEqual(list(db.iterator(prefix=b'a')), [(b'a2', b'2'), (b'a3', b'4')])
+        self.assertEqual(list(db.iterator(prefix=b'a', include_value=False)), [b'a2', b'a3'])
+
+        # nothing reached the database yet
+        self.assertEqual(self._db.get(b'a1'), b'1')
+        self.assertIsNone(self._db.get(b'a3'))
+
+    def test_iterator_merges_lazily(self):
+        for i in range(100):
+            self._db.put(b'c%03d' % i, b'%d' % i)
+
+        db = BufferedDB(self._db)
+        db.put(b'c050', b'new')
+        db.put(b'c0505', b'added')
+        db.delete(b'c001')
+        db.put(b'c', b'first')
+
+        items = list(db.iterator(prefix=b'c'))
+        self.assertEqual(items[:3], [(b'c', b'first'), (b'c000', b'0'), (b'c002', b'2')])
+        self.assertEqual(items[50:52], [(b'c050', b'new'), (b'c0505', b'added')])
+        self.assertEqual(len(items), 101)
+        self.assertEqual(list(db.iterator(prefix=b'c', include_key=False))[-1], b'99')
+
+        # stopping early leaves the rest of the database unread
+        source = self._db
+        read = []
+
+        class CountingDB:
+            def iterator(self, **kwargs):
+                for item in source.iterator(**kwargs):
+                    read.append(item)
+                    yield item
+
+        db.DB = CountingDB()
+        self.assertEqual(next(db.iterator(prefix=b'c0', include_value=False)), b'c000')
+        self.assertEqual(len(read), 1)
+
+    def test_iterator_range(self):
+        db = BufferedDB(self._db)
+        db.put(b'a3', b'4')
+        db.put(b'b0', b'5')
+        db.delete(b'a2')
+
+        self.assertEqual(list(db.iterator(start=b'a2', stop=b'b1')), [(b'a3', b'4'), (b'b0', b'5')])
+        self.assertEqual(list(db.iterator(start=b'a3', include_value=False)), [b'a3', b'b0', b'b1'])
+        self.assertEqual(list(db.iterator(stop=b'a3', include_value=False)), [b'a1'])
+
+        with self.assertRaises(TypeError):
+            list(db.iterator(prefix=b'a', start=b'a1'))
+
+    def test_failed_transaction_is_discarded(self):
+        db = BufferedDB(self._db)
+
+        with self.assertRaises(Exception):
+            with db.write_batch(transaction=True) as wb:
+                wb.put(b'a3', b'4')
+                raise Exception("failed to persist")
+
+        self.assertIsNone(db.get(b'a3'))
+        self.assertEqual(len(db), 0)
+
+    def test_flush(self):
+        db = BufferedDB(self._db)
+        db.put(b'a3', b'4')
+        db.delete(b'b1')
+
+        db.Flush()
+
+        self.assertEqual(len(db), 0)
+        self.assertEqual(self._db.get(b'a3'), b'4')
+        self.assertIsNone(self._db.get(b'b1'))
@@ -0,0 +1,73 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Core.State.StorageItem import StorageItem
+from neo.Settings import settings
+import plyvel
+import shutil
+import os
+
+
+class DBCollectionTest(NeoTestCase):
+
+    LEVELDB_TESTPATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestDBCollection')
+
+    contract = b'\x01' * 20
+
+    def setUp(self):
+        self._db = plyvel.DB(self.LEVELDB_TESTPATH, create_if_missing=True)
+
+    def tearDown(self):
+        self._db.close()
+        shutil.rmtree(self.LEVELDB_TESTPATH)
+
+    def storages(self):
+        return DBCollection(self._db, None, DBPrefix.ST_Storage, StorageItem, True)
+
+    def test_commit_goes_through_write_batch(self):
+        storages = self.storages()
+        storages.Add(self.contract + b'a', StorageItem(b'\x01'))
+
+        wb = self._db.write_batch()
+        storages.Commit(wb, False)
+
+        # nothing is written until the batch is
+        self.assertIsNone(self._db.get(DBPrefix.ST_Storage + self.contract + b'a'))
+
+        wb.write()
+        self.assertIsNotNone(self._db.get(DBPrefix.ST_Storage + self.contract + b'a'))
+
+    def test_commit_without_write_batch(self):
+        storages = self.storages()
+        storages.Add(self.contract + b'a', StorageItem(b'\x01'))
+        storages.Commit(None)
+
+        self.assertIsNotNone(self._db.get(DBPrefix.ST_Storage + self.contract + b'a'))
+
+    def test_reads_see_batched_changes(self):
+        self._db.put(DBPrefix.ST_Storage + self.contract + b'a', StorageItem(b'\x01').ToByteArray(True))
+        self._db.put(DBPrefix.ST_Storage + self.contract + b'b', StorageItem(b'\x02').ToByteArray(True))
+
+        storages = self.storages()
+        wb = self._db.write_batch()
+
+        storages.GetAndChange(self.contract + b'a').Value = b'\x03'
+        storages.Remove(self.contract + b'b')
+        storages.Add(self.contract + b'c', StorageItem(b'\x04'))
+        storages.Commit(wb, False)
+
+        # a failed execution after the commit must not fall back to the stale DB values
+        storages.GetAndChange(self.contract + b'a').Value = b'\x05'
+        storages.Reset()
+
+        self.assertEqual(storages.TryGet(self.contract + b'a').Value, b'\x03')
+        self.assertIsNone(storages.TryGet(self.contract + b'b'))
+        self.assertEqual(storages.TryGet(self.contract + b'c').Value, b'\x04')
+
+        self.assertEqual(storages.Find(self.contract), {b'a': b'\x03', b'c': b'\x04'})
+
+        wb.write()
+
+        storages = self.storages()
+        self.assertEqual(storages.Find(self.contract), {b'a': b'\x03', b'c': b'\x04'})
+
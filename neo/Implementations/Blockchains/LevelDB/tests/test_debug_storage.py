@@ -0,0 +1,62 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.DebugStorage import DebugStorage
+from neo.Core.Blockchain import Blockchain
+from neo.Core.State.StorageItem import StorageItem
+from neo.Settings import settings
+from mock import patch
+import plyvel
+import shutil
+import os
+
+
+class DebugStorageTest(NeoTestCase):
+
+    LEVELDB_TESTPATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestDebugStorageChain')
+    DEBUG_TESTPATH = 'UnitTestDebugStorage'
+
+    _blockchain = None
+
+    def setUp(self):
+        self._blockchain = LevelDBBlockchain(self.LEVELDB_TESTPATH)
+        Blockchain.RegisterBlockchain(self._blockchain)
+
+        # an item of the live chain, stored as raw bytes
+        self._blockchain._db.put(DBPrefix.ST_Storage + b'live', StorageItem(b'live value').ToByteArray(True))
+
+    def tearDown(self):
+        Blockchain.DeregisterBlockchain()
+        self._blockchain.Dispose()
+        for path in [self.LEVELDB_TESTPATH, os.path.join(settings.DATA_DIR_PATH, self.DEBUG_TESTPATH)]:
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
+    def open(self):
+        with patch.object(settings, 'DEBUG_STORAGE_PATH', self.DEBUG_TESTPATH):
+            storage = DebugStorage()
+        storage.clone_from_live()
+        return storage
+
+    def read(self, storage, key):
+        storages = DBCollection(storage.db, storage.db.snapshot(), DBPrefix.ST_Storage, StorageItem, storage.BinaryFormat)
+        return storages.TryGet(key).Value
+
+    def test_new_storage_uses_chain_format(self):
+        storage = self.open()
+        self.assertTrue(storage.BinaryFormat)
+        self.assertEqual(self.read(storage, b'live'), b'live value')
+        storage.db.close()
+
+    def test_legacy_storage_stays_hex(self):
+        # debug storage written before the format was recorded holds hex encoded items
+        db = plyvel.DB(os.path.join(settings.DATA_DIR_PATH, self.DEBUG_TESTPATH), create_if_missing=True)
+        db.put(DBPrefix.ST_Storage + b'debug', StorageItem(b'debug value').ToByteArray())
+        db.close()
+
+        storage = self.open()
+        self.assertFalse(storage.BinaryFormat)
+        self.assertEqual(self.read(storage, b'debug'), b'debug value')
+        self.assertEqual(self.read(storage, b'live'), b'live value')
+        storage.db.close()
@@ -0,0 +1,132 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.StateCache import StateCache
+from neo.Core.State.StorageItem import StorageItem
+from neo.Core.State.UnspentCoinState import UnspentCoinState
+from neo.Settings import settings
+import plyvel
+import shutil
+import os
+
+
+class StateCacheTest(NeoTestCase):
+
+    LEVELDB_TESTPATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestStateCache')
+
+    key = DBPrefix.ST_Storage + b'\x01' * 20 + b'a'
+
+    def setUp(self):
+        self._db = plyvel.DB(self.LEVELDB_TESTPATH, create_if_missing=True)
+
+    def tearDown(self):
+        self._db.close()
+        shutil.rmtree(self.LEVELDB_TESTPATH)
+
+    def test_get(self):
+        cache = StateCache(10)
+        self._db.put(self.key, b'\x01')
+
+        self.assertEqual(cache.Get(self._db, self.key), b'\x01')
+        self.assertEqual(cache.Misses, 1)
+
+        # served from the cache, even if the DB changed behind its back
+        self._db.put(self.key, b'\x02')
+        self.assertEqual(cache.Get(self._db, self.key), b'\x01')
+        self.assertEqual(cache.Hits, 1)
+
+        cache.Invalidate(self.key)
+        self.assertEqual(cache.Get(self._db, self.key), b'\x02')
+        self.assertEqual(cache.Misses, 2)
+
+    def test_get_missing(self):
+        cache = StateCache(10)
+
+        self.assertIsNone(cache.Get(self._db, self.key))
+        self.assertIsNone(cache.Get(self._db, self.key))
+        self.assertEqual(cache.Hits, 1)
+        self.assertEqual(cache.Misses, 1)
+
+    def test_lru_eviction(self):
+        cache = StateCache(2)
+        for i in range(0, 3):
+            self._db.put(b'%d' % i, b'%d' % i)
+
+        cache.Get(self._db, b'0')
+        cache.Get(self._db, b'1')
+        # touch 0 so 1 is the least recently used one
+        cache.Get(self._db, b'0')
+        cache.Get(self._db, b'2')
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.Evictions, 1)
+
+        cache.Get(self._db, b'0')
+        self.assertEqual(cache.Hits, 2)
+        cache.Get(self._db, b'1')
+        self.assertEqual(cache.Misses, 4)
+
+        self.assertEqual(cache.ToJson()['evictions'], 2)
+
+    def test_disabled(self):
+        cache = StateCache(0)
+        self._db.put(self.key, b'\x01')
+
+        self.assertEqual(cache.Get(self._db, self.key), b'\x01')
+        self.assertEqual(len(cache), 0)
+
+    def test_collection_commit_invalidates(self):
+        cache = StateCache(10)
+        self._db.put(self.key, StorageItem(b'\x01').ToByteArray(True))
+
+        storages = DBCollection(self._db, None, DBPrefix.ST_Storage, StorageItem, True, cache)
+        storages.GetAndChange(self.key[1:]).Value = b'\x02'
+
+        with self._db.write_batch() as wb:
+            storages.Commit(wb)
+
+            # a read before the batch is written sees the old value, and must not keep it cached
+            reader = DBCollection(self._db, None, DBPrefix.ST_Storage, StorageItem, True, cache)
+            self.assertEqual(reader.TryGet(self.key[1:]).Value, b'\x01')
+
+        cache.ApplyStaged()
+
+        storages = DBCollection(self._db, None, DBPrefix.ST_Storage, StorageItem, True, cache)
+        self.assertEqual(storages.TryGet(self.key[1:]).Value, b'\x02')
+        self.assertEqual(cache.Misses, 1)
+
+    def test_collection_commit_discarded(self):
+        cache = StateCache(10)
+        self._db.put(self.key, StorageItem(b'\x01').ToByteArray(True))
+
+        storages = DBCollection(self._db, None, DBPrefix.ST_Storage, StorageItem, True, cache)
+        storages.GetAndChange(self.key[1:]).Value = b'\x02'
+        storages.Commit(self._db.write_batch())
+
+        # the batch was never written
+        cache.DiscardStaged()
+        cache.ApplyStaged()
+
+        storages = DBCollection(self._db, None, DBPrefix.ST_Storage, StorageItem, True, cache)
+        self.assertEqual(storages.TryGet(self.key[1:]).Value, b'\x01')
+
+    def test_collection_commit_without_batch(self):
+        cache = StateCache(10)
+        self._db.put(self.key, StorageItem(b'\x01').ToByteArray(True))
+
+        storages = DBCollection(self._db, None, DBPrefix.ST_Storage, StorageItem, True, cache)
+        storages.Remove(self.key[1:])
+        storages.Commit(None)
+
+        self.assertIsNone(self._db.get(self.key))
+        storages = DBCollection(self._db, None, DBPrefix.ST_Storage, StorageItem, True, cache)
+        self.assertIsNone(storages.TryGet(self.key[1:]))
+        self.assertEqual(cache.Hits, 1)
+
+    def test_uncached_prefix(self):
+        cache = StateCache(10)
+
+        coins = DBCollection(self._db, None, DBPrefix.ST_Coin, UnspentCoinState, True, cache)
+        self.assertIsNone(coins.Cache)
+        self.assertIsNone(coins.TryGet(b'\x01' * 32))
+        self.assertEqual(cache.Misses, 0)
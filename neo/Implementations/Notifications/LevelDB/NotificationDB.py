@@ -1,6 +1,10 @@
 import plyvel
+import queue
+import threading
+import time
 from logzero import logger
 from neo.EventHub import events
+from neo.Network.BoundedCache import BoundedCache
 from neo.SmartContract.SmartContractEvent import SmartContractEvent, NotifyEvent, NotifyType
 from neo.Core.State.ContractState import ContractState
 from neo.Settings import settings
@@ -21,6 +25,24 @@ class NotificationPrefix:
 
     PREFIX_TOKEN = b'\xCE'
 
+    # version of the database layout, see `NotificationDB.VERSION`
+    PREFIX_VERSION = b'\xCF'
+
+    PREFIX_TX = b'\xD0'
+
+    # blocks with stored events that are not indexed yet, by big endian height, see `NotificationDB.start`
+    PREFIX_PENDING = b'\xD1'
+
+    # height of the last block with indexed events
+    PREFIX_INDEXED = b'\xD2'
+
+
+class InvalidCursorError(Exception):
+    """
+    Raised for a cursor that does not belong to the address or contract of a page request.
+    """
+    pass
+
 
 class NotificationDB:
 
@@ -29,6 +51,26 @@ class NotificationDB:
     _events_to_write = None
     _new_contracts_to_write = None
 
+    # file the events of persisted blocks are appended to instead of writing them, see `start`
+    _spool = None
+
+    # the events of persisted blocks are indexed by a background thread, see `start`
+    _queue = None
+    _writer = None
+
+    # maximum number of blocks waiting to be indexed before `on_persist_completed` blocks
+    WRITER_QUEUE_SIZE = 1000
+
+    # maximum number of queued blocks indexed in one batch when the writer falls behind
+    MAX_BLOCKS_PER_BATCH = 100
+
+    # maximum number of address and contract event counts kept in memory
+    COUNT_CACHE_SIZE = 100000
+
+    # layout of the database. 1: the PREFIX_COUNT values match the number of stored events,
+    # 2: events are indexed by transaction hash. Older databases are upgraded with `rebuild_indexes`
+    VERSION = 2
+
     @staticmethod
     def instance():
         """
@@ -50,6 +92,7 @@ class NotificationDB:
         Closes the database if it is open
         """
         if NotificationDB.__instance:
+            NotificationDB.__instance.stop_writer()
             NotificationDB.__instance.db.close()
             NotificationDB.__instance = None
 
@@ -75,12 +118,65 @@ class NotificationDB:
             logger.info("Notification leveldb unavailable, you may already be running this process: %s " % e)
             raise Exception('Notification Leveldb Unavailable %s ' % e)
 
-    def start(self):
+        if next(self._db.iterator(include_value=False), None) is None:
+            self._db.put(NotificationPrefix.PREFIX_VERSION, self.VERSION.to_bytes(4, 'little'))
+        self._read_version()
+
+        # next event index by address or contract, prefixed with PREFIX_ADDR or PREFIX_CONTRACT, of the indexed events.
+        # Only used by the thread indexing the events
+        self._counts = BoundedCache(self.COUNT_CACHE_SIZE)
+
+        # height of the last block with events handed to the writer and of the last block indexed
+        indexed = self._db.get(NotificationPrefix.PREFIX_INDEXED)
+        self._written_block = int.from_bytes(indexed, 'little') if indexed else -1
+        self._queued_block = self._written_block
+
+        self._batches_written = 0
+        self._events_written = 0
+        self._last_flush_duration = 0
+        self._last_flush_time = None
+
+    def _read_version(self):
+        version = self._db.get(NotificationPrefix.PREFIX_VERSION)
+        version = int.from_bytes(version, 'little') if version else 0
+
+        # databases created before the counts were kept in memory can have counts that are off
+        self._exact_counts = version >= 1
+        self._has_tx_index = version >= 2
+
+    @property
+    def has_tx_index(self):
+        """
+        Check if all events are indexed by transaction hash, see `get_by_tx`.
+
+        Returns:
+            bool: False for databases created by older versions that were not rebuilt.
+        """
+        return self._has_tx_index
+
+    def start(self, spool=None):
         """
         Handle EventHub events for SmartContract decorators
+
+        The events of persisted blocks are stored right away and indexed by a background thread, so persisting
+        the next block does not wait for the index. Blocks that were stored but not indexed when the process
+        stopped are indexed first.
+
+        Args:
+            spool (file, optional): a binary file to append the events of persisted blocks to, instead of writing
+                                    them to the database. They are written later with `write_spooled`.
         """
+        self.stop_writer()
+        self._index_pending()
+
         self._events_to_write = []
         self._new_contracts_to_write = []
+        self._spool = spool
+
+        if not spool:
+            self._queue = queue.Queue(maxsize=self.WRITER_QUEUE_SIZE)
+            self._writer = threading.Thread(target=self._write_queued, name='NotificationDBWriter', daemon=True)
+            self._writer.start()
 
         @events.on(SmartContractEvent.CONTRACT_CREATED)
         @events.on(SmartContractEvent.CONTRACT_MIGRATED)
@@ -124,93 +220,352 @@ class NotificationDB:
         Args:
             block (neo.Core.Block): the currently persisting block
         """
-        if len(self._events_to_write):
+        events = self._events_to_write
+        contracts = self._new_contracts_to_write
+        self._events_to_write = []
+        self._new_contracts_to_write = []
 
-            addr_db = self.db.prefixed_db(NotificationPrefix.PREFIX_ADDR)
-            block_db = self.db.prefixed_db(NotificationPrefix.PREFIX_BLOCK)
-            contract_db = self.db.prefixed_db(NotificationPrefix.PREFIX_CONTRACT)
+        if self._spool:
+            for event in events + contracts:
+                data = event.ToByteArray()
+                self._spool.write(len(data).to_bytes(4, 'little') + data)
+            return
 
-            block_write_batch = block_db.write_batch()
-            contract_write_batch = contract_db.write_batch()
+        if not events and not contracts:
+            return
 
-            block_count = 0
-            block_bytes = self._events_to_write[0].block_number.to_bytes(4, 'little')
+        self._queued_block = (events + contracts)[0].block_number
+        item = (self._queued_block, self._store_events(events, contracts))
 
-            for evt in self._events_to_write:  # type:NotifyEvent
+        if self._writer:
+            self._queue.put(item)
+        else:
+            self._index_blocks([item])
 
-                # write the event for both or one of the addresses involved in the transfer
-                write_both = True
-                hash_data = evt.ToByteArray()
+    def flush(self, timeout=None):
+        """
+        Wait until the events of all persisted blocks are indexed.
 
-                bytes_to = bytes(evt.addr_to.Data)
-                bytes_from = bytes(evt.addr_from.Data)
-
-                if bytes_to == bytes_from:
-                    write_both = False
-
-                total_bytes_to = addr_db.get(bytes_to + NotificationPrefix.PREFIX_COUNT)
-                total_bytes_from = addr_db.get(bytes_from + NotificationPrefix.PREFIX_COUNT)
-
-                if not total_bytes_to:
-                    total_bytes_to = b'\x00'
-
-                if not total_bytes_from:
-                    total_bytes_from = b'x\00'
-
-                addr_to_key = bytes_to + total_bytes_to
-                addr_from_key = bytes_from + total_bytes_from
-
-                with addr_db.write_batch() as b:
-                    b.put(addr_to_key, hash_data)
-                    if write_both:
-                        b.put(addr_from_key, hash_data)
-                    total_bytes_to = int.from_bytes(total_bytes_to, 'little') + 1
-                    total_bytes_from = int.from_bytes(total_bytes_from, 'little') + 1
-                    new_bytes_to = total_bytes_to.to_bytes(4, 'little')
-                    new_bytes_from = total_bytes_from.to_bytes(4, 'little')
-                    b.put(bytes_to + NotificationPrefix.PREFIX_COUNT, new_bytes_to)
-                    if write_both:
-                        b.put(bytes_from + NotificationPrefix.PREFIX_COUNT, new_bytes_from)
-
-                # write the event to the per-block database
-                per_block_key = block_bytes + block_count.to_bytes(4, 'little')
-                block_write_batch.put(per_block_key, hash_data)
-                block_count += 1
-
-                # write the event to the per-contract database
-                contract_bytes = bytes(evt.contract_hash.Data)
-                count_for_contract = contract_db.get(contract_bytes + NotificationPrefix.PREFIX_COUNT)
-                if not count_for_contract:
-                    count_for_contract = b'\x00'
-                contract_event_key = contract_bytes + count_for_contract
-                contract_count_int = int.from_bytes(count_for_contract, 'little') + 1
-                new_contract_count = contract_count_int.to_bytes(4, 'little')
-                contract_write_batch.put(contract_bytes + NotificationPrefix.PREFIX_COUNT, new_contract_count)
-                contract_write_batch.put(contract_event_key, hash_data)
-
-            # finish off the per-block write batch and contract write batch
-            block_write_batch.write()
-            contract_write_batch.write()
+        Args:
+            timeout (float, optional): maximum number of seconds to wait.
 
-        self._events_to_write = []
+        Returns:
+            bool: True if all events were indexed.
+        """
+        if not self._writer:
+            return True
+
+        end = time.time() + timeout if timeout is not None else None
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = end - time.time() if end is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stop_writer(self):
+        """
+        Index the queued events and stop the background writer. Events are indexed right away afterwards.
+        """
+        if self._writer:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+            self._queue = None
+
+    def get_index_status(self):
+        """
+        Get the progress of the background writer.
+
+        Returns:
+            dict: the height of the last block with events that was persisted and of the last one indexed,
+                  the number of blocks waiting to be indexed and statistics of the index batches.
+        """
+        pending = self._queue.unfinished_tasks if self._queue else 0
+
+        return {
+            'last_block': self._queued_block,
+            'indexed_block': self._written_block,
+            'lag_blocks': self._queued_block - self._written_block,
+            'pending_blocks': pending,
+            'batches_written': self._batches_written,
+            'events_written': self._events_written,
+            'last_flush_ms': round(self._last_flush_duration * 1000, 3),
+            'last_flush_time': self._last_flush_time,
+        }
+
+    def _write_queued(self):
+        """
+        Index the queued events until `stop_writer` is called. Runs in the writer thread.
 
-        if len(self._new_contracts_to_write):
+        All blocks that are waiting when the writer gets to them are indexed in one batch.
+        """
+        stopping = False
+        while not stopping:
+            items = [self._queue.get()]
+            while len(items) < self.MAX_BLOCKS_PER_BATCH:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            blocks = [item for item in items if item is not None]
+            stopping = len(blocks) < len(items)
+
+            try:
+                if blocks:
+                    self._index_blocks(blocks)
+            except Exception as e:
+                logger.error("Could not index notifications, they are indexed on the next start: %s" % e)
+            finally:
+                for item in items:
+                    self._queue.task_done()
+
+    def _next_index(self, prefix, key, counts):
+        """
+        Get the index of the next event of an address or contract and count the event.
 
-            token_db = self.db.prefixed_db(NotificationPrefix.PREFIX_TOKEN)
+        Args:
+            prefix (bytes): PREFIX_ADDR or PREFIX_CONTRACT.
+            key (bytes): the address or contract hash.
+            counts (dict): the counts changed by the batch being written, the event is counted there.
 
-            token_write_batch = token_db.write_batch()
+        Returns:
+            int: the number of events stored before.
+        """
+        cache_key = prefix + key
+        count = counts.get(cache_key)
+        if count is None:
+            count = self._counts.get(cache_key)
+        if count is None:
+            stored = self.db.get(cache_key + NotificationPrefix.PREFIX_COUNT)
+            count = int.from_bytes(stored, 'little') if stored else 0
+
+        counts[cache_key] = count + 1
+        return count
+
+    def _write_counts(self, batch, counts):
+        for key, count in counts.items():
+            batch.put(key + NotificationPrefix.PREFIX_COUNT, count.to_bytes(4, 'little'))
+
+    def _store_events(self, events, contracts):
+        """
+        Store the events of a block by block and NEP5 contracts by their script hash, and mark the block as
+        not indexed. Runs in the thread persisting the blocks.
 
-            for token_event in self._new_contracts_to_write:
+        Args:
+            events (list): the notify events.
+            contracts (list): the contract events.
+
+        Returns:
+            list: (event, serialized event, per-block key) tuples of the notify events.
+        """
+        stored = []
+
+        # events are serialized here, the stream manager must not be used by the writer thread
+        with self.db.write_batch() as batch:
+            for block_count, evt in enumerate(events):  # type:NotifyEvent
+                per_block_key = evt.block_number.to_bytes(4, 'little') + block_count.to_bytes(4, 'little')
+                hash_data = evt.ToByteArray()
+                batch.put(NotificationPrefix.PREFIX_BLOCK + per_block_key, hash_data)
+                batch.put(NotificationPrefix.PREFIX_PENDING + evt.block_number.to_bytes(4, 'big'), b'')
+                stored.append((evt, hash_data, per_block_key))
 
-                hash_data = token_event.ToByteArray()
+            for token_event in contracts:
                 hash_key = token_event.contract.Code.ScriptHash().ToBytes()
-#                logger.info("persist new NEP5 contract: %s " % (hash_key))
-                token_write_batch.put(hash_key, hash_data)
+                batch.put(NotificationPrefix.PREFIX_TOKEN + hash_key, token_event.ToByteArray())
+
+        return stored
+
+    def _index_blocks(self, blocks):
+        """
+        Index the stored events of one or more blocks in a single batch.
+
+        The batch also clears the marks of the blocks and records the last indexed height. The counts kept
+        in memory are only updated once it is written, so they always match the database.
+
+        Args:
+            blocks (list): the height of each block and the (event, serialized event, per-block key) tuples of
+                           its notify events, see `_store_events`.
+        """
+        start = time.time()
+        counts = {}
+        written = 0
+
+        with self.db.write_batch(transaction=True) as batch:
+            for height, events in blocks:
+                for evt, hash_data, per_block_key in events:
+                    self._index_event(batch, evt, hash_data, per_block_key, counts)
+                    batch.delete(NotificationPrefix.PREFIX_PENDING + evt.block_number.to_bytes(4, 'big'))
+                    written += 1
+
+            batch.put(NotificationPrefix.PREFIX_INDEXED, height.to_bytes(4, 'little'))
+            self._write_counts(batch, counts)
+
+        for key, count in counts.items():
+            self._counts[key] = count
+
+        self._written_block = height
+        self._batches_written += 1
+        self._events_written += written
+        self._last_flush_duration = time.time() - start
+        self._last_flush_time = int(time.time())
+
+    def _index_pending(self):
+        """
+        Index the stored events of the blocks that were not indexed when the process stopped.
+        The writer must not be running.
+
+        Returns:
+            int: the number of blocks indexed.
+        """
+        heights = [int.from_bytes(key[1:], 'big')
+                   for key in self.db.iterator(prefix=NotificationPrefix.PREFIX_PENDING, include_value=False)]
+
+        # blocks left from a failed batch can be older than the ones indexed after it
+        indexed = self._written_block
 
-            token_write_batch.write()
+        for height in heights:
+            events = []
+            block_db = self.db.prefixed_db(NotificationPrefix.PREFIX_BLOCK)
+            for per_block_key, hash_data in block_db.iterator(prefix=height.to_bytes(4, 'little')):
+                try:
+                    events.append((SmartContractEvent.FromByteArray(hash_data), hash_data, per_block_key))
+                except Exception as e:
+                    logger.error("could not parse event: %s %s" % (e, hash_data))
+
+            if events:
+                # keys are little endian, index the events in the order they were stored
+                events.sort(key=lambda item: int.from_bytes(item[2][4:], 'little'))
+                self._index_blocks([(height, events)])
+            else:
+                self.db.delete(NotificationPrefix.PREFIX_PENDING + height.to_bytes(4, 'big'))
+
+        if self._written_block < indexed:
+            self.db.put(NotificationPrefix.PREFIX_INDEXED, indexed.to_bytes(4, 'little'))
+            self._written_block = indexed
+
+        if heights:
+            logger.info("Indexed the notifications of %s blocks that were not indexed before" % len(heights))
+
+        return len(heights)
+
+    def _index_event(self, batch, evt, hash_data, per_block_key, counts):
+        """
+        Write the entries of an event by address, by contract and by transaction.
+
+        Args:
+            batch (plyvel.WriteBatch): the batch to write to.
+            evt (NotifyEvent): the event.
+            hash_data (bytes): the serialized event.
+            per_block_key (bytes): key of the event in the per-block database.
+            counts (dict): the counts changed by the batch, see `_next_index`.
+        """
+        # write the event for both or one of the addresses involved in the transfer
+        addresses = [bytes(evt.addr_to.Data)]
+        bytes_from = bytes(evt.addr_from.Data)
+        if bytes_from != addresses[0]:
+            addresses.append(bytes_from)
 
+        for addr in addresses:
+            index = self._next_index(NotificationPrefix.PREFIX_ADDR, addr, counts)
+            batch.put(NotificationPrefix.PREFIX_ADDR + addr + index.to_bytes(4, 'little'), hash_data)
+
+        # write the event to the per-contract database
+        contract_bytes = bytes(evt.contract_hash.Data)
+        index = self._next_index(NotificationPrefix.PREFIX_CONTRACT, contract_bytes, counts)
+        batch.put(NotificationPrefix.PREFIX_CONTRACT + contract_bytes + index.to_bytes(4, 'little'), hash_data)
+
+        # point from the transaction to the per-block entry
+        batch.put(NotificationPrefix.PREFIX_TX + evt.tx_hash.ToBytes() + per_block_key, b'')
+
+    def rebuild_indexes(self, progress=None):
+        """
+        Write the entries by address, by contract and by transaction again from the per-block database,
+        which upgrades a database created by an older version. The writer must not be running.
+
+        Args:
+            progress (function): (Optional) called with the number of events indexed so far.
+
+        Returns:
+            int: the number of events indexed.
+        """
+        for prefix in [NotificationPrefix.PREFIX_ADDR, NotificationPrefix.PREFIX_CONTRACT, NotificationPrefix.PREFIX_TX,
+                       NotificationPrefix.PREFIX_PENDING]:
+            batch = self.db.write_batch()
+            for count, key in enumerate(self.db.iterator(prefix=prefix, include_value=False)):
+                batch.delete(key)
+                if count % 10000 == 9999:
+                    batch.write()
+                    batch = self.db.write_batch()
+            batch.write()
+
+        self._counts.clear()
+
+        indexed = 0
+        counts = {}
+        batch = self.db.write_batch()
+
+        block_db = self.db.prefixed_db(NotificationPrefix.PREFIX_BLOCK)
+        for per_block_key, hash_data in block_db.iterator():
+            try:
+                evt = SmartContractEvent.FromByteArray(hash_data)
+            except Exception as e:
+                logger.error("could not parse event: %s %s" % (e, hash_data))
+                continue
+
+            self._index_event(batch, evt, hash_data, per_block_key, counts)
+            indexed += 1
+
+            if indexed % 10000 == 0:
+                self._write_counts(batch, counts)
+                batch.write()
+                batch = self.db.write_batch()
+                counts = {}
+                if progress:
+                    progress(indexed)
+
+        self._write_counts(batch, counts)
+        batch.put(NotificationPrefix.PREFIX_VERSION, self.VERSION.to_bytes(4, 'little'))
+        batch.write()
+        self._read_version()
+
+        return indexed
+
+    def write_spooled(self, spool):
+        """
+        Write the events appended to a spool file by `on_persist_completed`, block by block.
+
+        Args:
+            spool (file): the binary spool file, read from its current position.
+        """
+        # from now on events are written right away
+        self._spool = None
+        self._events_to_write = []
         self._new_contracts_to_write = []
 
+        current_block = None
+
+        while True:
+            length = spool.read(4)
+
+            if len(length) < 4:
+                break
+
+            event = SmartContractEvent.FromByteArray(spool.read(int.from_bytes(length, 'little')))
+
+            if event.block_number != current_block:
+                self.on_persist_completed(None)
+                current_block = event.block_number
+
+            if isinstance(event, NotifyEvent):
+                self._events_to_write.append(event)
+            else:
+                self._new_contracts_to_write.append(event)
+
+        self.on_persist_completed(None)
+
     def get_by_block(self, block_number):
         """
         Look up notifications for a block
@@ -229,6 +584,27 @@ class NotificationDB:
 
         return results
 
+    def get_by_tx(self, tx_hash):
+        """
+        Look up the notifications of a transaction, see `has_tx_index`.
+
+        Args:
+            tx_hash (UInt256): hash of the transaction.
+
+        Returns:
+            list: a list of notifications
+        """
+        snapshot = self.db.snapshot()
+        prefix = NotificationPrefix.PREFIX_TX + tx_hash.ToBytes()
+        results = []
+
+        for key in snapshot.iterator(prefix=prefix, include_value=False):
+            val = snapshot.get(NotificationPrefix.PREFIX_BLOCK + key[len(prefix):])
+            if val:
+                results.append(SmartContractEvent.FromByteArray(val))
+
+        return results
+
     def get_by_addr(self, address):
         """
         Lookup a set of notifications by address
@@ -238,24 +614,37 @@ class NotificationDB:
         Returns:
             list: a list of notifications
         """
-        addr = address
-        if isinstance(address, str) and len(address) == 34:
-            addr = Helper.AddrStrToScriptHash(address)
+        return self.get_page_by_addr(address, limit=None)[0]
 
-        if not isinstance(addr, UInt160):
-            raise Exception("Incorrect address format")
+    def get_page_by_addr(self, address, offset=0, limit=500, cursor=None):
+        """
+        Look up a page of notifications by address, reading only that page from the database.
 
-        addrlist_snapshot = self.db.prefixed_db(NotificationPrefix.PREFIX_ADDR).snapshot()
-        results = []
+        Args:
+            address (UInt160 or str): hash of address for notifications
+            offset (int): number of notifications to skip, after the cursor if one is given.
+            limit (int): maximum number of notifications, None for all of them.
+            cursor (bytes): (Optional) the cursor returned with the previous page.
 
-        for val in addrlist_snapshot.iterator(prefix=bytes(addr.Data), include_key=False):
-            if len(val) > 4:
-                try:
-                    event = SmartContractEvent.FromByteArray(val)
-                    results.append(event)
-                except Exception as e:
-                    logger.error("could not parse event: %s %s" % (e, val))
-        return results
+        Returns:
+            tuple: a list of notifications and the cursor of the next page, None if there are no more notifications.
+
+        Raises:
+            InvalidCursorError: if the cursor is not one of a page of the address.
+        """
+        return self._get_page(NotificationPrefix.PREFIX_ADDR, self._addr_key(address), offset, limit, cursor)
+
+    def get_count_by_addr(self, address):
+        """
+        Get the number of notifications of an address.
+
+        Args:
+            address (UInt160 or str): hash of address for notifications
+
+        Returns:
+            int: the number of notifications.
+        """
+        return self._get_count(NotificationPrefix.PREFIX_ADDR, self._addr_key(address))
 
     def get_by_contract(self, contract_hash):
         """
@@ -266,6 +655,51 @@ class NotificationDB:
         Returns:
             list: a list of notifications
         """
+        return self.get_page_by_contract(contract_hash, limit=None)[0]
+
+    def get_page_by_contract(self, contract_hash, offset=0, limit=500, cursor=None):
+        """
+        Look up a page of notifications by contract, reading only that page from the database.
+
+        Args:
+            contract_hash (UInt160 or str): hash of contract for notifications to be retreived
+            offset (int): number of notifications to skip, after the cursor if one is given.
+            limit (int): maximum number of notifications, None for all of them.
+            cursor (bytes): (Optional) the cursor returned with the previous page.
+
+        Returns:
+            tuple: a list of notifications and the cursor of the next page, None if there are no more notifications.
+
+        Raises:
+            InvalidCursorError: if the cursor is not one of a page of the contract.
+        """
+        return self._get_page(NotificationPrefix.PREFIX_CONTRACT, self._contract_key(contract_hash), offset, limit, cursor)
+
+    def get_count_by_contract(self, contract_hash):
+        """
+        Get the number of notifications of a contract.
+
+        Args:
+            contract_hash (UInt160 or str): hash of contract for notifications
+
+        Returns:
+            int: the number of notifications.
+        """
+        return self._get_count(NotificationPrefix.PREFIX_CONTRACT, self._contract_key(contract_hash))
+
+    @staticmethod
+    def _addr_key(address):
+        addr = address
+        if isinstance(address, str) and len(address) == 34:
+            addr = Helper.AddrStrToScriptHash(address)
+
+        if not isinstance(addr, UInt160):
+            raise Exception("Incorrect address format")
+
+        return bytes(addr.Data)
+
+    @staticmethod
+    def _contract_key(contract_hash):
         hash = contract_hash
         if isinstance(contract_hash, str) and len(contract_hash) == 40:
             hash = UInt160.ParseString(contract_hash)
@@ -273,17 +707,79 @@ class NotificationDB:
         if not isinstance(hash, UInt160):
             raise Exception("Incorrect address format")
 
-        contractlist_snapshot = self.db.prefixed_db(NotificationPrefix.PREFIX_CONTRACT).snapshot()
+        return bytes(hash.Data)
+
+    def _get_page(self, prefix, key, offset, limit, cursor):
+        """
+        Read a page of the notifications stored under an address or contract.
+
+        The notifications are read in the order of their keys. A cursor is the key of the last notification of
+        a page, so the next page is read from there instead of skipping all notifications before it.
+
+        Args:
+            prefix (bytes): PREFIX_ADDR or PREFIX_CONTRACT.
+            key (bytes): the address or contract hash.
+            offset (int): number of notifications to skip.
+            limit (int): maximum number of notifications, None for all of them.
+            cursor (bytes): key of the last notification of the previous page or None.
+
+        Returns:
+            tuple: a list of notifications and the cursor of the next page or None.
+        """
+        snapshot = self.db.prefixed_db(prefix).snapshot()
+        count_key = key + NotificationPrefix.PREFIX_COUNT
+
+        if cursor is not None:
+            if not cursor.startswith(key) or len(cursor) <= len(key):
+                raise InvalidCursorError("Invalid cursor")
+            iterator = snapshot.iterator(start=cursor, include_start=False)
+        else:
+            iterator = snapshot.iterator(start=key)
+
         results = []
+        last_key = None
 
-        for val in contractlist_snapshot.iterator(prefix=bytes(hash.Data), include_key=False):
-            if len(val) > 4:
-                try:
-                    event = SmartContractEvent.FromByteArray(val)
-                    results.append(event)
-                except Exception as e:
-                    logger.error("could not parse event: %s %s" % (e, val))
-        return results
+        for item_key, val in iterator:
+            if not item_key.startswith(key):
+                break
+
+            # skip the count, which is stored next to the notifications
+            if item_key == count_key or len(val) <= 4:
+                continue
+
+            if offset > 0:
+                offset -= 1
+                continue
+
+            if limit is not None and len(results) >= limit:
+                return results, last_key
+
+            last_key = item_key
+            try:
+                results.append(SmartContractEvent.FromByteArray(val))
+            except Exception as e:
+                logger.error("could not parse event: %s %s" % (e, val))
+
+        return results, None
+
+    def _get_count(self, prefix, key):
+        """
+        Get the number of notifications stored under an address or contract.
+
+        Args:
+            prefix (bytes): PREFIX_ADDR or PREFIX_CONTRACT.
+            key (bytes): the address or contract hash.
+
+        Returns:
+            int: the number of notifications.
+        """
+        if self._exact_counts:
+            stored = self.db.get(prefix + key + NotificationPrefix.PREFIX_COUNT)
+            return int.from_bytes(stored, 'little') if stored else 0
+
+        # count the keys, without reading the notifications
+        count_key = prefix + key + NotificationPrefix.PREFIX_COUNT
+        return sum(1 for item_key in self.db.iterator(prefix=prefix + key, include_value=False) if item_key != count_key)
 
     def get_tokens(self):
         """
@@ -5,10 +5,12 @@ from neo.SmartContract.ContractParameter import ContractParameterType, ContractP
 from neocore.UInt160 import UInt160
 from neocore.UInt256 import UInt256
 from uuid import uuid1
+from mock import patch
+from io import BytesIO
 import shutil
 import os
 
-from neo.Implementations.Notifications.LevelDB.NotificationDB import NotificationDB
+from neo.Implementations.Notifications.LevelDB.NotificationDB import NotificationDB, NotificationPrefix, InvalidCursorError
 from neocore.BigInteger import BigInteger
 
 
@@ -64,6 +66,7 @@ class NotificationDBTestCase(TestCase):
 
         self.assertEqual(len(ndb.current_events), 1)
         ndb.on_persist_completed(None)
+        self.assertTrue(ndb.flush(5))
 
     def test_4_should_persist(self):
 
@@ -157,3 +160,202 @@ class NotificationDBTestCase(TestCase):
 
         self.assertEqual(len(ndb.current_events), 1)
         ndb.on_persist_completed(None)
+        self.assertTrue(ndb.flush(5))
+
+    def test_writer_batches_and_counts(self):
+        ndb = NotificationDB.instance()
+        contract_hash = UInt160(data=bytearray(b'\x22' * 20))
+        addr = b'\x13' * 20
+
+        payload = ContractParameter(ContractParameterType.Array, [
+            ContractParameter(ContractParameterType.String, b'transfer'),
+            ContractParameter(ContractParameterType.ByteArray, addr),
+            ContractParameter(ContractParameterType.ByteArray, self.addr_from),
+            ContractParameter(ContractParameterType.Integer, 1)
+        ])
+
+        # several events of the same contract and address in a block, and blocks queued faster than written
+        for block_number in [93000, 93001]:
+            for i in range(3):
+                sc = NotifyEvent(SmartContractEvent.RUNTIME_NOTIFY, payload, contract_hash, block_number, self.event_tx, True, False)
+                ndb.on_smart_contract_event(sc)
+            ndb.on_persist_completed(None)
+
+        self.assertTrue(ndb.flush(5))
+
+        self.assertEqual(len(ndb.get_by_block(93000)), 3)
+        self.assertEqual(len(ndb.get_by_contract(contract_hash)), 6)
+        self.assertEqual(len(ndb.get_by_addr(UInt160(data=addr))), 6)
+
+        status = ndb.get_index_status()
+        self.assertEqual(status['last_block'], 93001)
+        self.assertEqual(status['indexed_block'], 93001)
+        self.assertEqual(status['lag_blocks'], 0)
+        self.assertEqual(status['pending_blocks'], 0)
+
+        # counts survive a restart of the writer
+        ndb._counts.clear()
+        sc = NotifyEvent(SmartContractEvent.RUNTIME_NOTIFY, payload, contract_hash, 93002, self.event_tx, True, False)
+        ndb.on_smart_contract_event(sc)
+        ndb.on_persist_completed(None)
+        ndb.flush(5)
+        self.assertEqual(len(ndb.get_by_contract(contract_hash)), 7)
+
+    def test_paginated_queries(self):
+        ndb = NotificationDB.instance()
+        contract_hash = UInt160(data=bytearray(b'\x14' * 20))
+
+        payload = ContractParameter(ContractParameterType.Array, [
+            ContractParameter(ContractParameterType.String, b'transfer'),
+            ContractParameter(ContractParameterType.ByteArray, self.addr_to),
+            ContractParameter(ContractParameterType.ByteArray, self.addr_from),
+            ContractParameter(ContractParameterType.Integer, 1)
+        ])
+
+        for block_number in range(94000, 94010):
+            sc = NotifyEvent(SmartContractEvent.RUNTIME_NOTIFY, payload, contract_hash, block_number, self.event_tx, True, False)
+            ndb.on_smart_contract_event(sc)
+            ndb.on_persist_completed(None)
+        ndb.flush(5)
+
+        everything = [e.block_number for e in ndb.get_by_contract(contract_hash)]
+        self.assertEqual(sorted(everything), list(range(94000, 94010)))
+        self.assertEqual(ndb.get_count_by_contract(contract_hash), 10)
+
+        page, cursor = ndb.get_page_by_contract(contract_hash, offset=2, limit=3)
+        self.assertEqual([e.block_number for e in page], everything[2:5])
+
+        # the next page continues from the cursor
+        page, cursor = ndb.get_page_by_contract(contract_hash, limit=3, cursor=cursor)
+        self.assertEqual([e.block_number for e in page], everything[5:8])
+
+        page, cursor = ndb.get_page_by_contract(contract_hash, limit=3, cursor=cursor)
+        self.assertEqual([e.block_number for e in page], everything[8:])
+        self.assertIsNone(cursor)
+
+        with self.assertRaises(InvalidCursorError):
+            ndb.get_page_by_contract(contract_hash, cursor=b'\x55' * 24)
+
+        # counts of databases written by older versions are taken from the stored notifications
+        ndb._exact_counts = False
+        self.assertEqual(ndb.get_count_by_contract(contract_hash), 10)
+        self.assertEqual(ndb.get_count_by_addr(UInt160(data=self.addr_to)), len(ndb.get_by_addr(UInt160(data=self.addr_to))))
+        ndb._exact_counts = True
+
+    def test_tx_index_and_rebuild(self):
+        path = os.path.join(settings.DATA_DIR_PATH, f"fixtures/{str(uuid1())}")
+        ndb = NotificationDB(path)
+        try:
+            self.assertTrue(ndb.has_tx_index)
+
+            payload = ContractParameter(ContractParameterType.Array, [
+                ContractParameter(ContractParameterType.String, b'transfer'),
+                ContractParameter(ContractParameterType.ByteArray, self.addr_to),
+                ContractParameter(ContractParameterType.ByteArray, self.addr_from),
+                ContractParameter(ContractParameterType.Integer, 1)
+            ])
+            other_tx = UInt256(data=bytearray(b'\x01' * 32))
+
+            ndb.start()
+            for block_number, tx in [(95000, self.event_tx), (95000, other_tx), (95001, self.event_tx)]:
+                ndb.on_smart_contract_event(NotifyEvent(SmartContractEvent.RUNTIME_NOTIFY, payload, self.contract_hash, block_number, tx, True, False))
+            ndb.on_persist_completed(None)
+            ndb.stop_writer()
+
+            self.assertEqual([e.tx_hash for e in ndb.get_by_tx(other_tx)], [other_tx])
+            self.assertEqual(len(ndb.get_by_tx(self.event_tx)), 2)
+
+            # a database of an older version, without tx index and with a count that is off
+            ndb.db.delete(NotificationPrefix.PREFIX_VERSION)
+            for key in ndb.db.iterator(prefix=NotificationPrefix.PREFIX_TX, include_value=False):
+                ndb.db.delete(key)
+            ndb.db.put(NotificationPrefix.PREFIX_CONTRACT + bytes(self.contract_hash.Data) + NotificationPrefix.PREFIX_COUNT,
+                       (121).to_bytes(4, 'little'))
+            ndb.db.close()
+
+            ndb = NotificationDB(path)
+            self.assertFalse(ndb.has_tx_index)
+            self.assertEqual(ndb.get_by_tx(other_tx), [])
+            self.assertEqual(ndb.get_count_by_contract(self.contract_hash), 3)
+
+            self.assertEqual(ndb.rebuild_indexes(), 3)
+            self.assertTrue(ndb.has_tx_index)
+            self.assertEqual(len(ndb.get_by_tx(self.event_tx)), 2)
+            self.assertEqual(ndb.get_count_by_contract(self.contract_hash), 3)
+            self.assertEqual(len(ndb.get_by_contract(self.contract_hash)), 3)
+            self.assertEqual(ndb.get_count_by_addr(UInt160(data=self.addr_to)), 3)
+        finally:
+            ndb.db.close()
+            shutil.rmtree(path)
+
+    def test_unindexed_blocks_are_indexed_on_start(self):
+        path = os.path.join(settings.DATA_DIR_PATH, f"fixtures/{str(uuid1())}")
+        ndb = NotificationDB(path)
+        try:
+            payload = ContractParameter(ContractParameterType.Array, [
+                ContractParameter(ContractParameterType.String, b'transfer'),
+                ContractParameter(ContractParameterType.ByteArray, self.addr_to),
+                ContractParameter(ContractParameterType.ByteArray, self.addr_from),
+                ContractParameter(ContractParameterType.Integer, 1)
+            ])
+
+            ndb.start()
+            ndb.on_smart_contract_event(NotifyEvent(SmartContractEvent.RUNTIME_NOTIFY, payload, self.contract_hash, 96000, self.event_tx, True, False))
+            ndb.on_persist_completed(None)
+            self.assertTrue(ndb.flush(5))
+
+            # a failed batch changes neither the index nor the counts in memory
+            with patch.object(ndb, '_write_counts', side_effect=Exception('disk full')):
+                for block_number in [96001, 96002]:
+                    ndb.on_smart_contract_event(NotifyEvent(SmartContractEvent.RUNTIME_NOTIFY, payload, self.contract_hash, block_number, self.event_tx, True, False))
+                    ndb.on_persist_completed(None)
+                self.assertTrue(ndb.flush(5))
+            ndb.stop_writer()
+
+            self.assertEqual(len(ndb.get_by_block(96002)), 1)
+            self.assertEqual(ndb.get_count_by_contract(self.contract_hash), 1)
+            self.assertEqual(ndb._counts[NotificationPrefix.PREFIX_CONTRACT + bytes(self.contract_hash.Data)], 1)
+            self.assertEqual(ndb.get_index_status()['indexed_block'], 96000)
+            ndb.db.close()
+
+            # the stored events of blocks that were not indexed are indexed when the database is started again
+            ndb = NotificationDB(path)
+            self.assertEqual(ndb.get_index_status()['indexed_block'], 96000)
+            ndb.start()
+            ndb.stop_writer()
+
+            self.assertEqual([e.block_number for e in ndb.get_by_contract(self.contract_hash)], [96000, 96001, 96002])
+            self.assertEqual(ndb.get_count_by_contract(self.contract_hash), 3)
+            self.assertEqual(ndb.get_count_by_addr(UInt160(data=self.addr_to)), 3)
+            self.assertEqual(ndb.get_index_status()['indexed_block'], 96002)
+            self.assertEqual(list(ndb.db.iterator(prefix=NotificationPrefix.PREFIX_PENDING)), [])
+        finally:
+            ndb.db.close()
+            shutil.rmtree(path)
+
+    def test_spooled_events(self):
+        payload = ContractParameter(ContractParameterType.Array, [
+            ContractParameter(ContractParameterType.String, b'transfer'),
+            ContractParameter(ContractParameterType.ByteArray, self.addr_to),
+            ContractParameter(ContractParameterType.ByteArray, self.addr_from),
+            ContractParameter(ContractParameterType.Integer, 123000)
+        ])
+
+        ndb = NotificationDB.instance()
+        spool = BytesIO()
+        ndb.start(spool)
+
+        for block_number in [92000, 92001]:
+            sc = NotifyEvent(SmartContractEvent.RUNTIME_NOTIFY, payload, self.contract_hash, block_number, self.event_tx, True, False)
+            ndb.on_smart_contract_event(sc)
+            ndb.on_persist_completed(None)
+
+        # nothing is written until the spool is
+        self.assertEqual(len(ndb.get_by_block(92000)), 0)
+
+        spool.seek(0)
+        ndb.write_spooled(spool)
+
+        self.assertEqual(len(ndb.get_by_block(92000)), 1)
+        self.assertEqual(len(ndb.get_by_block(92001)), 1)
+        self.assertEqual(ndb.get_by_block(92001)[0].AddressTo, 'ALb8FEhEmtSqv97fuNVuoLmcmrSKckffRf')
@@ -51,6 +51,11 @@ class Coin(ModelBase):
     State = IntegerField()
     Address = ForeignKeyField(Address)
 
+    class Meta:
+        indexes = (
+            (('TxId', 'Index'), False),
+        )
+
 
 class Contract(ModelBase):
     Id = PrimaryKeyField()
@@ -37,8 +37,14 @@ class UserWallet(Wallet):
 
     _holds = None
 
+    # holds that are not complete by the reference of the coin they hold
+    _holds_by_reference = {}
+
     _db = None
 
+    # coins per bulk insert, SQLite allows 999 variables in a statement
+    INSERT_BATCH_SIZE = 100
+
     def __init__(self, path, passwordKey, create):
 
         super(UserWallet, self).__init__(path, passwordKey=passwordKey, create=create)
@@ -90,6 +96,7 @@ class UserWallet(Wallet):
         try:
             self._db.create_tables([Account, Address, Coin, Contract, Key, NEP5Token, VINHold,
                                     Transaction, TransactionInfo, NamedAddress], safe=True)
+            self.MigrateCoinIndex()
         except Exception as e:
             logger.error("Could not build database %s %s " % (e, self._path))
 
@@ -100,6 +107,18 @@ class UserWallet(Wallet):
             migrator.add_column('Address', 'IsWatchOnly', BooleanField(default=False)),
         )
 
+    def MigrateCoinIndex(self):
+        """
+        Add the index on Coin(TxId, Index) to wallets created before it was part of the model.
+        """
+        table = Coin._meta.db_table
+        columns = ('TxId', 'Index')
+        name = self._db.compiler().index_name(table, columns)
+
+        if name not in [index.name for index in self._db.get_indexes(table)]:
+            logger.debug("Adding index %s to wallet %s" % (name, self._path))
+            migrate(SqliteMigrator(self._db).add_index(table, columns, False))
+
     def DB(self):
         return self._db
 
@@ -110,10 +129,9 @@ class UserWallet(Wallet):
             logger.debug("wallet rebuild: deleting %s coins and %s transactions" %
                          (Coin.select().count(), Transaction.select().count()))
 
-            for c in Coin.select():
-                c.delete_instance()
-            for tx in Transaction.select():
-                tx.delete_instance()
+            with self._db.atomic():
+                Coin.delete().execute()
+                Transaction.delete().execute()
         except Exception as e:
             print("Could not rebuild %s " % e)
 
@@ -342,6 +360,7 @@ class UserWallet(Wallet):
 
     def LoadHolds(self):
         self._holds = VINHold.filter(IsComplete=False)
+        self._holds_by_reference = {hold.Reference: hold for hold in self._holds}
         return self._holds
 
     def LoadCompletedHolds(self):
@@ -365,80 +384,128 @@ class UserWallet(Wallet):
         k.save()
 
     def OnProcessNewBlock(self, block, added, changed, deleted):
-        for tx in block.FullTransactions:
-
-            if self.IsWalletTransaction(tx):
-                db_tx = None
-                try:
-                    db_tx = Transaction.get(Hash=tx.Hash.ToBytes())
-                except Exception as e:
-                    pass
-
-                ttype = tx.Type
-                if type(ttype) is bytes:
-                    ttype = int.from_bytes(tx.Type, 'little')
-
-                if not db_tx:
-                    db_tx = Transaction.create(
-                        Hash=tx.Hash.ToBytes(),
-                        TransactionType=ttype,
-                        RawData=tx.ToArray(),
-                        Height=block.Index,
-                        DateTime=block.Timestamp
-                    )
-                else:
-                    db_tx.Height = block.Index
-
-                db_tx.save()
+        # all changes of a block are written in one database transaction
+        with self._db.atomic():
+            self.SaveBlockTransactions(block)
+            self.OnCoinsChanged(added, changed, deleted)
 
-        self.OnCoinsChanged(added, changed, deleted)
+    def SaveBlockTransactions(self, block):
+        """
+        Save the transactions of a block that belong to the wallet, or update their height if they were saved before.
 
-    def OnSaveTransaction(self, tx, added, changed, deleted):
-        self.OnCoinsChanged(added, changed, deleted)
+        Args:
+            block (neo.Core.Block): the block.
+        """
+        txs = [tx for tx in block.FullTransactions if self.IsWalletTransaction(tx)]
+        if not txs:
+            return
 
-    def OnCoinsChanged(self, added, changed, deleted):
+        hashes = [tx.Hash.ToBytes() for tx in txs]
 
-        for coin in added:
-            addr_hash = bytes(coin.Output.ScriptHash.Data)
+        # hashes are read back as str, so both sides are compared as they are stored
+        existing = set(Transaction.Hash.db_value(db_tx.Hash) for db_tx in
+                       Transaction.select(Transaction.Hash).where(Transaction.Hash << hashes))
 
-            try:
-                address = Address.get(ScriptHash=addr_hash)
-
-                c = Coin(
-                    TxId=bytes(coin.Reference.PrevHash.Data),
-                    Index=coin.Reference.PrevIndex,
-                    AssetId=bytes(coin.Output.AssetId.Data),
-                    Value=coin.Output.Value.value,
-                    ScriptHash=bytes(coin.Output.ScriptHash.Data),
-                    State=coin.State,
-                    Address=address
-                )
-                c.save()
-            except Exception as e:
-                logger.error("[Path: %s ] Could not create coin: %s " % (self._path, e))
+        if existing:
+            Transaction.update(Height=block.Index).where(Transaction.Hash << list(existing)).execute()
 
-        for coin in changed:
-            for hold in self._holds:
-                if hold.Reference == coin.Reference and coin.State & CoinState.Spent > 0:
-                    hold.IsComplete = True
-                    hold.save()
-            try:
-                c = Coin.get(TxId=bytes(coin.Reference.PrevHash.Data), Index=coin.Reference.PrevIndex)
-                c.State = coin.State
-                c.save()
-            except Exception as e:
-                logger.error("[Path: %s ] could not change coin %s %s (coin to change not found)" % (self._path, coin, e))
+        rows = []
+        for tx, tx_hash in zip(txs, hashes):
+            if Transaction.Hash.db_value(tx_hash) in existing:
+                continue
 
-        for coin in deleted:
-            for hold in self._holds:
-                if hold.Reference == coin.Reference:
-                    hold.IsComplete = True
-                    hold.save()
-            try:
-                c = Coin.get(TxId=bytes(coin.Reference.PrevHash.Data), Index=coin.Reference.PrevIndex)
-                c.delete_instance()
-            except Exception as e:
-                logger.error("[Path: %s] could not delete coin %s %s " % (self._path, coin, e))
+            ttype = tx.Type
+            if type(ttype) is bytes:
+                ttype = int.from_bytes(tx.Type, 'little')
+
+            rows.append({
+                'Hash': tx_hash,
+                'TransactionType': ttype,
+                'RawData': tx.ToArray(),
+                'Height': block.Index,
+                'DateTime': block.Timestamp
+            })
+
+        for start in range(0, len(rows), self.INSERT_BATCH_SIZE):
+            Transaction.insert_many(rows[start:start + self.INSERT_BATCH_SIZE]).execute()
+
+    def OnSaveTransaction(self, tx, added, changed, deleted):
+        self.OnCoinsChanged(added, changed, deleted)
+
+    def OnCoinsChanged(self, added, changed, deleted):
+        with self._db.atomic():
+            if added:
+                self._InsertCoins(added)
+
+            for coin in changed:
+                if coin.State & CoinState.Spent > 0:
+                    self._CompleteHold(coin.Reference)
+            if changed:
+                self._UpdateCoins(changed)
+
+            for coin in deleted:
+                self._CompleteHold(coin.Reference)
+            if deleted:
+                self._DeleteCoins(deleted)
+
+    def _CompleteHold(self, reference):
+        hold = self._holds_by_reference.pop(reference, None)
+        if hold is not None:
+            hold.IsComplete = True
+            hold.save()
+
+    def _InsertCoins(self, coins):
+        script_hashes = list(set(bytes(coin.Output.ScriptHash.Data) for coin in coins))
+
+        # script hashes that decode as UTF-8 are read back as str, so both sides are compared as they are stored
+        address_ids = {Address.ScriptHash.db_value(address.ScriptHash): address.Id for address in
+                       Address.select(Address.Id, Address.ScriptHash).where(Address.ScriptHash << script_hashes)}
+
+        rows = []
+        for coin in coins:
+            script_hash = bytes(coin.Output.ScriptHash.Data)
+            address_id = address_ids.get(Address.ScriptHash.db_value(script_hash))
+            if address_id is None:
+                logger.error("[Path: %s ] Could not create coin: %s (address not found)" % (self._path, coin))
+                continue
+
+            rows.append({
+                'TxId': bytes(coin.Reference.PrevHash.Data),
+                'Index': coin.Reference.PrevIndex,
+                'AssetId': bytes(coin.Output.AssetId.Data),
+                'Value': coin.Output.Value.value,
+                'ScriptHash': script_hash,
+                'State': coin.State,
+                'Address': address_id
+            })
+
+        for start in range(0, len(rows), self.INSERT_BATCH_SIZE):
+            Coin.insert_many(rows[start:start + self.INSERT_BATCH_SIZE]).execute()
+
+    @staticmethod
+    def _CoinWhere(coin):
+        return (Coin.TxId == bytes(coin.Reference.PrevHash.Data)) & (Coin.Index == coin.Reference.PrevIndex)
+
+    def _UpdateCoins(self, coins):
+        # one statement per coin, found by the (TxId, Index) index, all in one transaction
+        changed = 0
+        with self._db.atomic():
+            for coin in coins:
+                changed += Coin.update(State=coin.State).where(self._CoinWhere(coin)).execute()
+
+        if changed < len(coins):
+            logger.error("[Path: %s ] could not change %s coins (coins to change not found)" %
+                         (self._path, len(coins) - changed))
+
+    def _DeleteCoins(self, coins):
+        deleted = 0
+        with self._db.atomic():
+            for coin in coins:
+                deleted += Coin.delete().where(self._CoinWhere(coin)).execute()
+
+        if deleted < len(coins):
+            logger.error("[Path: %s] could not delete %s coins (coins to delete not found)" %
+                         (self._path, len(coins) - deleted))
 
     @property
     def Addresses(self):
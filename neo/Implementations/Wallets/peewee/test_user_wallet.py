@@ -11,6 +11,12 @@ from neo.Wallets.NEP5Token import NEP5Token
 from neo.SmartContract.ContractParameterContext import ContractParametersContext
 from neo.Core.TX.Transaction import ContractTransaction, TransactionOutput
 from neo.Network.NodeLeader import NodeLeader
+from neo.Core.CoinReference import CoinReference
+from neo.Core.State.CoinState import CoinState
+from neo.Implementations.Wallets.peewee.Models import Coin, Transaction
+from neo.Wallets.Coin import Coin as WalletCoin
+from neocore.UInt256 import UInt256
+from mock import MagicMock
 import binascii
 
 
@@ -198,3 +204,55 @@ class UserWalletTestCase(WalletFixtureTestCase):
 
         result = NodeLeader.Instance().Relay(tx)
         self.assertEqual(result, True)
+
+    def test_10_coins_changed(self):
+
+        wallet = self.GetWallet1(recreate=True)
+
+        indexes = [index.name for index in wallet.DB().get_indexes('coin')]
+        self.assertIn('coin_TxId_Index', indexes)
+
+        count = Coin.select().count()
+
+        reference = CoinReference(prev_hash=UInt256(data=b'\x14' * 32), prev_index=3)
+        output = TransactionOutput(self.NEO, Fixed8.FromDecimal(5), self.wallet_1_script_hash)
+        coin = WalletCoin.CoinFromRef(reference, output, CoinState.Confirmed)
+
+        wallet.OnCoinsChanged({coin}, set(), set())
+        self.assertEqual(Coin.select().count(), count + 1)
+
+        coin.State |= CoinState.Spent
+        wallet.OnCoinsChanged(set(), {coin}, set())
+        db_coin = Coin.get(TxId=bytes(reference.PrevHash.Data), Index=3)
+        self.assertEqual(db_coin.State, CoinState.Confirmed | CoinState.Spent)
+
+        wallet.OnCoinsChanged(set(), set(), {coin})
+        self.assertEqual(Coin.select().count(), count)
+
+        # a script hash that decodes as UTF-8 is stored as text
+        watch = UInt160(data=b'a' * 20)
+        wallet.AddWatchOnly(watch)
+        reference = CoinReference(prev_hash=UInt256(data=b'\x15' * 32), prev_index=0)
+        coin = WalletCoin.CoinFromRef(reference, TransactionOutput(self.NEO, Fixed8.FromDecimal(5), watch), CoinState.Confirmed)
+
+        wallet.OnCoinsChanged({coin}, set(), set())
+        self.assertEqual(Coin.select().count(), count + 1)
+        wallet.OnCoinsChanged(set(), set(), {coin})
+        self.assertEqual(Coin.select().count(), count)
+
+    def test_11_save_block_transactions(self):
+
+        wallet = self.GetWallet1(recreate=True)
+
+        tx = ContractTransaction()
+        tx.outputs = [TransactionOutput(self.NEO, Fixed8.FromDecimal(1), self.wallet_1_script_hash)]
+        count = Transaction.select().count()
+
+        # the hex hash decodes as UTF-8, so it is read back as str
+        wallet.SaveBlockTransactions(MagicMock(FullTransactions=[tx], Index=10, Timestamp=1500000000))
+        self.assertEqual(Transaction.select().count(), count + 1)
+
+        # saving it again updates the height instead of inserting it twice
+        wallet.SaveBlockTransactions(MagicMock(FullTransactions=[tx], Index=11, Timestamp=1500000000))
+        self.assertEqual(Transaction.select().count(), count + 1)
+        self.assertEqual(Transaction.get(Hash=tx.Hash.ToBytes()).Height, 11)
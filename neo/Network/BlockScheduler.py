@@ -0,0 +1,386 @@
+import time
+from collections import deque
+from logzero import logger
+from neo.Core.Blockchain import Blockchain as BC
+
+
+class BlockRange:
+    """
+    Blocks requested from one peer in a single `getdata` message.
+    """
+
+    def __init__(self, peer, heights, hashes, requested):
+        """
+        Create an instance.
+
+        Args:
+            peer (neo.Network.NeoNode): the peer the blocks are requested from.
+            heights (list): heights of the blocks, or None for blocks announced by the peer.
+            hashes (list): hashes of the blocks.
+            requested (float): time of the request.
+        """
+        self.Peer = peer
+        self.Heights = heights
+        self.Size = len(hashes)
+        self.Requested = requested
+        self.FirstReceived = None
+
+        # hashes that did not arrive yet, with their height
+        self.Pending = dict(zip(hashes, heights if heights else [None] * len(hashes)))
+
+    @property
+    def Start(self):
+        return self.Heights[0] if self.Heights else None
+
+
+class PeerStats:
+    """
+    Measured download performance of a peer.
+    """
+
+    # weight of a new measurement in the moving averages
+    SMOOTHING = 0.3
+
+    def __init__(self):
+        self.Throughput = None  # blocks per second
+        self.Latency = None  # seconds until the first block of a range arrives
+        self.Ranges = []
+        self.Received = 0
+        self.Timeouts = 0
+
+        # timeouts since the last block received, such a peer only gets single blocks to probe it
+        self.Failures = 0
+
+    def AddThroughput(self, value):
+        self.Throughput = value if self.Throughput is None else self.Throughput + self.SMOOTHING * (value - self.Throughput)
+
+    def AddLatency(self, value):
+        self.Latency = value if self.Latency is None else self.Latency + self.SMOOTHING * (value - self.Latency)
+
+    @property
+    def InFlight(self):
+        return sum(len(r.Pending) for r in self.Ranges)
+
+    def ToJson(self):
+        return {
+            'throughput': self.Throughput,
+            'latency': self.Latency,
+            'ranges': len(self.Ranges),
+            'in_flight': self.InFlight,
+            'received': self.Received,
+            'timeouts': self.Timeouts,
+            'failures': self.Failures,
+        }
+
+
+class BlockScheduler:
+    """
+    Assigns the blocks missing between the current block height and the header height to the connected peers.
+
+    Ranges of consecutive heights are handed out to the peers, sized by the throughput measured for each peer.
+    Every peer has up to `RANGES_PER_PEER` ranges in flight so it keeps sending while the next request is on its way.
+    Ranges that do not arrive in time are assigned to another peer, and no block more than `Window` blocks above
+    the current height is requested, which bounds the block cache of the blockchain.
+    """
+
+    RANGES_PER_PEER = 2
+
+    # seconds of download a range should take, based on the measured throughput of the peer
+    RANGE_SECONDS = 2
+
+    # a range times out after this many times its expected duration, but never before MIN_TIMEOUT
+    TIMEOUT_FACTOR = 3
+    MIN_TIMEOUT = 5
+    MAX_TIMEOUT = 60
+
+    def __init__(self, range_size, window):
+        """
+        Create an instance.
+
+        Args:
+            range_size (int): maximum number of blocks requested in one message.
+            window (int): maximum distance above the current height of requested blocks.
+        """
+        self.RangeSize = range_size
+        self.Window = window
+
+        self._peers = {}
+
+        # ranges by hash of their pending blocks
+        self._requested = {}
+
+        # heights of timed out ranges to assign again, lowest first
+        self._retry = deque()
+
+        # next height that was never assigned
+        self._next_height = None
+
+    def AddPeer(self, peer):
+        """
+        Start downloading blocks from a peer.
+
+        Args:
+            peer (neo.Network.NeoNode): instance, must support `RequestBlocks(hashes)`.
+        """
+        if peer not in self._peers:
+            self._peers[peer] = PeerStats()
+
+    def RemovePeer(self, peer):
+        """
+        Stop downloading blocks from a peer and assign its ranges to the other peers.
+
+        Args:
+            peer (neo.Network.NeoNode): instance.
+        """
+        stats = self._peers.pop(peer, None)
+        if stats:
+            for block_range in stats.Ranges:
+                self._Release(block_range)
+
+    def GetPeerStats(self, peer):
+        """
+        Get the download statistics of a peer.
+
+        Args:
+            peer (neo.Network.NeoNode): instance.
+
+        Returns:
+            PeerStats: the statistics or None if the peer is unknown.
+        """
+        return self._peers.get(peer)
+
+    @property
+    def InFlight(self):
+        """
+        Number of requested blocks that did not arrive yet.
+
+        Returns:
+            int:
+        """
+        return len(self._requested)
+
+    def IsRequested(self, hash):
+        """
+        Check if a block is requested from a peer.
+
+        Args:
+            hash (bytes): hash of the block.
+
+        Returns:
+            bool:
+        """
+        return hash in self._requested
+
+    def Reset(self):
+        """
+        Forget all outstanding requests and measurements.
+        """
+        for stats in self._peers.values():
+            stats.Ranges = []
+        self._requested = {}
+        self._retry.clear()
+        self._next_height = None
+
+    def Schedule(self, now=None):
+        """
+        Expire the ranges that timed out and request more blocks from the peers that have room for them.
+
+        Args:
+            now (float): (Optional) current time, used by tests.
+
+        Returns:
+            int: number of requested blocks.
+        """
+        now = time.time() if now is None else now
+
+        chain = BC.Default()
+        if chain is None:
+            return 0
+
+        height = chain.Height
+        self._Expire(now, height)
+
+        if self._next_height is None or self._next_height <= height:
+            self._next_height = height + 1
+
+        self._RetryMissing(chain, height)
+
+        requested = 0
+        limit = min(chain.HeaderHeight, height + self.Window)
+
+        # the fastest peers get the lowest ranges, which the chain needs first
+        for peer in sorted(self._peers, key=self._Speed, reverse=True):
+            stats = self._peers[peer]
+
+            capacity = 1 if stats.Failures else self.RANGES_PER_PEER
+
+            while len(stats.Ranges) < capacity:
+                heights = self._NextHeights(peer, stats, height, limit)
+                if not heights:
+                    break
+
+                hashes = [chain.GetHeaderHash(h) for h in heights]
+                self._Request(peer, stats, BlockRange(peer, heights, hashes, now))
+                requested += len(hashes)
+
+        return requested
+
+    def RequestAnnounced(self, peer, hashes, now=None):
+        """
+        Request blocks a peer announced with an `inv` message, unless they are already requested.
+
+        Args:
+            peer (neo.Network.NeoNode): the peer that announced the blocks.
+            hashes (list): hashes of the blocks.
+            now (float): (Optional) current time, used by tests.
+
+        Returns:
+            list: the hashes that were requested.
+        """
+        stats = self._peers.get(peer)
+        hashes = [h for h in hashes if h not in self._requested]
+
+        if stats is None or not hashes:
+            return []
+
+        now = time.time() if now is None else now
+        self._Request(peer, stats, BlockRange(peer, None, hashes, now))
+        return hashes
+
+    def BlockReceived(self, peer, block, now=None):
+        """
+        Account for a block received from a peer.
+
+        Requests more blocks from the peer as soon as one of its ranges is complete.
+
+        Args:
+            peer (neo.Network.NeoNode): the peer that sent the block.
+            block (neo.Core.Block.Block): instance.
+            now (float): (Optional) current time, used by tests.
+
+        Returns:
+            bool: True if the block was requested. False otherwise.
+        """
+        hash = block.Hash.ToBytes()
+        block_range = self._requested.pop(hash, None)
+        if block_range is None:
+            return False
+
+        now = time.time() if now is None else now
+        del block_range.Pending[hash]
+
+        # blocks of a range that timed out can still arrive from its original peer
+        stats = self._peers.get(block_range.Peer)
+        if stats is None or block_range not in stats.Ranges:
+            return True
+
+        stats.Received += 1
+        stats.Failures = 0
+        if block_range.FirstReceived is None:
+            block_range.FirstReceived = now
+            stats.AddLatency(now - block_range.Requested)
+
+        if not block_range.Pending:
+            stats.Ranges.remove(block_range)
+            duration = max(now - block_range.Requested, 0.001)
+            stats.AddThroughput(block_range.Size / duration)
+
+            if block_range.Peer is peer:
+                self.Schedule(now)
+
+        return True
+
+    def _Speed(self, peer):
+        throughput = self._peers[peer].Throughput
+        return -1 if throughput is None else throughput
+
+    def _RangeSizeFor(self, stats):
+        if stats.Failures:
+            return 1
+        if stats.Throughput is None:
+            # start small until the peer has shown how fast it is
+            return max(1, self.RangeSize // 4)
+        return max(1, min(self.RangeSize, int(stats.Throughput * self.RANGE_SECONDS)))
+
+    def _Timeout(self, stats, block_range):
+        expected = block_range.Size / stats.Throughput if stats.Throughput else 0
+        if stats.Latency is not None:
+            expected += stats.Latency
+        return min(self.MAX_TIMEOUT, max(self.MIN_TIMEOUT, self.TIMEOUT_FACTOR * expected))
+
+    def _NextHeights(self, peer, stats, height, limit):
+        size = self._RangeSizeFor(stats)
+        heights = []
+
+        # ranges that timed out come first, preferably from a different peer
+        for retry in list(self._retry):
+            if stats.Failures or (retry[0] is peer and len(self._peers) > 1):
+                continue
+            self._retry.remove(retry)
+            heights = [h for h in retry[1] if h > height]
+            if heights:
+                return heights
+
+        while self._next_height <= limit and len(heights) < size:
+            heights.append(self._next_height)
+            self._next_height += 1
+
+        return heights
+
+    def _RetryMissing(self, chain, height):
+        # a block that arrived but was never persisted, because it was dropped from the block cache,
+        # is neither requested nor cached anymore, and the chain can not move on without it
+        missing = height + 1
+        if missing >= self._next_height or missing > chain.HeaderHeight:
+            return
+
+        hash = chain.GetHeaderHash(missing)
+        if hash is None or hash in self._requested or chain.IsBlockCached(hash):
+            return
+
+        if any(retry[1][0] == missing for retry in self._retry):
+            return
+
+        logger.debug("Block %s is missing, requesting it again" % missing)
+        self._retry.appendleft((None, [missing]))
+
+    def _Request(self, peer, stats, block_range):
+        stats.Ranges.append(block_range)
+        for hash in block_range.Pending:
+            self._requested[hash] = block_range
+
+        peer.RequestBlocks(list(block_range.Pending))
+
+    def _Release(self, block_range):
+        for hash in block_range.Pending:
+            if self._requested.get(hash) is block_range:
+                del self._requested[hash]
+
+        # announced blocks are requested again when they are announced again or reached by the headers
+        if block_range.Heights:
+            heights = sorted(block_range.Pending.values())
+            if heights:
+                self._retry.append((block_range.Peer, heights))
+                self._retry = deque(sorted(self._retry, key=lambda retry: retry[1][0]))
+
+    def _Expire(self, now, height):
+        for peer, stats in self._peers.items():
+            for block_range in list(stats.Ranges):
+
+                # drop blocks the chain already has
+                for hash, block_height in list(block_range.Pending.items()):
+                    if block_height is not None and block_height <= height:
+                        del block_range.Pending[hash]
+                        self._requested.pop(hash, None)
+
+                if not block_range.Pending:
+                    stats.Ranges.remove(block_range)
+
+                elif now - block_range.Requested > self._Timeout(stats, block_range):
+                    logger.debug("Block range %s (%s blocks) from %s timed out" % (block_range.Start, len(block_range.Pending), peer))
+                    stats.Ranges.remove(block_range)
+                    stats.Timeouts += 1
+                    stats.Failures += 1
+                    if stats.Throughput:
+                        stats.Throughput /= 2
+                    self._Release(block_range)
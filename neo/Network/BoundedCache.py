@@ -0,0 +1,150 @@
+import time
+from collections import OrderedDict
+
+
+class BoundedCache:
+    """
+    LRU mapping bounded by a maximum number of items and, optionally, a maximum age.
+
+    Items are kept in the order they were last stored or read, and reading an item renews its age,
+    so the oldest items are always at the front and expiring them is amortized O(1).
+    """
+
+    def __init__(self, max_items, max_age=None, clock=time.monotonic):
+        """
+        Create an instance.
+
+        Args:
+            max_items (int): maximum number of items.
+            max_age (float): (Optional) seconds after which an item that was not used expires.
+            clock (function): (Optional) returns the current time in seconds, used by tests.
+        """
+        self.MaxItems = max_items
+        self.MaxAge = max_age
+        self._clock = clock
+
+        # values by key, with the time they were last used
+        self._items = OrderedDict()
+
+        self.Evictions = 0
+        self.Expirations = 0
+
+    def __len__(self):
+        self.Expire()
+        return len(self._items)
+
+    def __contains__(self, key):
+        self.Expire()
+        return key in self._items
+
+    def __getitem__(self, key):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._items[key] = (self._clock(), value)
+        self._items.move_to_end(key)
+
+        if len(self._items) > self.MaxItems:
+            self._items.popitem(last=False)
+            self.Evictions += 1
+
+        self.Expire()
+
+    def __delitem__(self, key):
+        del self._items[key]
+
+    def get(self, key, default=None):
+        self.Expire()
+
+        item = self._items.get(key)
+        if item is None:
+            return default
+
+        self._items[key] = (self._clock(), item[1])
+        self._items.move_to_end(key)
+        return item[1]
+
+    def pop(self, key, default=None):
+        item = self._items.pop(key, None)
+        return default if item is None else item[1]
+
+    def keys(self):
+        self.Expire()
+        return self._items.keys()
+
+    def values(self):
+        self.Expire()
+        return [item[1] for item in self._items.values()]
+
+    def clear(self):
+        self._items.clear()
+
+    def Expire(self):
+        """
+        Remove the items that were not used for `MaxAge` seconds.
+        """
+        if self.MaxAge is None:
+            return
+
+        oldest = self._clock() - self.MaxAge
+        while self._items:
+            key, item = next(iter(self._items.items()))
+            if item[0] > oldest:
+                break
+            del self._items[key]
+            self.Expirations += 1
+
+    def ToJson(self):
+        """
+        Convert object members to a dictionary that can be parsed as JSON.
+
+        Returns:
+             dict:
+        """
+        return {
+            'size': len(self),
+            'max_size': self.MaxItems,
+            'max_age': self.MaxAge,
+            'evictions': self.Evictions,
+            'expirations': self.Expirations,
+        }
+
+
+class ExpiringHashSet(BoundedCache):
+    """
+    Set of hashes bounded by a maximum number of hashes and a maximum age.
+
+    Unlike cache reads, checking a hash does not renew it, so a hash expires `MaxAge` seconds after it was added.
+    """
+
+    def __init__(self, max_items, max_age, clock=time.monotonic):
+        """
+        Create an instance.
+
+        Args:
+            max_items (int): maximum number of hashes.
+            max_age (float): seconds after which a hash expires.
+            clock (function): (Optional) returns the current time in seconds, used by tests.
+        """
+        super(ExpiringHashSet, self).__init__(max_items, max_age, clock)
+
+    def add(self, hash):
+        """
+        Add a hash, renewing it if it is in the set already.
+
+        Args:
+            hash (bytes): the hash.
+        """
+        self[hash] = None
+
+    def discard(self, hash):
+        """
+        Remove a hash if it is in the set.
+
+        Args:
+            hash (bytes): the hash.
+        """
+        self._items.pop(hash, None)
@@ -0,0 +1,292 @@
+import heapq
+import itertools
+from collections import deque
+
+
+class MemPool:
+    """
+    Pool of verified transactions that are not in a block yet.
+
+    Transactions are indexed by hash and by the coins they spend, so duplicates and double spends within the pool
+    are found without scanning it. They are ordered by network fee per byte, and when the pool is full the
+    transactions with the lowest fee are evicted first.
+    """
+
+    def __init__(self, max_size):
+        """
+        Create an instance.
+
+        Args:
+            max_size (int): maximum number of transactions.
+        """
+        self.MaxSize = max_size
+
+        # transactions and their heap entries by hash
+        self._transactions = {}
+        self._entries = {}
+
+        # hash of the pool transaction spending a coin, by (previous hash, previous index)
+        self._spent = {}
+
+        # (fee per byte, -sequence number, hash) of all transactions, entries of removed ones are skipped when popped
+        self._heap = []
+        self._sequence = itertools.count()
+
+        # hashes of transactions to verify again after a block was persisted, and of the ones verified since,
+        # every transaction of the pool is in one of them
+        self._unverified = deque()
+        self._verified = {}
+
+        self.Evictions = 0
+
+    def __len__(self):
+        return len(self._transactions)
+
+    def __contains__(self, hash):
+        return hash in self._transactions
+
+    def __getitem__(self, hash):
+        return self._transactions[hash]
+
+    def get(self, hash, default=None):
+        return self._transactions.get(hash, default)
+
+    def keys(self):
+        return self._transactions.keys()
+
+    def values(self):
+        return self._transactions.values()
+
+    @staticmethod
+    def FeePerByte(tx):
+        """
+        Get the network fee of a transaction per byte of its size.
+
+        Args:
+            tx (neo.Core.TX.Transaction): instance.
+
+        Returns:
+            float: fee in the smallest unit of GAS per byte.
+        """
+        return tx.NetworkFee().value / tx.Size()
+
+    @staticmethod
+    def _CoinKeys(tx):
+        return [(coin.PrevHash.ToBytes(), coin.PrevIndex) for coin in tx.inputs]
+
+    def GetConflicts(self, tx):
+        """
+        Find the pool transactions spending the same coins as a transaction.
+
+        Args:
+            tx (neo.Core.TX.Transaction): instance.
+
+        Returns:
+            set: hashes of the conflicting transactions.
+        """
+        conflicts = set()
+        for key in self._CoinKeys(tx):
+            hash = self._spent.get(key)
+            if hash is not None:
+                conflicts.add(hash)
+        return conflicts
+
+    def HasConflicts(self, tx):
+        """
+        Check if a transaction spends a coin twice or a coin spent by a pool transaction.
+
+        Args:
+            tx (neo.Core.TX.Transaction): instance.
+
+        Returns:
+            bool:
+        """
+        keys = self._CoinKeys(tx)
+        if len(set(keys)) != len(keys):
+            return True
+        return any(key in self._spent for key in keys)
+
+    @property
+    def MinFeePerByte(self):
+        """
+        Get the lowest fee per byte in the pool.
+
+        Returns:
+            float: the fee or None if the pool is empty.
+        """
+        self._DropStale()
+        return self._heap[0][0] if self._heap else None
+
+    def IsFull(self):
+        return len(self._transactions) >= self.MaxSize
+
+    def CanAdmit(self, fee_per_byte):
+        """
+        Check if a transaction with the given fee would fit in the pool, possibly by evicting another one.
+
+        Args:
+            fee_per_byte (float): network fee per byte of the transaction.
+
+        Returns:
+            bool:
+        """
+        return not self.IsFull() or fee_per_byte > self.MinFeePerByte
+
+    def Add(self, tx, fee_per_byte=None):
+        """
+        Add a transaction, evicting the ones with the lowest fee if the pool is full.
+
+        The caller checks for duplicates, conflicts and the validity of the transaction.
+
+        Args:
+            tx (neo.Core.TX.Transaction): instance.
+            fee_per_byte (float): (Optional) network fee per byte of the transaction, calculated if not given.
+
+        Returns:
+            list: the evicted transactions, which can include `tx` itself if its fee is too low.
+        """
+        if fee_per_byte is None:
+            fee_per_byte = self.FeePerByte(tx)
+
+        hash = tx.Hash.ToBytes()
+        entry = (fee_per_byte, -next(self._sequence), hash)
+
+        self._transactions[hash] = tx
+        self._entries[hash] = entry
+        self._verified[hash] = None
+        for key in self._CoinKeys(tx):
+            self._spent[key] = hash
+
+        heapq.heappush(self._heap, entry)
+
+        evicted = []
+        while len(self._transactions) > self.MaxSize:
+            self._DropStale()
+            evicted.append(self.Remove(heapq.heappop(self._heap)[2]))
+            self.Evictions += 1
+
+        return evicted
+
+    def Remove(self, hash):
+        """
+        Remove a transaction.
+
+        Args:
+            hash (bytes): hash of the transaction.
+
+        Returns:
+            neo.Core.TX.Transaction: the removed transaction or None if it is not in the pool.
+        """
+        tx = self._transactions.pop(hash, None)
+        if tx is None:
+            return None
+
+        del self._entries[hash]
+        self._verified.pop(hash, None)
+        for key in self._CoinKeys(tx):
+            if self._spent.get(key) == hash:
+                del self._spent[key]
+
+        # the heap entry is dropped lazily, unless the heap gets much larger than the pool
+        if len(self._heap) > 2 * len(self._transactions) + 64:
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+
+        return tx
+
+    def RemoveBlock(self, block):
+        """
+        Remove the transactions of a persisted block and the pool transactions spending the same coins,
+        and queue the remaining ones to be verified again.
+
+        Args:
+            block (neo.Core.Block.Block): instance.
+
+        Returns:
+            list: the removed transactions.
+        """
+        removed = []
+        for tx in block.Transactions:
+            hash = tx.Hash.ToBytes()
+            conflicts = self.GetConflicts(tx)
+            conflicts.discard(hash)
+
+            for item in [hash] + list(conflicts):
+                item = self.Remove(item)
+                if item is not None:
+                    removed.append(item)
+
+        # transactions still queued from an earlier block are verified against this one when their turn comes
+        self._unverified.extend(self._verified)
+        self._verified.clear()
+        return removed
+
+    @property
+    def UnverifiedCount(self):
+        return len(self._unverified)
+
+    def Reverify(self, verify, count):
+        """
+        Verify the next transactions queued by `RemoveBlock` again and remove the ones that are no longer valid.
+
+        Args:
+            verify (function): takes a transaction and returns True if it is still valid.
+            count (int): maximum number of transactions to verify.
+
+        Returns:
+            list: the removed transactions.
+        """
+        removed = []
+        while self._unverified and count > 0:
+            hash = self._unverified.popleft()
+            tx = self._transactions.get(hash)
+            if tx is None:
+                continue
+
+            count -= 1
+            if verify(tx):
+                self._verified[hash] = None
+            else:
+                removed.append(self.Remove(hash))
+
+        return removed
+
+    def GetTransactions(self):
+        """
+        Get all transactions, highest fee per byte first.
+
+        Returns:
+            list: the transactions.
+        """
+        entries = sorted(self._entries.values(), reverse=True)
+        return [self._transactions[entry[2]] for entry in entries]
+
+    def Clear(self):
+        """
+        Remove all transactions.
+        """
+        self._transactions.clear()
+        self._entries.clear()
+        self._spent.clear()
+        self._heap = []
+        self._unverified.clear()
+        self._verified.clear()
+
+    def ToJson(self):
+        """
+        Convert object members to a dictionary that can be parsed as JSON.
+
+        Returns:
+             dict:
+        """
+        return {
+            'size': len(self._transactions),
+            'max_size': self.MaxSize,
+            'min_fee_per_byte': self.MinFeePerByte,
+            'unverified': len(self._unverified),
+            'evictions': self.Evictions,
+        }
+
+    def _DropStale(self):
+        while self._heap and self._entries.get(self._heap[0][2]) is not self._heap[0]:
+            heapq.heappop(self._heap)
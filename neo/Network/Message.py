@@ -1,5 +1,5 @@
 import ctypes
-import binascii
+import struct
 from logzero import logger
 from neocore.IO.Mixins import SerializableMixin
 from neo.Settings import settings
@@ -26,6 +26,11 @@ class Message(SerializableMixin):
 
     Length = 0
 
+    # size of the magic, command, length and checksum fields
+    HeaderSize = 24
+
+    _HeaderStruct = struct.Struct('<I12sII')
+
     def __init__(self, command=None, payload=None, print_payload=False):
         """
         Create an instance.
@@ -41,7 +46,7 @@ class Message(SerializableMixin):
         if payload is None:
             payload = bytearray()
         else:
-            payload = binascii.unhexlify(Helper.ToArray(payload))
+            payload = Helper.ToArray(payload, raw=True)
 
         self.Checksum = Message.GetChecksum(payload)
         self.Payload = payload
@@ -65,21 +70,35 @@ class Message(SerializableMixin):
         Args:
             reader (neo.IO.BinaryReader):
         """
-        self.Magic = reader.ReadUInt32()
-        self.Command = reader.ReadFixedString(12).decode('utf-8')
-        self.Length = reader.ReadUInt32()
+        self.DeserializeHeader(reader.ReadBytes(self.HeaderSize))
+        self.DeserializePayload(reader.ReadBytes(self.Length))
+
+    def DeserializeHeader(self, buffer, offset=0):
+        """
+        Deserialize the header fields in place, without copying them out of `buffer`.
+
+        Args:
+            buffer (bytes, bytearray or memoryview): buffer holding at least `HeaderSize` bytes at `offset`.
+            offset (int): position of the header in the buffer.
+        """
+        self.Magic, command, self.Length, self.Checksum = self._HeaderStruct.unpack_from(buffer, offset)
+        self.Command = command.rstrip(b'\x00').decode('utf-8')
 
         if self.Length > self.PayloadMaxSizeInt:
             raise Exception("invalid format- payload too large")
 
-        self.Checksum = reader.ReadUInt32()
-        self.Payload = reader.ReadBytes(self.Length)
-
-        checksum = Message.GetChecksum(self.Payload)
+    def DeserializePayload(self, payload):
+        """
+        Set the payload after `DeserializeHeader` and verify it against the header checksum.
 
-        if checksum != self.Checksum:
+        Args:
+            payload (bytes): the `Length` bytes following the header.
+        """
+        if Message.GetChecksum(payload) != self.Checksum:
             raise ChecksumException("checksum mismatch")
 
+        self.Payload = payload
+
     @staticmethod
     def GetChecksum(value):
         """
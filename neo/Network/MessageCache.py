@@ -0,0 +1,66 @@
+from neo.Network.BoundedCache import BoundedCache
+
+
+class MessageCache(BoundedCache):
+    """
+    Bounded LRU cache of serialized messages, keyed by command and inventory hash.
+
+    Blocks and transactions requested by many peers, and the inventory messages relayed to all of them,
+    are serialized once and sent from the cache afterwards.
+    """
+
+    def __init__(self, max_items):
+        """
+        Create an instance.
+
+        Args:
+            max_items (int): maximum number of cached messages.
+        """
+        super(MessageCache, self).__init__(max_items)
+
+        self.Hits = 0
+        self.Misses = 0
+
+    def Get(self, command, hash):
+        """
+        Get a serialized message.
+
+        Args:
+            command (str): message command, e.g. "block".
+            hash (bytes): hash of the inventory the message is about.
+
+        Returns:
+            bytes: the serialized message or None if it is not cached.
+        """
+        data = self.get((command, hash))
+
+        if data is None:
+            self.Misses += 1
+            return None
+
+        self.Hits += 1
+        return data
+
+    def Add(self, command, hash, data):
+        """
+        Add a serialized message.
+
+        Args:
+            command (str): message command, e.g. "block".
+            hash (bytes): hash of the inventory the message is about.
+            data (bytes): the serialized message.
+        """
+        if self.MaxItems > 0:
+            self[(command, hash)] = data
+
+    def Clear(self):
+        """
+        Remove all cached messages.
+        """
+        self.clear()
+
+    def ToJson(self):
+        json = super(MessageCache, self).ToJson()
+        json['hits'] = self.Hits
+        json['misses'] = self.Misses
+        return json
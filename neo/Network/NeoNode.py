@@ -1,12 +1,9 @@
-import binascii
 import random
 from logzero import logger
 from twisted.internet.protocol import Protocol
 from twisted.internet import reactor, task
 from neo.Core.Blockchain import Blockchain as BC
-from neocore.IO.BinaryReader import BinaryReader
 from neo.Network.Message import Message
-from neo.IO.MemoryStream import StreamManager
 from neo.IO.Helper import Helper as IOHelper
 from neo.Core.Helper import Helper
 from .Payloads.GetBlocksPayload import GetBlocksPayload
@@ -17,8 +14,8 @@ from .InventoryType import InventoryType
 from neo.Settings import settings
 
 
-MODE_MAINTAIN = 7
-MODE_CATCHUP = 2
+# blocks announced by peers are only requested this close to the header height
+MAINTAIN_DISTANCE = 2000
 
 
 class NeoNode(Protocol):
@@ -26,12 +23,8 @@ class NeoNode(Protocol):
 
     leader = None
 
-    block_loop = None
-
     peer_loop = None
 
-    sync_mode = MODE_CATCHUP
-
     identifier = None
 
     def __init__(self):
@@ -46,7 +39,6 @@ class NeoNode(Protocol):
         self.remote_nodeid = random.randint(1294967200, 4294967200)
         self.endpoint = ''
         self.buffer_in = bytearray()
-        self.myblockrequests = set()
         self.bytes_in = 0
         self.bytes_out = 0
 
@@ -110,97 +102,62 @@ class NeoNode(Protocol):
 
     def connectionLost(self, reason=None):
         """Callback handler from twisted when a connection was lost."""
-        if self.block_loop:
-            self.block_loop.stop()
-            self.block_loop = None
         if self.peer_loop:
             self.peer_loop.stop()
             self.peer_loop = None
 
-        self.ReleaseBlockRequests()
+        self.leader.BlockScheduler.RemovePeer(self)
         self.leader.RemoveConnectedPeer(self)
         self.Log("%s disconnected %s" % (self.remote_nodeid, reason))
 
-    def ReleaseBlockRequests(self):
-        bcr = BC.Default().BlockRequests
-        requests = self.myblockrequests
-
-        for req in requests:
-            try:
-                if req in bcr:
-                    bcr.remove(req)
-            except Exception as e:
-                self.Log("Could not remove request %s " % e)
-
-        self.myblockrequests = set()
-
     def dataReceived(self, data):
         """ Called from Twisted whenever data is received. """
         self.bytes_in += (len(data))
-        self.buffer_in = self.buffer_in + data
+        self.buffer_in += data
         self.CheckDataReceived()
 
     def CheckDataReceived(self):
-        """Tries to extract a Message from the data buffer and process it."""
-        currentLength = len(self.buffer_in)
-        if currentLength < 24:
-            return
-
-        # Extract the message header from the buffer, and return if not enough
-        # buffer to fully deserialize the message object.
-        try:
-            # Construct message
-            mstart = self.buffer_in[:24]
-            ms = StreamManager.GetStream(mstart)
-            reader = BinaryReader(ms)
-            m = Message()
-
-            # Extract message metadata
-            m.Magic = reader.ReadUInt32()
-            m.Command = reader.ReadFixedString(12).decode('utf-8')
-            m.Length = reader.ReadUInt32()
-            m.Checksum = reader.ReadUInt32()
+        """
+        Extract all complete messages from the data buffer and process them.
 
-            # Return if not enough buffer to fully deserialize object.
-            messageExpectedLength = 24 + m.Length
-            if currentLength < messageExpectedLength:
-                return
+        Headers are parsed in place, every payload is copied out of the buffer once and the consumed
+        bytes are removed from the buffer in one go after the loop.
+        """
+        buffer = self.buffer_in
+        currentLength = len(buffer)
+        offset = 0
 
-        except Exception as e:
-            self.Log('Error: Could not read initial bytes %s ' % e)
-            return
+        while currentLength - offset >= Message.HeaderSize:
+            m = Message()
 
-        finally:
-            StreamManager.ReleaseStream(ms)
-            del reader
+            try:
+                # Extract message metadata
+                m.DeserializeHeader(buffer, offset)
+            except Exception as e:
+                self.Log('Error: Could not read initial bytes %s ' % e)
+                break
 
-        # The message header was successfully extracted, and we have enough enough buffer
-        # to extract the full payload
-        try:
-            # Extract message bytes from buffer and truncate buffer
-            mdata = self.buffer_in[:messageExpectedLength]
-            self.buffer_in = self.buffer_in[messageExpectedLength:]
+            # Stop if not enough buffer to fully deserialize the message.
+            start = offset + Message.HeaderSize
+            end = start + m.Length
+            if currentLength < end:
+                break
 
-            # Deserialize message with payload
-            stream = StreamManager.GetStream(mdata)
-            reader = BinaryReader(stream)
-            message = Message()
-            message.Deserialize(reader)
+            offset = end
 
-            # Propagate new message
-            self.MessageReceived(message)
+            try:
+                with memoryview(buffer) as view:
+                    payload = bytes(view[start:end])
+                m.DeserializePayload(payload)
 
-        except Exception as e:
-            self.Log('Error: Could not extract message: %s ' % e)
-            return
+                # Propagate new message
+                self.MessageReceived(m)
 
-        finally:
-            StreamManager.ReleaseStream(stream)
+            except Exception as e:
+                self.Log('Error: Could not extract message: %s ' % e)
 
-        # Finally, after a message has been fully deserialized and propagated,
-        # check if another message can be extracted with the current buffer:
-        if len(self.buffer_in) >= 24:
-            self.CheckDataReceived()
+        if offset:
+            del buffer[:offset]
 
     def MessageReceived(self, m):
         """
@@ -235,8 +192,8 @@ class NeoNode(Protocol):
     def ProtocolReady(self):
         self.AskForMoreHeaders()
 
-        self.block_loop = task.LoopingCall(self.AskForMoreBlocks)
-        self.block_loop.start(self.sync_mode)
+        self.leader.BlockScheduler.AddPeer(self)
+        self.leader.BlockScheduler.Schedule()
 
         # ask every 3 minutes for new peers
         self.peer_loop = task.LoopingCall(self.RequestPeerInfo)
@@ -247,62 +204,15 @@ class NeoNode(Protocol):
         get_headers_message = Message("getheaders", GetBlocksPayload(hash_start=[BC.Default().CurrentHeaderHash]))
         self.SendSerializedMessage(get_headers_message)
 
-    def AskForMoreBlocks(self):
-
-        distance = BC.Default().HeaderHeight - BC.Default().Height
-
-        current_mode = self.sync_mode
-
-        if distance > 2000:
-            self.sync_mode = MODE_CATCHUP
-        else:
-            self.sync_mode = MODE_MAINTAIN
-
-        if self.sync_mode != current_mode:
-            self.block_loop.stop()
-            # self.Log("Changing sync mode from %s to %s" % (current_mode, self.sync_mode))
-            self.block_loop.start(self.sync_mode)
-        else:
-            if len(BC.Default().BlockRequests) > self.leader.BREQMAX:
-                self.leader.ResetBlockRequestsAndCache()
-
-            self.DoAskForMoreBlocks()
-
-    def DoAskForMoreBlocks(self):
-        hashes = []
-        hashstart = BC.Default().Height + 1
-        current_header_height = BC.Default().HeaderHeight + 1
-
-        do_go_ahead = False
-        if BC.Default().BlockSearchTries > 100 and len(BC.Default().BlockRequests) > 0:
-            do_go_ahead = True
-
-        first = None
-        while hashstart < current_header_height and len(hashes) < self.leader.BREQPART:
-            hash = BC.Default().GetHeaderHash(hashstart)
-            if not do_go_ahead:
-                if hash is not None and hash not in BC.Default().BlockRequests \
-                        and hash not in self.myblockrequests:
-
-                    if not first:
-                        first = hashstart
-                    BC.Default().BlockRequests.add(hash)
-                    self.myblockrequests.add(hash)
-                    hashes.append(hash)
-            else:
-                if not first:
-                    first = hashstart
-                BC.Default().BlockRequests.add(hash)
-                self.myblockrequests.add(hash)
-                hashes.append(hash)
-
-            hashstart += 1
-
-        self.Log("asked for more blocks ... %s thru %s (%s blocks) stale count %s BCRLen: %s " % (first, hashstart, len(hashes), BC.Default().BlockSearchTries, len(BC.Default().BlockRequests)))
+    def RequestBlocks(self, hashes):
+        """
+        Request blocks from the remote client.
 
-        if len(hashes) > 0:
-            message = Message("getdata", InvPayload(InventoryType.Block, hashes))
-            reactor.callInThread(self.SendSerializedMessage, message)
+        Args:
+            hashes (list): hashes of the blocks.
+        """
+        self.Log("asked for %s blocks" % len(hashes))
+        self.SendSerializedMessage(Message("getdata", InvPayload(InventoryType.Block, hashes)))
 
     def RequestPeerInfo(self):
         """Request the peer address information from the remote client."""
@@ -362,24 +272,14 @@ class NeoNode(Protocol):
             inventory (neo.Network.Payloads.InvPayload):
         """
 
-        if self.sync_mode != MODE_MAINTAIN:
+        if BC.Default().HeaderHeight - BC.Default().Height > MAINTAIN_DISTANCE:
             return
 
         inventory = IOHelper.AsSerializableWithType(payload, 'neo.Network.Payloads.InvPayload.InvPayload')
 
         if inventory.Type == InventoryType.BlockInt:
-
-            ok_hashes = []
-            for hash in inventory.Hashes:
-                hash = hash.encode('utf-8')
-                if hash not in self.myblockrequests and hash not in BC.Default().BlockRequests:
-                    ok_hashes.append(hash)
-                    BC.Default().BlockRequests.add(hash)
-                    self.myblockrequests.add(hash)
-            if len(ok_hashes):
-                #                logger.info("OK HASHES, get data %s " % ok_hashes)
-                message = Message("getdata", InvPayload(InventoryType.Block, ok_hashes))
-                self.SendSerializedMessage(message)
+            hashes = [hash.encode('utf-8') for hash in inventory.Hashes]
+            self.leader.BlockScheduler.RequestAnnounced(self, hashes)
 
         elif inventory.Type == InventoryType.TXInt:
             pass
@@ -398,10 +298,43 @@ class NeoNode(Protocol):
         Args:
             message (neo.Network.Message):
         """
-        ba = Helper.ToArray(message)
-        ba2 = binascii.unhexlify(ba)
-        self.bytes_out += len(ba2)
-        self.transport.write(ba2)
+        self.SendRawMessage(Helper.ToArray(message, raw=True))
+
+    def SendRawMessage(self, data):
+        """
+        Send an already serialized message to the remote client.
+
+        Args:
+            data (bytes): the serialized message.
+        """
+        self.bytes_out += len(data)
+        self.transport.write(data)
+
+    def GetSerializedMessage(self, command, hash, get_payload):
+        """
+        Get a serialized message about an inventory item from the message cache of the leader,
+        serializing and caching it if it is not there yet.
+
+        Args:
+            command (str): message command, e.g. "block".
+            hash (bytes): hash of the inventory item.
+            get_payload (function): returns the inventory item, or None if it is unknown. Only called on a cache miss.
+
+        Returns:
+            bytes: the serialized message or None if the inventory item is unknown.
+        """
+        cache = self.leader.MessageCache
+        data = cache.Get(command, hash)
+
+        if data is None:
+            payload = get_payload()
+            if not payload:
+                return None
+
+            data = Helper.ToArray(Message(command, payload), raw=True)
+            cache.Add(command, hash, data)
+
+        return data
 
     def HandleBlockHeadersReceived(self, inventory):
         """
@@ -414,6 +347,7 @@ class NeoNode(Protocol):
 #        self.Log("Received headers %s " % ([h.Hash.ToBytes() for h in inventory.Headers]))
         if inventory is not None:
             BC.Default().AddHeaders(inventory.Headers)
+            self.leader.BlockScheduler.Schedule()
 
         if BC.Default().HeaderHeight < self.Version.StartHeight:
             self.AskForMoreHeaders()
@@ -429,17 +363,8 @@ class NeoNode(Protocol):
         """
         block = IOHelper.AsSerializableWithType(inventory, 'neo.Core.Block.Block')
 
-        blockhash = block.Hash.ToBytes()
-        if blockhash in BC.Default().BlockRequests:
-            BC.Default().BlockRequests.remove(blockhash)
-        if blockhash in self.myblockrequests:
-            self.myblockrequests.remove(blockhash)
-
         self.leader.InventoryReceived(block)
-
-    def HandleBlockReset(self, hash):
-        """Process block reset request."""
-        self.myblockrequests = []
+        self.leader.BlockScheduler.BlockReceived(self, block)
 
     def HandleGetDataMessageReceived(self, payload):
         """
@@ -453,31 +378,38 @@ class NeoNode(Protocol):
         for hash in inventory.Hashes:
             hash = hash.encode('utf-8')
 
-            item = None
-            # try to get the inventory to send from relay cache
-
-            if hash in self.leader.RelayCache.keys():
-                item = self.leader.RelayCache[hash]
+            data = None
 
             if inventory.Type == InventoryType.TXInt:
-                if not item:
-                    item, index = BC.Default().GetTransaction(hash)
-                if not item:
-                    item = self.leader.GetTransaction(hash)
-                if item:
-                    message = Message(command='tx', payload=item, print_payload=False)
-                    self.SendSerializedMessage(message)
+                data = self.GetSerializedMessage('tx', hash, lambda: self.GetInventoryTransaction(hash))
 
             elif inventory.Type == InventoryType.BlockInt:
-                if not item:
-                    item = BC.Default().GetBlock(hash)
-                if item:
-                    message = Message(command='block', payload=item, print_payload=True)
-                    self.SendSerializedMessage(message)
+                # try to get the inventory to send from relay cache
+                data = self.GetSerializedMessage('block', hash,
+                                                 lambda: self.leader.RelayCache.get(hash) or BC.Default().GetBlock(hash))
 
             elif inventory.Type == InventoryType.ConsensusInt:
-                if item:
-                    self.SendSerializedMessage(Message(command='consensus', payload=item, print_payload=True))
+                data = self.GetSerializedMessage('consensus', hash, lambda: self.leader.RelayCache.get(hash))
+
+            if data:
+                self.SendRawMessage(data)
+
+    def GetInventoryTransaction(self, hash):
+        """
+        Find a transaction requested by the remote client in the relay cache, the blockchain or the memory pool.
+
+        Args:
+            hash (bytes): hash of the transaction.
+
+        Returns:
+            neo.Core.TX.Transaction: the transaction or None if it is unknown.
+        """
+        item = self.leader.RelayCache.get(hash)
+        if not item:
+            item, index = BC.Default().GetTransaction(hash)
+        if not item:
+            item = self.leader.GetTransaction(hash)
+        return item
 
     def HandleGetBlocksMessageReceived(self, payload):
         """
@@ -490,23 +422,50 @@ class NeoNode(Protocol):
             return
 
         inventory = IOHelper.AsSerializableWithType(payload, 'neo.Network.Payloads.GetBlocksPayload.GetBlocksPayload')
-
-        if not BC.Default().GetHeader(inventory.HashStart):
-            self.Log("Hash %s not found %s " % inventory.HashStart)
+        if not inventory:
             return
 
-        hashes = []
-        hcount = 0
-        hash = inventory.HashStart
-        while hash != inventory.HashStop and hcount < 500:
-            hash = BC.Default().GetNextBlockHash(hash)
-            if hash is None:
+        blockchain = BC.Default()
+
+        # the first hash of the locator we know is where the answer starts
+        header = None
+        for hash in inventory.HashStart:
+            header = blockchain.GetHeader(hash.encode('utf-8'))
+            if header:
                 break
-            hashes.append(hash)
-            hcount += 1
-        if hcount > 0:
-            self.Log("sending inv hashes! %s " % hashes)
-            self.SendSerializedMessage(Message('inv', InvPayload(type=InventoryType.Block, hashes=hashes)))
+
+        if not header:
+            self.Log("Hashes %s not found" % inventory.HashStart)
+            return
+
+        hash_stop = inventory.HashStop.ToBytes()
+        key = header.Hash.ToBytes() + hash_stop
+
+        cache = self.leader.MessageCache
+        data = cache.Get('inv', key)
+
+        if data is None:
+            hashes = []
+            index = header.Index + 1
+            while len(hashes) < 500:
+                hash = blockchain.GetHeaderHash(index)
+                if hash is None:
+                    break
+                hashes.append(hash)
+                if hash == hash_stop:
+                    break
+                index += 1
+
+            if not hashes:
+                return
+
+            data = Helper.ToArray(Message('inv', InvPayload(type=InventoryType.Block, hashes=hashes)), raw=True)
+
+            # an answer that ends at the tip of the chain grows with it and is not cached
+            if len(hashes) == 500 or hashes[-1] == hash_stop:
+                cache.Add('inv', key, data)
+
+        self.SendRawMessage(data)
 
     def Relay(self, inventory):
         """
@@ -518,11 +477,13 @@ class NeoNode(Protocol):
         Returns:
             bool: True (fixed)
         """
-        inventory = InvPayload(type=inventory.InventoryType, hashes=[inventory.Hash.ToBytes()])
-        m = Message("inv", inventory)
-        self.SendSerializedMessage(m)
+        hash = inventory.Hash.ToBytes()
+        inventory = InvPayload(type=inventory.InventoryType, hashes=[hash])
+
+        # the same message is sent to every peer
+        self.SendRawMessage(self.GetSerializedMessage('inv', hash, lambda: inventory))
 
         return True
 
     def Log(self, msg):
-        logger.debug("[%s][mode %s] %s - %s" % (self.identifier, self.sync_mode, self.endpoint, msg))
+        logger.debug("[%s] %s - %s" % (self.identifier, self.endpoint, msg))
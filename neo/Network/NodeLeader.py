@@ -6,6 +6,10 @@ from neo.Implementations.Blockchains.LevelDB.TestLevelDBBlockchain import TestLe
 from neo.Core.TX.Transaction import Transaction
 from neo.Core.TX.MinerTransaction import MinerTransaction
 from neo.Network.NeoNode import NeoNode
+from neo.Network.MessageCache import MessageCache
+from neo.Network.BoundedCache import BoundedCache, ExpiringHashSet
+from neo.Network.MemPool import MemPool
+from neo.Network.BlockScheduler import BlockScheduler
 from neo.Settings import settings
 from twisted.internet.protocol import ReconnectingClientFactory
 from twisted.internet import reactor, task
@@ -34,15 +38,40 @@ class NodeLeader:
 
     NodeId = None
 
-    _MissedBlocks = []
+    _MissedBlocks = None
 
+    # blocks per request and maximum distance of requested blocks above the current height
     BREQPART = 100
     BREQMAX = 10000
 
-    KnownHashes = []
+    BlockScheduler = None
+
+    # seconds between checks for timed out block requests
+    BLOCK_LOOP_INTERVAL = 1
+
+    # hashes of relayed inventories, so they are relayed once
+    KnownHashes = None
+    KNOWN_HASHES_SIZE = 100000
+    KNOWN_HASHES_AGE = 3600
+
     MissionsGlobal = []
-    MemPool = {}
-    RelayCache = {}
+
+    # verified transactions that are not in a block yet
+    MemPool = None
+    MEMPOOL_SIZE = 50000
+
+    # transactions verified again per reactor iteration after a block was persisted
+    MEMPOOL_REVERIFY_BATCH = 100
+    _reverify_pending = False
+
+    # inventories relayed to the peers, by hash, for peers that request them
+    RelayCache = None
+    RELAY_CACHE_SIZE = 500
+    RELAY_CACHE_AGE = 600
+
+    # serialized block, transaction and inventory messages shared by all peers
+    MessageCache = None
+    MESSAGE_CACHE_SIZE = 200
 
     NodeCount = 0
 
@@ -50,6 +79,10 @@ class NodeLeader:
 
     peer_check_loop = None
 
+    block_loop = None
+
+    _persist_handler = None
+
     @staticmethod
     def Instance():
         """
@@ -81,6 +114,12 @@ class NodeLeader:
         self.UnconnectedPeers = []
         self.ADDRS = []
         self.MissionsGlobal = []
+        self.MemPool = MemPool(self.MEMPOOL_SIZE)
+        self.KnownHashes = ExpiringHashSet(self.KNOWN_HASHES_SIZE, self.KNOWN_HASHES_AGE)
+        self.RelayCache = BoundedCache(self.RELAY_CACHE_SIZE, self.RELAY_CACHE_AGE)
+        self._MissedBlocks = ExpiringHashSet(self.KNOWN_HASHES_SIZE, self.KNOWN_HASHES_AGE)
+        self.MessageCache = MessageCache(self.MESSAGE_CACHE_SIZE)
+        self.BlockScheduler = BlockScheduler(self.BREQPART, self.BREQMAX)
         self.NodeId = random.randint(1294967200, 4294967200)
 
     def Restart(self):
@@ -88,6 +127,10 @@ class NodeLeader:
             self.peer_check_loop.stop()
             self.peer_check_loop = None
 
+        if self.block_loop:
+            self.block_loop.stop()
+            self.block_loop = None
+
         if len(self.Peers) == 0:
             self.ADDRS = []
             self.Start()
@@ -106,10 +149,20 @@ class NodeLeader:
         self.peer_check_loop = task.LoopingCall(self.PeerCheckLoop)
         self.peer_check_loop.start(240, now=False)
 
+        # the peers request more blocks as their ranges complete, this handles timeouts and new peers
+        self.block_loop = task.LoopingCall(self.BlockScheduler.Schedule)
+        self.block_loop.start(self.BLOCK_LOOP_INTERVAL, now=False)
+
+        if self._persist_handler is None:
+            self._persist_handler = self.OnPersistCompleted
+            BC.PersistCompleted.on_change += self._persist_handler
+
     def setBlockReqSizeAndMax(self, breqpart=0, breqmax=0):
         if breqpart > 0 and breqmax > 0 and breqmax > breqpart:
             self.BREQPART = breqpart
             self.BREQMAX = breqmax
+            self.BlockScheduler.RangeSize = self.BREQPART
+            self.BlockScheduler.Window = self.BREQMAX
             logger.info("Set each node to request %s blocks per request with a total of %s in queue" % (self.BREQPART, self.BREQMAX))
         else:
             logger.info("invalid values. Please specify a block request part and max size for each node, like 30 and 1000")
@@ -127,6 +180,8 @@ class NodeLeader:
         else:
             logger.info("configuration name %s not found. use 'slow', 'normal', or 'fast'" % name)
 
+        self.BlockScheduler.RangeSize = self.BREQPART
+        self.BlockScheduler.Window = self.BREQMAX
         logger.info("Set each node to request %s blocks per request with a total of %s in queue" % (self.BREQPART, self.BREQMAX))
 
     def RemoteNodePeerReceived(self, host, port, index):
@@ -145,6 +200,14 @@ class NodeLeader:
             self.peer_check_loop.stop()
             self.peer_check_loop = None
 
+        if self.block_loop:
+            self.block_loop.stop()
+            self.block_loop = None
+
+        if self._persist_handler is not None:
+            BC.PersistCompleted.on_change -= self._persist_handler
+            self._persist_handler = None
+
         for p in self.Peers:
             p.Disconnect()
 
@@ -191,11 +254,24 @@ class NodeLeader:
         logger.debug("Resseting Block requests")
         self.MissionsGlobal = []
         BC.Default().BlockSearchTries = 0
-        for p in self.Peers:
-            p.myblockrequests = set()
+        self.BlockScheduler.Reset()
         BC.Default().ResetBlockRequests()
         BC.Default()._block_cache = {}
 
+    def CacheStats(self):
+        """
+        Get the sizes and eviction counters of the inventory caches.
+
+        Returns:
+            dict: the `ToJson` output of each cache, by name.
+        """
+        return {
+            'known_hashes': self.KnownHashes.ToJson(),
+            'relay_cache': self.RelayCache.ToJson(),
+            'missed_blocks': self._MissedBlocks.ToJson(),
+            'message_cache': self.MessageCache.ToJson(),
+        }
+
     def InventoryReceived(self, inventory):
         """
         Process a received inventory.
@@ -206,8 +282,7 @@ class NodeLeader:
         Returns:
             bool: True if processed and verified. False otherwise.
         """
-        if inventory.Hash.ToBytes() in self._MissedBlocks:
-            self._MissedBlocks.remove(inventory.Hash.ToBytes())
+        self._MissedBlocks.discard(inventory.Hash.ToBytes())
 
         if inventory is MinerTransaction:
             return False
@@ -268,7 +343,7 @@ class NodeLeader:
         if inventory.Hash.ToBytes() in self.KnownHashes:
             return False
 
-        self.KnownHashes.append(inventory.Hash.ToBytes())
+        self.KnownHashes.add(inventory.Hash.ToBytes())
 
         if type(inventory) is Block:
             pass
@@ -285,9 +360,7 @@ class NodeLeader:
         return relayed
 
     def GetTransaction(self, hash):
-        if hash in self.MemPool.keys():
-            return self.MemPool[hash]
-        return None
+        return self.MemPool.get(hash)
 
     def AddTransaction(self, tx):
         """
@@ -302,16 +375,66 @@ class NodeLeader:
         if BC.Default() is None:
             return False
 
-        if tx.Hash.ToBytes() in self.MemPool.keys():
+        if tx.Hash.ToBytes() in self.MemPool:
             return False
 
         if BC.Default().ContainsTransaction(tx.Hash):
             return False
 
+        # cheap checks first, scripts are only verified for transactions that can enter the pool
+        if self.MemPool.HasConflicts(tx):
+            logger.debug("Transaction %s spends coins spent in the memory pool" % tx.Hash.ToBytes())
+            return False
+
+        fee_per_byte = self.MemPool.FeePerByte(tx)
+        if not self.MemPool.CanAdmit(fee_per_byte):
+            logger.debug("Memory pool is full, transaction %s fee too low" % tx.Hash.ToBytes())
+            return False
+
         if not tx.Verify(self.MemPool.values()):
             logger.error("Veryfiying tx result... failed")
             return False
 
-        self.MemPool[tx.Hash.ToBytes()] = tx
+        self.MemPool.Add(tx, fee_per_byte)
 
         return True
+
+    def OnPersistCompleted(self, block):
+        """
+        Remove the transactions of a persisted block from the memory pool and verify the remaining ones again.
+
+        Args:
+            block (neo.Core.Block.Block): the persisted block.
+        """
+        self.MemPool.RemoveBlock(block)
+        if self.MemPool.UnverifiedCount and not self._reverify_pending:
+            self._reverify_pending = True
+            reactor.callLater(0, self.ReverifyMemPool)
+
+    def ReverifyMemPool(self):
+        """
+        Verify a batch of memory pool transactions again, and schedule the next batch until none are left.
+        """
+        removed = self.MemPool.Reverify(self.VerifyPoolTransaction, self.MEMPOOL_REVERIFY_BATCH)
+        if removed:
+            logger.debug("Removed %s invalid transactions from the memory pool" % len(removed))
+
+        if self.MemPool.UnverifiedCount:
+            reactor.callLater(0, self.ReverifyMemPool)
+        else:
+            self._reverify_pending = False
+
+    def VerifyPoolTransaction(self, tx):
+        """
+        Check that a memory pool transaction is still valid after a block was persisted.
+
+        Args:
+            tx (neo.Core.TX.Transaction): instance.
+
+        Returns:
+            bool: True if the coins it spends are still unspent and it verifies. False otherwise.
+        """
+        for coin in tx.inputs:
+            if BC.Default().GetUnspent(coin.PrevHash.ToBytes(), coin.PrevIndex) is None:
+                return False
+        return tx.Verify(self.MemPool.values())
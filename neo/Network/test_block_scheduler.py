@@ -0,0 +1,205 @@
+from unittest import TestCase
+from mock import patch
+from neo.Core.Blockchain import Blockchain
+from neo.Network.BlockScheduler import BlockScheduler
+
+
+class Hash:
+    def __init__(self, data):
+        self.data = data
+
+    def ToBytes(self):
+        return self.data
+
+
+class Block:
+    def __init__(self, index):
+        self.Index = index
+        self.Hash = Hash(b'%064x' % index)
+
+
+class Chain:
+    """Headers of `length` blocks of which only the genesis block is persisted."""
+
+    def __init__(self, length):
+        self.Blocks = [Block(i) for i in range(length)]
+        self.Height = 0
+        self.HeaderHeight = length - 1
+        self.Cache = {}
+
+    def GetHeaderHash(self, height):
+        return self.Blocks[height].Hash.ToBytes()
+
+    def IsBlockCached(self, hash):
+        return int(hash, 16) in self.Cache
+
+    def AddBlock(self, block):
+        self.Cache[block.Index] = block
+
+        while self.Height + 1 in self.Cache:
+            del self.Cache[self.Height + 1]
+            self.Height += 1
+
+
+class Peer:
+    """Serves blocks of the chain at a fixed rate after a delay, or never when `rate` is 0."""
+
+    def __init__(self, chain, rate, latency=0.1):
+        self.Chain = chain
+        self.Rate = rate
+        self.Latency = latency
+        self.Requests = []
+        self.Queue = []
+
+    def RequestBlocks(self, hashes):
+        self.Requests.append(hashes)
+        self.Queue.extend(hashes)
+
+    def Deliver(self, scheduler, now, elapsed):
+        if not self.Rate:
+            return
+
+        count = int(self.Rate * elapsed)
+        sent, self.Queue = self.Queue[:count], self.Queue[count:]
+
+        for hash in sent:
+            block = self.Chain.Blocks[int(hash, 16)]
+            self.Chain.AddBlock(block)
+            scheduler.BlockReceived(self, block, now)
+
+    @property
+    def Requested(self):
+        return [hash for hashes in self.Requests for hash in hashes]
+
+
+class BlockSchedulerTestCase(TestCase):
+
+    def sync(self, chain, scheduler, peers, seconds, step=0.1, on_step=None):
+        now = 1000.0
+        with patch.object(Blockchain, 'Default', return_value=chain):
+            for peer in peers:
+                scheduler.AddPeer(peer)
+
+            for i in range(int(seconds / step)):
+                scheduler.Schedule(now)
+                now += step
+                for peer in peers:
+                    peer.Deliver(scheduler, now, step)
+                if on_step:
+                    on_step(now)
+                if chain.Height == chain.HeaderHeight:
+                    break
+
+        return now - 1000.0
+
+    def test_faster_peers_get_more_blocks(self):
+        chain = Chain(2001)
+        scheduler = BlockScheduler(100, 500)
+        fast, slow = Peer(chain, 400), Peer(chain, 40)
+
+        self.sync(chain, scheduler, [fast, slow], 60)
+
+        self.assertEqual(chain.Height, 2000)
+        self.assertEqual(scheduler.InFlight, 0)
+        self.assertGreater(len(fast.Requested), 3 * len(slow.Requested))
+
+        # every block was requested exactly once
+        requested = fast.Requested + slow.Requested
+        self.assertEqual(len(requested), 2000)
+        self.assertEqual(len(set(requested)), 2000)
+
+        self.assertGreater(scheduler.GetPeerStats(fast).Throughput, scheduler.GetPeerStats(slow).Throughput)
+
+    def test_requests_stay_within_window(self):
+        chain = Chain(1001)
+        scheduler = BlockScheduler(50, 200)
+        peers = [Peer(chain, 300), Peer(chain, 300), Peer(chain, 300)]
+
+        def check_window(now):
+            highest = max((int(h, 16) for peer in peers for h in peer.Requested), default=0)
+            self.assertLessEqual(highest, chain.Height + 200 + scheduler.RangeSize)
+
+        self.sync(chain, scheduler, peers, 60, on_step=check_window)
+        self.assertEqual(chain.Height, 1000)
+
+    def test_stalled_peer_ranges_are_reassigned(self):
+        chain = Chain(501)
+        scheduler = BlockScheduler(100, 500)
+        stalled, working = Peer(chain, 0), Peer(chain, 200)
+
+        self.sync(chain, scheduler, [stalled, working], 120)
+
+        self.assertEqual(chain.Height, 500)
+        stats = scheduler.GetPeerStats(stalled)
+        self.assertGreater(stats.Timeouts, 0)
+        self.assertEqual(stats.Received, 0)
+
+        # once it timed out, the stalled peer is only probed with single blocks
+        self.assertTrue(all(len(hashes) == 1 for hashes in stalled.Requests[scheduler.RANGES_PER_PEER:]))
+
+    def test_dropped_block_is_requested_again(self):
+        chain = Chain(301)
+        scheduler = BlockScheduler(100, 500)
+        peer = Peer(chain, 200)
+
+        # the block at height 50 is received, but dropped before it is persisted
+        add_block = chain.AddBlock
+        dropped = []
+
+        def drop_once(block):
+            if block.Index == 50 and not dropped:
+                dropped.append(block)
+                return
+            add_block(block)
+
+        chain.AddBlock = drop_once
+
+        self.sync(chain, scheduler, [peer], 60)
+
+        self.assertEqual(chain.Height, 300)
+        self.assertEqual(len(dropped), 1)
+        self.assertEqual(peer.Requested.count(chain.GetHeaderHash(50)), 2)
+
+    def test_remove_peer_releases_ranges(self):
+        chain = Chain(301)
+        scheduler = BlockScheduler(100, 500)
+        leaving, staying = Peer(chain, 0), Peer(chain, 100)
+
+        with patch.object(Blockchain, 'Default', return_value=chain):
+            scheduler.AddPeer(leaving)
+            scheduler.Schedule(1000.0)
+            self.assertEqual(scheduler.InFlight, 2 * 25)
+
+            scheduler.RemovePeer(leaving)
+            self.assertEqual(scheduler.InFlight, 0)
+
+        self.sync(chain, scheduler, [staying], 60)
+
+        self.assertEqual(chain.Height, 300)
+        self.assertIn(leaving.Requested[0], staying.Requested)
+
+    def test_request_announced(self):
+        # a synced chain, the peers announce the next block
+        chain = Chain(11)
+        chain.Height = 10
+        block = Block(11)
+
+        scheduler = BlockScheduler(100, 500)
+        peer, other = Peer(chain, 100), Peer(chain, 100)
+        scheduler.AddPeer(peer)
+        scheduler.AddPeer(other)
+
+        hashes = [block.Hash.ToBytes()]
+        self.assertEqual(scheduler.RequestAnnounced(peer, hashes, 1000.0), hashes)
+        self.assertTrue(scheduler.IsRequested(hashes[0]))
+
+        # the block is only requested once
+        self.assertEqual(scheduler.RequestAnnounced(other, hashes, 1000.0), [])
+
+        with patch.object(Blockchain, 'Default', return_value=chain):
+            self.assertTrue(scheduler.BlockReceived(peer, block, 1000.5))
+            self.assertFalse(scheduler.BlockReceived(peer, block, 1000.5))
+
+        self.assertFalse(scheduler.IsRequested(hashes[0]))
+        self.assertEqual(peer.Requests, [hashes])
+        self.assertEqual(other.Requests, [])
@@ -0,0 +1,116 @@
+from unittest import TestCase
+from neo.Network.BoundedCache import BoundedCache, ExpiringHashSet
+from neo.Network.NodeLeader import NodeLeader
+from neo.Network.InventoryType import InventoryType
+from neocore.UInt256 import UInt256
+import os
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Inventory:
+    InventoryType = InventoryType.Consensus
+
+    def __init__(self):
+        self.Hash = UInt256(data=os.urandom(32))
+
+
+class Peer:
+    def __init__(self):
+        self.Relayed = 0
+
+    def Relay(self, inventory):
+        self.Relayed += 1
+        return True
+
+
+class BoundedCacheTestCase(TestCase):
+
+    def test_lru_eviction(self):
+        cache = BoundedCache(2)
+        cache[b'a'] = 1
+        cache[b'b'] = 2
+
+        self.assertEqual(cache[b'a'], 1)
+        cache[b'c'] = 3
+
+        # b was used least recently
+        self.assertNotIn(b'b', cache)
+        self.assertEqual(cache.get(b'b'), None)
+        self.assertEqual(list(cache.keys()), [b'a', b'c'])
+        self.assertEqual(cache.Evictions, 1)
+
+        with self.assertRaises(KeyError):
+            cache[b'b']
+
+        self.assertEqual(cache.pop(b'a'), 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_expiration(self):
+        clock = Clock()
+        cache = BoundedCache(10, max_age=60, clock=clock)
+        cache[b'a'] = 1
+        clock.now += 30
+        cache[b'b'] = 2
+
+        clock.now += 40
+        # reading renews an item
+        self.assertEqual(cache.get(b'b'), 2)
+        self.assertNotIn(b'a', cache)
+
+        clock.now += 50
+        self.assertIn(b'b', cache)
+
+        clock.now += 60
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.Expirations, 2)
+        self.assertEqual(cache.ToJson()['size'], 0)
+
+    def test_hash_set(self):
+        clock = Clock()
+        hashes = ExpiringHashSet(10, 60, clock=clock)
+        hashes.add(b'a')
+        clock.now += 30
+
+        # checking does not renew a hash
+        self.assertIn(b'a', hashes)
+        clock.now += 30
+        self.assertNotIn(b'a', hashes)
+
+        hashes.add(b'b')
+        hashes.discard(b'b')
+        hashes.discard(b'c')
+        self.assertEqual(len(hashes), 0)
+
+    def test_relay_soak(self):
+        clock = Clock()
+        leader = NodeLeader()
+        leader.KnownHashes = ExpiringHashSet(1000, 3600, clock=clock)
+        leader.RelayCache = BoundedCache(100, 600, clock=clock)
+        leader.Peers = [Peer()]
+
+        # three days of a peer relaying a new inventory every ten seconds, and repeating some
+        relayed = []
+        for i in range(3 * 24 * 360):
+            clock.now += 10
+            inventory = Inventory()
+            self.assertTrue(leader.Relay(inventory))
+            relayed.append(inventory)
+
+            if i % 50 == 10:
+                self.assertFalse(leader.Relay(relayed[-10]))
+
+            self.assertLessEqual(len(leader.KnownHashes._items), 1000)
+            self.assertLessEqual(len(leader.RelayCache._items), 100)
+
+        stats = leader.CacheStats()
+        self.assertEqual(stats['known_hashes']['size'], 360)
+        self.assertEqual(stats['relay_cache']['size'], 60)
+        self.assertGreater(stats['relay_cache']['expirations'], 0)
+        self.assertEqual(leader.Peers[0].Relayed, len(relayed))
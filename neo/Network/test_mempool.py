@@ -0,0 +1,168 @@
+from unittest import TestCase
+from mock import patch, MagicMock
+from neo.Core.Blockchain import Blockchain
+from neo.Core.CoinReference import CoinReference
+from neo.Network.MemPool import MemPool
+from neo.Network.NodeLeader import NodeLeader
+from neocore.Fixed8 import Fixed8
+from neocore.UInt256 import UInt256
+import os
+
+
+def coin(index=0):
+    return CoinReference(prev_hash=UInt256(data=os.urandom(32)), prev_index=index)
+
+
+class Transaction:
+    def __init__(self, fee, inputs=None, size=100):
+        self.Hash = UInt256(data=os.urandom(32))
+        self.inputs = inputs if inputs is not None else [coin()]
+        self.fee = fee
+        self.size = size
+        self.verified = 0
+
+    def NetworkFee(self):
+        return Fixed8(self.fee)
+
+    def Size(self):
+        return self.size
+
+    def Verify(self, mempool):
+        self.verified += 1
+        return True
+
+
+class Block:
+    def __init__(self, transactions):
+        self.Transactions = transactions
+
+
+class MemPoolTestCase(TestCase):
+
+    def test_add_and_conflicts(self):
+        pool = MemPool(10)
+        tx = Transaction(100)
+        pool.Add(tx)
+
+        hash = tx.Hash.ToBytes()
+        self.assertIn(hash, pool)
+        self.assertIs(pool.get(hash), tx)
+        self.assertEqual(pool.MinFeePerByte, 1)
+
+        double_spend = Transaction(200, inputs=[CoinReference(tx.inputs[0].PrevHash, 0)])
+        self.assertTrue(pool.HasConflicts(double_spend))
+        self.assertEqual(pool.GetConflicts(double_spend), {hash})
+
+        same_coin_twice = Transaction(200, inputs=[tx.inputs[0], tx.inputs[0]])
+        self.assertTrue(MemPool(10).HasConflicts(same_coin_twice))
+        self.assertFalse(pool.HasConflicts(Transaction(200)))
+
+        pool.Remove(hash)
+        self.assertFalse(pool.HasConflicts(double_spend))
+        self.assertEqual(len(pool), 0)
+        self.assertIsNone(pool.MinFeePerByte)
+
+    def test_lowest_fee_is_evicted(self):
+        pool = MemPool(3)
+        low, mid, high = Transaction(100), Transaction(200), Transaction(300)
+        for tx in [mid, low, high]:
+            self.assertEqual(pool.Add(tx), [])
+
+        self.assertTrue(pool.IsFull())
+        self.assertFalse(pool.CanAdmit(1))
+        self.assertTrue(pool.CanAdmit(1.5))
+
+        higher = Transaction(400)
+        self.assertEqual(pool.Add(higher), [low])
+        self.assertEqual(pool.GetTransactions(), [higher, high, mid])
+        self.assertEqual(pool.Evictions, 1)
+
+        # the newest of equal fees goes first
+        same = Transaction(200)
+        self.assertEqual(pool.Add(same), [same])
+
+    def test_remove_block_and_reverify(self):
+        pool = MemPool(10)
+        included, conflicting, valid, invalid = [Transaction(100) for i in range(4)]
+        for tx in [included, conflicting, valid, invalid]:
+            pool.Add(tx)
+
+        block_tx = Transaction(100, inputs=[conflicting.inputs[0]])
+        removed = pool.RemoveBlock(Block([included, block_tx]))
+
+        self.assertEqual(removed, [included, conflicting])
+        self.assertEqual(pool.UnverifiedCount, 2)
+
+        removed = pool.Reverify(lambda tx: tx is not invalid, 1)
+        self.assertEqual(pool.UnverifiedCount, 1)
+        removed += pool.Reverify(lambda tx: tx is not invalid, 1)
+
+        self.assertEqual(removed, [invalid])
+        self.assertEqual(list(pool.values()), [valid])
+
+    def test_remove_block_during_reverify(self):
+        pool = MemPool(10)
+        txs = [Transaction(100) for i in range(4)]
+        for tx in txs:
+            pool.Add(tx)
+
+        pool.RemoveBlock(Block([]))
+        pool.Reverify(lambda tx: True, 2)
+        self.assertEqual(pool.UnverifiedCount, 2)
+
+        # a new block queues the transactions verified before it again, after the pending ones
+        added = Transaction(100)
+        pool.Add(added)
+        pool.RemoveBlock(Block([]))
+        self.assertEqual(list(pool._unverified), [tx.Hash.ToBytes() for tx in txs[2:] + txs[:2] + [added]])
+
+        pool.Reverify(lambda tx: tx is not txs[0], 5)
+        self.assertEqual(pool.UnverifiedCount, 0)
+        self.assertEqual(len(pool), 4)
+
+    def test_leader_reverify_scheduled_once(self):
+        leader = NodeLeader()
+        for i in range(3):
+            leader.MemPool.Add(Transaction(100))
+
+        with patch('neo.Network.NodeLeader.reactor') as reactor:
+            leader.OnPersistCompleted(Block([]))
+            leader.OnPersistCompleted(Block([]))
+            self.assertEqual(reactor.callLater.call_count, 1)
+
+            with patch.object(leader, 'VerifyPoolTransaction', return_value=True):
+                leader.MEMPOOL_REVERIFY_BATCH = 2
+                leader.ReverifyMemPool()
+                self.assertEqual(reactor.callLater.call_count, 2)
+                leader.ReverifyMemPool()
+                self.assertEqual(reactor.callLater.call_count, 2)
+
+            # the pass is done, the next block starts a new one
+            leader.OnPersistCompleted(Block([]))
+            self.assertEqual(reactor.callLater.call_count, 3)
+
+    def test_leader_add_transaction(self):
+        leader = NodeLeader()
+        chain = MagicMock()
+        chain.ContainsTransaction.return_value = False
+
+        with patch.object(Blockchain, 'Default', return_value=chain):
+            tx = Transaction(100)
+            self.assertTrue(leader.AddTransaction(tx))
+            self.assertFalse(leader.AddTransaction(tx))
+            self.assertEqual(leader.GetTransaction(tx.Hash.ToBytes()), tx)
+
+            # double spends are rejected before their scripts are verified
+            double_spend = Transaction(200, inputs=tx.inputs)
+            self.assertFalse(leader.AddTransaction(double_spend))
+            self.assertEqual(double_spend.verified, 0)
+
+            # transactions that would be evicted right away are not verified either
+            leader.MemPool.MaxSize = 1
+            cheap = Transaction(10)
+            self.assertFalse(leader.AddTransaction(cheap))
+            self.assertEqual(cheap.verified, 0)
+
+            # spent inputs invalidate a transaction after a block
+            chain.GetUnspent.return_value = None
+            self.assertFalse(leader.VerifyPoolTransaction(tx))
@@ -0,0 +1,23 @@
+from unittest import TestCase
+from neo.Network.MessageCache import MessageCache
+
+
+class MessageCacheTestCase(TestCase):
+
+    def test_lru(self):
+        cache = MessageCache(2)
+        cache.Add('tx', b'aa', b'1')
+        cache.Add('block', b'aa', b'2')
+
+        self.assertEqual(cache.Get('tx', b'aa'), b'1')
+        cache.Add('tx', b'bb', b'3')
+
+        # the least recently used message is dropped
+        self.assertIsNone(cache.Get('block', b'aa'))
+        self.assertEqual(cache.Get('tx', b'aa'), b'1')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.Hits, 2)
+        self.assertEqual(cache.Misses, 1)
+
+        cache.Clear()
+        self.assertEqual(len(cache), 0)
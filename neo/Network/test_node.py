@@ -3,8 +3,14 @@ from neo.Network.NeoNode import NeoNode
 from mock import patch
 from neo.Network.Payloads.VersionPayload import VersionPayload
 from neo.Network.Message import Message
+from neo.Network.Payloads.InvPayload import InvPayload
+from neo.Network.Payloads.GetBlocksPayload import GetBlocksPayload
+from neo.Network.InventoryType import InventoryType
+from neo.Core.Blockchain import Blockchain
 from neo.IO.MemoryStream import StreamManager
 from neocore.IO.BinaryWriter import BinaryWriter
+from neocore.UInt256 import UInt256
+from neo.IO.Helper import Helper as IOHelper
 
 
 class Endpoint:
@@ -77,3 +83,129 @@ class NodeTestCase(TestCase):
         mock.assert_called_once()
 
         self.assertEqual(node.Version.Nonce, payload.Nonce)
+
+    @patch.object(NeoNode, 'MessageReceived')
+    def test_data_received_in_chunks(self, mock):
+        node = NeoNode()
+
+        messages = [Message('block', payload=Blockchain.GenesisBlock()), Message('verack'),
+                    Message('inv', payload=InvPayload(InventoryType.Block, [b'a' * 64]))] * 20
+
+        stream = StreamManager.GetStream()
+        writer = BinaryWriter(stream)
+        for message in messages:
+            message.Serialize(writer)
+        out = stream.getvalue()
+        StreamManager.ReleaseStream(stream)
+
+        # feed it like a socket would, with reads that split messages and headers
+        for start in range(0, len(out), 1000):
+            node.dataReceived(out[start:start + 1000])
+
+        self.assertEqual(mock.call_count, len(messages))
+        self.assertEqual(node.buffer_in, bytearray())
+
+        for call, message in zip(mock.call_args_list, messages):
+            received = call[0][0]
+            self.assertEqual(received.Command, message.Command)
+            self.assertEqual(received.Payload, message.Payload)
+
+    @patch.object(NeoNode, 'MessageReceived')
+    def test_data_received_bad_checksum(self, mock):
+        node = NeoNode()
+
+        stream = StreamManager.GetStream()
+        writer = BinaryWriter(stream)
+        message = Message('verack')
+        message.Checksum ^= 1
+        message.Serialize(writer)
+        Message('verack').Serialize(writer)
+        out = stream.getvalue()
+        StreamManager.ReleaseStream(stream)
+
+        node.dataReceived(out)
+
+        # the broken message is dropped, the next one is still processed
+        mock.assert_called_once()
+        self.assertEqual(node.buffer_in, bytearray())
+
+    def test_get_data_uses_message_cache(self):
+        node = NeoNode()
+        node.transport = Transport()
+
+        block = Blockchain.GenesisBlock()
+        hash = block.Hash.ToBytes()
+        node.leader.RelayCache[hash] = block
+
+        get_data = InvPayload(InventoryType.Block, [hash.decode('utf-8')])
+        hits = node.leader.MessageCache.Hits
+        try:
+            node.HandleGetDataMessageReceived(Message('getdata', payload=get_data).Payload)
+            del node.leader.RelayCache[hash]
+            # the second request is served from the message cache without looking up the block
+            node.HandleGetDataMessageReceived(Message('getdata', payload=get_data).Payload)
+        finally:
+            node.leader.RelayCache.pop(hash, None)
+
+        stream = StreamManager.GetStream()
+        writer = BinaryWriter(stream)
+        Message('block', payload=block).Serialize(writer)
+        expected = stream.getvalue()
+        StreamManager.ReleaseStream(stream)
+
+        self.assertEqual(node.transport.written, [expected, expected])
+        self.assertEqual(node.bytes_out, 2 * len(node.transport.written[0]))
+        self.assertEqual(node.leader.MessageCache.Hits, hits + 1)
+
+    def test_get_blocks_uses_message_cache(self):
+        node = NeoNode()
+        node.transport = Transport()
+
+        header = Blockchain.GenesisBlock().Header
+        hashes = [b'%064x' % index for index in range(1, 601)]
+        chain = Chain(header, hashes)
+
+        start = GetBlocksPayload(hash_start=[b'ff' * 32, header.Hash.ToBytes()], hash_stop=UInt256(data=bytes(32)))
+        stop = GetBlocksPayload(hash_start=[header.Hash.ToBytes()], hash_stop=UInt256.ParseString(hashes[9].decode('utf-8')))
+
+        hits = node.leader.MessageCache.Hits
+        with patch('neo.Network.NeoNode.BC.Default', return_value=chain):
+            for get_blocks in [start, start, stop, stop]:
+                node.HandleGetBlocksMessageReceived(Message('getblocks', payload=get_blocks).Payload)
+
+            # an answer up to the tip of the chain is not cached, it changes as the chain grows
+            chain.hashes = hashes[:5]
+            tip = GetBlocksPayload(hash_start=[header.Hash.ToBytes()], hash_stop=UInt256(data=b'\x01' * 32))
+            node.HandleGetBlocksMessageReceived(Message('getblocks', payload=tip).Payload)
+            chain.hashes = hashes[:6]
+            node.HandleGetBlocksMessageReceived(Message('getblocks', payload=tip).Payload)
+
+        self.assertEqual(node.leader.MessageCache.Hits, hits + 2)
+        self.assertEqual([[hash.encode('utf-8') for hash in read_message(data).Payload.Hashes] for data in node.transport.written],
+                         [hashes[:500]] * 2 + [hashes[:10]] * 2 + [hashes[:5], hashes[:6]])
+
+
+class Transport:
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+
+class Chain:
+    def __init__(self, header, hashes):
+        self.header = header
+        self.hashes = hashes
+
+    def GetHeader(self, hash):
+        return self.header if hash == self.header.Hash.ToBytes() else None
+
+    def GetHeaderHash(self, height):
+        return self.hashes[height - 1] if 0 < height <= len(self.hashes) else None
+
+
+def read_message(data):
+    message = IOHelper.AsSerializableWithType(data, 'neo.Network.Message.Message')
+    message.Payload = IOHelper.AsSerializableWithType(message.Payload, 'neo.Network.Payloads.InvPayload.InvPayload')
+    return message
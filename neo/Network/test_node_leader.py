@@ -140,7 +140,8 @@ class LeaderTestCase(WalletFixtureTestCase):
 
         with patch('twisted.internet.reactor.connectTCP', mock_connect_tcp):
             with patch('twisted.internet.reactor.callLater', mock_call_later):
-                with patch('neo.Network.NeoNode.NeoNode.SendSerializedMessage', mock_send_msg):
+                with patch('neo.Network.NeoNode.NeoNode.SendSerializedMessage', mock_send_msg), \
+                        patch('neo.Network.NeoNode.NeoNode.SendRawMessage', mock_send_msg):
                     leader.Start()
 
                     miner = MinerTransaction()
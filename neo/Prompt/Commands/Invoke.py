@@ -238,11 +238,11 @@ def test_invoke(script, wallet, outputs, withdrawal_tx=None,
 
     sn = bc._db.snapshot()
 
-    accounts = DBCollection(bc._db, sn, DBPrefix.ST_Account, AccountState)
-    assets = DBCollection(bc._db, sn, DBPrefix.ST_Asset, AssetState)
-    validators = DBCollection(bc._db, sn, DBPrefix.ST_Validator, ValidatorState)
-    contracts = DBCollection(bc._db, sn, DBPrefix.ST_Contract, ContractState)
-    storages = DBCollection(bc._db, sn, DBPrefix.ST_Storage, StorageItem)
+    accounts = DBCollection(bc._db, sn, DBPrefix.ST_Account, AccountState, bc.BinaryFormat, bc.StateCache)
+    assets = DBCollection(bc._db, sn, DBPrefix.ST_Asset, AssetState, bc.BinaryFormat, bc.StateCache)
+    validators = DBCollection(bc._db, sn, DBPrefix.ST_Validator, ValidatorState, bc.BinaryFormat, bc.StateCache)
+    contracts = DBCollection(bc._db, sn, DBPrefix.ST_Contract, ContractState, bc.BinaryFormat, bc.StateCache)
+    storages = DBCollection(bc._db, sn, DBPrefix.ST_Storage, StorageItem, bc.BinaryFormat, bc.StateCache)
 
     # if we are using a withdrawal tx, don't recreate the invocation tx
     # also, we don't want to reset the inputs / outputs
@@ -360,16 +360,16 @@ def test_deploy_and_invoke(deploy_script, invoke_args, wallet,
 
     sn = bc._db.snapshot()
 
-    accounts = DBCollection(bc._db, sn, DBPrefix.ST_Account, AccountState)
-    assets = DBCollection(bc._db, sn, DBPrefix.ST_Asset, AssetState)
-    validators = DBCollection(bc._db, sn, DBPrefix.ST_Validator, ValidatorState)
-    contracts = DBCollection(bc._db, sn, DBPrefix.ST_Contract, ContractState)
-    storages = DBCollection(bc._db, sn, DBPrefix.ST_Storage, StorageItem)
+    accounts = DBCollection(bc._db, sn, DBPrefix.ST_Account, AccountState, bc.BinaryFormat, bc.StateCache)
+    assets = DBCollection(bc._db, sn, DBPrefix.ST_Asset, AssetState, bc.BinaryFormat, bc.StateCache)
+    validators = DBCollection(bc._db, sn, DBPrefix.ST_Validator, ValidatorState, bc.BinaryFormat, bc.StateCache)
+    contracts = DBCollection(bc._db, sn, DBPrefix.ST_Contract, ContractState, bc.BinaryFormat, bc.StateCache)
+    storages = DBCollection(bc._db, sn, DBPrefix.ST_Storage, StorageItem, bc.BinaryFormat, bc.StateCache)
 
     if settings.USE_DEBUG_STORAGE:
         debug_storage = DebugStorage.instance()
         debug_sn = debug_storage.db.snapshot()
-        storages = DBCollection(debug_storage.db, debug_sn, DBPrefix.ST_Storage, StorageItem)
+        storages = DBCollection(debug_storage.db, debug_sn, DBPrefix.ST_Storage, StorageItem, debug_storage.BinaryFormat)
         storages.DebugStorage = True
 
     dtx = InvocationTransaction()
@@ -3,7 +3,8 @@ from neo.Core.TX.Transaction import TransactionOutput, ContractTransaction
 from neo.Core.TX.TransactionAttribute import TransactionAttribute, TransactionAttributeUsage
 from neo.SmartContract.ContractParameterContext import ContractParametersContext
 from neo.Network.NodeLeader import NodeLeader
-from neo.Prompt.Utils import get_arg, get_from_addr, get_asset_id, lookup_addr_str, get_tx_attr_from_args, get_owners_from_params
+from neo.Prompt.Utils import get_arg, get_from_addr, get_asset_id, lookup_addr_str, get_tx_attr_from_args, get_owners_from_params, \
+    get_coin_selector
 from neo.Prompt.Commands.Tokens import do_token_transfer, amount_from_string
 from neo.Prompt.Commands.Invoke import gather_signatures
 from neo.Wallets.NEP5Token import NEP5Token
@@ -26,6 +27,10 @@ def construct_and_send(prompter, wallet, arguments, prompt_password=True):
         arguments, from_address = get_from_addr(arguments)
         arguments, user_tx_attributes = get_tx_attr_from_args(arguments)
         arguments, owners = get_owners_from_params(arguments)
+        arguments, selector = get_coin_selector(arguments)
+
+        if selector is None:
+            return False
 
         to_send = get_arg(arguments)
         address_to = get_arg(arguments, 1)
@@ -69,7 +74,8 @@ def construct_and_send(prompter, wallet, arguments, prompt_password=True):
         ttx = wallet.MakeTransaction(tx=tx,
                                      change_address=None,
                                      fee=fee,
-                                     from_addr=scripthash_from)
+                                     from_addr=scripthash_from,
+                                     selector=selector)
 
         if ttx is None:
             print("insufficient funds")
@@ -4,6 +4,7 @@ from neocore.Fixed8 import Fixed8
 from neo.Core.Helper import Helper
 from neo.Core.Blockchain import Blockchain
 from neo.Wallets.Coin import CoinState
+from neo.Wallets.CoinSelection import SELECTORS
 from neo.Core.TX.Transaction import TransactionInput
 from neo.Core.TX.TransactionAttribute import TransactionAttribute, TransactionAttributeUsage
 from neo.SmartContract.ContractParameter import ContractParameterType
@@ -131,6 +132,46 @@ def get_from_addr(params):
     return params, from_addr
 
 
+def get_coin_selector(params):
+    """
+    Get the coin selection strategy from the `--select={strategy}` and `--max-inputs={count}` arguments.
+
+    Args:
+        params (list): the arguments, the ones used are removed.
+
+    Returns:
+        tuple:
+            list: the remaining arguments.
+            CoinSelector: the default selector if no strategy is given, None if the arguments are invalid.
+    """
+    to_remove = []
+    name = 'default'
+    max_inputs = None
+    for item in params:
+        if type(item) is str:
+            if '--select=' in item:
+                to_remove.append(item)
+                name = item.replace('--select=', '')
+            if '--max-inputs=' in item:
+                to_remove.append(item)
+                try:
+                    max_inputs = int(item.replace('--max-inputs=', ''))
+                except ValueError:
+                    max_inputs = 0
+    for item in to_remove:
+        params.remove(item)
+
+    if name not in SELECTORS:
+        print("Unknown coin selection strategy %s, use one of: %s" % (name, ', '.join(sorted(SELECTORS))))
+        return params, None
+
+    if max_inputs is not None and max_inputs < 1:
+        print("The maximum number of inputs must be a positive number")
+        return params, None
+
+    return params, SELECTORS[name](max_inputs=max_inputs)
+
+
 def get_parse_addresses(params):
     if '--no-parse-addr' in params:
         params.remove('--no-parse-addr')
@@ -4,6 +4,7 @@ from neocore.Fixed8 import Fixed8
 from neocore.UInt160 import UInt160
 import mock
 from neo.SmartContract.ContractParameter import ContractParameter, ContractParameterType
+from neo.Wallets.CoinSelection import CoinSelector, ConsolidationSelector
 
 
 class TestInputParser(TestCase):
@@ -122,6 +123,24 @@ class TestInputParser(TestCase):
 
         self.assertEqual(neo, Fixed8.FromDecimal(10))
 
+    def test_coin_selector(self):
+        args, selector = Utils.get_coin_selector([1, 2])
+        self.assertEqual(args, [1, 2])
+        self.assertIs(type(selector), CoinSelector)
+        self.assertIsNone(selector.MaxInputs)
+
+        args, selector = Utils.get_coin_selector([1, '--select=consolidate', 2, '--max-inputs=20'])
+        self.assertEqual(args, [1, 2])
+        self.assertIs(type(selector), ConsolidationSelector)
+        self.assertEqual(selector.MaxInputs, 20)
+
+        args, selector = Utils.get_coin_selector([1, '--select=oldest'])
+        self.assertEqual(args, [1])
+        self.assertIsNone(selector)
+
+        args, selector = Utils.get_coin_selector(['--max-inputs=x'])
+        self.assertIsNone(selector)
+
     def test_string_from_fixed8(self):
 
         amount_str = Utils.string_from_fixed8(100234, 8)
@@ -97,6 +97,15 @@ class SettingsHolder:
 
     CONNECTED_PEER_MAX = 5
 
+    # Maximum number of account, asset, contract and storage records kept in memory by the chain
+    STATE_CACHE_SIZE = 100000
+
+    # Maximum number of witnesses remembered as verified, so transactions are not verified again when their block arrives
+    VERIFICATION_CACHE_SIZE = 100000
+
+    # Whether the chain keeps an index of the transactions affecting each address, which lets wallets sync without reading every block
+    ADDRESS_INDEX = False
+
     SERVICE_ENABLED = True
 
     VERSION_NAME = "/NEO-PYTHON:%s/" % __version__
@@ -200,6 +209,15 @@ class SettingsHolder:
         if 'ServiceEnabled' in config:
             self.SERVICE_ENABLED = bool(config['ServiceEnabled'])
 
+        if 'StateCacheSize' in config:
+            self.STATE_CACHE_SIZE = int(config['StateCacheSize'])
+
+        if 'VerificationCacheSize' in config:
+            self.VERIFICATION_CACHE_SIZE = int(config['VerificationCacheSize'])
+
+        if 'AddressIndex' in config:
+            self.ADDRESS_INDEX = bool(config['AddressIndex'])
+
     def setup_mainnet(self):
         """ Load settings from the mainnet JSON config file """
         self.setup(FILENAME_SETTINGS_MAINNET)
@@ -249,6 +267,21 @@ class SettingsHolder:
         except Exception as e:
             logzero.logger.error("Please supply an integer number for max peers")
 
+    def set_state_cache_size(self, size):
+        try:
+            self.STATE_CACHE_SIZE = int(size)
+        except Exception as e:
+            logzero.logger.error("Please supply an integer number for the state cache size")
+
+    def set_verification_cache_size(self, size):
+        try:
+            self.VERIFICATION_CACHE_SIZE = int(size)
+        except Exception as e:
+            logzero.logger.error("Please supply an integer number for the verification cache size")
+
+    def set_address_index(self, is_enabled=True):
+        self.ADDRESS_INDEX = is_enabled
+
     def set_log_smart_contract_events(self, is_enabled=True):
         self.log_smart_contract_events = is_enabled
 
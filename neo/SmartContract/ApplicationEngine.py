@@ -25,6 +25,35 @@ from neocore.UInt160 import UInt160
 import datetime
 from neo.Settings import settings
 
+# limits checked before an instruction is executed
+MAX_STACK_SIZE = 2 * 1024
+MAX_ITEM_SIZE = 1024 * 1024
+MAX_ARRAY_SIZE = 1024
+MAX_INVOCATION_STACK_SIZE = 1024
+
+# prices of the SYSCALLs that neither depend on the evaluation stack nor on the gas ratio
+SYSCALL_PRICES = {
+    "Neo.Runtime.CheckWitness": 200,
+    "Neo.Blockchain.GetHeader": 100,
+    "Neo.Blockchain.GetBlock": 200,
+    "Neo.Runtime.GetTime": 100,
+    "Neo.Blockchain.GetTransaction": 100,
+    "Neo.Blockchain.GetAccount": 100,
+    "Neo.Blockchain.GetValidators": 200,
+    "Neo.Blockchain.GetAsset": 100,
+    "Neo.Blockchain.GetContract": 100,
+    "Neo.Transaction.GetReferences": 200,
+    "Neo.Transaction.GetUnspentCoins": 200,
+    "Neo.Account.SetVotes": 1000,
+    "Neo.Storage.Get": 100,
+    "Neo.Storage.Delete": 100,
+}
+
+# SYSCALLs priced from the evaluation stack
+DYNAMIC_SYSCALLS = frozenset(["Neo.Asset.Renew", "Neo.Contract.Create", "Neo.Contract.Migrate", "Neo.Storage.Put"])
+
+_CHECKMULTISIG = CHECKMULTISIG[0]
+
 
 class ApplicationEngine(ExecutionEngine):
 
@@ -38,6 +67,10 @@ class ApplicationEngine(ExecutionEngine):
 
     invocation_args = None
 
+    # see `_BuildPriceTable` and `_BuildPreCheckTable`
+    _PriceTable = None
+    _PreCheckTable = None
+
     def GasConsumed(self):
         return Fixed8(self.gas_consumed)
 
@@ -51,7 +84,6 @@ class ApplicationEngine(ExecutionEngine):
 
     def CheckArraySize(self):
 
-        maxArraySize = 1024
         cx = self.CurrentContext
 
         if cx.InstructionPointer >= len(cx.Script):
@@ -63,7 +95,7 @@ class ApplicationEngine(ExecutionEngine):
 
             size = self.EvaluationStack.Peek().GetBigInteger()
 
-            if size > maxArraySize:
+            if size > MAX_ARRAY_SIZE:
                 logger.error("ARRAY SIZE TOO BIG!!!")
                 return False
 
@@ -73,7 +105,6 @@ class ApplicationEngine(ExecutionEngine):
 
     def CheckInvocationStack(self):
 
-        maxInvocationStackSize = 1024
         cx = self.CurrentContext
 
         if cx.InstructionPointer >= len(cx.Script):
@@ -82,7 +113,7 @@ class ApplicationEngine(ExecutionEngine):
         opcode = cx.NextInstruction
 
         if opcode == CALL or opcode == APPCALL:
-            if self.InvocationStack.Count >= maxInvocationStackSize:
+            if self.InvocationStack.Count >= MAX_INVOCATION_STACK_SIZE:
                 logger.error("INVOCATION STACK TOO BIG, RETURN FALSE")
                 return False
 
@@ -92,7 +123,6 @@ class ApplicationEngine(ExecutionEngine):
 
     def CheckItemSize(self):
 
-        maxItemSize = 1024 * 1024
         cx = self.CurrentContext
 
         if cx.InstructionPointer >= len(cx.Script):
@@ -111,7 +141,7 @@ class ApplicationEngine(ExecutionEngine):
             lengthpointer = cx.Script[position:position + 4]
             length = int.from_bytes(lengthpointer, 'little')
 
-            if length > maxItemSize:
+            if length > MAX_ITEM_SIZE:
                 logger.error("ITEM IS GREATER THAN MAX ITEM SIZE!")
                 return False
 
@@ -131,7 +161,7 @@ class ApplicationEngine(ExecutionEngine):
                 logger.error("COULD NOT GET STR LENGTH!")
                 raise e
 
-            if length > maxItemSize:
+            if length > MAX_ITEM_SIZE:
                 logger.error("ITEM IS GREATER THAN MAX SIZE!!!")
                 return False
 
@@ -141,7 +171,6 @@ class ApplicationEngine(ExecutionEngine):
 
     def CheckStackSize(self):
 
-        maxStackSize = 2 * 1024
         cx = self.CurrentContext
 
         if cx.InstructionPointer >= len(cx.Script):
@@ -174,7 +203,7 @@ class ApplicationEngine(ExecutionEngine):
 
         size += self.EvaluationStack.Count + self.AltStack.Count
 
-        if size > maxStackSize:
+        if size > MAX_STACK_SIZE:
             logger.error("SIZE IS OVER MAX STACK SIZE!!!!")
             return False
 
@@ -189,16 +218,9 @@ class ApplicationEngine(ExecutionEngine):
         opcode = cx.NextInstruction
 
         if opcode == APPCALL:
-            opreader = cx.OpReader
-            # read the current position of the stream
-            start_pos = opreader.stream.tell()
-
-            # normal app calls are stored in the op reader
+            # normal app calls are stored in the script
             # we read ahead past the next instruction 1 the next 20 bytes
-            script_hash = opreader.ReadBytes(21)[1:]
-
-            # then reset the position
-            opreader.stream.seek(start_pos)
+            script_hash = cx.Script[cx.InstructionPointer + 1:cx.InstructionPointer + 21]
 
             for b in script_hash:
                 # if any of the bytes are greater than 0, this is a normal app call
@@ -218,12 +240,24 @@ class ApplicationEngine(ExecutionEngine):
     # @profile_it
     def Execute(self):
         def loop_validation_and_stepinto():
+            prices = self._PriceTable
+            checks = self._PreCheckTable
+
             while self._VMState & VMState.HALT == 0 and self._VMState & VMState.FAULT == 0:
 
+                op = None
+
                 try:
+                    cx = self.CurrentContext
+                    ip = cx.InstructionPointer
 
-                    self.gas_consumed = self.gas_consumed + (self.GetPrice() * self.ratio)
-                #                print("gas consumeb: %s " % self.gas_consumed)
+                    if ip < len(cx.Script):
+                        op = cx.Script[ip]
+                        price = prices[op]
+                        if price is None:
+                            price = self._GetDynamicPrice(op, cx, ip)
+
+                        self.gas_consumed = self.gas_consumed + (price * self.ratio)
                 except Exception as e:
                     logger.debug("Exception calculating gas consumed %s " % e)
                     self._VMState |= VMState.FAULT
@@ -234,30 +268,12 @@ class ApplicationEngine(ExecutionEngine):
                     self._VMState |= VMState.FAULT
                     return False
 
-                if not self.CheckItemSize():
-                    logger.debug("ITEM SIZE TOO BIG")
-                    self._VMState |= VMState.FAULT
-                    return False
-
-                if not self.CheckStackSize():
-                    logger.debug("STACK SIZE TOO BIG")
-                    self._VMState |= VMState.FAULT
-                    return False
-
-                if not self.CheckArraySize():
-                    logger.debug("ARRAY SIZE TOO BIG")
-                    self._VMState |= VMState.FAULT
-                    return False
-
-                if not self.CheckInvocationStack():
-                    logger.debug("INVOCATION SIZE TO BIIG")
-                    self._VMState |= VMState.FAULT
-                    return False
-
-                if not self.CheckDynamicInvoke():
-                    logger.debug("Dynamic invoke without proper contract")
-                    self._VMState |= VMState.FAULT
-                    return False
+                if op is not None:
+                    check = checks[op]
+                    if check is not None and not check(self, cx, ip):
+                        logger.debug("LIMIT CHECK FAILED FOR OPCODE %s" % op)
+                        self._VMState |= VMState.FAULT
+                        return False
 
                 self.StepInto()
 
@@ -270,7 +286,178 @@ class ApplicationEngine(ExecutionEngine):
 
         return not self._VMState & VMState.FAULT > 0
 
+    def _GetDynamicPrice(self, op, cx, ip):
+        """
+        Get the price of an instruction that depends on its operand or the evaluation stack.
+
+        Args:
+            op (int): the opcode, CHECKMULTISIG or SYSCALL.
+            cx (neo.VM.ExecutionContext.ExecutionContext): the current context.
+            ip (int): position of the instruction.
+
+        Returns:
+            int: the price.
+        """
+        if op == _CHECKMULTISIG:
+            if self.EvaluationStack.Count == 0:
+                return 1
+            n = self.EvaluationStack.Peek().GetBigInteger()
+
+            if n < 1:
+                return 1
+
+            return 100 * n
+
+        # the price of a SYSCALL only depends on its name, which is resolved once per script position
+        prices = cx.Decoded.SysCallPrices
+        price = prices.get(ip)
+
+        if price is None:
+            price = self._ResolveSysCallPrice(cx.Script, ip)
+            prices[ip] = price
+
+        if type(price) is str:
+            return self._GetDynamicSysCallPrice(price)
+
+        return price
+
+    def _ResolveSysCallPrice(self, script, ip):
+        """
+        Get the price of the SYSCALL at a position.
+
+        Args:
+            script (bytes): the script.
+            ip (int): position of the SYSCALL.
+
+        Returns:
+            int: the price, or str: the API name if the price depends on the evaluation stack.
+        """
+        if ip >= len(script) - 3:
+            return 1
+
+        length = script[ip + 1]
+
+        if ip > len(script) - length - 2:
+            return 1
+
+        api = script[ip + 2:ip + 2 + length].decode('utf-8').replace('Antshares.', 'Neo.')
+
+        if api in DYNAMIC_SYSCALLS:
+            return api
+
+        elif api == "Neo.Validator.Register":
+            return int(1000 * 100000000 / self.ratio)
+
+        elif api == "Neo.Asset.Create":
+            return int(5000 * 100000000 / self.ratio)
+
+        return SYSCALL_PRICES.get(api, 1)
+
+    def _GetDynamicSysCallPrice(self, api):
+        if api == "Neo.Asset.Renew":
+            return int(self.EvaluationStack.Peek(1).GetBigInteger() * 5000 * 100000000 / self.ratio)
+
+        elif api == "Neo.Storage.Put":
+            l1 = len(self.EvaluationStack.Peek(1).GetByteArray())
+            l2 = len(self.EvaluationStack.Peek(2).GetByteArray())
+            return (int((l1 + l2 - 1) / 1024) + 1) * 1000
+
+        # Neo.Contract.Create and Neo.Contract.Migrate
+        fee = int(100 * 100000000 / self.ratio)
+
+        contract_properties = self.EvaluationStack.Peek(3).GetBigInteger()
+
+        if contract_properties & ContractPropertyState.HasStorage > 0:
+            fee += int(400 * 100000000 / self.ratio)
+
+        if contract_properties & ContractPropertyState.HasDynamicInvoke > 0:
+            fee += int(500 * 100000000 / self.ratio)
+
+        return fee
+
+    def _CheckStackGrowth(self, size):
+        if size + self.EvaluationStack.Count + self.AltStack.Count > MAX_STACK_SIZE:
+            logger.error("SIZE IS OVER MAX STACK SIZE!!!!")
+            return False
+        return True
+
+    def _CheckPush(self, cx, ip):
+        return self._CheckStackGrowth(1)
+
+    def _CheckPushData4(self, cx, ip):
+        if ip + 4 >= len(cx.Script):
+            return False
+
+        length = int.from_bytes(cx.Script[ip + 1:ip + 5], 'little')
+
+        if length > MAX_ITEM_SIZE:
+            logger.error("ITEM IS GREATER THAN MAX ITEM SIZE!")
+            return False
+
+        return self._CheckStackGrowth(1)
+
+    def _CheckCat(self, cx, ip):
+        if self.EvaluationStack.Count < 2:
+            logger.error("NOT ENOUGH ITEMS TO CONCAT")
+            return False
+
+        length = len(self.EvaluationStack.Peek(0).GetByteArray()) + len(self.EvaluationStack.Peek(1).GetByteArray())
+
+        if length > MAX_ITEM_SIZE:
+            logger.error("ITEM IS GREATER THAN MAX SIZE!!!")
+            return False
+
+        return True
+
+    def _CheckUnpack(self, cx, ip):
+        # the same accounting as CheckStackSize. Stack items have no IsArray, so this raises and Execute
+        # raises with it, which decides the outcome of transactions using UNPACK. Keep it in sync with the reference.
+        item = self.EvaluationStack.Peek()
+
+        if not item.IsArray:
+            logger.error("ITEM NOT ARRAY:")
+            return False
+
+        size = len(item.GetArray())
+        if size == 0:
+            return True
+
+        return self._CheckStackGrowth(size)
+
+    def _CheckNewArray(self, cx, ip):
+        if self.EvaluationStack.Peek().GetBigInteger() > MAX_ARRAY_SIZE:
+            logger.error("ARRAY SIZE TOO BIG!!!")
+            return False
+        return True
+
+    def _CheckCall(self, cx, ip):
+        if self.InvocationStack.Count >= MAX_INVOCATION_STACK_SIZE:
+            logger.error("INVOCATION STACK TOO BIG, RETURN FALSE")
+            return False
+        return True
+
+    def _CheckAppCall(self, cx, ip):
+        if not self._CheckCall(cx, ip):
+            return False
+
+        for b in cx.Script[ip + 1:ip + 21]:
+            # if any of the bytes are greater than 0, this is a normal app call
+            if b > 0:
+                return True
+
+        # a dynamic app call needs a contract that allows it
+        current = UInt160(data=cx.ScriptHash())
+        return self._Table.GetContractState(current.ToBytes()).HasDynamicInvoke
+
     def GetPrice(self):
+        """
+        Get the price of the next instruction.
+
+        `Execute` uses the precomputed price table instead, this is the reference it is tested against.
+
+        Returns:
+            int: the price.
+        """
 
         if self.CurrentContext.InstructionPointer >= len(self.CurrentContext.Script):
             return 0
@@ -412,11 +599,11 @@ class ApplicationEngine(ExecutionEngine):
         bc = Blockchain.Default()
         sn = bc._db.snapshot()
 
-        accounts = DBCollection(bc._db, sn, DBPrefix.ST_Account, AccountState)
-        assets = DBCollection(bc._db, sn, DBPrefix.ST_Asset, AssetState)
-        validators = DBCollection(bc._db, sn, DBPrefix.ST_Validator, ValidatorState)
-        contracts = DBCollection(bc._db, sn, DBPrefix.ST_Contract, ContractState)
-        storages = DBCollection(bc._db, sn, DBPrefix.ST_Storage, StorageItem)
+        accounts = DBCollection(bc._db, sn, DBPrefix.ST_Account, AccountState, bc.BinaryFormat, bc.StateCache)
+        assets = DBCollection(bc._db, sn, DBPrefix.ST_Asset, AssetState, bc.BinaryFormat, bc.StateCache)
+        validators = DBCollection(bc._db, sn, DBPrefix.ST_Validator, ValidatorState, bc.BinaryFormat, bc.StateCache)
+        contracts = DBCollection(bc._db, sn, DBPrefix.ST_Contract, ContractState, bc.BinaryFormat, bc.StateCache)
+        storages = DBCollection(bc._db, sn, DBPrefix.ST_Storage, StorageItem, bc.BinaryFormat, bc.StateCache)
 
         script_table = CachedScriptTable(contracts)
         service = StateMachine(accounts, validators, assets, contracts, storages, None)
@@ -447,3 +634,75 @@ class ApplicationEngine(ExecutionEngine):
             events.emit(event.event_type, event)
 
         return engine
+
+
+def _BuildPriceTable():
+    """
+    Build the gas prices of the opcodes, indexed by the opcode byte.
+
+    Returns:
+        list: 256 prices, None for the opcodes that are priced by `ApplicationEngine._GetDynamicPrice`.
+    """
+    table = [1] * 256
+
+    for op in range(0, PUSH16[0] + 1):
+        table[op] = 0
+
+    prices = {
+        NOP: 0,
+        APPCALL: 10,
+        TAILCALL: 10,
+        SYSCALL: None,
+        SHA1: 10,
+        SHA256: 10,
+        HASH160: 20,
+        HASH256: 20,
+        CHECKSIG: 100,
+        CHECKMULTISIG: None,
+    }
+
+    for opcode, price in prices.items():
+        table[opcode[0]] = price
+
+    return table
+
+
+def _BuildPreCheckTable():
+    """
+    Build the limit checks run before an instruction, indexed by the opcode byte.
+
+    Returns:
+        list: 256 functions taking (engine, context, instruction pointer) and returning False if a limit is exceeded,
+              None for the opcodes without checks.
+    """
+    E = ApplicationEngine
+
+    table = [None] * 256
+
+    # every push grows the stack by one item
+    for op in range(0, PUSH16[0]):
+        table[op] = E._CheckPush
+
+    checks = {
+        PUSHDATA4: E._CheckPushData4,
+        DEPTH: E._CheckPush,
+        DUP: E._CheckPush,
+        OVER: E._CheckPush,
+        TUCK: E._CheckPush,
+        UNPACK: E._CheckUnpack,
+        CAT: E._CheckCat,
+        PACK: E._CheckNewArray,
+        NEWARRAY: E._CheckNewArray,
+        NEWSTRUCT: E._CheckNewArray,
+        CALL: E._CheckCall,
+        APPCALL: E._CheckAppCall,
+    }
+
+    for opcode, check in checks.items():
+        table[opcode[0]] = check
+
+    return table
+
+
+ApplicationEngine._PriceTable = _BuildPriceTable()
+ApplicationEngine._PreCheckTable = _BuildPreCheckTable()
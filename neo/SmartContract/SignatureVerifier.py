@@ -0,0 +1,123 @@
+import binascii
+import hashlib
+
+import bitcoin
+from ecdsa import VerifyingKey, NIST256p
+from logzero import logger
+
+from neo.Network.BoundedCache import BoundedCache
+from neocore.Cryptography.Crypto import Crypto, CryptoInstance
+from neocore.Cryptography.ECCurve import EllipticCurve
+
+# verifying keys by public key, per process. Building one validates the point, which takes about half as long
+# as verifying a signature, and the same consensus and wallet keys sign block after block
+KEY_CACHE_SIZE = 10000
+_keys = BoundedCache(KEY_CACHE_SIZE)
+
+
+def _get_key(public_key):
+    """
+    Get the verifying key of a public key, building it on first use.
+
+    Args:
+        public_key (bytes): a compressed or uncompressed public key.
+
+    Returns:
+        VerifyingKey: the key or None if it is not a valid point.
+
+    Raises:
+        Exception: if a compressed key cannot be decompressed, like `Crypto.VerifySignature` does.
+    """
+    try:
+        vk = _keys[public_key]
+    except KeyError:
+        # decompressing uses the curve parameters set up by the crypto instance
+        Crypto.Default()
+
+        raw = public_key
+        try:
+            if len(raw) == 33:
+                raw = bitcoin.decompress(raw)[1:]
+        except Exception as e:
+            vk = e
+        else:
+            try:
+                vk = VerifyingKey.from_string(raw, curve=NIST256p, hashfunc=hashlib.sha256)
+            except Exception as e:
+                vk = None
+
+        _keys[public_key] = vk
+
+    if isinstance(vk, Exception):
+        raise vk.with_traceback(None)
+    return vk
+
+
+def verify_signature(message, signature, public_key, unhex=True):
+    """
+    Verify a signature like `Crypto.VerifySignature`, reusing verifying keys.
+
+    Args:
+        message (bytes): the signed message.
+        signature (bytes): the signature.
+        public_key (ECPoint|bytes): the public key.
+        unhex (bool): whether the message should be unhexlified before verifying.
+
+    Returns:
+        bool: True if the signature is valid. False otherwise.
+
+    Raises:
+        Exception: if a compressed public key cannot be decompressed, like `Crypto.VerifySignature` does.
+    """
+    if isinstance(public_key, EllipticCurve.ECPoint):
+        public_key = public_key.x.value.to_bytes(32, 'big') + public_key.y.value.to_bytes(32, 'big')
+
+    if unhex:
+        try:
+            message = binascii.unhexlify(message)
+        except Exception as e:
+            logger.error("could not get m: %s" % e)
+    elif isinstance(message, str):
+        message = message.encode('utf-8')
+
+    vk = _get_key(bytes(public_key))
+    try:
+        return vk is not None and vk.verify(bytes(signature), message, hashfunc=hashlib.sha256)
+    except Exception as e:
+        return False
+
+
+class KeyCacheCrypto(CryptoInstance):
+    """
+    Crypto that verifies signatures with `verify_signature`, reusing the verifying keys of the public keys
+    seen before.
+    """
+
+    __default = None
+
+    @staticmethod
+    def Default():
+        """
+        Get the shared instance.
+
+        Returns:
+            KeyCacheCrypto: instance.
+        """
+        if KeyCacheCrypto.__default is None:
+            KeyCacheCrypto.__default = KeyCacheCrypto()
+        return KeyCacheCrypto.__default
+
+    def VerifySignature(self, message, signature, public_key, unhex=True):
+        """
+        Verify the integrity of the message.
+
+        Args:
+            message (bytes): the message to verify.
+            signature (bytearray): the signature belonging to the message.
+            public_key (ECPoint|bytes): the public key to use for verifying the signature.
+            unhex (bool): whether the message should be unhexlified before verifying
+
+        Returns:
+            bool: True if verification passes. False otherwise.
+        """
+        return verify_signature(message, signature, public_key, unhex=unhex)
@@ -0,0 +1,119 @@
+from neo.Network.BoundedCache import BoundedCache
+from neo.Settings import settings
+
+
+class VerificationCache(BoundedCache):
+    """
+    Bounded LRU set of witnesses that passed verification, with counters of how they were verified.
+
+    A transaction is verified when it arrives from a peer, when it is relayed and again when its block arrives.
+    Only standard signature and multi-signature witnesses are kept, as other verification scripts can read
+    chain state and have to be run again.
+    Witnesses are not part of the transaction hash, so a key includes the invocation script besides the hash,
+    the witness index and the verification script hash, and a different witness for the same transaction
+    is verified on its own.
+    """
+
+    __default = None
+
+    def __init__(self, max_items):
+        """
+        Create an instance.
+
+        Args:
+            max_items (int): maximum number of cached witnesses.
+        """
+        super(VerificationCache, self).__init__(max_items)
+
+        self.Hits = 0
+        self.Misses = 0
+
+        # witnesses verified by checking their signatures directly, and by running the VM
+        self.NativeVerifications = 0
+        self.VMRuns = 0
+
+    @staticmethod
+    def Default():
+        """
+        Get the cache shared by all verifications, sized by `settings.VERIFICATION_CACHE_SIZE`.
+
+        Returns:
+            VerificationCache: instance.
+        """
+        if VerificationCache.__default is None:
+            VerificationCache.__default = VerificationCache(settings.VERIFICATION_CACHE_SIZE)
+        return VerificationCache.__default
+
+    @staticmethod
+    def Key(hash, index, verification_hash, invocation):
+        """
+        Build the key of a witness.
+
+        Args:
+            hash (bytes): hash of the verified object.
+            index (int): index of the witness.
+            verification_hash (UInt160): hash of the verification script.
+            invocation (bytes): the invocation script.
+
+        Returns:
+            tuple:
+        """
+        return hash, index, verification_hash.ToBytes(), bytes(invocation)
+
+    def Contains(self, key):
+        """
+        Check if a witness passed verification before.
+
+        Args:
+            key (tuple): see `Key`.
+
+        Returns:
+            bool:
+        """
+        if self.get(key):
+            self.Hits += 1
+            return True
+
+        self.Misses += 1
+        return False
+
+    def Add(self, key):
+        """
+        Remember a witness that passed verification.
+
+        Args:
+            key (tuple): see `Key`.
+        """
+        if self.MaxItems > 0:
+            self[key] = True
+
+    def Clear(self):
+        """
+        Remove all cached witnesses.
+        """
+        self.clear()
+
+    @property
+    def VMRunsAvoided(self):
+        """
+        Get the number of witness verifications that did not need the VM.
+
+        Returns:
+            int:
+        """
+        return self.Hits + self.NativeVerifications
+
+    def ToJson(self):
+        """
+        Convert object members to a dictionary that can be parsed as JSON.
+
+        Returns:
+             dict:
+        """
+        json = super(VerificationCache, self).ToJson()
+        json['hits'] = self.Hits
+        json['misses'] = self.Misses
+        json['native_verifications'] = self.NativeVerifications
+        json['vm_runs'] = self.VMRuns
+        json['vm_runs_avoided'] = self.VMRunsAvoided
+        return json
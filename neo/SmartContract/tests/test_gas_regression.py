@@ -0,0 +1,155 @@
+from unittest import TestCase
+from neo.Utils.BlockchainFixtureTestCase import BlockchainFixtureTestCase
+from neo.SmartContract.ApplicationEngine import ApplicationEngine
+from neo.SmartContract.StateMachine import StateMachine
+from neo.SmartContract import TriggerType
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.CachedScriptTable import CachedScriptTable
+from neo.Core.State.ContractState import ContractState
+from neo.Core.State.AssetState import AssetState
+from neo.Core.State.AccountState import AccountState
+from neo.Core.State.ValidatorState import ValidatorState
+from neo.Core.State.StorageItem import StorageItem
+from neo.Core.TX.Transaction import TransactionType
+from neo.VM import VMState
+from neo.VM import OpCode
+from neocore.Fixed8 import Fixed8
+from neo.Settings import settings
+import binascii
+import os
+
+
+class ReferenceApplicationEngine(ApplicationEngine):
+    """
+    Runs the price calculation and every limit check before each step, like the engine did before
+    they were folded into per-opcode tables.
+    """
+
+    def Execute(self):
+        while self._VMState & VMState.HALT == 0 and self._VMState & VMState.FAULT == 0:
+
+            try:
+                self.gas_consumed = self.gas_consumed + (self.GetPrice() * self.ratio)
+            except Exception as e:
+                self._VMState |= VMState.FAULT
+                return False
+
+            if not self.testMode and self.gas_consumed > self.gas_amount:
+                self._VMState |= VMState.FAULT
+                return False
+
+            if not self.CheckItemSize() or not self.CheckStackSize() or not self.CheckArraySize() or \
+                    not self.CheckInvocationStack() or not self.CheckDynamicInvoke():
+                self._VMState |= VMState.FAULT
+                return False
+
+            self.StepInto()
+
+        return not self._VMState & VMState.FAULT > 0
+
+
+def run_script(engine_class, script):
+    engine = engine_class(TriggerType.Application, None, None, None, Fixed8.Zero(), testMode=True, exit_on_error=True)
+    engine.LoadScript(script, False)
+
+    try:
+        engine.Execute()
+    except Exception as e:
+        return type(e), None, None, None
+
+    stack = [str(item) for item in engine.EvaluationStack.Items]
+    return engine.State, engine.gas_consumed, engine.ops_processed, stack
+
+
+class StackCheckRegressionTestCase(TestCase):
+    """
+    Compares the per-opcode stack checks with the reference checks on scripts that do not need a chain.
+    """
+
+    SCRIPTS = [
+        OpCode.PUSH1 + OpCode.PUSH2 + OpCode.PUSH2 + OpCode.PACK + OpCode.UNPACK,
+        OpCode.PUSH0 + OpCode.NEWARRAY + OpCode.UNPACK,
+        OpCode.PUSH1 + OpCode.UNPACK,
+        OpCode.UNPACK,
+        OpCode.PUSH1 + OpCode.DUP + OpCode.DEPTH + OpCode.OVER + OpCode.TUCK,
+    ]
+
+    def test_stack_checks_match_reference(self):
+        for script in self.SCRIPTS:
+            expected = run_script(ReferenceApplicationEngine, script)
+            actual = run_script(ApplicationEngine, script)
+
+            self.assertEqual(actual, expected, "script %s" % script.hex())
+
+    def test_unpack_raises_like_reference(self):
+        script = OpCode.PUSH1 + OpCode.PUSH2 + OpCode.PUSH2 + OpCode.PACK + OpCode.UNPACK
+        self.assertEqual(run_script(ApplicationEngine, script)[0], AttributeError)
+
+
+class GasRegressionTestCase(BlockchainFixtureTestCase):
+    """
+    Replays the invocation transactions of the fixture chain and compares the gas, state and result stack
+    of the engine with the reference implementation.
+    """
+
+    MAX_TRANSACTIONS = 250
+
+    @classmethod
+    def leveldb_testpath(cls):
+        return os.path.join(settings.DATA_DIR_PATH, 'fixtures/test_chain')
+
+    def invocation_transactions(self):
+        chain = self._blockchain
+
+        for key in chain._db.iterator(prefix=DBPrefix.DATA_Transaction, include_value=False):
+            tx_hash = binascii.hexlify(key[1:]) if chain.BinaryFormat else key[1:]
+            tx, height = chain.GetTransaction(tx_hash)
+            if tx.Type == TransactionType.InvocationTransaction:
+                yield tx
+
+    def run_engine(self, engine_class, tx):
+        chain = self._blockchain
+        sn = chain._db.snapshot()
+
+        accounts = DBCollection(chain._db, sn, DBPrefix.ST_Account, AccountState, chain.BinaryFormat)
+        assets = DBCollection(chain._db, sn, DBPrefix.ST_Asset, AssetState, chain.BinaryFormat)
+        validators = DBCollection(chain._db, sn, DBPrefix.ST_Validator, ValidatorState, chain.BinaryFormat)
+        contracts = DBCollection(chain._db, sn, DBPrefix.ST_Contract, ContractState, chain.BinaryFormat)
+        storages = DBCollection(chain._db, sn, DBPrefix.ST_Storage, StorageItem, chain.BinaryFormat)
+
+        service = StateMachine(accounts, validators, assets, contracts, storages, None)
+
+        engine = engine_class(
+            trigger_type=TriggerType.Application,
+            container=tx,
+            table=CachedScriptTable(contracts),
+            service=service,
+            gas=tx.Gas,
+            testMode=False,
+            exit_on_error=True
+        )
+        engine.LoadScript(tx.Script, False)
+
+        try:
+            engine.Execute()
+        except Exception as e:
+            return type(e), None, None, None
+
+        stack = [str(item) for item in engine.EvaluationStack.Items]
+        return engine.State, engine.gas_consumed, engine.ops_processed, stack
+
+    def test_gas_matches_reference(self):
+        count = 0
+
+        for tx in self.invocation_transactions():
+            expected = self.run_engine(ReferenceApplicationEngine, tx)
+            actual = self.run_engine(ApplicationEngine, tx)
+
+            self.assertEqual(actual, expected, "transaction %s" % tx.Hash.ToString())
+
+            count += 1
+            if count == self.MAX_TRANSACTIONS:
+                break
+
+        self.assertGreater(count, 0)
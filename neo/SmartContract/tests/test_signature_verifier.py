@@ -0,0 +1,35 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Core.Helper import Helper
+from neo.Core.test_helper import SignedMessage, run_witness
+from neo.SmartContract.SignatureVerifier import KeyCacheCrypto, verify_signature
+from neocore.Cryptography.Crypto import Crypto
+import binascii
+
+
+class SignatureVerifierTestCase(NeoTestCase):
+
+    def test_verify_signature(self):
+        message = binascii.hexlify(b'abcdef')
+        pubkey = binascii.unhexlify(SignedMessage.PUBKEY)
+        crypto = Crypto.Default()
+
+        for sig, key in [(SignedMessage.SIG, pubkey), (bytes(64), pubkey), (SignedMessage.SIG, pubkey[1:])]:
+            self.assertEqual(verify_signature(message, sig, key), crypto.VerifySignature(message, sig, key))
+
+        # keys that cannot be decompressed raise like they do with Crypto, also when the key is cached
+        for i in range(2):
+            with self.assertRaises(Exception):
+                verify_signature(message, SignedMessage.SIG, bytes(33))
+        with self.assertRaises(Exception):
+            crypto.VerifySignature(message, SignedMessage.SIG, bytes(33))
+
+    def test_malformed_key_fails_multisig(self):
+        # 1 of 2 multi-signature with a valid key and a key that cannot be decompressed, checked first by CHECKMULTISIG
+        pubkey = binascii.unhexlify(SignedMessage.PUBKEY)
+        verification = b'\x51\x21' + pubkey + b'\x21\x05' + bytes(32) + b'\x52\xae'
+        message = SignedMessage(b'\x40' + SignedMessage.SIG, verification)
+        witness = message.Scripts[0]
+
+        self.assertFalse(run_witness(message, witness, Crypto.Default()))
+        self.assertFalse(Helper.VerifyStandardWitness(message, witness.InvocationScript, verification))
+        self.assertFalse(run_witness(message, witness, KeyCacheCrypto.Default()))
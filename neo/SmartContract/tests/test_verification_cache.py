@@ -0,0 +1,30 @@
+from unittest import TestCase
+from neo.SmartContract.VerificationCache import VerificationCache
+
+
+class VerificationCacheTestCase(TestCase):
+
+    def test_lru(self):
+        cache = VerificationCache(2)
+        cache.Add(('a', 0))
+        cache.Add(('b', 0))
+
+        self.assertTrue(cache.Contains(('a', 0)))
+        cache.Add(('c', 0))
+
+        # the least recently used witness is dropped
+        self.assertFalse(cache.Contains(('b', 0)))
+        self.assertTrue(cache.Contains(('a', 0)))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.ToJson()['hits'], 2)
+        self.assertEqual(cache.ToJson()['misses'], 1)
+        self.assertEqual(cache.ToJson()['evictions'], 1)
+
+        cache.Clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_disabled(self):
+        cache = VerificationCache(0)
+        cache.Add(('a', 0))
+        self.assertFalse(cache.Contains(('a', 0)))
+        self.assertEqual(len(cache), 0)
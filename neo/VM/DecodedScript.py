@@ -0,0 +1,188 @@
+from collections import OrderedDict
+
+from neo.VM.OpCode import PUSHBYTES75, PUSHDATA1, PUSHDATA2, PUSHDATA4, JMP, JMPIF, JMPIFNOT, CALL, APPCALL, \
+    TAILCALL, SYSCALL
+
+# single byte opcode objects, so decoding never allocates them
+OPCODES = tuple(bytes([i]) for i in range(256))
+
+_PUSHBYTES75 = PUSHBYTES75[0]
+_PUSHDATA1 = PUSHDATA1[0]
+_PUSHDATA2 = PUSHDATA2[0]
+_PUSHDATA4 = PUSHDATA4[0]
+_JUMPS = {JMP[0], JMPIF[0], JMPIFNOT[0], CALL[0]}
+_APPCALLS = {APPCALL[0], TAILCALL[0]}
+_SYSCALL = SYSCALL[0]
+
+# the maximum length of a SYSCALL name
+MAX_SYSCALL_LENGTH = 252
+
+
+class DecodedScript:
+    """
+    A script decoded into instructions, so it can be executed by indexing instead of reading from a stream.
+
+    `Opcodes`, `Operands` and `NextIPs` are indexed by the instruction position in the script.
+    The script is decoded linearly from its start once, positions that are only reached by a jump into the
+    middle of an instruction are decoded when they are first executed.
+
+    Decoded scripts are shared by all engines through a bounded cache keyed by script hash.
+    """
+
+    # maximum number of cached scripts
+    MaxItems = 1000
+
+    _cache = OrderedDict()
+
+    def __init__(self, script):
+        """
+        Create an instance.
+
+        Args:
+            script (bytes): the script to decode.
+        """
+        script = bytes(script)
+        self.Script = script
+
+        length = len(script)
+        self.Opcodes = [None] * length
+        self.Operands = [None] * length
+        self.NextIPs = [None] * length
+
+        # gas price of the SYSCALL at a position, filled by the ApplicationEngine when it is first run
+        self.SysCallPrices = {}
+
+        ip = 0
+        while ip < length:
+            try:
+                ip = self._Decode(ip)
+            except Exception:
+                # a truncated instruction only fails once it is executed
+                break
+
+    @classmethod
+    def Get(cls, script_hash, script):
+        """
+        Get the decoded form of a script, decoding it if it is not cached.
+
+        Args:
+            script_hash (bytes): hash of the script.
+            script (bytes): the script.
+
+        Returns:
+            DecodedScript:
+        """
+        decoded = cls._cache.get(script_hash)
+
+        if decoded is not None:
+            cls._cache.move_to_end(script_hash)
+            return decoded
+
+        decoded = DecodedScript(script)
+
+        cls._cache[script_hash] = decoded
+        if len(cls._cache) > cls.MaxItems:
+            cls._cache.popitem(last=False)
+
+        return decoded
+
+    @classmethod
+    def ClearCache(cls):
+        """
+        Remove all cached scripts.
+        """
+        cls._cache.clear()
+
+    def GetInstruction(self, ip):
+        """
+        Get the instruction at a position.
+
+        Args:
+            ip (int): position of the instruction, must be inside the script.
+
+        Returns:
+            tuple: the opcode (bytes), the operand and the position of the next instruction (int).
+
+        Raises:
+            Exception: if the operand of the instruction is truncated or invalid.
+        """
+        next_ip = self.NextIPs[ip]
+
+        if next_ip is None:
+            next_ip = self._Decode(ip)
+
+        return self.Opcodes[ip], self.Operands[ip], next_ip
+
+    def _Decode(self, ip):
+        script = self.Script
+        op = script[ip]
+        pos = ip + 1
+        operand = None
+
+        if op <= _PUSHBYTES75:
+            # like reading from a stream, a truncated push gets the remaining bytes
+            if op > 0:
+                operand = script[pos:pos + op]
+                pos = min(pos + op, len(script))
+
+        elif op == _PUSHDATA1:
+            length = self._ReadByte(pos)
+            pos += 1
+            operand = script[pos:pos + length]
+            pos = min(pos + length, len(script))
+
+        elif op == _PUSHDATA2:
+            length = self._ReadInt(pos, 2)
+            pos += 2
+            operand = script[pos:pos + length]
+            pos = min(pos + length, len(script))
+
+        elif op == _PUSHDATA4:
+            length = self._ReadInt(pos, 4)
+            pos += 4
+            operand = script[pos:pos + length]
+            pos = min(pos + length, len(script))
+
+        elif op in _JUMPS:
+            operand = self._ReadInt(pos, 2, signed=True)
+            pos += 2
+
+        elif op in _APPCALLS:
+            operand = script[pos:pos + 20]
+            pos = min(pos + 20, len(script))
+
+        elif op == _SYSCALL:
+            length = self._ReadByte(pos)
+            pos += 1
+            if length == 0xfd:
+                length = self._ReadInt(pos, 2)
+                pos += 2
+            elif length == 0xfe:
+                length = self._ReadInt(pos, 4)
+                pos += 4
+            elif length == 0xff:
+                length = self._ReadInt(pos, 8)
+                pos += 8
+
+            if length > MAX_SYSCALL_LENGTH:
+                raise Exception("Invalid format")
+
+            operand = script[pos:pos + length]
+            pos = min(pos + length, len(script))
+
+        self.Opcodes[ip] = OPCODES[op]
+        self.Operands[ip] = operand
+        self.NextIPs[ip] = pos
+
+        return pos
+
+    def _ReadByte(self, pos):
+        # like BinaryReader.ReadByte, reading past the end gives 0 instead of failing
+        if pos >= len(self.Script):
+            return 0
+        return self.Script[pos]
+
+    def _ReadInt(self, pos, size, signed=False):
+        if pos + size > len(self.Script):
+            raise Exception("Unexpected end of script at %s" % pos)
+        return int.from_bytes(self.Script[pos:pos + size], 'little', signed=signed)
@@ -1,5 +1,5 @@
-from neo.IO.MemoryStream import StreamManager
-from neocore.IO.BinaryReader import BinaryReader
+from neo.VM.DecodedScript import DecodedScript, OPCODES
+from neo.VM.OpCode import RET
 from neocore.UInt160 import UInt160
 
 
@@ -11,26 +11,40 @@ class ExecutionContext:
 
     PushOnly = False
 
-    __OpReader = None
+    Breakpoints = None
 
-    __mstream = None
+    # operand of the instruction being executed
+    Operand = None
 
-    Breakpoints = None
+    _decoded = None
 
-    @property
-    def OpReader(self):
-        return self.__OpReader
+    _ip = 0
 
     @property
     def InstructionPointer(self):
-        return self.__OpReader.stream.tell()
+        return self._ip
 
     def SetInstructionPointer(self, value):
-        self.__OpReader.stream.seek(value)
+        self._ip = value
 
     @property
     def NextInstruction(self):
-        return self.Script[self.__OpReader.stream.tell()].to_bytes(1, 'little')
+        return OPCODES[self.Script[self._ip]]
+
+    @property
+    def Decoded(self):
+        """
+        Get the decoded form of the script.
+
+        Returns:
+            neo.VM.DecodedScript.DecodedScript:
+        """
+        if self._decoded is None:
+            if self._Engine is not None and self._Engine.Crypto is not None:
+                self._decoded = DecodedScript.Get(self.ScriptHash(), self.Script)
+            else:
+                self._decoded = DecodedScript(self.Script)
+        return self._decoded
 
     _script_hash = None
 
@@ -39,21 +53,44 @@ class ExecutionContext:
             self._script_hash = self._Engine.Crypto.Hash160(self.Script)
         return self._script_hash
 
-    def __init__(self, engine=None, script=None, push_only=False, break_points=set()):
+    def __init__(self, engine=None, script=None, push_only=False, break_points=set(), decoded=None):
         self._Engine = engine
         self.Script = script
         self.PushOnly = push_only
         self.Breakpoints = break_points
-        self.__mstream = StreamManager.GetStream(self.Script)
-        self.__OpReader = BinaryReader(self.__mstream)
+        self._ip = 0
+        self._decoded = decoded
+
+    def ReadInstruction(self):
+        """
+        Read the instruction at the instruction pointer and move the pointer past it.
+        The operand of the instruction is stored in `Operand`.
+
+        Returns:
+            bytes: the opcode, RET if the end of the script is reached.
+        """
+        ip = self._ip
+
+        if ip >= len(self.Script):
+            self.Operand = None
+            return RET
+
+        try:
+            opcode, self.Operand, self._ip = self.Decoded.GetInstruction(ip)
+        except Exception:
+            # skip the rest of a script ending in a truncated instruction
+            self._ip = len(self.Script)
+            raise
+
+        return opcode
 
     def Clone(self):
 
-        context = ExecutionContext(self._Engine, self.Script, self.PushOnly, self.Breakpoints)
+        context = ExecutionContext(self._Engine, self.Script, self.PushOnly, self.Breakpoints, self._decoded)
         context.SetInstructionPointer(self.InstructionPointer)
+        context.Operand = self.Operand
 
         return context
 
     def Dispose(self):
-        self.__OpReader = None
-        StreamManager.ReleaseStream(self.__mstream)
+        self._decoded = None
@@ -6,13 +6,18 @@ from logzero import logger
 from neo.VM.RandomAccessStack import RandomAccessStack
 from neo.VM.ExecutionContext import ExecutionContext
 from neo.VM import VMState
-from neo.VM.InteropService import Array, Struct, CollectionMixin, Map, Boolean
+from neo.VM.InteropService import StackItem, Array, Struct, CollectionMixin, Map
 from neocore.UInt160 import UInt160
 from neo.Settings import settings
 from neo.VM.VMFault import VMFault
 from neo.Prompt.vm_debugger import VMDebugger
 from logging import DEBUG as LOGGING_LEVEL_DEBUG
 
+# integer values of the opcodes checked on every instruction
+_PUSH1 = PUSH1[0]
+_PUSH16 = PUSH16[0]
+_RET = RET[0]
+
 
 class ExecutionEngine:
     _Table = None
@@ -41,6 +46,9 @@ class ExecutionEngine:
     _debug_map = None
     _vm_debugger = None
 
+    # opcode handlers indexed by the opcode byte, see `_BuildOpTable`
+    _OpTable = None
+
     def write_log(self, message):
         """
         Write a line to the VM instruction log file.
@@ -139,765 +147,771 @@ class ExecutionEngine:
             loop_stepinto()
 
     def ExecuteOp(self, opcode, context):
-        estack = self._EvaluationStack
-        istack = self._InvocationStack
-        astack = self._AltStack
-
-        if opcode > PUSH16 and opcode != RET and context.PushOnly:
-            return self.VM_FAULT_and_report(VMFault.UNKNOWN1)
-
-        if opcode >= PUSHBYTES1 and opcode <= PUSHBYTES75:
-            bytestoread = context.OpReader.ReadBytes(int.from_bytes(opcode, 'little'))
-            estack.PushT(bytestoread)
-        else:
-
-            # push values
-            pushops = [PUSHM1, PUSH1, PUSH2, PUSH3, PUSH4, PUSH5, PUSH6, PUSH7, PUSH8,
-                       PUSH9, PUSH10, PUSH11, PUSH12, PUSH13, PUSH14, PUSH15, PUSH16]
-
-            if opcode == PUSH0:
-                estack.PushT(bytearray(0))
-
-            elif opcode == PUSHDATA1:
-                lenngth = context.OpReader.ReadByte()
-                estack.PushT(bytearray(context.OpReader.ReadBytes(lenngth)))
-            elif opcode == PUSHDATA2:
-                estack.PushT(context.OpReader.ReadBytes(context.OpReader.ReadUInt16()))
-            elif opcode == PUSHDATA4:
-                estack.PushT(context.OpReader.ReadBytes(context.OpReader.ReadUInt32()))
-            elif opcode in pushops:
-                # EvaluationStack.Push((int)opcode - (int)OpCode.PUSH1 + 1);
-                topush = int.from_bytes(opcode, 'little') - int.from_bytes(PUSH1, 'little') + 1
-                estack.PushT(topush)
-
-            # control
-            elif opcode == NOP:
-                pass
-            elif opcode in [JMP, JMPIF, JMPIFNOT]:
-                offset_b = context.OpReader.ReadInt16()
-                offset = context.InstructionPointer + offset_b - 3
-
-                if offset < 0 or offset > len(context.Script):
-                    return self.VM_FAULT_and_report(VMFault.INVALID_JUMP)
-
-                fValue = True
-                if opcode > JMP:
-                    fValue = estack.Pop().GetBoolean()
-                    if opcode == JMPIFNOT:
-                        fValue = not fValue
-                if fValue:
-                    context.SetInstructionPointer(offset)
-
-            elif opcode == CALL:
-                istack.PushT(context.Clone())
-                context.SetInstructionPointer(context.InstructionPointer + 2)
-
-                self.ExecuteOp(JMP, self.CurrentContext)
-
-            elif opcode == RET:
-                istack.Pop().Dispose()
-                if istack.Count == 0:
-                    self._VMState |= VMState.HALT
-
-            elif opcode == APPCALL or opcode == TAILCALL:
-                if self._Table is None:
-                    return self.VM_FAULT_and_report(VMFault.UNKNOWN2)
-
-                script_hash = context.OpReader.ReadBytes(20)
-
-                is_normal_call = False
-                for b in script_hash:
-                    if b > 0:
-                        is_normal_call = True
-
-                if not is_normal_call:
-                    script_hash = self.EvaluationStack.Pop().GetByteArray()
-
-                script = self._Table.GetScript(UInt160(data=script_hash).ToBytes())
-
-                if script is None:
-                    logger.error("Could not find script from script table: %s " % script_hash)
-                    return self.VM_FAULT_and_report(VMFault.INVALID_CONTRACT, script_hash)
-
-                if opcode == TAILCALL:
-                    istack.Pop().Dispose()
-
-                self.LoadScript(script)
-
-            elif opcode == SYSCALL:
-                call = context.OpReader.ReadVarBytes(252).decode('ascii')
-                self.write_log(call)
-                if not self._Service.Invoke(call, self):
-                    return self.VM_FAULT_and_report(VMFault.SYSCALL_ERROR, call)
-
-            # stack operations
-            elif opcode == DUPFROMALTSTACK:
-                estack.PushT(astack.Peek())
-
-            elif opcode == TOALTSTACK:
-                astack.PushT(estack.Pop())
-
-            elif opcode == FROMALTSTACK:
-                estack.PushT(astack.Pop())
-
-            elif opcode == XDROP:
-                n = estack.Pop().GetBigInteger()
-                if n < 0:
-                    self._VMState |= VMState.FAULT
-                    return
-                estack.Remove(n)
-
-            elif opcode == XSWAP:
-                n = estack.Pop().GetBigInteger()
-
-                if n < 0:
-                    return self.VM_FAULT_and_report(VMFault.UNKNOWN3)
-
-                # if n == 0 break, same as do x if n > 0
-                if n > 0:
-                    item = estack.Peek(n)
-                    estack.Set(n, estack.Peek())
-                    estack.Set(0, item)
-
-            elif opcode == XTUCK:
-                n = estack.Pop().GetBigInteger()
-
-                if n <= 0:
-                    return self.VM_FAULT_and_report(VMFault.UNKNOWN4)
-
-                estack.Insert(n, estack.Peek())
-
-            elif opcode == DEPTH:
-                estack.PushT(estack.Count)
-
-            elif opcode == DROP:
-                estack.Pop()
-
-            elif opcode == DUP:
-                estack.PushT(estack.Peek())
-
-            elif opcode == NIP:
-                x2 = estack.Pop()
-                estack.Pop()
-                estack.PushT(x2)
-
-            elif opcode == OVER:
-
-                x2 = estack.Pop()
-                x1 = estack.Peek()
-                estack.PushT(x2)
-                estack.PushT(x1)
-
-            elif opcode == PICK:
-
-                n = estack.Pop().GetBigInteger()
-                if n < 0:
-                    return self.VM_FAULT_and_report(VMFault.UNKNOWN5)
-
-                estack.PushT(estack.Peek(n))
-
-            elif opcode == ROLL:
-
-                n = estack.Pop().GetBigInteger()
-                if n < 0:
-                    return self.VM_FAULT_and_report(VMFault.UNKNOWN6)
-
-                if n > 0:
-                    estack.PushT(estack.Remove(n))
-
-            elif opcode == ROT:
-                x3 = estack.Pop()
-                x2 = estack.Pop()
-                x1 = estack.Pop()
-
-                estack.PushT(x2)
-                estack.PushT(x3)
-                estack.PushT(x1)
-
-            elif opcode == SWAP:
-
-                x2 = estack.Pop()
-                x1 = estack.Pop()
-                estack.PushT(x2)
-                estack.PushT(x1)
-
-            elif opcode == TUCK:
-
-                x2 = estack.Pop()
-                x1 = estack.Pop()
-                estack.PushT(x2)
-                estack.PushT(x1)
-                estack.PushT(x2)
-
-            elif opcode == CAT:
-
-                x2 = estack.Pop().GetByteArray()
-                x1 = estack.Pop().GetByteArray()
-                estack.PushT(x1 + x2)
+        """
+        Execute a single instruction.
 
-            elif opcode == SUBSTR:
+        The handler is looked up in a 256-entry table indexed by the opcode byte, so dispatching
+        costs the same for every opcode.
 
-                count = estack.Pop().GetBigInteger()
-                if count < 0:
-                    return self.VM_FAULT_and_report(VMFault.SUBSTR_INVALID_LENGTH)
+        Args:
+            opcode (bytes): the opcode to execute, as a single byte.
+            context (neo.VM.ExecutionContext.ExecutionContext): the context the opcode was read from.
+        """
+        op = opcode[0]
 
-                index = estack.Pop().GetBigInteger()
-                if index < 0:
-                    return self.VM_FAULT_and_report(VMFault.SUBSTR_INVALID_INDEX)
+        if op > _PUSH16 and op != _RET and context.PushOnly:
+            return self.VM_FAULT_and_report(VMFault.UNKNOWN1)
 
-                x = estack.Pop().GetByteArray()
+        self._OpTable[op](self, opcode, context)
 
-                estack.PushT(x[index:count + index])
+        if self._VMState & VMState.FAULT == 0 and self._InvocationStack.Count > 0:
+            if len(self.CurrentContext.Breakpoints):
+                if self.CurrentContext.InstructionPointer in self.CurrentContext.Breakpoints:
+                    self._vm_debugger = VMDebugger(self)
+                    self._vm_debugger.start()
 
-            elif opcode == LEFT:
+    # push values
 
-                count = estack.Pop().GetBigInteger()
-                if count < 0:
-                    return self.VM_FAULT_and_report(VMFault.LEFT_INVALID_COUNT)
+    def _OpPush0(self, opcode, context):
+        self._EvaluationStack.PushT(bytearray(0))
 
-                x = estack.Pop().GetByteArray()
-                estack.PushT(x[:count])
+    def _OpPushBytes(self, opcode, context):
+        self._EvaluationStack.PushT(context.Operand)
 
-            elif opcode == RIGHT:
+    def _OpPushData1(self, opcode, context):
+        self._EvaluationStack.PushT(bytearray(context.Operand))
 
-                count = estack.Pop().GetBigInteger()
-                if count < 0:
-                    return self.VM_FAULT_and_report(VMFault.RIGHT_INVALID_COUNT)
+    def _OpPushData(self, opcode, context):
+        self._EvaluationStack.PushT(context.Operand)
 
-                x = estack.Pop().GetByteArray()
-                if len(x) < count:
-                    return self.VM_FAULT_and_report(VMFault.RIGHT_UNKNOWN)
+    def _OpPushN(self, opcode, context):
+        # EvaluationStack.Push((int)opcode - (int)OpCode.PUSH1 + 1);
+        self._EvaluationStack.PushT(opcode[0] - _PUSH1 + 1)
 
-                estack.PushT(x[-count:])
+    # control
 
-            elif opcode == SIZE:
+    def _OpNop(self, opcode, context):
+        pass
 
-                x = estack.Pop().GetByteArray()
-                estack.PushT(len(x))
+    def _OpJump(self, opcode, context):
+        # the instruction pointer is already past the 2 byte offset
+        offset = context.InstructionPointer + context.Operand - 3
 
-            elif opcode == INVERT:
+        if offset < 0 or offset > len(context.Script):
+            return self.VM_FAULT_and_report(VMFault.INVALID_JUMP)
 
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(~x)
+        fValue = True
+        if opcode != JMP:
+            fValue = self._EvaluationStack.Pop().GetBoolean()
+            if opcode == JMPIFNOT:
+                fValue = not fValue
+        if fValue:
+            context.SetInstructionPointer(offset)
 
-            elif opcode == AND:
+    def _OpCall(self, opcode, context):
+        # the calling context returns to the instruction after the CALL
+        callee = context.Clone()
+        self._InvocationStack.Push(callee)
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
-                estack.PushT(x1 & x2)
+        self._OpJump(JMP, callee)
 
-            elif opcode == OR:
+    def _OpRet(self, opcode, context):
+        istack = self._InvocationStack
+        istack.Pop().Dispose()
+        if istack.Count == 0:
+            self._VMState |= VMState.HALT
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpAppCall(self, opcode, context):
+        if self._Table is None:
+            return self.VM_FAULT_and_report(VMFault.UNKNOWN2)
 
-                estack.PushT(x1 | x2)
+        script_hash = context.Operand
 
-            elif opcode == XOR:
+        is_normal_call = False
+        for b in script_hash:
+            if b > 0:
+                is_normal_call = True
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+        if not is_normal_call:
+            script_hash = self.EvaluationStack.Pop().GetByteArray()
 
-                estack.PushT(x1 ^ x2)
+        script = self._Table.GetScript(UInt160(data=script_hash).ToBytes())
 
-            elif opcode == EQUAL:
-                x2 = estack.Pop()
-                x1 = estack.Pop()
-                estack.PushT(x1.Equals(x2))
+        if script is None:
+            logger.error("Could not find script from script table: %s " % script_hash)
+            return self.VM_FAULT_and_report(VMFault.INVALID_CONTRACT, script_hash)
 
-            # numeric
+        if opcode == TAILCALL:
+            self._InvocationStack.Pop().Dispose()
 
-            elif opcode == INC:
+        self.LoadScript(script)
 
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(x + 1)
+    def _OpSysCall(self, opcode, context):
+        call = context.Operand.decode('ascii')
+        self.write_log(call)
+        if not self._Service.Invoke(call, self):
+            return self.VM_FAULT_and_report(VMFault.SYSCALL_ERROR, call)
 
-            elif opcode == DEC:
+    # stack operations
 
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(x - 1)
+    def _OpDupFromAltStack(self, opcode, context):
+        self._EvaluationStack.Push(self._AltStack.Peek())
 
-            elif opcode == SIGN:
+    def _OpToAltStack(self, opcode, context):
+        self._AltStack.Push(self._EvaluationStack.Pop())
 
-                # Make sure to implement sign for big integer
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(x.Sign)
+    def _OpFromAltStack(self, opcode, context):
+        self._EvaluationStack.Push(self._AltStack.Pop())
 
-            elif opcode == NEGATE:
+    def _OpXDrop(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
+        if n < 0:
+            self._VMState |= VMState.FAULT
+            return
+        estack.Remove(n)
 
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(-x)
+    def _OpXSwap(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
 
-            elif opcode == ABS:
+        if n < 0:
+            return self.VM_FAULT_and_report(VMFault.UNKNOWN3)
 
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(abs(x))
+        # if n == 0 break, same as do x if n > 0
+        if n > 0:
+            item = estack.Peek(n)
+            estack.Set(n, estack.Peek())
+            estack.Set(0, item)
 
-            elif opcode == NOT:
+    def _OpXTuck(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
 
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(not x)
+        if n <= 0:
+            return self.VM_FAULT_and_report(VMFault.UNKNOWN4)
 
-            elif opcode == NZ:
+        estack.Insert(n, estack.Peek())
 
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(x is not 0)
+    def _OpDepth(self, opcode, context):
+        self._EvaluationStack.PushT(self._EvaluationStack.Count)
 
-            elif opcode == ADD:
+    def _OpDrop(self, opcode, context):
+        self._EvaluationStack.Pop()
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
-                estack.PushT(x1 + x2)
+    def _OpDup(self, opcode, context):
+        self._EvaluationStack.Push(self._EvaluationStack.Peek())
 
-            elif opcode == SUB:
+    def _OpNip(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop()
+        estack.Pop()
+        estack.Push(x2)
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpOver(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop()
+        x1 = estack.Peek()
+        estack.Push(x2)
+        estack.Push(x1)
 
-                estack.PushT(x1 - x2)
+    def _OpPick(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
+        if n < 0:
+            return self.VM_FAULT_and_report(VMFault.UNKNOWN5)
 
-            elif opcode == MUL:
+        estack.Push(estack.Peek(n))
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpRoll(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
+        if n < 0:
+            return self.VM_FAULT_and_report(VMFault.UNKNOWN6)
 
-                estack.PushT(x1 * x2)
+        if n > 0:
+            estack.Push(estack.Remove(n))
 
-            elif opcode == DIV:
+    def _OpRot(self, opcode, context):
+        estack = self._EvaluationStack
+        x3 = estack.Pop()
+        x2 = estack.Pop()
+        x1 = estack.Pop()
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+        estack.Push(x2)
+        estack.Push(x3)
+        estack.Push(x1)
 
-                estack.PushT(x1 / x2)
+    def _OpSwap(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop()
+        x1 = estack.Pop()
+        estack.Push(x2)
+        estack.Push(x1)
 
-            elif opcode == MOD:
+    def _OpTuck(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop()
+        x1 = estack.Pop()
+        estack.Push(x2)
+        estack.Push(x1)
+        estack.Push(x2)
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    # splice
 
-                estack.PushT(x1 % x2)
+    def _OpCat(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetByteArray()
+        x1 = estack.Pop().GetByteArray()
+        estack.PushT(x1 + x2)
 
-            elif opcode == SHL:
+    def _OpSubStr(self, opcode, context):
+        estack = self._EvaluationStack
+        count = estack.Pop().GetBigInteger()
+        if count < 0:
+            return self.VM_FAULT_and_report(VMFault.SUBSTR_INVALID_LENGTH)
 
-                n = estack.Pop().GetBigInteger()
-                x = estack.Pop().GetBigInteger()
+        index = estack.Pop().GetBigInteger()
+        if index < 0:
+            return self.VM_FAULT_and_report(VMFault.SUBSTR_INVALID_INDEX)
 
-                estack.PushT(x << n)
+        x = estack.Pop().GetByteArray()
 
-            elif opcode == SHR:
+        estack.PushT(x[index:count + index])
 
-                n = estack.Pop().GetBigInteger()
-                x = estack.Pop().GetBigInteger()
+    def _OpLeft(self, opcode, context):
+        estack = self._EvaluationStack
+        count = estack.Pop().GetBigInteger()
+        if count < 0:
+            return self.VM_FAULT_and_report(VMFault.LEFT_INVALID_COUNT)
 
-                estack.PushT(x >> n)
+        x = estack.Pop().GetByteArray()
+        estack.PushT(x[:count])
 
-            elif opcode == BOOLAND:
+    def _OpRight(self, opcode, context):
+        estack = self._EvaluationStack
+        count = estack.Pop().GetBigInteger()
+        if count < 0:
+            return self.VM_FAULT_and_report(VMFault.RIGHT_INVALID_COUNT)
 
-                x2 = estack.Pop().GetBoolean()
-                x1 = estack.Pop().GetBoolean()
+        x = estack.Pop().GetByteArray()
+        if len(x) < count:
+            return self.VM_FAULT_and_report(VMFault.RIGHT_UNKNOWN)
 
-                estack.PushT(x1 and x2)
+        estack.PushT(x[-count:])
 
-            elif opcode == BOOLOR:
+    def _OpSize(self, opcode, context):
+        estack = self._EvaluationStack
+        x = estack.Pop().GetByteArray()
+        estack.PushT(len(x))
 
-                x2 = estack.Pop().GetBoolean()
-                x1 = estack.Pop().GetBoolean()
+    # bitwise logic
 
-                estack.PushT(x1 or x2)
+    def _OpInvert(self, opcode, context):
+        estack = self._EvaluationStack
+        x = estack.Pop().GetBigInteger()
+        estack.PushT(~x)
 
-            elif opcode == NUMEQUAL:
+    def _OpAnd(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 & x2)
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpOr(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 | x2)
 
-                estack.PushT(x2 == x1)
+    def _OpXor(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 ^ x2)
 
-            elif opcode == NUMNOTEQUAL:
+    def _OpEqual(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop()
+        x1 = estack.Pop()
+        estack.PushT(x1.Equals(x2))
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    # numeric
 
-                estack.PushT(x1 != x2)
+    def _OpInc(self, opcode, context):
+        estack = self._EvaluationStack
+        x = estack.Pop().GetBigInteger()
+        estack.PushT(x + 1)
 
-            elif opcode == LT:
+    def _OpDec(self, opcode, context):
+        estack = self._EvaluationStack
+        x = estack.Pop().GetBigInteger()
+        estack.PushT(x - 1)
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpSign(self, opcode, context):
+        estack = self._EvaluationStack
+        # Make sure to implement sign for big integer
+        x = estack.Pop().GetBigInteger()
+        estack.PushT(x.Sign)
 
-                estack.PushT(x1 < x2)
+    def _OpNegate(self, opcode, context):
+        estack = self._EvaluationStack
+        x = estack.Pop().GetBigInteger()
+        estack.PushT(-x)
 
-            elif opcode == GT:
+    def _OpAbs(self, opcode, context):
+        estack = self._EvaluationStack
+        x = estack.Pop().GetBigInteger()
+        estack.PushT(abs(x))
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpNot(self, opcode, context):
+        estack = self._EvaluationStack
+        x = estack.Pop().GetBigInteger()
+        estack.PushT(not x)
 
-                estack.PushT(x1 > x2)
+    def _OpNz(self, opcode, context):
+        estack = self._EvaluationStack
+        x = estack.Pop().GetBigInteger()
+        estack.PushT(x is not 0)
 
-            elif opcode == LTE:
+    def _OpAdd(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 + x2)
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpSub(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 - x2)
 
-                estack.PushT(x1 <= x2)
+    def _OpMul(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 * x2)
 
-            elif opcode == GTE:
+    def _OpDiv(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 / x2)
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpMod(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 % x2)
 
-                estack.PushT(x1 >= x2)
+    def _OpShl(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
+        x = estack.Pop().GetBigInteger()
+        estack.PushT(x << n)
 
-            elif opcode == MIN:
+    def _OpShr(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
+        x = estack.Pop().GetBigInteger()
+        estack.PushT(x >> n)
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
-                estack.PushT(min(x1, x2))
+    def _OpBoolAnd(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBoolean()
+        x1 = estack.Pop().GetBoolean()
+        estack.PushT(x1 and x2)
 
-            elif opcode == MAX:
+    def _OpBoolOr(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBoolean()
+        x1 = estack.Pop().GetBoolean()
+        estack.PushT(x1 or x2)
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpNumEqual(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x2 == x1)
 
-                estack.PushT(max(x1, x2))
+    def _OpNumNotEqual(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 != x2)
 
-            elif opcode == WITHIN:
+    def _OpLt(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 < x2)
 
-                b = estack.Pop().GetBigInteger()
-                a = estack.Pop().GetBigInteger()
-                x = estack.Pop().GetBigInteger()
+    def _OpGt(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 > x2)
 
-                estack.PushT(a <= x and x < b)
+    def _OpLte(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 <= x2)
 
-            # CRyPTO
-            elif opcode == SHA1:
-                h = hashlib.sha1(estack.Pop().GetByteArray())
-                estack.PushT(h.digest())
+    def _OpGte(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(x1 >= x2)
 
-            elif opcode == SHA256:
-                h = hashlib.sha256(estack.Pop().GetByteArray())
-                estack.PushT(h.digest())
+    def _OpMin(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(min(x1, x2))
 
-            elif opcode == HASH160:
+    def _OpMax(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetBigInteger()
+        x1 = estack.Pop().GetBigInteger()
+        estack.PushT(max(x1, x2))
 
-                estack.PushT(self.Crypto.Hash160(estack.Pop().GetByteArray()))
+    def _OpWithin(self, opcode, context):
+        estack = self._EvaluationStack
+        b = estack.Pop().GetBigInteger()
+        a = estack.Pop().GetBigInteger()
+        x = estack.Pop().GetBigInteger()
+        estack.PushT(a <= x and x < b)
 
-            elif opcode == HASH256:
+    # crypto
 
-                estack.PushT(self.Crypto.Hash256(estack.Pop().GetByteArray()))
+    def _OpSha1(self, opcode, context):
+        h = hashlib.sha1(self._EvaluationStack.Pop().GetByteArray())
+        self._EvaluationStack.PushT(h.digest())
 
-            elif opcode == CHECKSIG:
+    def _OpSha256(self, opcode, context):
+        h = hashlib.sha256(self._EvaluationStack.Pop().GetByteArray())
+        self._EvaluationStack.PushT(h.digest())
 
-                pubkey = estack.Pop().GetByteArray()
-                sig = estack.Pop().GetByteArray()
-                container = self.ScriptContainer
-                if not container:
-                    logger.debug("Cannot check signature without container")
-                    estack.PushT(False)
-                    return
-                try:
-                    res = self.Crypto.VerifySignature(container.GetMessage(), sig, pubkey)
-                    estack.PushT(res)
-                except Exception as e:
-                    estack.PushT(False)
-                    logger.error("Could not checksig: %s " % e)
+    def _OpHash160(self, opcode, context):
+        estack = self._EvaluationStack
+        estack.PushT(self.Crypto.Hash160(estack.Pop().GetByteArray()))
 
-            elif opcode == VERIFY:
-                pubkey = estack.Pop().GetByteArray()
-                sig = estack.Pop().GetByteArray()
-                message = estack.Pop().GetByteArray()
-                try:
-                    res = self.Crypto.VerifySignature(message, sig, pubkey, unhex=False)
-                    estack.PushT(res)
-                except Exception as e:
-                    estack.PushT(False)
-                    logger.error("Could not checksig: %s " % e)
+    def _OpHash256(self, opcode, context):
+        estack = self._EvaluationStack
+        estack.PushT(self.Crypto.Hash256(estack.Pop().GetByteArray()))
 
-            elif opcode == CHECKMULTISIG:
+    def _OpCheckSig(self, opcode, context):
+        estack = self._EvaluationStack
+        pubkey = estack.Pop().GetByteArray()
+        sig = estack.Pop().GetByteArray()
+        container = self.ScriptContainer
+        if not container:
+            logger.debug("Cannot check signature without container")
+            estack.PushT(False)
+            return
+        try:
+            res = self.Crypto.VerifySignature(container.GetMessage(), sig, pubkey)
+            estack.PushT(res)
+        except Exception as e:
+            estack.PushT(False)
+            logger.error("Could not checksig: %s " % e)
 
-                n = estack.Pop().GetBigInteger()
+    def _OpVerify(self, opcode, context):
+        estack = self._EvaluationStack
+        pubkey = estack.Pop().GetByteArray()
+        sig = estack.Pop().GetByteArray()
+        message = estack.Pop().GetByteArray()
+        try:
+            res = self.Crypto.VerifySignature(message, sig, pubkey, unhex=False)
+            estack.PushT(res)
+        except Exception as e:
+            estack.PushT(False)
+            logger.error("Could not checksig: %s " % e)
 
-                if n < 1:
-                    return self.VM_FAULT_and_report(VMFault.CHECKMULTISIG_INVALID_PUBLICKEY_COUNT)
+    def _OpCheckMultiSig(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
 
-                pubkeys = []
-                for i in range(0, n):
-                    pubkeys.append(estack.Pop().GetByteArray())
+        if n < 1:
+            return self.VM_FAULT_and_report(VMFault.CHECKMULTISIG_INVALID_PUBLICKEY_COUNT)
 
-                m = estack.Pop().GetBigInteger()
+        pubkeys = []
+        for i in range(0, n):
+            pubkeys.append(estack.Pop().GetByteArray())
 
-                if m < 1 or m > n:
-                    return self.VM_FAULT_and_report(VMFault.CHECKMULTISIG_SIGNATURE_ERROR, m, n)
+        m = estack.Pop().GetBigInteger()
 
-                sigs = []
+        if m < 1 or m > n:
+            return self.VM_FAULT_and_report(VMFault.CHECKMULTISIG_SIGNATURE_ERROR, m, n)
 
-                for i in range(0, m):
-                    sigs.append(estack.Pop().GetByteArray())
+        sigs = []
 
-                message = self.ScriptContainer.GetMessage() if self.ScriptContainer else ''
+        for i in range(0, m):
+            sigs.append(estack.Pop().GetByteArray())
 
-                fSuccess = True
+        message = self.ScriptContainer.GetMessage() if self.ScriptContainer else ''
 
-                try:
+        fSuccess = True
 
-                    i = 0
-                    j = 0
+        try:
 
-                    while fSuccess and i < m and j < n:
+            i = 0
+            j = 0
 
-                        if self.Crypto.VerifySignature(message, sigs[i], pubkeys[j]):
-                            i += 1
-                        j += 1
+            while fSuccess and i < m and j < n:
 
-                        if m - i > n - j:
-                            fSuccess = False
+                if self.Crypto.VerifySignature(message, sigs[i], pubkeys[j]):
+                    i += 1
+                j += 1
 
-                except Exception as e:
+                if m - i > n - j:
                     fSuccess = False
 
-                estack.PushT(fSuccess)
-
-            # lists
-            elif opcode == ARRAYSIZE:
-
-                item = estack.Pop()
-
-                if not item:
-                    return self.VM_FAULT_and_report(VMFault.UNKNOWN7)
-
-                if isinstance(item, CollectionMixin):
-                    estack.PushT(item.Count)
-
-                else:
-                    estack.PushT(len(item.GetByteArray()))
-
-            elif opcode == PACK:
-
-                size = estack.Pop().GetBigInteger()
-
-                if size < 0 or size > estack.Count:
-                    return self.VM_FAULT_and_report(VMFault.UNKNOWN8)
-
-                items = []
-
-                for i in range(0, size):
-                    topack = estack.Pop()
-                    items.append(topack)
+        except Exception as e:
+            fSuccess = False
 
-                estack.PushT(items)
+        estack.PushT(fSuccess)
 
-            elif opcode == UNPACK:
-                item = estack.Pop()
+    # lists
 
-                if not isinstance(item, Array):
-                    return self.VM_FAULT_and_report(VMFault.UNPACK_INVALID_TYPE, item)
+    def _OpArraySize(self, opcode, context):
+        estack = self._EvaluationStack
+        item = estack.Pop()
 
-                items = item.GetArray()
-                items.reverse()
+        if not item:
+            return self.VM_FAULT_and_report(VMFault.UNKNOWN7)
 
-                [estack.PushT(i) for i in items]
+        if isinstance(item, CollectionMixin):
+            estack.PushT(item.Count)
 
-                estack.PushT(len(items))
+        else:
+            estack.PushT(len(item.GetByteArray()))
 
-            elif opcode == PICKITEM:
+    def _OpPack(self, opcode, context):
+        estack = self._EvaluationStack
+        size = estack.Pop().GetBigInteger()
 
-                key = estack.Pop()
+        if size < 0 or size > estack.Count:
+            return self.VM_FAULT_and_report(VMFault.UNKNOWN8)
 
-                if isinstance(key, CollectionMixin):
-                    # key must be an array index or dictionary key, but not a collection
-                    return self.VM_FAULT_and_report(VMFault.KEY_IS_COLLECTION, key)
+        items = []
 
-                collection = estack.Pop()
+        for i in range(0, size):
+            topack = estack.Pop()
+            items.append(topack)
 
-                if isinstance(collection, Array):
-                    index = key.GetBigInteger()
-                    if index < 0 or index >= collection.Count:
-                        return self.VM_FAULT_and_report(VMFault.PICKITEM_INVALID_INDEX, index, collection.Count)
+        estack.PushT(items)
 
-                    items = collection.GetArray()
-                    to_pick = items[index]
-                    estack.PushT(to_pick)
+    def _OpUnpack(self, opcode, context):
+        estack = self._EvaluationStack
+        item = estack.Pop()
 
-                elif isinstance(collection, Map):
-                    success, value = collection.TryGetValue(key)
+        if not isinstance(item, Array):
+            return self.VM_FAULT_and_report(VMFault.UNPACK_INVALID_TYPE, item)
 
-                    if success:
-                        estack.PushT(value)
-                    else:
-                        return self.VM_FAULT_and_report(VMFault.DICT_KEY_NOT_FOUND, key, collection.Keys)
+        items = item.GetArray()
+        items.reverse()
 
-                else:
-                    return self.VM_FAULT_and_report(VMFault.PICKITEM_INVALID_TYPE, key, collection)
+        [estack.PushT(i) for i in items]
 
-            elif opcode == SETITEM:
-                value = estack.Pop()
+        estack.PushT(len(items))
 
-                if isinstance(value, Struct):
-                    value = value.Clone()
+    def _OpPickItem(self, opcode, context):
+        estack = self._EvaluationStack
+        key = estack.Pop()
 
-                key = estack.Pop()
+        if isinstance(key, CollectionMixin):
+            # key must be an array index or dictionary key, but not a collection
+            return self.VM_FAULT_and_report(VMFault.KEY_IS_COLLECTION, key)
 
-                if isinstance(key, CollectionMixin):
-                    return self.VM_FAULT_and_report(VMFault.KEY_IS_COLLECTION)
+        collection = estack.Pop()
 
-                collection = estack.Pop()
+        if isinstance(collection, Array):
+            index = key.GetBigInteger()
+            if index < 0 or index >= collection.Count:
+                return self.VM_FAULT_and_report(VMFault.PICKITEM_INVALID_INDEX, index, collection.Count)
 
-                if isinstance(collection, Array):
+            items = collection.GetArray()
+            to_pick = items[index]
+            estack.PushT(to_pick)
 
-                    index = key.GetBigInteger()
+        elif isinstance(collection, Map):
+            success, value = collection.TryGetValue(key)
 
-                    if index < 0 or index >= collection.Count:
-                        return self.VM_FAULT_and_report(VMFault.SETITEM_INVALID_INDEX)
+            if success:
+                estack.PushT(value)
+            else:
+                return self.VM_FAULT_and_report(VMFault.DICT_KEY_NOT_FOUND, key, collection.Keys)
 
-                    items = collection.GetArray()
-                    items[index] = value
+        else:
+            return self.VM_FAULT_and_report(VMFault.PICKITEM_INVALID_TYPE, key, collection)
 
-                elif isinstance(collection, Map):
+    def _OpSetItem(self, opcode, context):
+        estack = self._EvaluationStack
+        value = estack.Pop()
 
-                    collection.SetItem(key, value)
+        if isinstance(value, Struct):
+            value = value.Clone()
 
-                else:
+        key = estack.Pop()
 
-                    return self.VM_FAULT_and_report(VMFault.SETITEM_INVALID_TYPE, key, collection)
+        if isinstance(key, CollectionMixin):
+            return self.VM_FAULT_and_report(VMFault.KEY_IS_COLLECTION)
 
-            elif opcode == NEWARRAY:
+        collection = estack.Pop()
 
-                count = estack.Pop().GetBigInteger()
-                items = [Boolean(False) for i in range(0, count)]
-                estack.PushT(Array(items))
+        if isinstance(collection, Array):
 
-            elif opcode == NEWSTRUCT:
+            index = key.GetBigInteger()
 
-                count = estack.Pop().GetBigInteger()
+            if index < 0 or index >= collection.Count:
+                return self.VM_FAULT_and_report(VMFault.SETITEM_INVALID_INDEX)
 
-                items = [Boolean(False) for i in range(0, count)]
+            items = collection.GetArray()
+            items[index] = value
 
-                estack.PushT(Struct(items))
+        elif isinstance(collection, Map):
 
-            elif opcode == NEWMAP:
-                estack.PushT(Map())
+            collection.SetItem(key, value)
 
-            elif opcode == APPEND:
-                newItem = estack.Pop()
+        else:
 
-                if isinstance(newItem, Struct):
-                    newItem = newItem.Clone()
+            return self.VM_FAULT_and_report(VMFault.SETITEM_INVALID_TYPE, key, collection)
 
-                arrItem = estack.Pop()
+    def _OpNewArray(self, opcode, context):
+        estack = self._EvaluationStack
+        count = estack.Pop().GetBigInteger()
+        items = [StackItem.New(False)] * count
+        estack.Push(Array(items))
 
-                if not isinstance(arrItem, Array):
-                    return self.VM_FAULT_and_report(VMFault.APPEND_INVALID_TYPE, arrItem)
+    def _OpNewStruct(self, opcode, context):
+        estack = self._EvaluationStack
+        count = estack.Pop().GetBigInteger()
+        items = [StackItem.New(False)] * count
+        estack.Push(Struct(items))
 
-                arr = arrItem.GetArray()
-                arr.append(newItem)
+    def _OpNewMap(self, opcode, context):
+        self._EvaluationStack.PushT(Map())
 
-            elif opcode == REVERSE:
+    def _OpAppend(self, opcode, context):
+        estack = self._EvaluationStack
+        newItem = estack.Pop()
 
-                arrItem = estack.Pop()
-                if not isinstance(arrItem, Array):
-                    return self.VM_FAULT_and_report(VMFault.REVERSE_INVALID_TYPE, arrItem)
+        if isinstance(newItem, Struct):
+            newItem = newItem.Clone()
 
-                arrItem.Reverse()
+        arrItem = estack.Pop()
 
-            elif opcode == REMOVE:
+        if not isinstance(arrItem, Array):
+            return self.VM_FAULT_and_report(VMFault.APPEND_INVALID_TYPE, arrItem)
 
-                key = estack.Pop()
+        arr = arrItem.GetArray()
+        arr.append(newItem)
 
-                if isinstance(key, CollectionMixin):
-                    return self.VM_FAULT_and_report(VMFault.UNKNOWN1)
+    def _OpReverse(self, opcode, context):
+        arrItem = self._EvaluationStack.Pop()
+        if not isinstance(arrItem, Array):
+            return self.VM_FAULT_and_report(VMFault.REVERSE_INVALID_TYPE, arrItem)
 
-                collection = estack.Pop()
+        arrItem.Reverse()
 
-                if isinstance(collection, Array):
+    def _OpRemove(self, opcode, context):
+        estack = self._EvaluationStack
+        key = estack.Pop()
 
-                    index = key.GetBigInteger()
+        if isinstance(key, CollectionMixin):
+            return self.VM_FAULT_and_report(VMFault.UNKNOWN1)
 
-                    if index < 0 or index >= collection.Count:
-                        return self.VM_FAULT_and_report(VMFault.REMOVE_INVALID_INDEX, index, collection.Count)
+        collection = estack.Pop()
 
-                    collection.RemoveAt(index)
+        if isinstance(collection, Array):
 
-                elif isinstance(collection, Map):
+            index = key.GetBigInteger()
 
-                    collection.Remove(key)
+            if index < 0 or index >= collection.Count:
+                return self.VM_FAULT_and_report(VMFault.REMOVE_INVALID_INDEX, index, collection.Count)
 
-                else:
+            collection.RemoveAt(index)
 
-                    return self.VM_FAULT_and_report(VMFault.REMOVE_INVALID_TYPE, key, collection)
+        elif isinstance(collection, Map):
 
-            elif opcode == HASKEY:
+            collection.Remove(key)
 
-                key = estack.Pop()
+        else:
 
-                if isinstance(key, CollectionMixin):
-                    return self.VM_FAULT_and_report(VMFault.DICT_KEY_ERROR)
+            return self.VM_FAULT_and_report(VMFault.REMOVE_INVALID_TYPE, key, collection)
 
-                collection = estack.Pop()
+    def _OpHasKey(self, opcode, context):
+        estack = self._EvaluationStack
+        key = estack.Pop()
 
-                if isinstance(collection, Array):
+        if isinstance(key, CollectionMixin):
+            return self.VM_FAULT_and_report(VMFault.DICT_KEY_ERROR)
 
-                    index = key.GetBigInteger()
+        collection = estack.Pop()
 
-                    if index < 0:
-                        return self.VM_FAULT_and_report(VMFault.DICT_KEY_ERROR)
+        if isinstance(collection, Array):
 
-                    estack.PushT(index < collection.Count)
+            index = key.GetBigInteger()
 
-                elif isinstance(collection, Map):
+            if index < 0:
+                return self.VM_FAULT_and_report(VMFault.DICT_KEY_ERROR)
 
-                    estack.PushT(collection.ContainsKey(key))
+            estack.PushT(index < collection.Count)
 
-                else:
+        elif isinstance(collection, Map):
 
-                    return self.VM_FAULT_and_report(VMFault.DICT_KEY_ERROR)
+            estack.PushT(collection.ContainsKey(key))
 
-            elif opcode == KEYS:
+        else:
 
-                collection = estack.Pop()
+            return self.VM_FAULT_and_report(VMFault.DICT_KEY_ERROR)
 
-                if isinstance(collection, Map):
+    def _OpKeys(self, opcode, context):
+        estack = self._EvaluationStack
+        collection = estack.Pop()
 
-                    estack.PushT(Array(collection.Keys))
-                else:
-                    return self.VM_FAULT_and_report(VMFault.DICT_KEY_ERROR)
+        if isinstance(collection, Map):
 
-            elif opcode == VALUES:
+            estack.PushT(Array(collection.Keys))
+        else:
+            return self.VM_FAULT_and_report(VMFault.DICT_KEY_ERROR)
 
-                collection = estack.Pop()
-                values = []
+    def _OpValues(self, opcode, context):
+        estack = self._EvaluationStack
+        collection = estack.Pop()
+        values = []
 
-                if isinstance(collection, Map):
-                    values = collection.Values
+        if isinstance(collection, Map):
+            values = collection.Values
 
-                elif isinstance(collection, Array):
-                    values = collection
+        elif isinstance(collection, Array):
+            values = collection
 
-                else:
-                    return self.VM_FAULT_and_report(VMFault.DICT_KEY_ERROR)
+        else:
+            return self.VM_FAULT_and_report(VMFault.DICT_KEY_ERROR)
 
-                newArray = Array()
-                for item in values:
-                    if isinstance(item, Struct):
-                        newArray.Add(item.Clone())
-                    else:
-                        newArray.Add(item)
+        newArray = Array()
+        for item in values:
+            if isinstance(item, Struct):
+                newArray.Add(item.Clone())
+            else:
+                newArray.Add(item)
 
-                estack.PushT(newArray)
+        estack.PushT(newArray)
 
-            elif opcode == THROW:
-                return self.VM_FAULT_and_report(VMFault.THROW)
+    # exceptions
 
-            elif opcode == THROWIFNOT:
-                if not estack.Pop().GetBoolean():
-                    return self.VM_FAULT_and_report(VMFault.THROWIFNOT)
+    def _OpThrow(self, opcode, context):
+        return self.VM_FAULT_and_report(VMFault.THROW)
 
-            else:
-                return self.VM_FAULT_and_report(VMFault.UNKNOWN_OPCODE, opcode)
+    def _OpThrowIfNot(self, opcode, context):
+        if not self._EvaluationStack.Pop().GetBoolean():
+            return self.VM_FAULT_and_report(VMFault.THROWIFNOT)
 
-        if self._VMState & VMState.FAULT == 0 and self.InvocationStack.Count > 0:
-            if len(self.CurrentContext.Breakpoints):
-                if self.CurrentContext.InstructionPointer in self.CurrentContext.Breakpoints:
-                    self._vm_debugger = VMDebugger(self)
-                    self._vm_debugger.start()
+    def _OpUnknown(self, opcode, context):
+        return self.VM_FAULT_and_report(VMFault.UNKNOWN_OPCODE, opcode)
 
     def LoadScript(self, script, push_only=False):
 
@@ -906,7 +920,7 @@ class ExecutionEngine:
         if self._debug_map and context.ScriptHash() == self._debug_map['script_hash']:
             context.Breakpoints = set(self._debug_map['breakpoints'])
 
-        self._InvocationStack.PushT(context)
+        self._InvocationStack.Push(context)
 
         self._ExecutedScriptHashes.append(context.ScriptHash())
 
@@ -925,18 +939,15 @@ class ExecutionEngine:
             return
 
         op = None
-
-        if self.CurrentContext.InstructionPointer >= len(self.CurrentContext.Script):
-            op = RET
-        else:
-            op = self.CurrentContext.OpReader.ReadByte(do_ord=False)
+        context = self.CurrentContext
 
         self.ops_processed += 1
 
         try:
+            op = context.ReadInstruction()
             if self._is_write_log:
                 self.write_log("{} {}".format(self.ops_processed, ToName(op)))
-            self.ExecuteOp(op, self.CurrentContext)
+            self.ExecuteOp(op, context)
         except Exception as e:
             error_msg = "COULD NOT EXECUTE OP (%s): %s %s %s" % (self.ops_processed, e, op, ToName(op))
             self.write_log(error_msg)
@@ -1050,3 +1061,120 @@ class ExecutionEngine:
             logger.error("({}) {}".format(self.ops_processed, error_msg))
 
         return
+
+
+def _BuildOpTable():
+    """
+    Build the handler table of the interpreter, indexed by the opcode byte.
+
+    Returns:
+        list: 256 handler functions, taking (engine, opcode, context).
+    """
+    E = ExecutionEngine
+
+    handlers = {
+        PUSH0: E._OpPush0,
+        PUSHDATA1: E._OpPushData1,
+        PUSHDATA2: E._OpPushData,
+        PUSHDATA4: E._OpPushData,
+        NOP: E._OpNop,
+        JMP: E._OpJump,
+        JMPIF: E._OpJump,
+        JMPIFNOT: E._OpJump,
+        CALL: E._OpCall,
+        RET: E._OpRet,
+        APPCALL: E._OpAppCall,
+        TAILCALL: E._OpAppCall,
+        SYSCALL: E._OpSysCall,
+        DUPFROMALTSTACK: E._OpDupFromAltStack,
+        TOALTSTACK: E._OpToAltStack,
+        FROMALTSTACK: E._OpFromAltStack,
+        XDROP: E._OpXDrop,
+        XSWAP: E._OpXSwap,
+        XTUCK: E._OpXTuck,
+        DEPTH: E._OpDepth,
+        DROP: E._OpDrop,
+        DUP: E._OpDup,
+        NIP: E._OpNip,
+        OVER: E._OpOver,
+        PICK: E._OpPick,
+        ROLL: E._OpRoll,
+        ROT: E._OpRot,
+        SWAP: E._OpSwap,
+        TUCK: E._OpTuck,
+        CAT: E._OpCat,
+        SUBSTR: E._OpSubStr,
+        LEFT: E._OpLeft,
+        RIGHT: E._OpRight,
+        SIZE: E._OpSize,
+        INVERT: E._OpInvert,
+        AND: E._OpAnd,
+        OR: E._OpOr,
+        XOR: E._OpXor,
+        EQUAL: E._OpEqual,
+        INC: E._OpInc,
+        DEC: E._OpDec,
+        SIGN: E._OpSign,
+        NEGATE: E._OpNegate,
+        ABS: E._OpAbs,
+        NOT: E._OpNot,
+        NZ: E._OpNz,
+        ADD: E._OpAdd,
+        SUB: E._OpSub,
+        MUL: E._OpMul,
+        DIV: E._OpDiv,
+        MOD: E._OpMod,
+        SHL: E._OpShl,
+        SHR: E._OpShr,
+        BOOLAND: E._OpBoolAnd,
+        BOOLOR: E._OpBoolOr,
+        NUMEQUAL: E._OpNumEqual,
+        NUMNOTEQUAL: E._OpNumNotEqual,
+        LT: E._OpLt,
+        GT: E._OpGt,
+        LTE: E._OpLte,
+        GTE: E._OpGte,
+        MIN: E._OpMin,
+        MAX: E._OpMax,
+        WITHIN: E._OpWithin,
+        SHA1: E._OpSha1,
+        SHA256: E._OpSha256,
+        HASH160: E._OpHash160,
+        HASH256: E._OpHash256,
+        CHECKSIG: E._OpCheckSig,
+        VERIFY: E._OpVerify,
+        CHECKMULTISIG: E._OpCheckMultiSig,
+        ARRAYSIZE: E._OpArraySize,
+        PACK: E._OpPack,
+        UNPACK: E._OpUnpack,
+        PICKITEM: E._OpPickItem,
+        SETITEM: E._OpSetItem,
+        NEWARRAY: E._OpNewArray,
+        NEWSTRUCT: E._OpNewStruct,
+        NEWMAP: E._OpNewMap,
+        APPEND: E._OpAppend,
+        REVERSE: E._OpReverse,
+        REMOVE: E._OpRemove,
+        HASKEY: E._OpHasKey,
+        KEYS: E._OpKeys,
+        VALUES: E._OpValues,
+        THROW: E._OpThrow,
+        THROWIFNOT: E._OpThrowIfNot,
+    }
+
+    table = [E._OpUnknown] * 256
+
+    for op in range(PUSHBYTES1[0], PUSHBYTES75[0] + 1):
+        table[op] = E._OpPushBytes
+
+    for op in range(PUSHM1[0], PUSH16[0] + 1):
+        if op != PUSHM1[0] + 1:
+            table[op] = E._OpPushN
+
+    for opcode, handler in handlers.items():
+        table[opcode[0]] = handler
+
+    return table
+
+
+ExecutionEngine._OpTable = _BuildOpTable()
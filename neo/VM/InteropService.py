@@ -7,6 +7,7 @@ from neo.SmartContract import StackItemType
 
 
 class CollectionMixin:
+    __slots__ = ()
 
     IsSynchronized = False
     SyncRoot = None
@@ -26,6 +27,12 @@ class CollectionMixin:
 
 
 class StackItem(EquatableMixin):
+    """
+    Base class of the items on the VM stacks.
+
+    Stack items are created for every push, so all of them use `__slots__` instead of an instance `__dict__`.
+    """
+    __slots__ = ()
 
     @property
     def IsStruct(self):
@@ -120,14 +127,15 @@ class StackItem(EquatableMixin):
     def New(value):
         typ = type(value)
 
-        if typ is BigInteger:
-            return Integer(value)
-        elif typ is int:
-            return Integer(BigInteger(value))
+        if typ is BigInteger or typ is int:
+            item = _SMALL_INTEGERS.get(value)
+            if item is not None:
+                return item
+            return Integer(value if typ is BigInteger else BigInteger(value))
+        elif typ is bool:
+            return _TRUE if value else _FALSE
         elif typ is float:
             return Integer(BigInteger(int(value)))
-        elif typ is bool:
-            return Boolean(value)
         elif typ is bytearray or typ is bytes:
             return ByteArray(value)
         elif typ is list:
@@ -138,8 +146,7 @@ class StackItem(EquatableMixin):
 
 
 class Array(StackItem, CollectionMixin):
-
-    _array = None  # a list of stack items
+    __slots__ = ('_array',)  # a list of stack items
 
     @property
     def Count(self):
@@ -219,12 +226,11 @@ class Array(StackItem, CollectionMixin):
 
 
 class Boolean(StackItem):
+    __slots__ = ('_value',)
 
     TRUE = bytearray([1])
     FALSE = bytearray([0])
 
-    _value = None
-
     def __init__(self, value):
         self._value = value
 
@@ -257,8 +263,7 @@ class Boolean(StackItem):
 
 
 class ByteArray(StackItem):
-
-    _value = None
+    __slots__ = ('_value',)
 
     def __init__(self, value):
         self._value = value
@@ -304,8 +309,7 @@ class ByteArray(StackItem):
 
 
 class Integer(StackItem):
-
-    _value = None
+    __slots__ = ('_value',)
 
     def __init__(self, value):
         if type(value) is not BigInteger:
@@ -341,8 +345,7 @@ class Integer(StackItem):
 
 
 class InteropInterface(StackItem):
-
-    _object = None
+    __slots__ = ('_object',)
 
     def __init__(self, value):
         self._object = value
@@ -379,6 +382,7 @@ class InteropInterface(StackItem):
 
 
 class Struct(Array):
+    __slots__ = ()
 
     @property
     def IsStruct(self):
@@ -422,8 +426,7 @@ class Struct(Array):
 
 
 class Map(StackItem, CollectionMixin):
-
-    _dict = None
+    __slots__ = ('_dict',)
 
     def __init__(self, dict=None):
         if dict:
@@ -513,6 +516,12 @@ class Map(StackItem, CollectionMixin):
         raise Exception("Not supported- Cant get byte array for item %s %s " % (type(self), self._dict))
 
 
+# shared instances of the most common items, items are never changed once created
+_SMALL_INTEGERS = {i: Integer(BigInteger(i)) for i in range(-1, 17)}
+_TRUE = Boolean(True)
+_FALSE = Boolean(False)
+
+
 class InteropService:
 
     _dictionary = {}
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 
 
 class EquatableMixin(ABC):
+    __slots__ = ()
 
     @abstractmethod
     def Equals(self, other):
@@ -29,37 +29,43 @@ class RandomAccessStack:
         return enumerate(self._list)
 
     def Insert(self, index, item):
-        index = int(index)
-
         if index < 0 or index > self._size:
             raise Exception("Invalid list operation")
 
         self._list.insert(index, item)
         self._size += 1
 
-    # @TODO can be optimized
     def Peek(self, index=0):
-        index = int(index)
         if index >= self._size:
             raise Exception("Invalid list operation")
 
         return self._list[self._size - 1 - index]
 
     def Pop(self):
-        #        self.PrintList("POPSTACK <- ")
-        return self.Remove(0)
+        if self._size == 0:
+            raise Exception("Invalid list operation")
+
+        self._size -= 1
+        return self._list.pop()
 
     def PushT(self, item):
-        if not type(item) is StackItem and not issubclass(type(item), StackItem):
+        if not isinstance(item, StackItem):
             item = StackItem.New(item)
 
         self._list.append(item)
         self._size += 1
 
-    # @TODO can be optimized
-    def Remove(self, index):
-        index = int(index)
+    def Push(self, item):
+        """
+        Push an item that is known to be a `StackItem` (or an execution context), skipping the conversion of `PushT`.
 
+        Args:
+            item (StackItem):
+        """
+        self._list.append(item)
+        self._size += 1
+
+    def Remove(self, index):
         if index < 0 or index >= self._size:
             raise Exception("Invalid list operation")
 
@@ -69,12 +75,10 @@ class RandomAccessStack:
         return item
 
     def Set(self, index, item):
-        index = int(index)
-
         if index < 0 or index > self._size:
             raise Exception("Invalid list operation")
 
-        if not type(item) is StackItem and not issubclass(type(item), StackItem):
+        if not isinstance(item, StackItem):
             item = StackItem.New(item)
 
         self._list[self._size - index - 1] = item
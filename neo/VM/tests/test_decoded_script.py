@@ -0,0 +1,120 @@
+from unittest import TestCase
+from neo.VM.DecodedScript import DecodedScript
+from neo.VM.ExecutionEngine import ExecutionEngine
+from neo.VM import OpCode
+from neo.VM import VMState
+from neo.IO.MemoryStream import MemoryStream
+from neocore.Cryptography.Crypto import Crypto
+from neocore.IO.BinaryReader import BinaryReader
+
+
+def read_with_stream(script, ip):
+    """
+    Read an instruction the way the ExecutionEngine did with a BinaryReader over the script, as reference.
+    """
+    reader = BinaryReader(MemoryStream(script))
+    reader.stream.seek(ip)
+    op = reader.ReadByte(do_ord=False)
+    operand = None
+
+    if OpCode.PUSHBYTES1 <= op <= OpCode.PUSHBYTES75:
+        operand = reader.ReadBytes(op[0])
+    elif op == OpCode.PUSHDATA1:
+        operand = reader.ReadBytes(reader.ReadByte())
+    elif op == OpCode.PUSHDATA2:
+        operand = reader.ReadBytes(reader.ReadUInt16())
+    elif op == OpCode.PUSHDATA4:
+        operand = reader.ReadBytes(reader.ReadUInt32())
+    elif op in [OpCode.JMP, OpCode.JMPIF, OpCode.JMPIFNOT, OpCode.CALL]:
+        operand = reader.ReadInt16()
+    elif op in [OpCode.APPCALL, OpCode.TAILCALL]:
+        operand = reader.ReadBytes(20)
+    elif op == OpCode.SYSCALL:
+        operand = reader.ReadVarBytes(252)
+
+    return op, operand, reader.stream.tell()
+
+
+class DecodedScriptTestCase(TestCase):
+
+    def tearDown(self):
+        DecodedScript.ClearCache()
+
+    def test_decode(self):
+        script = OpCode.PUSH1 + OpCode.PUSHBYTES2 + b'ab' + OpCode.PUSHDATA1 + b'\x03xyz' + \
+            OpCode.JMPIF + (-5).to_bytes(2, 'little', signed=True) + \
+            OpCode.SYSCALL + b'\x0cNeo.Test.Api' + OpCode.APPCALL + b'\x01' * 20 + OpCode.RET
+
+        decoded = DecodedScript(script)
+
+        self.assertEqual(decoded.GetInstruction(0), (OpCode.PUSH1, None, 1))
+        self.assertEqual(decoded.GetInstruction(1), (OpCode.PUSHBYTES2, b'ab', 4))
+        self.assertEqual(decoded.GetInstruction(4), (OpCode.PUSHDATA1, b'xyz', 9))
+        self.assertEqual(decoded.GetInstruction(9), (OpCode.JMPIF, -5, 12))
+        self.assertEqual(decoded.GetInstruction(12), (OpCode.SYSCALL, b'Neo.Test.Api', 26))
+        self.assertEqual(decoded.GetInstruction(26), (OpCode.APPCALL, b'\x01' * 20, 47))
+        self.assertEqual(decoded.GetInstruction(47), (OpCode.RET, None, 48))
+
+        # positions inside an instruction are decoded when they are reached
+        self.assertIsNone(decoded.NextIPs[2])
+        self.assertEqual(decoded.GetInstruction(2), (b'a', None, 3))
+
+    def test_truncated_push(self):
+        decoded = DecodedScript(OpCode.PUSHBYTES5 + b'ab')
+
+        self.assertEqual(decoded.GetInstruction(0), (OpCode.PUSHBYTES5, b'ab', 3))
+
+    def test_truncated_operand(self):
+        decoded = DecodedScript(OpCode.PUSH1 + OpCode.JMP + b'\x01')
+
+        self.assertEqual(decoded.GetInstruction(0), (OpCode.PUSH1, None, 1))
+
+        with self.assertRaises(Exception):
+            decoded.GetInstruction(1)
+
+    def test_truncated_like_stream(self):
+        scripts = [
+            OpCode.PUSHDATA1,
+            OpCode.PUSHDATA1 + b'\x05ab',
+            OpCode.PUSHDATA2,
+            OpCode.PUSHDATA2 + b'\x01',
+            OpCode.PUSHDATA2 + b'\x05\x00ab',
+            OpCode.PUSHDATA4,
+            OpCode.PUSHDATA4 + b'\x01\x02\x03',
+            OpCode.PUSHDATA4 + b'\x05\x00\x00\x00ab',
+            OpCode.PUSHBYTES3 + b'a',
+            OpCode.JMP + b'\x01',
+            OpCode.APPCALL + b'\x01' * 5,
+            OpCode.SYSCALL,
+            OpCode.SYSCALL + b'\x05ab',
+            OpCode.SYSCALL + b'\xfd\x01',
+        ]
+
+        for script in scripts:
+            decoded = DecodedScript(script)
+            try:
+                expected = read_with_stream(script, 0)
+            except Exception:
+                with self.assertRaises(Exception, msg=script):
+                    decoded.GetInstruction(0)
+                continue
+
+            self.assertEqual(decoded.GetInstruction(0), expected, msg=script)
+
+    def test_truncated_pushdata_halts(self):
+        # the length of a PUSHDATA1 at the end of a script reads as 0, as it did with the stream reader
+        engine = ExecutionEngine(crypto=Crypto.Default())
+        engine.LoadScript(OpCode.PUSHDATA1)
+        engine.Execute()
+
+        self.assertEqual(engine.State, VMState.HALT)
+        self.assertEqual(engine.EvaluationStack.Pop().GetByteArray(), bytearray())
+
+    def test_cache(self):
+        script = OpCode.PUSH1 + OpCode.RET
+
+        decoded = DecodedScript.Get(b'hash', script)
+        self.assertIs(DecodedScript.Get(b'hash', script), decoded)
+
+        DecodedScript.ClearCache()
+        self.assertIsNot(DecodedScript.Get(b'hash', script), decoded)
@@ -3,6 +3,7 @@ from neo.VM.InteropService import StackItem, ByteArray
 from neo.VM.ExecutionEngine import ExecutionEngine
 from neo.VM.ExecutionEngine import ExecutionContext
 from neo.VM import OpCode
+from neo.VM import VMState
 from neocore.Cryptography.Crypto import Crypto
 from mock import patch
 import binascii
@@ -77,3 +78,36 @@ class VMTestCase(TestCase):
 
         res = self.engine.EvaluationStack.Pop()
         self.assertEqual(res, StackItem.New(False))
+
+    def test_push_operations(self):
+
+        self.engine.LoadScript(OpCode.PUSHM1 + OpCode.PUSH16 + OpCode.PUSHBYTES2 + b'ab' + OpCode.PUSH0 + OpCode.RET)
+        self.engine.Execute()
+
+        self.assertEqual(self.engine.State, VMState.HALT)
+        self.assertEqual(self.engine.EvaluationStack.Items,
+                         [StackItem.New(-1), StackItem.New(16), StackItem.New(b'ab'), StackItem.New(bytearray(0))])
+
+    def test_jump_operations(self):
+
+        # count down from 3, jumping back to the DEC until the counter is 0
+        script = OpCode.PUSH3 + OpCode.DEC + OpCode.DUP + OpCode.JMPIF + (-2).to_bytes(2, 'little', signed=True) + OpCode.RET
+        self.engine.LoadScript(script)
+        self.engine.Execute()
+
+        self.assertEqual(self.engine.State, VMState.HALT)
+        self.assertEqual(self.engine.EvaluationStack.Items, [StackItem.New(0)])
+
+    def test_unknown_opcode(self):
+
+        self.engine.ExecuteOp(b'\x50', self.econtext)
+
+        self.assertTrue(self.engine.State & VMState.FAULT > 0)
+
+    def test_push_only(self):
+
+        self.engine.LoadScript(OpCode.PUSH1 + OpCode.PUSH2 + OpCode.ADD, push_only=True)
+        self.engine.Execute()
+
+        self.assertTrue(self.engine.State & VMState.FAULT > 0)
+        self.assertEqual(self.engine.EvaluationStack.Count, 2)
@@ -0,0 +1,42 @@
+from unittest import TestCase
+from neo.VM.InteropService import StackItem, Integer, ByteArray, Boolean, Array, Struct, Map
+from neo.VM.RandomAccessStack import RandomAccessStack
+from neocore.BigInteger import BigInteger
+
+
+class StackItemTestCase(TestCase):
+
+    def test_small_values_are_shared(self):
+        for i in range(-1, 17):
+            self.assertIs(StackItem.New(i), StackItem.New(BigInteger(i)))
+            self.assertEqual(StackItem.New(i).GetBigInteger(), i)
+
+        self.assertIs(StackItem.New(True), StackItem.New(True))
+        self.assertIs(StackItem.New(False), StackItem.New(False))
+        self.assertTrue(StackItem.New(True).GetBoolean())
+        self.assertFalse(StackItem.New(False).GetBoolean())
+
+        self.assertIsNot(StackItem.New(17), StackItem.New(17))
+        self.assertEqual(StackItem.New(17), StackItem.New(17))
+
+    def test_no_instance_dict(self):
+        items = [Integer(BigInteger(1000)), ByteArray(b'\x01'), Boolean(True), Array(), Struct([]), Map()]
+
+        for item in items:
+            self.assertFalse(hasattr(item, '__dict__'), type(item))
+
+    def test_stack_push(self):
+        stack = RandomAccessStack()
+
+        stack.PushT(5)
+        stack.Push(ByteArray(b'\x01'))
+        stack.PushT(ByteArray(b'\x02'))
+
+        self.assertEqual(stack.Count, 3)
+        self.assertIsInstance(stack.Peek(BigInteger(2)), Integer)
+        self.assertEqual(stack.Remove(BigInteger(1)).GetByteArray(), b'\x01')
+        self.assertEqual(stack.Pop().GetByteArray(), b'\x02')
+        self.assertEqual(stack.Pop().GetBigInteger(), 5)
+
+        with self.assertRaises(Exception):
+            stack.Pop()
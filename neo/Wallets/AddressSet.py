@@ -0,0 +1,73 @@
+"""
+Description:
+    Set of the addresses of a wallet, to check outputs and transactions against it
+Usage:
+    from neo.Wallets.AddressSet import AddressSet
+"""
+from neocore.Cryptography.Crypto import Crypto
+
+from neo.Wallets.AddressState import AddressState
+
+
+class AddressSet:
+    """
+    The script hashes and verification scripts of the contracts and watch only addresses of a wallet.
+
+    Every check is a set lookup, so checking a transaction takes one lookup per output and script however
+    many addresses the wallet has. The set does not follow changes of the wallet, a new one is built then.
+    """
+
+    def __init__(self, contracts, watch_only):
+        """
+        Create an instance.
+
+        Args:
+            contracts (list): of neo.SmartContract.Contract objects of the wallet.
+            watch_only (list): of UInt160 script hashes of the watch only addresses.
+        """
+        self.ScriptHashes = frozenset(bytes(contract.ScriptHash.Data) for contract in contracts)
+        self.VerificationScripts = frozenset(bytes(contract.Script) for contract in contracts)
+        self.WatchOnly = frozenset(bytes(script_hash.Data) for script_hash in watch_only)
+
+    def GetAddressState(self, script_hash):
+        """
+        Determine the address state of a script hash.
+
+        Args:
+            script_hash (UInt160): the script hash.
+
+        Returns:
+            AddressState: the address state.
+        """
+        data = bytes(script_hash.Data)
+        if data in self.ScriptHashes:
+            return AddressState.InWallet
+        if data in self.WatchOnly:
+            return AddressState.InWallet | AddressState.WatchOnly
+        return AddressState.NoState
+
+    def ContainsTransaction(self, tx):
+        """
+        Check if a transaction pays to one of the addresses or is signed by one of them.
+
+        Args:
+            tx (neo.Core.TX.Transaction): the transaction.
+
+        Returns:
+            bool: True if the transaction belongs to the wallet.
+        """
+        for output in tx.outputs:
+            data = bytes(output.ScriptHash.Data)
+            if data in self.ScriptHashes or data in self.WatchOnly:
+                return True
+
+        for script in tx.scripts:
+            if script.VerificationScript and bytes(script.VerificationScript) in self.VerificationScripts:
+                return True
+
+        if self.WatchOnly:
+            for script in tx.scripts:
+                if bytes(Crypto.ToScriptHash(script.VerificationScript, unhex=False).Data) in self.WatchOnly:
+                    return True
+
+        return False
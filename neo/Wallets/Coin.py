@@ -18,6 +18,9 @@ class Coin(TrackableMixin):
     _state = CoinState.Unconfirmed
     _transaction = None
 
+    # the neo.Wallets.CoinIndex holding the coin, which is told about state changes
+    _index = None
+
     @staticmethod
     def CoinFromRef(coin_ref, tx_output, state=CoinState.Unconfirmed, transaction=None):
         """
@@ -90,7 +93,10 @@ class Coin(TrackableMixin):
         Args:
             value (neo.Core.State.CoinState): the new coin state.
         """
+        changed = value != self._state
         self._state = value
+        if changed and self._index is not None:
+            self._index.CoinStateChanged(self)
 
     def Equals(self, other):
         """
@@ -107,7 +113,7 @@ class Coin(TrackableMixin):
         return True
 
     def __hash__(self):
-        return int.from_bytes(self.Reference.PrevHash.Data + bytearray(self.Reference.PrevIndex), 'little')
+        return hash(self.Reference)
 
     def RefToBytes(self):
         vin_index = bytearray(self.Reference.PrevIndex.to_bytes(1, 'little'))
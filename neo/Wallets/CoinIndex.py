@@ -0,0 +1,296 @@
+"""
+Description:
+    Index of the coins of a wallet by asset, address and state
+Usage:
+    from neo.Wallets.CoinIndex import CoinIndex
+"""
+import heapq
+import itertools
+from bisect import bisect_left
+
+from neo.Core.State.CoinState import CoinState
+
+
+class CoinBucket:
+    """
+    The coins of one asset, address and state class, sorted by value.
+    """
+
+    def __init__(self):
+        # (value, sequence number) of each coin, sorted, and the coins in the same order
+        self.Keys = []
+        self.Coins = []
+        self.Total = 0
+
+    def __len__(self):
+        return len(self.Keys)
+
+    def Add(self, key, coin):
+        position = bisect_left(self.Keys, key)
+        self.Keys.insert(position, key)
+        self.Coins.insert(position, coin)
+        self.Total += key[0]
+
+    def Remove(self, key):
+        position = bisect_left(self.Keys, key)
+        del self.Keys[position]
+        del self.Coins[position]
+        self.Total -= key[0]
+
+    def Find(self, value):
+        """
+        Get the position of the first coin with the given value or a higher one.
+
+        Args:
+            value (int): raw Fixed8 value.
+
+        Returns:
+            int:
+        """
+        return bisect_left(self.Keys, (value,))
+
+
+class CoinIndex(dict):
+    """
+    The coins of a wallet by reference, indexed by asset, address and state class.
+
+    It is used as the `Wallet._coins` dict. Coins are moved between buckets when they are added, removed
+    or when their state changes, so finding the unspent coins of an asset does not look at any other coin
+    and the coins of each bucket are kept sorted by value.
+    """
+
+    # state classes
+    OTHER = 0
+    AVAILABLE = 1  # confirmed, and not spent, locked or frozen
+    UNCLAIMED = 2  # confirmed and spent, but not claimed or frozen
+
+    def __init__(self, coins=None):
+        """
+        Create an instance.
+
+        Args:
+            coins (dict): (Optional) coins by reference to add.
+        """
+        super(CoinIndex, self).__init__()
+
+        # buckets by (asset id, script hash, state class, watch only flag)
+        self._buckets = {}
+
+        # bucket key and sort key of each coin by reference
+        self._entries = {}
+
+        # coins with the same value keep the order in which they were added
+        self._sequence = itertools.count()
+
+        if coins:
+            self.update(coins)
+
+    @staticmethod
+    def StateClass(state):
+        """
+        Get the state class of a coin state.
+
+        Args:
+            state (neo.Core.State.CoinState): the coin state.
+
+        Returns:
+            int: AVAILABLE, UNCLAIMED or OTHER.
+        """
+        if state & CoinState.Confirmed == 0:
+            return CoinIndex.OTHER
+
+        if state & (CoinState.Spent | CoinState.Locked | CoinState.Frozen) == 0:
+            return CoinIndex.AVAILABLE
+
+        if state & CoinState.Spent > 0 and state & (CoinState.Claimed | CoinState.Frozen) == 0:
+            return CoinIndex.UNCLAIMED
+
+        return CoinIndex.OTHER
+
+    def __setitem__(self, reference, coin):
+        # a replaced coin keeps its place in the wallet order, like a dict key
+        if reference in self:
+            sequence = self._entries[reference][1][1]
+            self[reference]._index = None
+            self._Unindex(reference)
+        else:
+            sequence = next(self._sequence)
+
+        super(CoinIndex, self).__setitem__(reference, coin)
+        coin._index = self
+        self._Index(reference, coin, sequence)
+
+    def __delitem__(self, reference):
+        coin = self[reference]
+        self._Unindex(reference)
+        super(CoinIndex, self).__delitem__(reference)
+        coin._index = None
+
+    def pop(self, reference, *default):
+        if reference not in self:
+            if default:
+                return default[0]
+            raise KeyError(reference)
+
+        coin = self[reference]
+        del self[reference]
+        return coin
+
+    def update(self, coins):
+        for reference, coin in coins.items():
+            self[reference] = coin
+
+    def clear(self):
+        for coin in self.values():
+            coin._index = None
+        super(CoinIndex, self).clear()
+        self._buckets.clear()
+        self._entries.clear()
+
+    def CoinStateChanged(self, coin):
+        """
+        Move a coin to the bucket of its new state. Called by `Coin.State`.
+
+        Args:
+            coin (neo.Wallets.Coin): the coin.
+        """
+        reference = coin.Reference
+        entry = self._entries.get(reference)
+        if entry is None or self.get(reference) is not coin:
+            return
+
+        self._Unindex(reference)
+        self._Index(reference, coin, entry[1][1])
+
+    def GetBuckets(self, asset_id=None, script_hash=None, state_class=AVAILABLE, watch_only_val=0):
+        """
+        Get the buckets of coins matching the given criteria.
+
+        Args:
+            asset_id (UInt256): (Optional) only coins of this asset.
+            script_hash (UInt160): (Optional) only coins of this address.
+            state_class (int): the state class of the coins.
+            watch_only_val (int): 0 or `CoinState.WatchOnly`.
+
+        Returns:
+            list: (script hash bytes, CoinBucket) tuples.
+        """
+        asset_bytes = asset_id.ToBytes() if asset_id is not None else None
+        script_bytes = script_hash.ToBytes() if script_hash is not None else None
+
+        buckets = []
+        for (asset, address, cls, watch), bucket in self._buckets.items():
+            if cls != state_class or watch != watch_only_val or not len(bucket):
+                continue
+            if asset_bytes is not None and asset != asset_bytes:
+                continue
+            if script_bytes is not None and address != script_bytes:
+                continue
+            buckets.append((address, bucket))
+        return buckets
+
+    def GetTotal(self, buckets, exclude=None):
+        """
+        Get the total value of the coins of several buckets.
+
+        Args:
+            buckets (list): CoinBucket objects.
+            exclude (set): (Optional) references of coins to leave out.
+
+        Returns:
+            int: raw Fixed8 value.
+        """
+        total = sum(bucket.Total for bucket in buckets)
+
+        for reference in exclude or ():
+            entry = self._entries.get(reference)
+            if entry is not None and any(self._buckets[entry[0]] is bucket for bucket in buckets):
+                total -= entry[1][0]
+
+        return total
+
+    @staticmethod
+    def InWalletOrder(buckets, exclude=None):
+        """
+        Get the coins of several buckets in the order they were added to the wallet.
+
+        Args:
+            buckets (list): CoinBucket objects.
+            exclude (set): (Optional) references of coins to leave out.
+
+        Returns:
+            list: coins.
+        """
+        entries = [(key[1], coin) for bucket in buckets for key, coin in zip(bucket.Keys, bucket.Coins)
+                   if not exclude or coin.Reference not in exclude]
+        entries.sort(key=lambda entry: entry[0])
+        return [coin for sequence, coin in entries]
+
+    @staticmethod
+    def ByValue(buckets, exclude=None, reverse=False):
+        """
+        Iterate over the coins of several buckets by value.
+
+        Coins of equal value are in the order they were added to the wallet, or in the opposite order if `reverse`.
+
+        Args:
+            buckets (list): CoinBucket objects.
+            exclude (set): (Optional) references of coins to leave out.
+            reverse (bool): highest value first.
+
+        Returns:
+            iterator: coins.
+        """
+        if reverse:
+            iterators = [zip(reversed(bucket.Keys), reversed(bucket.Coins)) for bucket in buckets]
+        else:
+            iterators = [zip(bucket.Keys, bucket.Coins) for bucket in buckets]
+
+        for key, coin in heapq.merge(*iterators, key=lambda item: item[0], reverse=reverse):
+            if not exclude or coin.Reference not in exclude:
+                yield coin
+
+    @staticmethod
+    def FindValue(buckets, value, exclude=None, reverse=False):
+        """
+        Find a coin of exactly the given value.
+
+        Args:
+            buckets (list): CoinBucket objects.
+            value (int): raw Fixed8 value.
+            exclude (set): (Optional) references of coins to leave out.
+            reverse (bool): take the coin added last instead of the one added first.
+
+        Returns:
+            neo.Wallets.Coin: the coin or None.
+        """
+        found = None
+        for bucket in buckets:
+            position = bucket.Find(value)
+            while position < len(bucket.Keys) and bucket.Keys[position][0] == value:
+                key, coin = bucket.Keys[position], bucket.Coins[position]
+                position += 1
+
+                if exclude and coin.Reference in exclude:
+                    continue
+
+                if found is None or (key[1] > found[0] if reverse else key[1] < found[0]):
+                    found = (key[1], coin)
+
+        return found[1] if found else None
+
+    def _Index(self, reference, coin, sequence):
+        bucket_key = (coin.Output.AssetId.ToBytes(), coin.Output.ScriptHash.ToBytes(),
+                      self.StateClass(coin.State), coin.State & CoinState.WatchOnly)
+        sort_key = (coin.Output.Value.value, sequence)
+
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            bucket = self._buckets[bucket_key] = CoinBucket()
+
+        bucket.Add(sort_key, coin)
+        self._entries[reference] = (bucket_key, sort_key)
+
+    def _Unindex(self, reference):
+        bucket_key, sort_key = self._entries.pop(reference)
+        self._buckets[bucket_key].Remove(sort_key)
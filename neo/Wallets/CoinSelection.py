@@ -0,0 +1,254 @@
+"""
+Description:
+    Coin selection strategies for Wallet.MakeTransaction
+Usage:
+    from neo.Wallets.CoinSelection import CoinSelector, BranchAndBoundSelector
+"""
+import itertools
+import operator
+from bisect import bisect_left
+
+from neo.Wallets.CoinIndex import CoinIndex
+
+
+class CoinSelector:
+    """
+    Selects the coins to pay an amount of one asset from the buckets of a `CoinIndex`.
+
+    The default strategy pays with a single coin of exactly the amount if there is one, otherwise with the
+    smallest coins first. If the selection needs more than `max_inputs` coins, the largest coins are used
+    instead, and no coins are selected if even those are not enough.
+    """
+
+    def __init__(self, max_inputs=None, reverse=False):
+        """
+        Create an instance.
+
+        Args:
+            max_inputs (int): (Optional) the maximum number of coins to select.
+            reverse (bool): select the largest coins first, and take the coin added last of an exact match.
+        """
+        self.MaxInputs = max_inputs
+        self.Reverse = reverse
+
+    def Select(self, buckets, amount, exclude=None):
+        """
+        Select coins paying at least the given amount.
+
+        Args:
+            buckets (list): CoinBucket objects holding the coins to select from.
+            amount (Fixed8): the amount to pay.
+            exclude (set): (Optional) references of coins not to select.
+
+        Returns:
+            list: the selected ``neo.Wallet.Coin`` objects or None if the amount cannot be paid.
+        """
+        coins = self._Select(buckets, amount.value, exclude)
+
+        if self.MaxInputs and (coins is None or len(coins) > self.MaxInputs):
+            coins = self._Greedy(buckets, amount.value, exclude, reverse=True, max_inputs=self.MaxInputs)
+
+        return coins
+
+    def _Select(self, buckets, value, exclude):
+        # see if one coin is an exact match. then we'll use that
+        coin = CoinIndex.FindValue(buckets, value, exclude=exclude, reverse=self.Reverse)
+        if coin is not None:
+            return [coin]
+
+        return self._Greedy(buckets, value, exclude, reverse=self.Reverse, max_inputs=self.MaxInputs)
+
+    @staticmethod
+    def _Greedy(buckets, value, exclude, reverse, max_inputs=None):
+        """
+        Select coins by value, up to `max_inputs` of them, until they pay the value.
+
+        Returns:
+            list: the coins or None if they do not pay the value.
+        """
+        coins = CoinIndex.ByValue(buckets, exclude=exclude, reverse=reverse)
+        if max_inputs:
+            coins = itertools.islice(coins, max_inputs)
+
+        total = 0
+        selected = []
+        for coin in coins:
+            total += coin.Output.Value.value
+            selected.append(coin)
+            if total >= value:
+                return selected
+
+        return None
+
+
+class LargestFirstSelector(CoinSelector):
+    """
+    Pays with the largest coins, which uses the fewest inputs.
+    """
+
+    def __init__(self, max_inputs=None):
+        super(LargestFirstSelector, self).__init__(max_inputs=max_inputs, reverse=True)
+
+    def _Select(self, buckets, value, exclude):
+        return self._Greedy(buckets, value, exclude, reverse=True)
+
+
+class BranchAndBoundSelector(CoinSelector):
+    """
+    Searches for a set of coins paying exactly the amount, so the transaction needs no change output.
+
+    Coins are tried from the largest to the smallest, including a coin before excluding it, and a branch is
+    left as soon as it pays too much or its remaining coins cannot pay enough. The search gives up after
+    `MAX_TRIES` steps, and the amount is paid by `fallback` if no exact match is found.
+    """
+
+    MAX_TRIES = 100000
+
+    def __init__(self, max_inputs=None, fallback=None):
+        """
+        Create an instance.
+
+        Args:
+            max_inputs (int): (Optional) the maximum number of coins to select.
+            fallback (CoinSelector): (Optional) the selector to use without an exact match, the default one if not given.
+        """
+        super(BranchAndBoundSelector, self).__init__(max_inputs=max_inputs)
+        self.Fallback = fallback if fallback is not None else CoinSelector(max_inputs=max_inputs)
+
+    def Select(self, buckets, amount, exclude=None):
+        coins = self._Search(buckets, amount.value, exclude)
+        if coins is not None:
+            return coins
+
+        return self.Fallback.Select(buckets, amount, exclude)
+
+    def _Search(self, buckets, value, exclude):
+        """
+        Find coins paying exactly the value.
+
+        Returns:
+            list: the coins or None if no exact match was found.
+        """
+        # only coins that do not pay too much on their own can be part of an exact match, largest first.
+        # the values are negated to keep them in ascending order for bisect
+        negated = []
+        coins = []
+        for bucket in buckets:
+            end = bucket.Find(value + 1)
+            negated.extend(map(operator.neg, map(operator.itemgetter(0), reversed(bucket.Keys[:end]))))
+            coins.extend(reversed(bucket.Coins[:end]))
+
+        if len(buckets) > 1:
+            order = sorted(range(len(negated)), key=negated.__getitem__)
+            negated = [negated[i] for i in order]
+            coins = [coins[i] for i in order]
+
+        if exclude:
+            kept = [i for i, coin in enumerate(coins) if coin.Reference not in exclude]
+            negated = [negated[i] for i in kept]
+            coins = [coins[i] for i in kept]
+
+        # remaining[i] is the total of the coins from i on
+        remaining = list(map(operator.neg, itertools.accumulate(reversed(negated))))
+        remaining.reverse()
+        remaining.append(0)
+
+        if remaining[0] < value:
+            return None
+
+        selected = []
+        total = 0
+        index = 0
+
+        for tries in range(self.MAX_TRIES):
+            if total == value:
+                return [coins[i] for i in selected]
+
+            # skip the coins that pay too much with the ones included
+            index = bisect_left(negated, total - value, index)
+
+            if total + remaining[index] < value or (self.MaxInputs and len(selected) == self.MaxInputs):
+                if not selected:
+                    break
+
+                # exclude the last included coin and continue after it
+                last = selected.pop()
+                total += negated[last]
+                index = last + 1
+                continue
+
+            # a coin of the same value as an excluded one leads to the branches already searched
+            if index == 0 or negated[index] != negated[index - 1] or (selected and selected[-1] == index - 1):
+                selected.append(index)
+                total -= negated[index]
+
+            index += 1
+
+        return None
+
+
+class ConsolidationSelector(CoinSelector):
+    """
+    Pays with as many of the smallest coins as allowed, sending what is left over back as a single change
+    output, to merge the dust of a wallet while paying.
+
+    Without `max_inputs`, up to `DEFAULT_MAX_INPUTS` coins are used.
+    """
+
+    DEFAULT_MAX_INPUTS = 100
+
+    def __init__(self, max_inputs=None):
+        super(ConsolidationSelector, self).__init__(max_inputs=max_inputs or self.DEFAULT_MAX_INPUTS)
+
+    def _Select(self, buckets, value, exclude):
+        smallest = list(itertools.islice(CoinIndex.ByValue(buckets, exclude=exclude), self.MaxInputs))
+        total = sum(coin.Output.Value.value for coin in smallest)
+        chosen = set(coin.Reference for coin in smallest)
+
+        # swap the largest of the small coins for the smallest coin paying the rest, or for the largest coin
+        # if none does, until the value is paid
+        largest = CoinIndex.ByValue(buckets, exclude=exclude, reverse=True)
+        swapped = []
+        while total < value and smallest:
+            total -= smallest.pop().Output.Value.value
+
+            coin = self._SmallestAbove(buckets, value - total, exclude, chosen)
+            if coin is None:
+                coin = next((coin for coin in largest if coin.Reference not in chosen), None)
+                if coin is None:
+                    return None
+
+            total += coin.Output.Value.value
+            chosen.add(coin.Reference)
+            swapped.append(coin)
+
+        return smallest + swapped if total >= value else None
+
+    @staticmethod
+    def _SmallestAbove(buckets, value, exclude, chosen):
+        """
+        Get the smallest coin worth at least the value that is not chosen yet.
+
+        Returns:
+            neo.Wallets.Coin: the coin or None.
+        """
+        found = None
+        for bucket in buckets:
+            for position in range(bucket.Find(value), len(bucket.Keys)):
+                coin = bucket.Coins[position]
+                if coin.Reference in chosen or (exclude and coin.Reference in exclude):
+                    continue
+                if found is None or bucket.Keys[position] < found[0]:
+                    found = (bucket.Keys[position], coin)
+                break
+
+        return found[1] if found else None
+
+
+# strategies by name, as used by the `send` command
+SELECTORS = {
+    'default': CoinSelector,
+    'exact': BranchAndBoundSelector,
+    'largest': LargestFirstSelector,
+    'consolidate': ConsolidationSelector,
+}
@@ -22,7 +22,10 @@ from neo.Core.TX.ClaimTransaction import ClaimTransaction
 from neocore.Cryptography.Helper import scripthash_to_address
 from neocore.Cryptography.Crypto import Crypto
 from neo.Wallets.AddressState import AddressState
+from neo.Wallets.AddressSet import AddressSet
 from neo.Wallets.Coin import Coin
+from neo.Wallets.CoinIndex import CoinIndex
+from neo.Wallets.CoinSelection import CoinSelector
 from neocore.KeyPair import KeyPair
 from neo.Wallets.NEP5Token import NEP5Token
 from neo.Settings import settings
@@ -44,7 +47,8 @@ class Wallet:
     _contracts = {}  # holds Contracts
     _tokens = {}  # holds references to NEP5 tokens
     _watch_only = []  # holds set of hashes
-    _coins = {}  # holds Coin References
+    _coins = {}  # holds Coins by reference, a CoinIndex once the wallet is created or opened
+    _address_set = None  # AddressSet of the contracts and watch only addresses, built again after they change
 
     _current_height = 0
 
@@ -56,6 +60,9 @@ class Wallet:
 
     _lock = None  # allows locking for threads that may need to access the DB concurrently (e.g. ProcessBlocks and Rebuild)
 
+    # the number of blocks the wallet must be behind the chain to sync through the address index of the chain
+    ADDRESS_INDEX_MIN_BLOCKS = 100
+
     @property
     def WalletHeight(self):
         return self._current_height
@@ -80,7 +87,7 @@ class Wallet:
             self._master_key = bytes(Random.get_random_bytes(32))
             self._keys = {}
             self._contracts = {}
-            self._coins = {}
+            self._coins = CoinIndex()
 
             if Blockchain.Default() is None:
                 self._indexedDB = LevelDBBlockchain(settings.chain_leveldb_path)
@@ -129,7 +136,7 @@ class Wallet:
             self._contracts = self.LoadContracts()
             self._watch_only = self.LoadWatchOnly()
             self._tokens = self.LoadNEP5Tokens()
-            self._coins = self.LoadCoins()
+            self._coins = CoinIndex(self.LoadCoins())
             try:
                 h = int(self.LoadStoredData('Height'))
                 self._current_height = h
@@ -159,6 +166,7 @@ class Wallet:
         self._contracts[contract.ScriptHash.ToBytes()] = contract
         if contract.ScriptHash in self._watch_only:
             self._watch_only.remove(contract.ScriptHash)
+        self._address_set = None
 
     def AddWatchOnly(self, script_hash):
         """
@@ -175,6 +183,7 @@ class Wallet:
             return
 
         self._watch_only.append(script_hash)
+        self._address_set = None
 
     def AddNEP5Token(self, token):
         """
@@ -353,6 +362,7 @@ class Wallet:
             ok = True
             self._watch_only.remove(script_hash)
 
+        self._address_set = None
         return ok, coins_to_remove
 
     def FindCoinsByVins(self, vins):
@@ -367,12 +377,10 @@ class Wallet:
             list: A list of ``neo.Wallet.Coin`` objects.
         """
         ret = []
-        for coin in self.GetCoins():
-            coinref = coin.Reference
-            for vin in vins:
-                if coinref.PrevIndex == vin.PrevIndex and \
-                        coinref.PrevHash == vin.PrevHash:
-                    ret.append(coin)
+        for vin in vins:
+            coin = self._coins.get(vin)
+            if coin is not None:
+                ret.append(coin)
         return ret
 
     def FindUnspentCoins(self, from_addr=None, use_standard=False, watch_only_val=0):
@@ -387,37 +395,25 @@ class Wallet:
         Returns:
             list: a list of ``neo.Wallet.Coins`` in the wallet that are not spent.
         """
-        ret = []
-        for coin in self.GetCoins():
-            if coin.State & CoinState.Confirmed > 0 and \
-                    coin.State & CoinState.Spent == 0 and \
-                    coin.State & CoinState.Locked == 0 and \
-                    coin.State & CoinState.Frozen == 0 and \
-                    coin.State & CoinState.WatchOnly == watch_only_val:
-
-                do_exclude = False
-                if self._vin_exclude:
-                    for to_exclude in self._vin_exclude:
-
-                        if coin.Reference.PrevIndex == to_exclude.PrevIndex and \
-                                coin.Reference.PrevHash == to_exclude.PrevHash:
-                            do_exclude = True
-
-                if do_exclude:
-                    continue
-
-                if from_addr is not None:
-                    if coin.Output.ScriptHash == from_addr:
-                        ret.append(coin)
-                elif use_standard:
-
-                    contract = self._contracts[coin.Output.ScriptHash.ToBytes()]
-                    if contract.IsStandard:
-                        ret.append(coin)
-                else:
-                    ret.append(coin)
+        buckets = self._coins.GetBuckets(script_hash=from_addr, watch_only_val=watch_only_val)
+        return CoinIndex.InWalletOrder(self._FilterStandard(buckets, use_standard), self._vin_exclude)
 
-        return ret
+    def _FilterStandard(self, buckets, use_standard):
+        """
+        Get the buckets of coins from `CoinIndex.GetBuckets`, only those of standard contracts if `use_standard`.
+
+        Args:
+            buckets (list): (script hash bytes, CoinBucket) tuples.
+            use_standard (bool): whether or not to only include standard contracts ( i.e not a smart contract addr ).
+
+        Returns:
+            list: CoinBucket objects.
+        """
+        if not use_standard:
+            return [bucket for script_hash, bucket in buckets]
+
+        return [bucket for script_hash, bucket in buckets
+                if script_hash in self._contracts and self._contracts[script_hash].IsStandard]
 
     def FindUnspentCoinsByAsset(self, asset_id, from_addr=None, use_standard=False, watch_only_val=0):
         """
@@ -432,11 +428,11 @@ class Wallet:
         Returns:
             list: a list of ``neo.Wallet.Coin`` in the wallet that are not spent
         """
-        coins = self.FindUnspentCoins(from_addr=from_addr, use_standard=use_standard, watch_only_val=watch_only_val)
+        buckets = self._coins.GetBuckets(asset_id=asset_id, script_hash=from_addr, watch_only_val=watch_only_val)
+        return CoinIndex.InWalletOrder(self._FilterStandard(buckets, use_standard), self._vin_exclude)
 
-        return [coin for coin in coins if coin.Output.AssetId == asset_id]
-
-    def FindUnspentCoinsByAssetAndTotal(self, asset_id, amount, from_addr=None, use_standard=False, watch_only_val=0, reverse=False):
+    def FindUnspentCoinsByAssetAndTotal(self, asset_id, amount, from_addr=None, use_standard=False, watch_only_val=0, reverse=False,
+                                        selector=None):
         """
         Finds unspent coin objects totalling a requested value in the wallet limited to those of a certain asset type.
 
@@ -446,41 +442,23 @@ class Wallet:
             from_addr (UInt160): a bytearray (len 20) representing an address.
             use_standard (bool): whether or not to only include standard contracts ( i.e not a smart contract addr ).
             watch_only_val (int): a flag ( 0 or 64 ) indicating whether or not to find coins that are in 'watch only' addresses.
+            reverse (bool): whether the default selector should use the largest coins first.
+            selector (neo.Wallets.CoinSelection.CoinSelector): (Optional) the coin selection strategy to use.
 
         Returns:
-            list: a list of ``neo.Wallet.Coin`` in the wallet that are not spent. this list is empty if there are not enough coins to satisfy the request.
+            list: a list of ``neo.Wallet.Coin`` in the wallet that are not spent. None if there are not enough coins to satisfy the request.
         """
-        coins = self.FindUnspentCoinsByAsset(asset_id, from_addr=from_addr,
-                                             use_standard=use_standard, watch_only_val=watch_only_val)
-
-        sum = Fixed8(0)
+        buckets = self._coins.GetBuckets(asset_id=asset_id, script_hash=from_addr, watch_only_val=watch_only_val)
+        buckets = self._FilterStandard(buckets, use_standard)
+        exclude = self._vin_exclude
 
-        for coin in coins:
-            sum = sum + coin.Output.Value
-
-        if sum < amount:
+        if self._coins.GetTotal(buckets, exclude) < amount.value:
             return None
 
-        coins = sorted(coins, key=lambda coin: coin.Output.Value.value)
-
-        if reverse:
-            coins.reverse()
-
-        total = Fixed8(0)
-
-        # go through all coins, see if one is an exact match. then we'll use that
-        for coin in coins:
-            if coin.Output.Value == amount:
-                return [coin]
+        if selector is None:
+            selector = CoinSelector(reverse=reverse)
 
-        to_ret = []
-        for coin in coins:
-            total = total + coin.Output.Value
-            to_ret.append(coin)
-            if total >= amount:
-                break
-
-        return to_ret
+        return selector.Select(buckets, amount, exclude)
 
     def GetUnclaimedCoins(self):
         """
@@ -489,20 +467,8 @@ class Wallet:
         Returns:
             list: a list of ``neo.Wallet.Coin`` that have 'claimable' value
         """
-        unclaimed = []
-
-        neo = Blockchain.SystemShare().Hash
-
-        for coin in self.GetCoins():
-            if coin.Output.AssetId == neo and \
-                    coin.State & CoinState.Confirmed > 0 and \
-                    coin.State & CoinState.Spent > 0 and \
-                    coin.State & CoinState.Claimed == 0 and \
-                    coin.State & CoinState.Frozen == 0 and \
-                    coin.State & CoinState.WatchOnly == 0:
-                unclaimed.append(coin)
-
-        return unclaimed
+        buckets = self._coins.GetBuckets(asset_id=Blockchain.SystemShare().Hash, state_class=CoinIndex.UNCLAIMED)
+        return CoinIndex.InWalletOrder([bucket for script_hash, bucket in buckets])
 
     def GetAvailableClaimTotal(self):
         """
@@ -607,14 +573,8 @@ class Wallet:
         if type(asset_id) is NEP5Token:
             return self.GetTokenBalance(asset_id, watch_only)
 
-        for coin in self.GetCoins():
-            if coin.Output.AssetId == asset_id:
-                if coin.State & CoinState.Confirmed > 0 and \
-                        coin.State & CoinState.Spent == 0 and \
-                        coin.State & CoinState.Locked == 0 and \
-                        coin.State & CoinState.Frozen == 0 and \
-                        coin.State & CoinState.WatchOnly == watch_only:
-                    total = total + coin.Output.Value
+        for script_hash, bucket in self._coins.GetBuckets(asset_id=asset_id, watch_only_val=watch_only):
+            total = total + Fixed8(bucket.Total)
 
         return total
 
@@ -653,7 +613,8 @@ class Wallet:
         processes it.
 
         In the case that the wallet height is far behind the height of the blockchain, we do this 1000
-        blocks at a time.
+        blocks at a time. If the chain has an address index, only the blocks with transactions of the wallet
+        are read then, and `block_limit` applies to those.
 
         Args:
             block_limit (int): the number of blocks to process synchronously. defaults to 1000. set to 0 to block until the wallet is fully rebuilt.
@@ -661,6 +622,9 @@ class Wallet:
         self._lock.acquire()
         try:
             blockcount = 0
+            if Blockchain.Default().Height - self._current_height >= self.ADDRESS_INDEX_MIN_BLOCKS:
+                blockcount = self.ProcessIndexedBlocks(block_limit)
+
             while self._current_height <= Blockchain.Default().Height and (block_limit == 0 or blockcount < block_limit):
 
                 block = Blockchain.Default().GetBlockByHeight(self._current_height)
@@ -676,6 +640,45 @@ class Wallet:
         finally:
             self._lock.release()
 
+    def ProcessIndexedBlocks(self, block_limit=10000):
+        """
+        Process the blocks up to the current height of the blockchain through its address index, reading
+        only the blocks with transactions of the wallet and processing only those transactions.
+
+        Args:
+            block_limit (int): the number of blocks with transactions of the wallet to process. set to 0 for all of them.
+
+        Returns:
+            int: the number of blocks processed, 0 if the blockchain has no address index from the wallet height on.
+        """
+        blockchain = Blockchain.Default()
+        height = blockchain.Height
+
+        script_hashes = [contract.ScriptHash for contract in self._contracts.values()] + list(self._watch_only)
+        found = blockchain.GetAddressTransactions(script_hashes, self._current_height, height)
+        if found is None:
+            return 0
+
+        blockcount = 0
+        for index, positions in groupby(found, key=lambda entry: entry[0]):
+            if block_limit and blockcount >= block_limit:
+                self._current_height = index
+                return blockcount
+
+            block = blockchain.GetBlockByHeight(index)
+            block.Transactions = [block.Transactions[entry[1]] for entry in positions]
+
+            self._current_height = index
+            self.ProcessNewBlock(block)
+            blockcount += 1
+
+            # could not process it, try again on the next call
+            if self._current_height != index + 1:
+                return blockcount
+
+        self._current_height = height + 1
+        return blockcount
+
     def ProcessNewBlock(self, block):
         """
         Processes a block on the blockchain.  This should be done in a sequential order, ie block 4 should be
@@ -763,7 +766,7 @@ class Wallet:
         Sets the current height to 0 and now `ProcessBlocks` will start from
         the beginning of the blockchain.
         """
-        self._coins = {}
+        self._coins = CoinIndex()
         self._current_height = 0
 
     def OnProcessNewBlock(self, block, added, changed, deleted):
@@ -788,27 +791,7 @@ class Wallet:
         Returns:
             bool: True, if transaction belongs to wallet. False, if not.
         """
-        for key, contract in self._contracts.items():
-
-            for output in tx.outputs:
-                if output.ScriptHash.ToBytes() == contract.ScriptHash.ToBytes():
-                    return True
-
-            for script in tx.scripts:
-
-                if script.VerificationScript:
-                    if bytes(contract.Script) == script.VerificationScript:
-                        return True
-
-        for watch_script_hash in self._watch_only:
-            for output in tx.outputs:
-                if output.ScriptHash == watch_script_hash:
-                    return True
-            for script in tx.scripts:
-                if Crypto.ToScriptHash(script.VerificationScript, unhex=False) == watch_script_hash:
-                    return True
-
-        return False
+        return self.GetAddressSet().ContainsTransaction(tx)
 
     def CheckAddressState(self, script_hash):
         """
@@ -820,13 +803,20 @@ class Wallet:
         Returns:
             AddressState: the address state.
         """
-        for key, contract in self._contracts.items():
-            if contract.ScriptHash.ToBytes() == script_hash.ToBytes():
-                return AddressState.InWallet
-        for watch in self._watch_only:
-            if watch == script_hash:
-                return AddressState.InWallet | AddressState.WatchOnly
-        return AddressState.NoState
+        return self.GetAddressSet().GetAddressState(script_hash)
+
+    def GetAddressSet(self):
+        """
+        Get the set of the contracts and watch only addresses of the wallet.
+
+        Returns:
+            AddressSet:
+        """
+        address_set = self._address_set
+        if address_set is None:
+            address_set = AddressSet(self._contracts.values(), self._watch_only)
+            self._address_set = address_set
+        return address_set
 
     @staticmethod
     def ToAddress(scripthash):
@@ -1003,7 +993,8 @@ class Wallet:
                         use_standard=False,
                         watch_only_val=0,
                         exclude_vin=None,
-                        use_vins_for_asset=None):
+                        use_vins_for_asset=None,
+                        selector=None):
         """
         This method is used to to calculate the necessary TransactionInputs (CoinReferences) and TransactionOutputs to
         be used when creating a transaction that involves an exchange of system assets, ( NEO, Gas, etc ).
@@ -1017,6 +1008,7 @@ class Wallet:
             watch_only_val (int): 0 or CoinState.WATCH_ONLY, if present only choose coins that are in a WatchOnly address.
             exclude_vin (list): A list of CoinReferences to NOT use in the making of this tx.
             use_vins_for_asset (list): A list of CoinReferences to use.
+            selector (neo.Wallets.CoinSelection.CoinSelector): The coin selection strategy, by default an exact match or the smallest coins first.
 
         Returns:
             tx: (Transaction) Returns the transaction with oupdated inputs and outputs.
@@ -1054,7 +1046,7 @@ class Wallet:
 
         paycoins = {}
 
-        self._vin_exclude = exclude_vin
+        self._vin_exclude = set(exclude_vin) if exclude_vin else None
 
         for assetId, amount in paytotal.items():
 
@@ -1062,7 +1054,8 @@ class Wallet:
                 paycoins[assetId] = self.FindCoinsByVins(use_vins_for_asset[0])
             else:
                 paycoins[assetId] = self.FindUnspentCoinsByAssetAndTotal(
-                    assetId, amount, from_addr=from_addr, use_standard=use_standard, watch_only_val=watch_only_val)
+                    assetId, amount, from_addr=from_addr, use_standard=use_standard, watch_only_val=watch_only_val,
+                    selector=selector)
 
         self._vin_exclude = None
 
@@ -1125,18 +1118,12 @@ class Wallet:
         Returns:
             bool: True is successfully processes, otherwise False if input is not in the coin list, already spent or not confirmed.
         """
-        coins = self.GetCoins()
         changed = []
         added = []
         deleted = []
         found_coin = False
         for input in tx.inputs:
-            coin = None
-
-            for coinref in coins:
-                test_coin = coinref.Reference
-                if test_coin == input:
-                    coin = coinref
+            coin = self._coins.get(input)
 
             if coin is None:
                 return False
@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+from neo.Core.TX.Transaction import TransactionOutput, ContractTransaction
+from neo.Core.Witness import Witness
+from neo.SmartContract.Contract import Contract
+from neo.Wallets.AddressSet import AddressSet
+from neo.Wallets.AddressState import AddressState
+from neo.Wallets.Wallet import Wallet
+from neo.Wallets.utils import to_aes_key
+from neocore.Cryptography.Crypto import Crypto
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+
+
+class AddressSetTestCase(TestCase):
+    ASSET = UInt256(data=b'\x01' * 32)
+
+    # verification scripts of a signature contract and of a watch only address
+    SCRIPT = b'\x21' + b'\x02' * 33 + b'\xac'
+    WATCH_SCRIPT = b'\x21' + b'\x03' * 33 + b'\xac'
+    OTHER_SCRIPT = b'\x21' + b'\x04' * 33 + b'\xac'
+
+    def setUp(self):
+        self.contract = Contract(self.SCRIPT, b'\x00', UInt160(data=b'\x01' * 20))
+        self.watch = Crypto.ToScriptHash(self.WATCH_SCRIPT, unhex=False)
+        self.other = Crypto.ToScriptHash(self.OTHER_SCRIPT, unhex=False)
+        self.addresses = AddressSet([self.contract], [self.watch])
+
+    def tx(self, script_hash=None, verification_script=None):
+        outputs = [TransactionOutput(AssetId=self.ASSET, Value=Fixed8.One(), script_hash=script_hash)] if script_hash else []
+        tx = ContractTransaction(outputs=outputs)
+        tx.scripts = [Witness(b'\x00', verification_script)] if verification_script else []
+        return tx
+
+    def test_address_state(self):
+        self.assertEqual(self.addresses.GetAddressState(self.contract.ScriptHash), AddressState.InWallet)
+        self.assertEqual(self.addresses.GetAddressState(self.watch), AddressState.InWallet | AddressState.WatchOnly)
+        self.assertEqual(self.addresses.GetAddressState(self.other), AddressState.NoState)
+
+    def test_contains_transaction(self):
+        self.assertTrue(self.addresses.ContainsTransaction(self.tx(script_hash=self.contract.ScriptHash)))
+        self.assertTrue(self.addresses.ContainsTransaction(self.tx(script_hash=self.watch)))
+        self.assertTrue(self.addresses.ContainsTransaction(self.tx(script_hash=self.other, verification_script=self.SCRIPT)))
+        self.assertTrue(self.addresses.ContainsTransaction(self.tx(verification_script=self.WATCH_SCRIPT)))
+
+        self.assertFalse(self.addresses.ContainsTransaction(self.tx(script_hash=self.other, verification_script=self.OTHER_SCRIPT)))
+        self.assertFalse(self.addresses.ContainsTransaction(self.tx()))
+
+    def test_wallet_changes(self):
+        wallet = Wallet('', to_aes_key('unittest password'), True)
+        self.assertEqual(wallet.CheckAddressState(self.watch), AddressState.NoState)
+
+        wallet.AddWatchOnly(self.watch)
+        self.assertEqual(wallet.CheckAddressState(self.watch), AddressState.InWallet | AddressState.WatchOnly)
+        self.assertTrue(wallet.IsWalletTransaction(self.tx(script_hash=self.watch)))
+
+        wallet.DeleteAddress(self.watch)
+        self.assertEqual(wallet.CheckAddressState(self.watch), AddressState.NoState)
+        self.assertFalse(wallet.IsWalletTransaction(self.tx(script_hash=self.watch)))
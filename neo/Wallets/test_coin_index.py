@@ -0,0 +1,122 @@
+from unittest import TestCase
+
+from neo.Core.CoinReference import CoinReference
+from neo.Core.State.CoinState import CoinState
+from neo.Core.TX.Transaction import TransactionOutput
+from neo.Wallets.Coin import Coin
+from neo.Wallets.CoinIndex import CoinIndex
+from neo.Wallets.Wallet import Wallet
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+
+
+class CoinIndexTestCase(TestCase):
+    NEO = UInt256(data=b'\x01' * 32)
+    GAS = UInt256(data=b'\x02' * 32)
+    ADDR1 = UInt160(data=b'\x01' * 20)
+    ADDR2 = UInt160(data=b'\x02' * 20)
+
+    def coin(self, index, value, asset=NEO, addr=ADDR1, state=CoinState.Confirmed):
+        reference = CoinReference(prev_hash=UInt256(data=index.to_bytes(32, 'little')), prev_index=0)
+        output = TransactionOutput(AssetId=asset, Value=Fixed8.FromDecimal(value), script_hash=addr)
+        return Coin.CoinFromRef(reference, output, state=state)
+
+    def index(self, coins):
+        return CoinIndex({coin.Reference: coin for coin in coins})
+
+    def values(self, coins):
+        return [coin.Output.Value.ToInt() for coin in coins]
+
+    def wallet(self, coins):
+        wallet = Wallet.__new__(Wallet)
+        wallet._coins = self.index(coins)
+        return wallet
+
+    def test_buckets(self):
+        coins = [self.coin(1, 5), self.coin(2, 3), self.coin(3, 7, addr=self.ADDR2), self.coin(4, 1, asset=self.GAS),
+                 self.coin(5, 2, state=CoinState.Confirmed | CoinState.Spent)]
+        index = self.index(coins)
+
+        self.assertEqual(len(index), 5)
+        buckets = [bucket for addr, bucket in index.GetBuckets(asset_id=self.NEO)]
+        self.assertEqual(sum(bucket.Total for bucket in buckets), Fixed8.FromDecimal(15).value)
+
+        self.assertEqual(self.values(CoinIndex.InWalletOrder(buckets)), [5, 3, 7])
+        self.assertEqual(self.values(CoinIndex.ByValue(buckets)), [3, 5, 7])
+        self.assertEqual(self.values(CoinIndex.ByValue(buckets, reverse=True)), [7, 5, 3])
+
+        buckets = [bucket for addr, bucket in index.GetBuckets(asset_id=self.NEO, script_hash=self.ADDR2)]
+        self.assertEqual(self.values(CoinIndex.InWalletOrder(buckets)), [7])
+
+        unclaimed = [bucket for addr, bucket in index.GetBuckets(state_class=CoinIndex.UNCLAIMED)]
+        self.assertEqual(self.values(CoinIndex.InWalletOrder(unclaimed)), [2])
+
+    def test_state_changes_move_coins(self):
+        coins = [self.coin(1, 5), self.coin(2, 3)]
+        index = self.index(coins)
+
+        coins[0].State |= CoinState.Spent
+        available = [bucket for addr, bucket in index.GetBuckets()]
+        self.assertEqual(self.values(CoinIndex.InWalletOrder(available)), [3])
+        unclaimed = [bucket for addr, bucket in index.GetBuckets(state_class=CoinIndex.UNCLAIMED)]
+        self.assertEqual(self.values(CoinIndex.InWalletOrder(unclaimed)), [5])
+
+        coins[1].State |= CoinState.WatchOnly
+        self.assertEqual(index.GetBuckets(), [])
+        watched = [bucket for addr, bucket in index.GetBuckets(watch_only_val=CoinState.WatchOnly)]
+        self.assertEqual(self.values(CoinIndex.InWalletOrder(watched)), [3])
+
+        # removed coins are no longer tracked
+        del index[coins[1].Reference]
+        coins[1].State = CoinState.Confirmed
+        self.assertEqual(index.GetBuckets(), [])
+        self.assertEqual(len(index), 1)
+
+    def test_replaced_coin_keeps_wallet_order(self):
+        coins = [self.coin(1, 5), self.coin(2, 3), self.coin(3, 3)]
+        index = self.index(coins)
+
+        replacement = self.coin(1, 5, state=CoinState.Confirmed | CoinState.Locked)
+        index[replacement.Reference] = replacement
+        replacement.State = CoinState.Confirmed
+
+        # the replaced coin is not tracked anymore
+        coins[0].State |= CoinState.Spent
+
+        buckets = [bucket for addr, bucket in index.GetBuckets()]
+        self.assertEqual([coin.Reference for coin in CoinIndex.InWalletOrder(buckets)],
+                         [coin.Reference for coin in coins])
+        self.assertIs(CoinIndex.InWalletOrder(buckets)[0], replacement)
+
+    def test_find_value(self):
+        coins = [self.coin(1, 3), self.coin(2, 5), self.coin(3, 3, addr=self.ADDR2)]
+        buckets = [bucket for addr, bucket in self.index(coins).GetBuckets()]
+        value = Fixed8.FromDecimal(3).value
+
+        self.assertIs(CoinIndex.FindValue(buckets, value), coins[0])
+        self.assertIs(CoinIndex.FindValue(buckets, value, reverse=True), coins[2])
+        self.assertIs(CoinIndex.FindValue(buckets, value, exclude={coins[0].Reference}), coins[2])
+        self.assertIsNone(CoinIndex.FindValue(buckets, Fixed8.FromDecimal(4).value))
+
+    def test_wallet_find_unspent_by_total(self):
+        coins = [self.coin(1, 4), self.coin(2, 2), self.coin(3, 6), self.coin(4, 2, addr=self.ADDR2),
+                 self.coin(5, 1, asset=self.GAS)]
+        wallet = self.wallet(coins)
+
+        self.assertEqual(wallet.FindUnspentCoinsByAssetAndTotal(self.NEO, Fixed8.FromDecimal(2)), [coins[1]])
+        self.assertEqual(wallet.FindUnspentCoinsByAssetAndTotal(self.NEO, Fixed8.FromDecimal(2), reverse=True),
+                         [coins[3]])
+        self.assertEqual(self.values(wallet.FindUnspentCoinsByAssetAndTotal(self.NEO, Fixed8.FromDecimal(5))), [2, 2, 4])
+        self.assertEqual(self.values(wallet.FindUnspentCoinsByAssetAndTotal(self.NEO, Fixed8.FromDecimal(5),
+                                                                            reverse=True)), [6])
+        self.assertIsNone(wallet.FindUnspentCoinsByAssetAndTotal(self.NEO, Fixed8.FromDecimal(15)))
+
+        wallet._vin_exclude = {coins[2].Reference}
+        self.assertIsNone(wallet.FindUnspentCoinsByAssetAndTotal(self.NEO, Fixed8.FromDecimal(9)))
+        self.assertEqual(self.values(wallet.FindUnspentCoinsByAsset(self.NEO)), [4, 2, 2])
+        wallet._vin_exclude = None
+
+        self.assertEqual(self.values(wallet.FindUnspentCoinsByAsset(self.NEO, from_addr=self.ADDR2)), [2])
+        self.assertEqual(wallet.FindCoinsByVins([coins[4].Reference, coins[0].Reference]), [coins[4], coins[0]])
+        self.assertEqual(wallet.GetBalance(self.NEO), Fixed8.FromDecimal(14))
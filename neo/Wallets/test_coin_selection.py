@@ -0,0 +1,77 @@
+from unittest import TestCase
+
+from neo.Core.CoinReference import CoinReference
+from neo.Core.State.CoinState import CoinState
+from neo.Core.TX.Transaction import TransactionOutput
+from neo.Wallets.Coin import Coin
+from neo.Wallets.CoinIndex import CoinIndex
+from neo.Wallets.CoinSelection import CoinSelector, LargestFirstSelector, BranchAndBoundSelector, ConsolidationSelector
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+
+
+class CoinSelectionTestCase(TestCase):
+    NEO = UInt256(data=b'\x01' * 32)
+    ADDR = UInt160(data=b'\x01' * 20)
+
+    def buckets(self, values):
+        coins = {}
+        for index, value in enumerate(values):
+            reference = CoinReference(prev_hash=UInt256(data=index.to_bytes(32, 'little')), prev_index=0)
+            output = TransactionOutput(AssetId=self.NEO, Value=Fixed8.FromDecimal(value), script_hash=self.ADDR)
+            coins[reference] = Coin.CoinFromRef(reference, output, state=CoinState.Confirmed)
+        return [bucket for addr, bucket in CoinIndex(coins).GetBuckets()]
+
+    def select(self, selector, values, amount):
+        coins = selector.Select(self.buckets(values), Fixed8.FromDecimal(amount))
+        return sorted(coin.Output.Value.ToInt() for coin in coins) if coins is not None else None
+
+    def test_default(self):
+        self.assertEqual(self.select(CoinSelector(), [1, 2, 3, 7], 3), [3])
+        self.assertEqual(self.select(CoinSelector(), [1, 2, 3, 7], 5), [1, 2, 3])
+        self.assertEqual(self.select(CoinSelector(), [1, 2, 3, 7], 14), None)
+
+        # too many inputs, use the largest coins
+        self.assertEqual(self.select(CoinSelector(max_inputs=2), [1, 2, 3, 7], 5), [7])
+        self.assertEqual(self.select(CoinSelector(max_inputs=2), [1, 2, 3, 7], 11), None)
+
+    def test_largest_first(self):
+        self.assertEqual(self.select(LargestFirstSelector(), [1, 2, 3, 7], 3), [7])
+        self.assertEqual(self.select(LargestFirstSelector(), [1, 2, 3, 7], 9), [3, 7])
+
+    def test_branch_and_bound(self):
+        self.assertEqual(self.select(BranchAndBoundSelector(), [1, 2, 5, 7, 8], 10), [2, 8])
+        self.assertEqual(self.select(BranchAndBoundSelector(), [1, 2, 5, 7, 11], 10), [1, 2, 7])
+        self.assertEqual(self.select(BranchAndBoundSelector(), [3, 3, 3, 3, 5], 11), [3, 3, 5])
+        self.assertEqual(self.select(BranchAndBoundSelector(), [4, 4, 4, 9], 12), [4, 4, 4])
+        self.assertEqual(self.select(BranchAndBoundSelector(max_inputs=2), [4, 4, 4, 9], 12), [4, 9])
+        self.assertEqual(self.select(BranchAndBoundSelector(max_inputs=2), [4, 4, 4, 6], 12), None)
+
+        # no exact match, the fallback pays
+        self.assertEqual(self.select(BranchAndBoundSelector(), [2, 4, 6], 5), [2, 4])
+        self.assertEqual(self.select(BranchAndBoundSelector(fallback=LargestFirstSelector()), [2, 4, 6], 5), [6])
+
+    def test_branch_and_bound_gives_up(self):
+        selector = BranchAndBoundSelector()
+        selector.MAX_TRIES = 10
+        self.assertEqual(self.select(selector, [2] * 20 + [7], 41), [2] * 20 + [7])
+
+        # the search finds the odd coin given enough tries
+        self.assertEqual(self.select(BranchAndBoundSelector(), [2] * 20 + [7], 11), [2, 2, 7])
+
+    def test_consolidation(self):
+        values = [1, 1, 2, 2, 3, 50]
+        self.assertEqual(self.select(ConsolidationSelector(), values, 5), values)
+        self.assertEqual(self.select(ConsolidationSelector(max_inputs=3), values, 5), [1, 1, 3])
+        self.assertEqual(self.select(ConsolidationSelector(max_inputs=3), values, 20), [1, 1, 50])
+        self.assertEqual(self.select(ConsolidationSelector(max_inputs=2), values, 52), [2, 50])
+        self.assertEqual(self.select(ConsolidationSelector(max_inputs=2), values, 54), None)
+
+    def test_exclude(self):
+        buckets = self.buckets([1, 2, 3])
+        exclude = {buckets[0].Coins[2].Reference}
+
+        for selector in [CoinSelector(), LargestFirstSelector(), BranchAndBoundSelector(), ConsolidationSelector()]:
+            coins = selector.Select(buckets, Fixed8.FromDecimal(3), exclude)
+            self.assertEqual(sorted(coin.Output.Value.ToInt() for coin in coins), [1, 2])
@@ -179,7 +179,7 @@ class JsonRpcApi:
             return contract.ToJson()
 
         elif method == "getrawmempool":
-            return list(map(lambda hash: "0x%s" % hash.decode('utf-8'), NodeLeader.Instance().MemPool.keys()))
+            return [tx.Hash.To0xString() for tx in NodeLeader.Instance().MemPool.GetTransactions()]
 
         elif method == "getversion":
             return {
@@ -4,12 +4,13 @@ create HTTP routes and handlers with Twisted in a similar style to Flask:
 https://github.com/twisted/klein
 
 """
+import binascii
 import json
 from klein import Klein
 from logzero import logger
 
 from neo.Network.NodeLeader import NodeLeader
-from neo.Implementations.Notifications.LevelDB.NotificationDB import NotificationDB
+from neo.Implementations.Notifications.LevelDB.NotificationDB import NotificationDB, InvalidCursorError
 from neo.Core.Blockchain import Blockchain
 from neocore.UInt160 import UInt160
 from neocore.UInt256 import UInt256
@@ -39,7 +40,7 @@ class RestApi:
             <li><pre>{apiPrefix}/notifications/contract/&lt;hash&gt;</pre><em>notifications by contract</em></li>
             <li><pre>{apiPrefix}/tokens</pre><em>lists all NEP5 Tokens</em></li>
             <li><pre>{apiPrefix}/token/&lt;contract_hash&gt;</pre><em>list an NEP5 Token</em></li>
-            <li><pre>{apiPrefix}/status</pre> <em>current block height and version</em></li>
+            <li><pre>{apiPrefix}/status</pre> <em>current block height, version and notification indexing lag</em></li>
         </ul>
         """.format(apiPrefix=API_URL_PREFIX)
 
@@ -62,6 +63,8 @@ class RestApi:
                             <p>you may request a different page by specifying the <code>page</code> query string param, for example:</p>
                             <pre>/block/123456?page=3</pre>
                             <p>page index starts at 0, so the 2nd page would be <code>?page=1</code></p>
+                            <p>results by address and by contract include a <code>next_cursor</code>, pass it as the <code>cursor</code> query string param to get the next page quickly, for example:</p>
+                            <pre>/addr/&lt;addr&gt;?cursor=&lt;next_cursor&gt;</pre>
                             <hr/>
                             <h3>sample output</h3>
                             <pre>
@@ -138,11 +141,19 @@ class RestApi:
     def get_by_addr(self, request, address):
         request.setHeader('Content-Type', 'application/json')
         try:
-            notifications = self.notif.get_by_addr(address)
+            page, page_len, cursor = self.get_page_args(request)
+        except ValueError as e:
+            return self.format_bad_request(request, str(e))
+        try:
+            offset = page_len * (page - 1) if cursor is None else 0
+            notifications, next_cursor = self.notif.get_page_by_addr(address, offset, page_len, cursor)
+            total = self.notif.get_count_by_addr(address)
+        except InvalidCursorError as e:
+            return self.format_bad_request(request, str(e))
         except Exception as e:
             logger.info("Could not get notifications for address %s " % address)
             return self.format_message("Could not get notifications for address %s because %s" % (address, e))
-        return self.format_notifications(request, notifications)
+        return self.format_notification_page(request, notifications, total, next_cursor)
 
     @app.route('%s/notifications/tx/<string:tx_hash>' % API_URL_PREFIX, methods=['GET'])
     @cors_header
@@ -153,6 +164,11 @@ class RestApi:
         notifications = []
         try:
             hash = UInt256.ParseString(tx_hash)
+
+            if self.notif.has_tx_index:
+                return self.format_notifications(request, self.notif.get_by_tx(hash))
+
+            # databases created by older versions are only indexed by tx after running np-rebuild-notifications
             tx, height = bc.GetTransaction(hash)
             if not tx:
                 return self.format_message("Could not find transaction for hash %s" % (tx_hash))
@@ -170,13 +186,21 @@ class RestApi:
     @cors_header
     def get_by_contract(self, request, contract_hash):
         request.setHeader('Content-Type', 'application/json')
+        try:
+            page, page_len, cursor = self.get_page_args(request)
+        except ValueError as e:
+            return self.format_bad_request(request, str(e))
         try:
             hash = UInt160.ParseString(contract_hash)
-            notifications = self.notif.get_by_contract(hash)
+            offset = page_len * (page - 1) if cursor is None else 0
+            notifications, next_cursor = self.notif.get_page_by_contract(hash, offset, page_len, cursor)
+            total = self.notif.get_count_by_contract(hash)
+        except InvalidCursorError as e:
+            return self.format_bad_request(request, str(e))
         except Exception as e:
             logger.info("Could not get notifications for contract %s " % contract_hash)
             return self.format_message("Could not get notifications for contract hash %s because %s" % (contract_hash, e))
-        return self.format_notifications(request, notifications)
+        return self.format_notification_page(request, notifications, total, next_cursor)
 
     @app.route('%s/tokens' % API_URL_PREFIX, methods=['GET'])
     @cors_header
@@ -208,25 +232,42 @@ class RestApi:
         return json.dumps({
             'current_height': Blockchain.Default().Height + 1,
             'version': settings.VERSION_NAME,
-            'num_peers': len(NodeLeader.Instance().Peers)
+            'num_peers': len(NodeLeader.Instance().Peers),
+            'notifications': self.notif.get_index_status() if self.notif else None
         }, indent=4, sort_keys=True)
 
-    def format_notifications(self, request, notifications, show_none=False):
+    def get_page_args(self, request):
+        """
+        Get the page, page length and cursor requested with the `page`, `pagesize` and `cursor` query string params.
 
-        notif_len = len(notifications)
+        Returns:
+            tuple: the page, starting from 1, the page length and the cursor as bytes or None.
+
+        Raises:
+            ValueError: if a param is not valid.
+        """
         page_len = 500
         page = 1
-        message = ''
+        cursor = None
         if b'page' in request.args:
             try:
                 page = int(request.args[b'page'][0])
             except Exception as e:
-                print("could not get page: %s" % e)
+                raise ValueError("Invalid page: %s" % e)
+            if page < 0:
+                raise ValueError("Invalid page: %s" % page)
         if b'pagesize' in request.args:
             try:
                 page_len = int(request.args[b'pagesize'][0])
             except Exception as e:
-                print("could not get page length: %s" % e)
+                raise ValueError("Invalid page size: %s" % e)
+            if page_len <= 0:
+                raise ValueError("Invalid page size: %s" % page_len)
+        if b'cursor' in request.args:
+            try:
+                cursor = binascii.unhexlify(request.args[b'cursor'][0])
+            except Exception as e:
+                raise ValueError("Invalid cursor: %s" % e)
 
         # note, we want pages to start from 1, not 0, to be
         # in sync with C# version
@@ -234,6 +275,17 @@ class RestApi:
         if page == 0:
             page = 1
 
+        return page, page_len, cursor
+
+    def format_notifications(self, request, notifications, show_none=False):
+
+        notif_len = len(notifications)
+        try:
+            page, page_len, cursor = self.get_page_args(request)
+        except ValueError as e:
+            return self.format_bad_request(request, str(e))
+        message = ''
+
         start = page_len * (page - 1)
         end = start + page_len
 
@@ -253,6 +305,45 @@ class RestApi:
             'total_pages': total_pages
         }, indent=4, sort_keys=True)
 
+    def format_notification_page(self, request, notifications, total, next_cursor):
+        """
+        Format a page of notifications that was read from the database on its own.
+
+        Args:
+            request: the request, with the page arguments.
+            notifications (list): the notifications of the page.
+            total (int): the number of notifications of all pages.
+            next_cursor (bytes): the cursor of the next page or None.
+        """
+        page, page_len, cursor = self.get_page_args(request)
+        message = ''
+
+        if cursor is None and page_len * (page - 1) > total:
+            message = 'page greater than result length'
+
+        return json.dumps({
+            'current_height': Blockchain.Default().Height + 1,
+            'message': message,
+            'total': total,
+            'results': [n.ToJson() for n in notifications],
+            'page': page,
+            'page_len': page_len,
+            'total_pages': math.ceil(total / page_len),
+            'next_cursor': binascii.hexlify(next_cursor).decode() if next_cursor else None
+        }, indent=4, sort_keys=True)
+
+    def format_bad_request(self, request, message):
+        """
+        Answer a request with invalid params with status 400.
+
+        Args:
+            request: the request.
+            message (str): what is wrong with the request.
+        """
+        logger.info("Bad request %s: %s" % (request.uri, message))
+        request.setResponseCode(400)
+        return self.format_message(message)
+
     def format_message(self, message):
         return json.dumps({
             'current_height': Blockchain.Default().Height + 1,
@@ -222,6 +222,40 @@ class NotificationDBTestCase(BlockchainFixtureTestCase):
         results = jsn['results']
         self.assertEqual(len(results), 27)
 
+    def test_cursor_for_addr_results(self):
+        mock_req = requestMock(path=b'/addr/AFmseVrdL9f9oyCzZefL9tG6UbvhPbdYzM')
+        res = self.app.get_by_addr(mock_req, 'AFmseVrdL9f9oyCzZefL9tG6UbvhPbdYzM')
+        jsn = json.loads(res)
+        first_page = jsn['results']
+        cursor = jsn['next_cursor']
+        self.assertIsNotNone(cursor)
+
+        mock_req = requestMock(path=('/addr/AFmseVrdL9f9oyCzZefL9tG6UbvhPbdYzM?cursor=%s' % cursor).encode())
+        res = self.app.get_by_addr(mock_req, 'AFmseVrdL9f9oyCzZefL9tG6UbvhPbdYzM')
+        jsn = json.loads(res)
+        self.assertEqual(jsn['total'], 1027)
+        self.assertEqual(len(jsn['results']), 500)
+        self.assertNotEqual(jsn['results'][0], first_page[0])
+
+        mock_req = requestMock(path=('/addr/AFmseVrdL9f9oyCzZefL9tG6UbvhPbdYzM?cursor=%s' % jsn['next_cursor']).encode())
+        res = self.app.get_by_addr(mock_req, 'AFmseVrdL9f9oyCzZefL9tG6UbvhPbdYzM')
+        jsn = json.loads(res)
+        self.assertEqual(len(jsn['results']), 27)
+        self.assertIsNone(jsn['next_cursor'])
+
+    def test_invalid_page_args(self):
+        for query in [b'pagesize=0', b'pagesize=abc', b'page=-1', b'cursor=zz', b'cursor=' + b'55' * 24]:
+            mock_req = requestMock(path=b'/addr/AFmseVrdL9f9oyCzZefL9tG6UbvhPbdYzM?' + query)
+            res = self.app.get_by_addr(mock_req, 'AFmseVrdL9f9oyCzZefL9tG6UbvhPbdYzM')
+            jsn = json.loads(res)
+            self.assertEqual(mock_req.code, 400)
+            self.assertIsNone(jsn['results'])
+            self.assertIn('Invalid', jsn['message'])
+
+        mock_req = requestMock(path=b'/tokens?pagesize=0')
+        self.app.get_tokens(mock_req)
+        self.assertEqual(mock_req.code, 400)
+
     def test_block_heigher_than_current(self):
         mock_req = requestMock(path=b'/block/8000000')
         res = self.app.get_by_block(mock_req, 800000)
@@ -119,6 +119,14 @@ def main():
     parser.add_argument("--maxpeers", action="store", default=5,
                         help="Max peers to use for P2P Joining")
 
+    # witness verification
+    parser.add_argument("--verification-cache-size", action="store", type=int,
+                        help="Number of verified witnesses to remember, 0 to verify every witness again")
+
+    # address index
+    parser.add_argument("--address-index", action="store_true", default=False,
+                        help="Index the transactions of every address, so wallets sync without reading every block")
+
     # If a wallet should be opened
     parser.add_argument("--wallet",
                         action="store",
@@ -165,6 +173,12 @@ def main():
     if args.maxpeers:
         settings.set_max_peers(args.maxpeers)
 
+    if args.verification_cache_size is not None:
+        settings.set_verification_cache_size(args.verification_cache_size)
+
+    if args.address_index:
+        settings.set_address_index(True)
+
     if args.syslog or args.syslog_local is not None:
         # Setup the syslog facility
         if args.syslog_local is not None:
@@ -4,11 +4,15 @@ from neo.Core.Blockchain import Blockchain
 from neo.Core.Block import Block
 from neo.IO.MemoryStream import MemoryStream
 from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Notifications.LevelDB.NotificationDB import NotificationDB
 from neo.Settings import settings
 from neocore.IO.BinaryReader import BinaryReader
 import argparse
+import mmap
 import os
 import shutil
+import tempfile
+import time
 from tqdm import trange
 from prompt_toolkit import prompt
 
@@ -29,6 +33,13 @@ def main():
 
     parser.add_argument("-l", "--logevents", help="Log Smart Contract Events", default=False, action="store_true")
 
+    parser.add_argument("-b", "--batchsize", help="Number of blocks written to disk at once", type=int, default=1000)
+
+    parser.add_argument("-n", "--notifications", help="Index smart contract notifications", default=False, action="store_true")
+
+    parser.add_argument("-d", "--defer-notifications", default=False, action="store_true",
+                        help="Index smart contract notifications after all blocks are imported, implies --notifications")
+
     args = parser.parse_args()
 
     if args.mainnet and args.config:
@@ -52,9 +63,11 @@ def main():
         raise Exception("Please specify an input path")
     file_path = args.input
 
-    with open(file_path, 'rb') as file_input:
+    with open(file_path, 'rb') as file_input, mmap.mmap(file_input.fileno(), 0, access=mmap.ACCESS_READ) as data:
 
-        total_blocks = int.from_bytes(file_input.read(4), 'little')
+        total_blocks = int.from_bytes(data[0:4], 'little')
+        if args.totalblocks:
+            total_blocks = min(total_blocks, args.totalblocks)
 
         target_dir = os.path.join(settings.DATA_DIR_PATH, settings.LEVELDB_PATH)
         notif_target_dir = os.path.join(settings.DATA_DIR_PATH, settings.NOTIFICATION_DB_PATH)
@@ -82,15 +95,29 @@ def main():
 
         chain = Blockchain.Default()
 
+        spool = None
+        if args.notifications or args.defer_notifications:
+            if args.defer_notifications:
+                spool = tempfile.TemporaryFile()
+            NotificationDB.instance().start(spool)
+
         stream = MemoryStream()
         reader = BinaryReader(stream)
         block = Block()
 
-        for index in trange(total_blocks, desc='Importing Blocks', unit=' Block'):
+        # blocks are written to disk in batches of `batchsize`
+        chain.StartBulkWrite()
+        start = time.time()
+        offset = 4
+
+        progress = trange(total_blocks, desc='Importing Blocks', unit=' Block')
+        for index in progress:
             # set stream data
-            block_len = int.from_bytes(file_input.read(4), 'little')
-            reader.stream.write(file_input.read(block_len))
+            block_len = int.from_bytes(data[offset:offset + 4], 'little')
+            offset += 4
+            reader.stream.write(data[offset:offset + block_len])
             reader.stream.seek(0)
+            offset += block_len
 
             # get block
             block.Deserialize(reader)
@@ -102,6 +129,25 @@ def main():
             # reset stream
             reader.stream.Cleanup()
 
+            if (index + 1) % args.batchsize == 0:
+                chain.CommitBulkWrite()
+                progress.set_postfix(tx_per_s="%.1f" % (chain.TXProcessed / (time.time() - start)))
+
+        chain.StopBulkWrite()
+        elapsed = time.time() - start
+
+        print("Imported %s blocks in %.1fs, %.1f blocks/s, %.1f tx/s" % (
+            total_blocks, elapsed, total_blocks / elapsed, chain.TXProcessed / elapsed))
+
+        if spool:
+            print("Indexing notifications")
+            spool.seek(0)
+            NotificationDB.instance().write_spooled(spool)
+            spool.close()
+
+        if args.notifications or args.defer_notifications:
+            NotificationDB.close()
+
     print("Imported %s blocks to %s " % (total_blocks, target_dir))
 
 
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+from neo.Core.Blockchain import Blockchain
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Settings import settings
+import argparse
+import os
+import time
+from prompt_toolkit import prompt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add the blocks of a chain database that were persisted without the address index to it")
+    parser.add_argument("-m", "--mainnet", action="store_true", default=False,
+                        help="use MainNet instead of the default TestNet")
+    parser.add_argument("-c", "--config", action="store", help="Use a specific config file")
+
+    # Where to store stuff
+    parser.add_argument("--datadir", action="store",
+                        help="Absolute path to use for database directories")
+
+    parser.add_argument("-i", "--input", help="Path of the chain database. Defaults to the chain of the selected network")
+
+    parser.add_argument("-y", "--yes", action="store_true", default=False, help="Don't ask for confirmation")
+
+    args = parser.parse_args()
+
+    if args.mainnet and args.config:
+        print("Cannot use both --config and --mainnet parameters, please use only one.")
+        exit(1)
+
+    # Setting the datadir must come before setting the network, else the wrong path is checked at net setup.
+    if args.datadir:
+        settings.set_data_dir(args.datadir)
+
+    # Setup depending on command line arguments. By default, the testnet settings are already loaded.
+    if args.config:
+        settings.setup(args.config)
+    elif args.mainnet:
+        settings.setup_mainnet()
+
+    path = args.input if args.input else settings.chain_leveldb_path
+
+    if not os.path.exists(path):
+        print("No chain database found at %s" % path)
+        return False
+
+    print("Will index the addresses of the blocks in %s. If the indexing is interrupted it has to be run again." % path)
+    if not settings.ADDRESS_INDEX:
+        print("Enable AddressIndex in the config or use --address-index, else the index is dropped as soon as the next block is persisted.")
+
+    if not args.yes:
+        print("Make sure no other process is using the database.\nType 'confirm' to continue")
+        confirm = prompt("[confirm]> ", is_password=False)
+        if not confirm == 'confirm':
+            print("Cancelled operation")
+            return False
+
+    start = time.time()
+
+    def progress(height):
+        print("Indexed %s blocks (%.0f blocks/s)" % (height + 1, (height + 1) / max(time.time() - start, 1e-6)), end='\r')
+
+    try:
+        blockchain = LevelDBBlockchain(path)
+    except Exception as e:
+        print("Could not open database: %s" % e)
+        return False
+
+    Blockchain.RegisterBlockchain(blockchain)
+
+    try:
+        count = blockchain.IndexAddresses(progress)
+    finally:
+        blockchain.Dispose()
+
+    print("\nIndexed %s blocks in %.1f seconds" % (count, time.time() - start))
+
+
+if __name__ == "__main__":
+    main()
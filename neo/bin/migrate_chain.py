@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+from neo.Implementations.Blockchains.LevelDB.SchemaMigration import migrate_to_binary, get_dir_size
+from neo.Settings import settings
+import argparse
+import os
+import time
+from prompt_toolkit import prompt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a chain database from the legacy hex schema to the binary schema")
+    parser.add_argument("-m", "--mainnet", action="store_true", default=False,
+                        help="use MainNet instead of the default TestNet")
+    parser.add_argument("-c", "--config", action="store", help="Use a specific config file")
+
+    # Where to store stuff
+    parser.add_argument("--datadir", action="store",
+                        help="Absolute path to use for database directories")
+
+    parser.add_argument("-i", "--input", help="Path of the chain database to convert. Defaults to the chain of the selected network")
+
+    parser.add_argument("-o", "--output", help="Write the converted database to this path instead of converting it in place")
+
+    parser.add_argument("-y", "--yes", action="store_true", default=False, help="Don't ask for confirmation")
+
+    args = parser.parse_args()
+
+    if args.mainnet and args.config:
+        print("Cannot use both --config and --mainnet parameters, please use only one.")
+        exit(1)
+
+    # Setting the datadir must come before setting the network, else the wrong path is checked at net setup.
+    if args.datadir:
+        settings.set_data_dir(args.datadir)
+
+    # Setup depending on command line arguments. By default, the testnet settings are already loaded.
+    if args.config:
+        settings.setup(args.config)
+    elif args.mainnet:
+        settings.setup_mainnet()
+
+    source_path = args.input if args.input else settings.chain_leveldb_path
+
+    if not os.path.exists(source_path):
+        print("No chain database found at %s" % source_path)
+        return False
+
+    if args.output:
+        print("Will convert %s to %s" % (source_path, args.output))
+    else:
+        print("Will convert %s in place. If the conversion is interrupted, run this command again to finish it." % source_path)
+
+    if not args.yes:
+        print("Make sure no other process is using the database.\nType 'confirm' to continue")
+        confirm = prompt("[confirm]> ", is_password=False)
+        if not confirm == 'confirm':
+            print("Cancelled operation")
+            return False
+
+    size_before = get_dir_size(source_path)
+    start = time.time()
+
+    def progress(count):
+        print("Converted %s records (%.0f records/s)" % (count, count / max(time.time() - start, 1e-6)), end='\r')
+
+    try:
+        count = migrate_to_binary(source_path, args.output, progress)
+    except Exception as e:
+        print("\nCould not convert database: %s" % e)
+        return False
+
+    size_after = get_dir_size(args.output if args.output else source_path)
+
+    print("\nConverted %s records in %.1f seconds" % (count, time.time() - start))
+    print("Database size: %.1f MB -> %.1f MB" % (size_before / 1024 / 1024, size_after / 1024 / 1024))
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ from twisted.internet import reactor, task
 from neo import __version__
 from neo.Core.Blockchain import Blockchain
 from neo.SmartContract.ContractParameter import ContractParameter, ContractParameterType
+from neo.SmartContract.VerificationCache import VerificationCache
 from neocore.Fixed8 import Fixed8
 from neo.IO.MemoryStream import StreamManager
 from neo.Wallets.utils import to_aes_key
@@ -150,7 +151,7 @@ class PromptInterface:
                 'withdraw cleanup # cleans up completed holds',
                 'withdraw # withdraws the first hold availabe',
                 'withdraw all # withdraw all holds available',
-                'send {assetId or name} {address} {amount} (--from-addr={addr})',
+                'send {assetId or name} {address} {amount} (--from-addr={addr}) (--select={default/exact/largest/consolidate}) (--max-inputs={count})',
                 'sign {transaction in JSON format}',
                 'testinvoke {contract hash} [{params} or --i] (--attach-neo={amount}, --attach-gas={amount}) (--from-addr={addr}) --no-parse-addr (parse address strings to script hash bytearray)',
                 'debugstorage {on/off/reset}'
@@ -617,6 +618,13 @@ class PromptInterface:
         out += "Time elapsed %s mins\n" % mins
         out += "Blocks per min %s \n" % bpm
         out += "TPS: %s \n" % tps
+
+        state_cache = Blockchain.Default().StateCache
+        if state_cache is not None:
+            out += "State cache: %s items, hit rate %.1f%%\n" % (len(state_cache), state_cache.HitRate * 100)
+
+        verification_cache = VerificationCache.Default()
+        out += "Witness verifications: %s VM runs, %s avoided\n" % (verification_cache.VMRuns, verification_cache.VMRunsAvoided)
         tokens = [("class:number", out)]
         print_formatted_text(FormattedText(tokens), style=self.token_style)
 
@@ -625,6 +633,8 @@ class PromptInterface:
             out = "Total Connected: %s\n" % len(NodeLeader.Instance().Peers)
             for peer in NodeLeader.Instance().Peers:
                 out += "Peer %s - IO: %s\n" % (peer.Name(), peer.IOStats())
+            for name, stats in NodeLeader.Instance().CacheStats().items():
+                out += "%s: %s items, %s evicted, %s expired\n" % (name, stats['size'], stats['evictions'], stats['expirations'])
             print_formatted_text(FormattedText([("class:number", out)]), style=self.token_style)
         else:
             print("Not connected yet\n")
@@ -1061,6 +1071,14 @@ def main():
     parser.add_argument("--maxpeers", action="store", default=5,
                         help="Max peers to use for P2P Joining")
 
+    # witness verification
+    parser.add_argument("--verification-cache-size", action="store", type=int,
+                        help="Number of verified witnesses to remember, 0 to verify every witness again")
+
+    # address index
+    parser.add_argument("--address-index", action="store_true", default=False,
+                        help="Index the transactions of every address, so wallets sync without reading every block")
+
     # Show the neo-python version
     parser.add_argument("--version", action="version",
                         version="neo-python v{version}".format(version=__version__))
@@ -1100,6 +1118,12 @@ def main():
     if args.maxpeers:
         settings.set_max_peers(args.maxpeers)
 
+    if args.verification_cache_size is not None:
+        settings.set_verification_cache_size(args.verification_cache_size)
+
+    if args.address_index:
+        settings.set_address_index(True)
+
     # Instantiate the blockchain and subscribe to notifications
     blockchain = LevelDBBlockchain(settings.chain_leveldb_path)
     Blockchain.RegisterBlockchain(blockchain)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+from neo.Implementations.Notifications.LevelDB.NotificationDB import NotificationDB
+from neo.Settings import settings
+import argparse
+import os
+import time
+from prompt_toolkit import prompt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the address, contract and transaction indexes of a notification database")
+    parser.add_argument("-m", "--mainnet", action="store_true", default=False,
+                        help="use MainNet instead of the default TestNet")
+    parser.add_argument("-c", "--config", action="store", help="Use a specific config file")
+
+    # Where to store stuff
+    parser.add_argument("--datadir", action="store",
+                        help="Absolute path to use for database directories")
+
+    parser.add_argument("-i", "--input", help="Path of the notification database. Defaults to the notification database of the selected network")
+
+    parser.add_argument("-y", "--yes", action="store_true", default=False, help="Don't ask for confirmation")
+
+    args = parser.parse_args()
+
+    if args.mainnet and args.config:
+        print("Cannot use both --config and --mainnet parameters, please use only one.")
+        exit(1)
+
+    # Setting the datadir must come before setting the network, else the wrong path is checked at net setup.
+    if args.datadir:
+        settings.set_data_dir(args.datadir)
+
+    # Setup depending on command line arguments. By default, the testnet settings are already loaded.
+    if args.config:
+        settings.setup(args.config)
+    elif args.mainnet:
+        settings.setup_mainnet()
+
+    path = args.input if args.input else settings.notification_leveldb_path
+
+    if not os.path.exists(path):
+        print("No notification database found at %s" % path)
+        return False
+
+    print("Will rebuild the indexes of %s. If the rebuild is interrupted it has to be run again." % path)
+
+    if not args.yes:
+        print("Make sure no other process is using the database.\nType 'confirm' to continue")
+        confirm = prompt("[confirm]> ", is_password=False)
+        if not confirm == 'confirm':
+            print("Cancelled operation")
+            return False
+
+    start = time.time()
+
+    def progress(count):
+        print("Indexed %s events (%.0f events/s)" % (count, count / max(time.time() - start, 1e-6)), end='\r')
+
+    try:
+        db = NotificationDB(path)
+    except Exception as e:
+        print("Could not open database: %s" % e)
+        return False
+
+    try:
+        count = db.rebuild_indexes(progress)
+    finally:
+        db.db.close()
+
+    print("\nIndexed %s events in %.1f seconds" % (count, time.time() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,9 @@ setup(
             'np-sign=neo.bin.sign_message:main',
             'np-export=neo.bin.export_blocks:main',
             'np-import=neo.bin.import_blocks:main',
+            'np-migrate-chain=neo.bin.migrate_chain:main',
+            'np-rebuild-notifications=neo.bin.rebuild_notifications:main',
+            'np-index-addresses=neo.bin.index_addresses:main',
         ],
     },
     include_package_data=True,